@@ -0,0 +1,416 @@
+"""add course_member_content_progress read model
+
+Revision ID: c4e1d2a7b9f3
+Revises: 9b7a6f4f4a1d
+Create Date: 2025-03-03 00:00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'c4e1d2a7b9f3'
+down_revision = '9b7a6f4f4a1d'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'course_member_content_progress',
+        sa.Column('course_member_id', postgresql.UUID(), nullable=False),
+        sa.Column('course_content_id', postgresql.UUID(), nullable=False),
+        sa.Column('course_id', postgresql.UUID(), nullable=False),
+        sa.Column('course_submission_group_id', postgresql.UUID(), nullable=True),
+        sa.Column('latest_result_id', postgresql.UUID(), nullable=True),
+        sa.Column('latest_result_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('latest_submitted_result_id', postgresql.UUID(), nullable=True),
+        sa.Column('latest_submitted_result_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('best_result', sa.Float(precision=53), nullable=True),
+        sa.Column('result_count', sa.Integer(), server_default=sa.text('0'), nullable=False),
+        sa.Column('submitted_count', sa.Integer(), server_default=sa.text('0'), nullable=False),
+        sa.Column('latest_grading_id', postgresql.UUID(), nullable=True),
+        sa.Column('grading_status', sa.Integer(), nullable=True),
+        sa.Column('grading', sa.Float(precision=53), nullable=True),
+        sa.Column('content_unread_count', sa.Integer(), server_default=sa.text('0'), nullable=False),
+        sa.Column('submission_group_unread_count', sa.Integer(), server_default=sa.text('0'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['course_member_id'], ['course_member.id'], ondelete='CASCADE', onupdate='RESTRICT'),
+        sa.ForeignKeyConstraint(['course_content_id'], ['course_content.id'], ondelete='CASCADE', onupdate='RESTRICT'),
+        sa.ForeignKeyConstraint(['course_id'], ['course.id'], ondelete='CASCADE', onupdate='RESTRICT'),
+        sa.ForeignKeyConstraint(['course_submission_group_id'], ['course_submission_group.id'], ondelete='SET NULL', onupdate='RESTRICT'),
+        sa.ForeignKeyConstraint(['latest_result_id'], ['result.id'], ondelete='SET NULL', onupdate='RESTRICT'),
+        sa.ForeignKeyConstraint(['latest_submitted_result_id'], ['result.id'], ondelete='SET NULL', onupdate='RESTRICT'),
+        sa.ForeignKeyConstraint(['latest_grading_id'], ['course_submission_group_grading.id'], ondelete='SET NULL', onupdate='RESTRICT'),
+        sa.PrimaryKeyConstraint('course_member_id', 'course_content_id'),
+    )
+    op.create_index('course_member_content_progress_content_idx', 'course_member_content_progress', ['course_content_id'])
+    op.create_index('course_member_content_progress_course_member_idx', 'course_member_content_progress', ['course_id', 'course_member_id'])
+
+    # Recompute the progress rows of a set of (member, content) pairs in one
+    # statement. NULL arguments widen the scope: all contents of a course, all
+    # members of the content's course, or everything for a full rebuild.
+    #
+    # The first upsert only locks the rows, creating missing ones, so concurrent
+    # writers refreshing the same member and content queue on the progress row.
+    # The recompute takes a new snapshot once the lock is held and sees every
+    # write committed before it; other members and contents are not blocked.
+    op.execute("""
+        CREATE OR REPLACE FUNCTION ctutor_refresh_member_content_progress(
+            p_course_content_id uuid,
+            p_course_member_ids uuid[] DEFAULT NULL,
+            p_course_id uuid DEFAULT NULL
+        )
+        RETURNS void AS $$
+        BEGIN
+            INSERT INTO course_member_content_progress AS p (course_member_id, course_content_id, course_id)
+            SELECT cm.id, cc.id, cc.course_id
+            FROM course_content cc
+            JOIN course_member cm ON cm.course_id = cc.course_id
+            WHERE (p_course_content_id IS NULL OR cc.id = p_course_content_id)
+              AND (p_course_id IS NULL OR cc.course_id = p_course_id)
+              AND (p_course_member_ids IS NULL OR cm.id = ANY(p_course_member_ids))
+            ORDER BY cm.id, cc.id
+            ON CONFLICT (course_member_id, course_content_id) DO UPDATE SET updated_at = now();
+
+            INSERT INTO course_member_content_progress AS p (
+                course_member_id, course_content_id, course_id, course_submission_group_id,
+                latest_result_id, latest_result_at, latest_submitted_result_id, latest_submitted_result_at,
+                best_result, result_count, submitted_count,
+                latest_grading_id, grading_status, grading,
+                content_unread_count, submission_group_unread_count, updated_at
+            )
+            SELECT
+                cm.id, cc.id, cc.course_id, sg.id,
+                lr.id, lr.created_at, ls.id, ls.created_at,
+                agg.best_result, COALESCE(agg.result_count, 0), COALESCE(agg.submitted_count, 0),
+                lg.id, lg.status, lg.grading,
+                COALESCE(cu.unread_count, 0), COALESCE(gu.unread_count, 0), now()
+            FROM course_content cc
+            JOIN course_member cm ON cm.course_id = cc.course_id
+            LEFT JOIN LATERAL (
+                SELECT g.id
+                FROM course_submission_group g
+                JOIN course_submission_group_member gm ON gm.course_submission_group_id = g.id
+                WHERE g.course_content_id = cc.id AND gm.course_member_id = cm.id
+                ORDER BY g.created_at DESC, g.id DESC
+                LIMIT 1
+            ) sg ON true
+            LEFT JOIN LATERAL (
+                SELECT count(*) AS result_count,
+                       count(*) FILTER (WHERE r.submit) AS submitted_count,
+                       max(r.result) AS best_result
+                FROM result r
+                WHERE r.course_submission_group_id = sg.id AND r.status = 0
+            ) agg ON true
+            LEFT JOIN LATERAL (
+                SELECT r.id, r.created_at
+                FROM result r
+                WHERE r.course_submission_group_id = sg.id AND r.status = 0
+                ORDER BY r.created_at DESC, r.id DESC
+                LIMIT 1
+            ) lr ON true
+            LEFT JOIN LATERAL (
+                SELECT r.id, r.created_at
+                FROM result r
+                WHERE r.course_submission_group_id = sg.id AND r.status = 0 AND r.submit
+                ORDER BY r.created_at DESC, r.id DESC
+                LIMIT 1
+            ) ls ON true
+            LEFT JOIN LATERAL (
+                SELECT gr.id, gr.status, gr.grading
+                FROM course_submission_group_grading gr
+                WHERE gr.course_submission_group_id = sg.id
+                ORDER BY gr.created_at DESC, gr.id DESC
+                LIMIT 1
+            ) lg ON true
+            LEFT JOIN LATERAL (
+                SELECT count(*) AS unread_count
+                FROM message m
+                WHERE m.course_content_id = cc.id
+                  AND m.course_submission_group_id IS NULL
+                  AND m.archived_at IS NULL
+                  AND m.author_id <> cm.user_id
+                  AND NOT EXISTS (
+                      SELECT 1 FROM message_read mr
+                      WHERE mr.message_id = m.id AND mr.reader_user_id = cm.user_id
+                  )
+            ) cu ON true
+            LEFT JOIN LATERAL (
+                SELECT count(*) AS unread_count
+                FROM message m
+                WHERE m.course_submission_group_id = sg.id
+                  AND m.archived_at IS NULL
+                  AND m.author_id <> cm.user_id
+                  AND NOT EXISTS (
+                      SELECT 1 FROM message_read mr
+                      WHERE mr.message_id = m.id AND mr.reader_user_id = cm.user_id
+                  )
+            ) gu ON true
+            WHERE (p_course_content_id IS NULL OR cc.id = p_course_content_id)
+              AND (p_course_id IS NULL OR cc.course_id = p_course_id)
+              AND (p_course_member_ids IS NULL OR cm.id = ANY(p_course_member_ids))
+            ON CONFLICT (course_member_id, course_content_id) DO UPDATE SET
+                course_id = EXCLUDED.course_id,
+                course_submission_group_id = EXCLUDED.course_submission_group_id,
+                latest_result_id = EXCLUDED.latest_result_id,
+                latest_result_at = EXCLUDED.latest_result_at,
+                latest_submitted_result_id = EXCLUDED.latest_submitted_result_id,
+                latest_submitted_result_at = EXCLUDED.latest_submitted_result_at,
+                best_result = EXCLUDED.best_result,
+                result_count = EXCLUDED.result_count,
+                submitted_count = EXCLUDED.submitted_count,
+                latest_grading_id = EXCLUDED.latest_grading_id,
+                grading_status = EXCLUDED.grading_status,
+                grading = EXCLUDED.grading,
+                content_unread_count = EXCLUDED.content_unread_count,
+                submission_group_unread_count = EXCLUDED.submission_group_unread_count,
+                updated_at = EXCLUDED.updated_at;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+
+    # Refresh the members of a submission group
+    op.execute("""
+        CREATE OR REPLACE FUNCTION ctutor_refresh_submission_group_progress(p_course_submission_group_id uuid)
+        RETURNS void AS $$
+        DECLARE
+            v_course_content_id uuid;
+            v_course_member_ids uuid[];
+        BEGIN
+            IF p_course_submission_group_id IS NULL THEN
+                RETURN;
+            END IF;
+
+            SELECT course_content_id INTO v_course_content_id
+            FROM course_submission_group WHERE id = p_course_submission_group_id;
+
+            IF v_course_content_id IS NULL THEN
+                RETURN;
+            END IF;
+
+
+            SELECT array_agg(course_member_id) INTO v_course_member_ids
+            FROM course_submission_group_member
+            WHERE course_submission_group_id = p_course_submission_group_id;
+
+            IF v_course_member_ids IS NULL THEN
+                RETURN;
+            END IF;
+
+            PERFORM ctutor_refresh_member_content_progress(v_course_content_id, v_course_member_ids);
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+
+    op.execute("""
+        CREATE OR REPLACE FUNCTION ctutor_refresh_message_progress(
+            p_course_submission_group_id uuid,
+            p_course_content_id uuid,
+            p_reader_user_id uuid DEFAULT NULL
+        )
+        RETURNS void AS $$
+        DECLARE
+            v_course_content_id uuid;
+            v_course_member_ids uuid[];
+        BEGIN
+            IF p_course_submission_group_id IS NOT NULL THEN
+                IF p_reader_user_id IS NULL THEN
+                    PERFORM ctutor_refresh_submission_group_progress(p_course_submission_group_id);
+                    RETURN;
+                END IF;
+
+                SELECT g.course_content_id, array_agg(gm.course_member_id)
+                INTO v_course_content_id, v_course_member_ids
+                FROM course_submission_group g
+                JOIN course_submission_group_member gm ON gm.course_submission_group_id = g.id
+                JOIN course_member cm ON cm.id = gm.course_member_id
+                WHERE g.id = p_course_submission_group_id AND cm.user_id = p_reader_user_id
+                GROUP BY g.course_content_id;
+            ELSIF p_course_content_id IS NOT NULL THEN
+                v_course_content_id := p_course_content_id;
+
+                IF p_reader_user_id IS NOT NULL THEN
+                    SELECT array_agg(cm.id) INTO v_course_member_ids
+                    FROM course_content cc
+                    JOIN course_member cm ON cm.course_id = cc.course_id
+                    WHERE cc.id = p_course_content_id AND cm.user_id = p_reader_user_id;
+
+                    IF v_course_member_ids IS NULL THEN
+                        RETURN;
+                    END IF;
+                END IF;
+            END IF;
+
+            IF v_course_content_id IS NULL THEN
+                RETURN;
+            END IF;
+
+            PERFORM ctutor_refresh_member_content_progress(v_course_content_id, v_course_member_ids);
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+
+    op.execute("""
+        CREATE OR REPLACE FUNCTION ctutor_progress_result_trigger()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            IF TG_OP <> 'INSERT' THEN
+                PERFORM ctutor_refresh_submission_group_progress(OLD.course_submission_group_id);
+            END IF;
+            IF TG_OP <> 'DELETE' AND (TG_OP = 'INSERT' OR NEW.course_submission_group_id IS DISTINCT FROM OLD.course_submission_group_id) THEN
+                PERFORM ctutor_refresh_submission_group_progress(NEW.course_submission_group_id);
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+
+        CREATE TRIGGER trg_progress_result
+        AFTER INSERT OR DELETE OR UPDATE OF status, submit, result, course_submission_group_id ON result
+        FOR EACH ROW
+        EXECUTE FUNCTION ctutor_progress_result_trigger();
+
+        CREATE TRIGGER trg_progress_grading
+        AFTER INSERT OR DELETE OR UPDATE OF status, grading, course_submission_group_id ON course_submission_group_grading
+        FOR EACH ROW
+        EXECUTE FUNCTION ctutor_progress_result_trigger();
+    """)
+
+    op.execute("""
+        CREATE OR REPLACE FUNCTION ctutor_progress_submission_group_member_trigger()
+        RETURNS TRIGGER AS $$
+        DECLARE
+            v_course_content_id uuid;
+        BEGIN
+            IF TG_OP <> 'INSERT' THEN
+                SELECT course_content_id INTO v_course_content_id
+                FROM course_submission_group WHERE id = OLD.course_submission_group_id;
+                IF v_course_content_id IS NOT NULL THEN
+                    PERFORM ctutor_refresh_member_content_progress(v_course_content_id, ARRAY[OLD.course_member_id]);
+                END IF;
+            END IF;
+            IF TG_OP <> 'DELETE' THEN
+                SELECT course_content_id INTO v_course_content_id
+                FROM course_submission_group WHERE id = NEW.course_submission_group_id;
+                IF v_course_content_id IS NOT NULL THEN
+                    PERFORM ctutor_refresh_member_content_progress(v_course_content_id, ARRAY[NEW.course_member_id]);
+                END IF;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+
+        CREATE TRIGGER trg_progress_submission_group_member
+        AFTER INSERT OR DELETE OR UPDATE OF course_submission_group_id, course_member_id ON course_submission_group_member
+        FOR EACH ROW
+        EXECUTE FUNCTION ctutor_progress_submission_group_member_trigger();
+    """)
+
+    # Deleting a group cascades to its members before this trigger runs, so
+    # the whole content is recomputed for the course
+    op.execute("""
+        CREATE OR REPLACE FUNCTION ctutor_progress_submission_group_trigger()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            PERFORM ctutor_refresh_member_content_progress(OLD.course_content_id);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+
+        CREATE TRIGGER trg_progress_submission_group
+        AFTER DELETE ON course_submission_group
+        FOR EACH ROW
+        EXECUTE FUNCTION ctutor_progress_submission_group_trigger();
+    """)
+
+    op.execute("""
+        CREATE OR REPLACE FUNCTION ctutor_progress_message_trigger()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            IF TG_OP <> 'INSERT' THEN
+                PERFORM ctutor_refresh_message_progress(OLD.course_submission_group_id, OLD.course_content_id);
+            END IF;
+            IF TG_OP <> 'DELETE' THEN
+                PERFORM ctutor_refresh_message_progress(NEW.course_submission_group_id, NEW.course_content_id);
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+
+        CREATE TRIGGER trg_progress_message
+        AFTER INSERT OR DELETE OR UPDATE OF archived_at, author_id, course_content_id, course_submission_group_id ON message
+        FOR EACH ROW
+        EXECUTE FUNCTION ctutor_progress_message_trigger();
+    """)
+
+    op.execute("""
+        CREATE OR REPLACE FUNCTION ctutor_progress_message_read_trigger()
+        RETURNS TRIGGER AS $$
+        DECLARE
+            v_read message_read%ROWTYPE;
+            v_course_submission_group_id uuid;
+            v_course_content_id uuid;
+        BEGIN
+            IF TG_OP = 'DELETE' THEN
+                v_read := OLD;
+            ELSE
+                v_read := NEW;
+            END IF;
+
+            SELECT course_submission_group_id, course_content_id
+            INTO v_course_submission_group_id, v_course_content_id
+            FROM message WHERE id = v_read.message_id;
+
+            PERFORM ctutor_refresh_message_progress(v_course_submission_group_id, v_course_content_id, v_read.reader_user_id);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+
+        CREATE TRIGGER trg_progress_message_read
+        AFTER INSERT OR DELETE ON message_read
+        FOR EACH ROW
+        EXECUTE FUNCTION ctutor_progress_message_read_trigger();
+    """)
+
+    # New members start with the unread content-level messages of their course
+    op.execute("""
+        CREATE OR REPLACE FUNCTION ctutor_progress_course_member_trigger()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            PERFORM ctutor_refresh_member_content_progress(NULL, ARRAY[NEW.id], NEW.course_id);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+
+        CREATE TRIGGER trg_progress_course_member
+        AFTER INSERT ON course_member
+        FOR EACH ROW
+        EXECUTE FUNCTION ctutor_progress_course_member_trigger();
+    """)
+
+    op.execute("SELECT ctutor_refresh_member_content_progress(NULL);")
+
+
+def downgrade() -> None:
+    op.execute("""
+        DROP TRIGGER IF EXISTS trg_progress_course_member ON course_member;
+        DROP TRIGGER IF EXISTS trg_progress_message_read ON message_read;
+        DROP TRIGGER IF EXISTS trg_progress_message ON message;
+        DROP TRIGGER IF EXISTS trg_progress_submission_group ON course_submission_group;
+        DROP TRIGGER IF EXISTS trg_progress_submission_group_member ON course_submission_group_member;
+        DROP TRIGGER IF EXISTS trg_progress_grading ON course_submission_group_grading;
+        DROP TRIGGER IF EXISTS trg_progress_result ON result;
+        DROP FUNCTION IF EXISTS ctutor_progress_course_member_trigger();
+        DROP FUNCTION IF EXISTS ctutor_progress_message_read_trigger();
+        DROP FUNCTION IF EXISTS ctutor_progress_message_trigger();
+        DROP FUNCTION IF EXISTS ctutor_progress_submission_group_trigger();
+        DROP FUNCTION IF EXISTS ctutor_progress_submission_group_member_trigger();
+        DROP FUNCTION IF EXISTS ctutor_progress_result_trigger();
+        DROP FUNCTION IF EXISTS ctutor_refresh_message_progress(uuid, uuid, uuid);
+        DROP FUNCTION IF EXISTS ctutor_refresh_submission_group_progress(uuid);
+        DROP FUNCTION IF EXISTS ctutor_refresh_member_content_progress(uuid, uuid[], uuid);
+    """)
+    op.drop_index('course_member_content_progress_course_member_idx', table_name='course_member_content_progress')
+    op.drop_index('course_member_content_progress_content_idx', table_name='course_member_content_progress')
+    op.drop_table('course_member_content_progress')
@@ -0,0 +1,26 @@
+"""add result index for latest submission per submission group
+
+Revision ID: d8f3a1c5e6b2
+Revises: c4e1d2a7b9f3
+Create Date: 2025-03-04 00:00:00
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'd8f3a1c5e6b2'
+down_revision = 'c4e1d2a7b9f3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'result_submission_group_submit_status_created_idx',
+        'result',
+        ['course_submission_group_id', 'submit', 'status', 'created_at'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('result_submission_group_submit_status_created_idx', table_name='result')
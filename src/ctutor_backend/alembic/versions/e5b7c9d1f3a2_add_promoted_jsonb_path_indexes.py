@@ -0,0 +1,44 @@
+"""add expression indexes on promoted JSONB properties paths
+
+Revision ID: e5b7c9d1f3a2
+Revises: d8f3a1c5e6b2
+Create Date: 2025-03-06 00:00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'e5b7c9d1f3a2'
+down_revision = 'd8f3a1c5e6b2'
+branch_labels = None
+depends_on = None
+
+# (table, promoted path) as declared through jsonb_path_index on the models
+PROMOTED_PATHS = [
+    ('organization', 'url'),
+    ('organization', 'full_path'),
+    ('organization', 'group_id'),
+    ('course_family', 'full_path'),
+    ('course_family', 'group_id'),
+    ('course', 'url'),
+    ('course', 'full_path'),
+    ('course', 'group_id'),
+    ('course_content', 'directory'),
+    ('course_member', 'url'),
+    ('course_member', 'full_path'),
+]
+
+
+def upgrade() -> None:
+    for table, key in PROMOTED_PATHS:
+        op.create_index(
+            f'{table}_gitlab_{key}_idx',
+            table,
+            [sa.text(f"((properties -> 'gitlab') ->> '{key}')")],
+        )
+
+
+def downgrade() -> None:
+    for table, key in reversed(PROMOTED_PATHS):
+        op.drop_index(f'{table}_gitlab_{key}_idx', table_name=table)
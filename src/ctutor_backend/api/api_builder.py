@@ -1,13 +1,15 @@
+import hashlib
 from uuid import UUID
 from fastapi import APIRouter, Depends, status
 from sqlalchemy.orm import Session
-from ctutor_backend.api.crud import archive_db, create_db, filter_db, get_id_db, list_db, update_db, delete_db
+from ctutor_backend.api.crud import archive_db, bulk_upsert_db, create_db, filter_db, get_id_db, list_db, update_db, delete_db
+from ctutor_backend.api.pagination import ListPage, set_list_headers
 from typing import Annotated, Optional
 from ctutor_backend.permissions.auth import get_current_permissions
 from ctutor_backend.database import get_db
 from ctutor_backend.permissions.principal import Principal
-from ctutor_backend.interface.base import EntityInterface
-# from ctutor_backend.api.cache import cache_route
+from ctutor_backend.interface.base import BulkUpsertResponse, EntityInterface
+from ctutor_backend.api.cache import cache_dependencies, get_cache_generations, versioned_key
 from ctutor_backend.redis_cache import get_redis_client
 from aiocache import BaseCache
 from fastapi import FastAPI, BackgroundTasks
@@ -28,74 +30,77 @@ class CrudRouter:
         
         self.router = APIRouter()
 
+        # Responses are cached per generation of the entity's table and of the
+        # tables they embed; every commit writing one of them bumps it, see
+        # ctutor_backend.api.cache.invalidate_written_tables
+        self.cache_namespaces = (self.dto.model.__tablename__, *cache_dependencies(self.dto)) if self.dto.model != None else ()
+
         self.on_created = []
         self.on_updated = []
         self.on_deleted = []
         self.on_archived = []
 
     def create(self):
-        async def route(background_tasks: BackgroundTasks, permissions: Annotated[Principal, Depends(get_current_permissions)], entity: self.dto.create, cache: Annotated[BaseCache, Depends(get_redis_client)], db: Session = Depends(get_db)) -> self.dto.get:
+        async def route(background_tasks: BackgroundTasks, permissions: Annotated[Principal, Depends(get_current_permissions)], entity: self.dto.create, db: Session = Depends(get_db)) -> self.dto.get:
             entity_created = await create_db(permissions, db, entity, self.dto.model, self.dto.get, self.dto.post_create)
 
-            # Clear related cache entries
-            await self._clear_entity_cache(cache, self.dto.model.__tablename__)
-
             for task in self.on_created:
                 background_tasks.add_task(task, entity_created, db, permissions)
 
             return entity_created
         return route
     
+    def bulk(self):
+        if self.dto.bulk_upsert_keys is None:
+            return None
+
+        async def route(permissions: Annotated[Principal, Depends(get_current_permissions)], entities: list[dict], db: Session = Depends(get_db)) -> BulkUpsertResponse:
+            return await bulk_upsert_db(permissions, db, entities, self.dto)
+        return route
+
     def get(self):
         async def route(permissions: Annotated[Principal, Depends(get_current_permissions)], id: UUID | str, cache: Annotated[BaseCache, Depends(get_redis_client)], db: Session = Depends(get_db)) -> self.dto.get:
-            # Check cache first
-            # cache_key = f"{self.dto.model.__tablename__}:get:{permissions.user_id}:{id}"
-            # cached_result = await cache.get(cache_key)
-            
-            # if cached_result:
-            #     return self.dto.get.model_validate_json(cached_result)
-            
+            cache_key = await self._cache_key(cache, permissions, "get", id)
+
+            cached_result = await self._cache_get(cache, cache_key)
+            if cached_result:
+                return self.dto.get.model_validate(cached_result)
+
             result = await get_id_db(permissions, db, id, self.dto)
-            
-            # # Cache the result
-            # await cache.set(cache_key, result.model_dump_json(), ttl=self.dto.cache_ttl)
-            
+
+            await self._cache_set(cache, cache_key, result.model_dump(mode='json'))
+
             return result
         return route
 
     def list(self):
         async def route(permissions: Annotated[Principal, Depends(get_current_permissions)], cache: Annotated[BaseCache, Depends(get_redis_client)], response: Response, params: self.dto.query = Depends(), db: Session = Depends(get_db)) -> list[self.dto.list]:
-            # Generate cache key based on params and user permissions
-            # import hashlib
-            # params_hash = hashlib.sha256(params.model_dump_json(exclude_none=True).encode()).hexdigest()
-            # cache_key = f"{self.dto.model.__tablename__}:list:{permissions.user_id}:{params_hash}"
-            
-            # cached_result = await cache.get(cache_key)
-            # if cached_result:
-            #     cached_data = cached_result
-            #     response.headers["X-Total-Count"] = str(cached_data.get("total", 0))
-            #     return [self.dto.list.model_validate(item) for item in cached_data.get("items", [])]
-            
-            list_result, total = await list_db(permissions, db, params, self.dto)
-            response.headers["X-Total-Count"] = str(total)
-            
-            # Cache the result
-            # cache_data = {
-            #     "items": [item.model_dump(mode='json') for item in list_result],
-            #     "total": total
-            # }
-            # await cache.set(cache_key, cache_data, ttl=self.dto.cache_ttl)
-            
-            return list_result
+            params_hash = hashlib.sha256(params.model_dump_json(exclude_none=True).encode()).hexdigest()
+            cache_key = await self._cache_key(cache, permissions, "list", params_hash)
+
+            cached_data = await self._cache_get(cache, cache_key)
+            if cached_data:
+                page = ListPage(**cached_data)
+                set_list_headers(response, page)
+                return [self.dto.list.model_validate(item) for item in page.items]
+
+            page = await list_db(permissions, db, params, self.dto)
+            set_list_headers(response, page)
+
+            await self._cache_set(cache, cache_key, {
+                "items": [item.model_dump(mode='json') for item in page.items],
+                "total": page.total,
+                "total_estimated": page.total_estimated,
+                "next_cursor": page.next_cursor
+            })
+
+            return page.items
         return route
     
     def update(self):
-        async def route(background_tasks: BackgroundTasks, permissions: Annotated[Principal, Depends(get_current_permissions)], id: UUID | str, entity: self.dto.update, cache: Annotated[BaseCache, Depends(get_redis_client)], db: Session = Depends(get_db)) -> self.dto.get:
+        async def route(background_tasks: BackgroundTasks, permissions: Annotated[Principal, Depends(get_current_permissions)], id: UUID | str, entity: self.dto.update, db: Session = Depends(get_db)) -> self.dto.get:
             entity_updated = update_db(permissions, db, id, entity, self.dto.model, self.dto.get, None, self.dto.post_update)
 
-            # Clear related cache entries
-            await self._clear_entity_cache(cache, self.dto.model.__tablename__)
-
             for task in self.on_updated:
                 background_tasks.add_task(task, entity_updated, db, permissions)
 
@@ -103,21 +108,20 @@ class CrudRouter:
         return route
 
     def delete(self):
-        async def route(background_tasks: BackgroundTasks, permissions: Annotated[Principal, Depends(get_current_permissions)], id: UUID | str, cache: Annotated[BaseCache, Depends(get_redis_client)], db: Session = Depends(get_db)):
+        async def route(background_tasks: BackgroundTasks, permissions: Annotated[Principal, Depends(get_current_permissions)], id: UUID | str, db: Session = Depends(get_db)):
 
             entity_deleted = None
             if len(self.on_deleted) > 0:
                 entity_deleted = await get_id_db(permissions, db, id, self.dto)
 
-            # Clear related cache entries
-            await self._clear_entity_cache(cache, self.dto.model.__tablename__)
+            result = delete_db(permissions, db, id, self.dto.model)
 
             # Run on_deleted tasks (not on_created)
             for task in self.on_deleted:
                 if entity_deleted:
                     background_tasks.add_task(task, entity_deleted, db, permissions)
 
-            return delete_db(permissions, db, id, self.dto.model)
+            return result
 
         return route
     
@@ -132,14 +136,16 @@ class CrudRouter:
                     for task in self.on_archived:
                         background_tasks.add_task(task, entity_archived, db, permissions)
 
-                return archive_db(permissions, db, id, self.dto.model)
+                result = archive_db(permissions, db, id, self.dto.model)
+
+                return result
             return route
         else:
             return None
 
     def filter(self):
         async def route(permissions: Annotated[Principal, Depends(get_current_permissions)], filters: Optional[dict] = None, params: self.dto.query = Depends(), db: Session = Depends(get_db)) -> list[self.dto.list]:
-            return await filter_db(permissions, db, self.dto.model, params, self.dto.search, filters)
+            return await filter_db(permissions, db, self.dto.model, params, self.dto.search, filters, self.dto.filter_fields)
         return route
 
     def register_routes(self, app: FastAPI):
@@ -148,6 +154,12 @@ class CrudRouter:
 
         self.router.add_api_route("", self.create(), methods=["POST"], 
                     status_code=status.HTTP_201_CREATED, name=f"{self.create.__name__} {scope_name.capitalize()}",dependencies=[Depends(get_current_permissions)])
+
+        bulk_fun = self.bulk()
+
+        if bulk_fun != None:
+            self.router.add_api_route("/bulk", bulk_fun, methods=["POST"],
+                    status_code=status.HTTP_200_OK, name=f"{self.bulk.__name__} {scope_name.capitalize()}",dependencies=[Depends(get_current_permissions)])
         self.router.add_api_route(f"/{{{CrudRouter.id_type}}}", self.get(), methods=["GET"], 
                     status_code=status.HTTP_200_OK, name=f"{self.get.__name__} {scope_name.capitalize()}",dependencies=[Depends(get_current_permissions)])
         self.router.add_api_route("", self.list(), methods=["GET"], 
@@ -174,32 +186,39 @@ class CrudRouter:
         
         return self
     
-    async def _clear_entity_cache(self, cache: BaseCache, table_name: str):
-        """Clear all cache entries for a given entity type"""
+    async def _cache_key(self, cache: BaseCache, permissions: Principal, *parts) -> Optional[str]:
+        """
+        Build a response cache key for the current generations of the entity
+        and of the tables its responses embed.
+
+        Keys are scoped to the caller's full principal (not just the user id),
+        so a change in roles or course memberships never serves a response
+        computed for the old permissions.
+        """
+        if self.dto.cache_ttl == None or self.dto.cache_ttl <= 0:
+            return None
+        try:
+            generations = await get_cache_generations(cache, self.cache_namespaces)
+        except Exception:
+            return None
+        scope = hashlib.sha256(permissions.model_dump_json().encode()).hexdigest()[:32]
+        return versioned_key(self.cache_namespaces[0], ".".join(str(generation) for generation in generations), *parts, scope)
+
+    async def _cache_get(self, cache: BaseCache, cache_key: Optional[str]):
+        if cache_key == None:
+            return None
+        try:
+            return await cache.get(cache_key)
+        except Exception:
+            return None
+
+    async def _cache_set(self, cache: BaseCache, cache_key: Optional[str], value):
+        if cache_key == None:
+            return
         try:
-            # Get the underlying Redis client from aiocache
-            if hasattr(cache, '_client'):
-                redis_client = cache._client
-            elif hasattr(cache, 'client'):
-                redis_client = cache.client
-            else:
-                # Try to get client directly from cache backend
-                redis_client = getattr(cache, '_client', None) or getattr(cache, 'client', None)
-            
-            if redis_client:
-                pattern = f"{table_name}:*"
-                keys = await redis_client.keys(pattern)
-                if keys:
-                    await redis_client.delete(*keys)
-            else:
-                # Fallback: clear cache entries individually (less efficient)
-                print(f"Warning: Using fallback cache clear method for {table_name}")
-                # We can't easily implement pattern matching without direct Redis access
-                # So we'll just skip the cache clear for now
-                
+            await cache.set(cache_key, value, ttl=self.dto.cache_ttl)
         except Exception as e:
-            # Log error but don't fail the operation
-            print(f"Cache clear error for {table_name}: {e}")
+            print(f"Cache set error for {cache_key}: {e}")
 
 class LookUpRouter:
 
@@ -225,9 +244,9 @@ class LookUpRouter:
     
     def list(self):
         async def route(permissions: Annotated[Principal, Depends(get_current_permissions)], response: Response, params: self.dto.query = Depends(), db: Session = Depends(get_db)) -> list[self.dto.list]:
-            list_result, total = await list_db(permissions, db, params, self.dto)
-            response.headers["X-Total-Count"] = str(total)
-            return list_result
+            page = await list_db(permissions, db, params, self.dto)
+            set_list_headers(response, page)
+            return page.items
         return route
     
     def register_routes(self, app: FastAPI):
@@ -1,8 +1,184 @@
 import json
+import asyncio
 import hashlib
-from functools import wraps
+import logging
+from functools import lru_cache, wraps
+from typing import Iterable
+from sqlalchemy import Table, event, inspect
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.util import find_tables
 from ctutor_backend.interface.base import EntityInterface
-from ctutor_backend.redis_cache import get_redis_client
+from aiocache import BaseCache
+from ctutor_backend.redis_cache import get_redis_client, get_sync_redis_client
+
+logger = logging.getLogger(__name__)
+
+def generation_key(namespace: str) -> str:
+    return f"{namespace}:generation"
+
+async def get_cache_generation(cache: BaseCache, namespace: str) -> int:
+    """Current generation of a cache namespace, 0 if it was never invalidated."""
+    generation = await cache.get(generation_key(namespace))
+    return int(generation) if generation != None else 0
+
+async def get_cache_generations(cache: BaseCache, namespaces: Iterable[str]) -> list[int]:
+    """Generations of several namespaces in one round trip."""
+    generations = await cache.multi_get([generation_key(namespace) for namespace in namespaces])
+    return [int(generation) if generation != None else 0 for generation in generations]
+
+async def invalidate_cache_namespace(cache: BaseCache, namespace: str) -> int:
+    """
+    Invalidate every entry of a namespace by bumping its generation.
+
+    Entries embed the generation they were written under (see
+    ``versioned_key``), so after the bump they are simply never read again
+    and expire through their TTL. This is a single INCR instead of a
+    KEYS scan over the whole keyspace.
+    """
+    return await cache.increment(generation_key(namespace), 1)
+
+def versioned_key(namespace: str, generation: int | str, *parts) -> str:
+    return ":".join([namespace, f"v{generation}", *[str(part) for part in parts]])
+
+def cache_dependencies(interface: EntityInterface) -> tuple[str, ...]:
+    """
+    Tables besides its own that the cached responses of ``interface`` read.
+
+    These are the targets of the relationships its get/list models embed, e.g.
+    a course content's deployment, and the tables behind column properties.
+    """
+    mapper = inspect(interface.model)
+    fields = set()
+    for dto in (interface.get, interface.list):
+        if dto is not None:
+            fields.update(dto.model_fields.keys())
+
+    tables = set()
+    for name in fields:
+        if name in mapper.relationships:
+            relationship = mapper.relationships[name]
+            tables.add(relationship.target.name)
+            if relationship.secondary is not None:
+                tables.add(relationship.secondary.name)
+        elif name in mapper.column_attrs:
+            for column in mapper.column_attrs[name].columns:
+                tables.update(table.name for table in find_tables(column, include_aliases=True) if hasattr(table, "name"))
+
+    tables.discard(mapper.local_table.name)
+    return tuple(sorted(tables))
+
+def _written_tables(session: Session) -> set:
+    return session.info.setdefault("cache_written_tables", set())
+
+@lru_cache(maxsize=None)
+def dependent_tables(table: Table, delete: bool = False) -> frozenset:
+    """
+    Tables the database writes itself when rows of ``table`` are written.
+
+    These are tables maintained by triggers on ``table``, declared as
+    ``maintained_by_triggers_on`` in their ``Table.info``, and for deletes the
+    children of ON DELETE CASCADE or SET NULL foreign keys. Cascaded deletes
+    are followed recursively.
+    """
+    tables = set()
+    pending = [(table, delete)]
+
+    while pending:
+        parent, parent_deleted = pending.pop()
+
+        for other in parent.metadata.tables.values():
+            if other.name in tables:
+                continue
+
+            if parent.name in other.info.get("maintained_by_triggers_on", ()):
+                tables.add(other.name)
+                pending.append((other, False))
+                continue
+
+            if not parent_deleted:
+                continue
+
+            for foreign_key in other.foreign_keys:
+                ondelete = (foreign_key.ondelete or "").upper()
+                if foreign_key.column.table is parent and ondelete in ("CASCADE", "SET NULL"):
+                    tables.add(other.name)
+                    pending.append((other, ondelete == "CASCADE"))
+                    break
+
+    tables.discard(table.name)
+    return frozenset(tables)
+
+def invalidate_written_tables(session_factory):
+    """
+    Bump the cache generation of every table a session wrote, once it commits.
+
+    Covers all writers of the database, not only CrudRouter: custom endpoints,
+    direct ``db.commit()`` paths and Temporal activities. ORM flushes and
+    insert/update/delete statements run through ``Session.execute`` are
+    tracked together with the tables their triggers and cascades write (see
+    ``dependent_tables``); raw SQL text is not.
+    """
+    @event.listens_for(session_factory, "after_flush")
+    def track_flush(session, flush_context):
+        tables = _written_tables(session)
+        for obj in [*session.new, *session.dirty, *session.deleted]:
+            if obj in session.dirty and not session.is_modified(obj):
+                continue
+            for table in inspect(obj).mapper.tables:
+                tables.add(table.name)
+                tables.update(dependent_tables(table, obj in session.deleted))
+
+    @event.listens_for(session_factory, "do_orm_execute")
+    def track_statement(orm_execute_state):
+        if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+            table = orm_execute_state.statement.table
+            tables = _written_tables(orm_execute_state.session)
+            tables.add(table.name)
+            tables.update(dependent_tables(table, orm_execute_state.is_delete))
+
+    @event.listens_for(session_factory, "after_commit")
+    def bump_generations(session):
+        tables = session.info.pop("cache_written_tables", None)
+        if not tables:
+            return
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            bump_cache_generations(tables)
+            return
+
+        # Commits on the event loop must not block on Redis
+        task = loop.create_task(abump_cache_generations(tables))
+        _pending_bumps.add(task)
+        task.add_done_callback(_pending_bumps.discard)
+
+    @event.listens_for(session_factory, "after_rollback")
+    def forget_writes(session):
+        session.info.pop("cache_written_tables", None)
+
+# Keeps running bump tasks referenced until they are done
+_pending_bumps: set = set()
+
+def bump_cache_generations(namespaces: Iterable[str]):
+    """Blocking invalidation of several namespaces, for code outside of an event loop."""
+    try:
+        pipeline = get_sync_redis_client().pipeline(transaction=False)
+        for namespace in namespaces:
+            pipeline.incr(generation_key(namespace))
+        pipeline.execute()
+    except Exception as e:
+        # Entries of the namespaces expire through their TTL
+        logger.warning(f"Cache invalidation of {sorted(namespaces)} failed: {e}")
+
+async def abump_cache_generations(namespaces: Iterable[str]):
+    """Invalidation of several namespaces through the aiocache client."""
+    try:
+        cache = await get_redis_client()
+        await asyncio.gather(*[invalidate_cache_namespace(cache, namespace) for namespace in namespaces])
+    except Exception as e:
+        # Entries of the namespaces expire through their TTL
+        logger.warning(f"Cache invalidation of {sorted(namespaces)} failed: {e}")
 
 def cache_route(interface: EntityInterface, ttl: int):
     def decorator(func):
@@ -20,16 +196,17 @@ def cache_route(interface: EntityInterface, ttl: int):
             id = kwargs.get('id')
             namespace = interface.model.__tablename__
 
+            cache = await get_redis_client()
+            generation = await get_cache_generation(cache, namespace)
+
             if id != None:
-                cache_key = f"{user_id}:{id}"
+                cache_key = versioned_key(namespace, generation, user_id, id)
             else:
                 if params != None:
                     hashed_params = hashlib.sha256(params.model_dump_json(exclude_none=True).encode()).hexdigest()
-                    cache_key = f"{namespace}:{user_id}:{hashed_params}"
+                    cache_key = versioned_key(namespace, generation, user_id, hashed_params)
                 else:
-                    cache_key = f"{namespace}:{user_id}"
-
-            cache = await get_redis_client()
+                    cache_key = versioned_key(namespace, generation, user_id)
 
             cached_value = await cache.get(cache_key)
 
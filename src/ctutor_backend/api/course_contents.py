@@ -5,14 +5,12 @@ This module handles course content management with clean separation
 between content hierarchy and example deployments.
 """
 
-import json
 import os
 from typing import Annotated, Optional, List, Dict, Any
 from uuid import UUID
-from datetime import datetime
+from datetime import datetime, timezone
 
-import yaml
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, Response, status
 from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import and_, or_
 
@@ -24,6 +22,7 @@ from ctutor_backend.permissions.principal import Principal
 
 from ctutor_backend.api.exceptions import BadRequestException, NotFoundException
 from ctutor_backend.api.filesystem import get_path_course_content, mirror_entity_to_filesystem
+from ctutor_backend.api.file_cache import etag_matches, get_parsed_file_cache
 from ctutor_backend.database import get_db
 from ctutor_backend.interface.course_contents import CourseContentGet, CourseContentInterface
 from ctutor_backend.interface.deployment import (
@@ -38,6 +37,8 @@ from ctutor_backend.model.course import CourseContent, Course, CourseContentType
 from ctutor_backend.model.example import Example, ExampleVersion
 from ctutor_backend.model.deployment import CourseContentDeployment, DeploymentHistory
 from ctutor_backend.redis_cache import get_redis_client
+from ctutor_backend.services.deployment_summary import get_deployment_summary, invalidate_deployment_summary
+from ctutor_backend.tasks.temporal_workflow_status import describe_workflow, describe_workflows
 from aiocache import BaseCache
 
 # Create the router
@@ -53,10 +54,19 @@ class CourseContentFileQuery(BaseModel):
 async def get_course_content_meta(
     permissions: Annotated[Principal, Depends(get_current_permissions)],
     course_content_id: UUID | str,
+    request: Request,
+    response: Response,
     file_query: CourseContentFileQuery = Depends(),
     db: Session = Depends(get_db)
 ):
-    """Get file content from course content directory."""
+    """Get file content from course content directory.
+
+    Parsed files are served from an in-process cache keyed by path, mtime and
+    size. Responses carry an ETag, and a matching If-None-Match returns 304.
+    """
+    if file_query.filename is None:
+        raise BadRequestException()
+
     if check_course_permissions(permissions, CourseContent, "_tutor", db).filter(
         CourseContent.id == course_content_id
     ).first() is None:
@@ -64,29 +74,20 @@ async def get_course_content_meta(
 
     course_content_dir = await get_path_course_content(course_content_id, db)
 
-    if file_query.filename is None:
+    file_path = os.path.normpath(os.path.join(course_content_dir, file_query.filename))
+    if os.path.commonpath([file_path, os.path.normpath(course_content_dir)]) != os.path.normpath(course_content_dir):
         raise BadRequestException()
 
-    with open(os.path.join(course_content_dir, file_query.filename), 'r') as file:
-        content = file.read()
-
-        if file_query.filename.endswith(".yaml") or file_query.filename.endswith(".yml"):
-            try:
-                data = yaml.safe_load(content)
-                if isinstance(data, dict):
-                    return data
-            except Exception:
-                raise BadRequestException()
-
-        elif file_query.filename.endswith(".json"):
-            try:
-                data = json.loads(content)
-                if isinstance(data, dict):
-                    return data
-            except Exception:
-                raise BadRequestException()
-        else:
-            return {"content": content}
+    file_cache = get_parsed_file_cache()
+    key = await file_cache.stat(file_path)
+    parsed = await file_cache.get(file_path, key)
+
+    headers = {"ETag": parsed.etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), parsed.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    response.headers.update(headers)
+    return parsed.data
 
 
 # Event handlers for filesystem mirroring
@@ -307,6 +308,7 @@ async def assign_example_to_content(
     # Clear cache
     if cache:
         await cache.delete(f"course:{content.course_id}:deployments")
+    await invalidate_deployment_summary(content.course_id, cache)
     
     # Return deployment with history (exclude course_content to avoid recursion)
     deployment_dict = {
@@ -421,10 +423,30 @@ async def unassign_example_from_content(
     # Clear cache
     if cache:
         await cache.delete(f"course:{content.course_id}:deployments")
+    await invalidate_deployment_summary(content.course_id, cache)
     
     return {"status": "unassigned", "message": "Example unassigned successfully"}
 
 
+def sync_deployment_with_workflow(deployment: CourseContentDeployment, workflow_info: Dict[str, Any]) -> bool:
+    """Update an in-progress deployment from the final state of its workflow. Returns whether it changed."""
+    if deployment.deployment_status != "in_progress":
+        return False
+    
+    if workflow_info["status"] == "COMPLETED":
+        deployment.deployment_status = "deployed"
+        deployment.deployed_at = datetime.now(timezone.utc)
+        deployment.deployment_message = "Deployment completed successfully"
+        return True
+    
+    if workflow_info["status"] in ["FAILED", "TERMINATED", "TIMED_OUT"]:
+        deployment.deployment_status = "failed"
+        deployment.deployment_message = f"Workflow {workflow_info['status'].lower()}"
+        return True
+    
+    return False
+
+
 @course_content_router.router.get(
     "/deployment/{content_id}",
     response_model=Dict[str, Any]
@@ -503,65 +525,15 @@ async def get_deployment_status_with_workflow(
     workflow_info = None
     if deployment.workflow_id:
         try:
-            # Import Temporal client
-            from temporalio.client import Client
-            from datetime import datetime, timezone
-            import os
-            
-            # Get Temporal configuration
-            temporal_host = os.environ.get('TEMPORAL_HOST', 'localhost')
-            temporal_port = os.environ.get('TEMPORAL_PORT', '7233')
-            temporal_namespace = os.environ.get('TEMPORAL_NAMESPACE', 'default')
-            
-            # Create Temporal client
-            async def get_workflow_status():
-                client = await Client.connect(
-                    f"{temporal_host}:{temporal_port}",
-                    namespace=temporal_namespace
-                )
-                
-                try:
-                    # Get workflow handle
-                    handle = client.get_workflow_handle(deployment.workflow_id)
-                    
-                    # Describe the workflow to get its status
-                    description = await handle.describe()
-                    
-                    return {
-                        "workflow_id": deployment.workflow_id,
-                        "status": description.status.name if description.status else "UNKNOWN",
-                        "start_time": description.start_time.isoformat() if description.start_time else None,
-                        "close_time": description.close_time.isoformat() if description.close_time else None,
-                        "execution_time": description.execution_time.isoformat() if description.execution_time else None,
-                        "task_queue": description.task_queue,
-                        "workflow_type": description.workflow_type,
-                        "is_running": description.status.name in ["RUNNING", "PENDING"] if description.status else False
-                    }
-                except Exception as e:
-                    return {
-                        "workflow_id": deployment.workflow_id,
-                        "status": "NOT_FOUND",
-                        "error": str(e),
-                        "is_running": False
-                    }
-            
-            # Run the async function
-            workflow_info = await get_workflow_status()
+            workflow_info = await describe_workflow(deployment.workflow_id)
             
             # Auto-update deployment status based on workflow status
-            if workflow_info["status"] == "COMPLETED" and deployment.deployment_status == "in_progress":
-                deployment.deployment_status = "deployed"
-                deployment.deployed_at = datetime.now(timezone.utc)
-                deployment.deployment_message = "Deployment completed successfully"
+            if sync_deployment_with_workflow(deployment, workflow_info):
                 db.commit()
-                deployment_info["deployment_status"] = "deployed"
-                deployment_info["deployed_at"] = deployment.deployed_at.isoformat()
-                
-            elif workflow_info["status"] in ["FAILED", "TERMINATED", "TIMED_OUT"] and deployment.deployment_status == "in_progress":
-                deployment.deployment_status = "failed"
-                deployment.deployment_message = f"Workflow {workflow_info['status'].lower()}"
-                db.commit()
-                deployment_info["deployment_status"] = "failed"
+                await invalidate_deployment_summary(content.course_id)
+                deployment_info["deployment_status"] = deployment.deployment_status
+                if deployment.deployed_at:
+                    deployment_info["deployed_at"] = deployment.deployed_at.isoformat()
                 
         except Exception as e:
             workflow_info = {
@@ -615,65 +587,68 @@ async def get_course_deployment_summary(
             detail="Not authorized to view this course"
         )
     
-    # Try cache first
-    cache_key = f"course:{course_id}:deployment-summary"
-    if cache:
-        cached = await cache.get(cache_key)
-        if cached:
-            return cached
+    # Cached until deployments of the course change
+    return await get_deployment_summary(db, course_id, cache)
+
+
+@course_content_router.router.get(
+    "/courses/{course_id}/deployment-workflows",
+    response_model=List[Dict[str, Any]]
+)
+async def get_course_deployment_workflows(
+    course_id: UUID,
+    permissions: Annotated[Principal, Depends(get_current_permissions)],
+    deployment_status: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Get the Temporal workflow status of every deployment of a course.
     
-    # Get total course content count
-    total_content = db.query(CourseContent).filter(
-        CourseContent.course_id == course_id,
-        CourseContent.archived_at.is_(None)
-    ).count()
-    
-    # Get submittable content count
-    submittable_query = db.query(CourseContent).join(
-        CourseContentType
-    ).join(
-        CourseContentKind
-    ).filter(
-        CourseContent.course_id == course_id,
-        CourseContent.archived_at.is_(None),
-        CourseContentKind.submittable == True
-    )
-    submittable_content = submittable_query.count()
+    Meant for dashboards polling many deployments: the statuses are fetched
+    in one batch over the shared Temporal client and cached for a few seconds.
+    """
+    if check_course_permissions(permissions, Course, "_tutor", db).filter(
+        Course.id == course_id
+    ).first() is None:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to view this course"
+        )
     
-    # Get deployment statistics
-    deployments = db.query(CourseContentDeployment).join(
+    query = db.query(CourseContentDeployment).join(
         CourseContent
     ).filter(
-        CourseContent.course_id == course_id
-    ).all()
-    
-    deployments_total = len(deployments)
-    deployments_pending = sum(1 for d in deployments if d.deployment_status == "pending")
-    deployments_deployed = sum(1 for d in deployments if d.deployment_status == "deployed")
-    deployments_failed = sum(1 for d in deployments if d.deployment_status == "failed")
-    
-    # Get last deployment timestamp
-    last_deployment = None
-    for d in deployments:
-        if d.deployed_at and (last_deployment is None or d.deployed_at > last_deployment):
-            last_deployment = d.deployed_at
-    
-    summary = DeploymentSummary(
-        course_id=course_id,
-        total_content=total_content,
-        submittable_content=submittable_content,
-        deployments_total=deployments_total,
-        deployments_pending=deployments_pending,
-        deployments_deployed=deployments_deployed,
-        deployments_failed=deployments_failed,
-        last_deployment_at=last_deployment
+        CourseContent.course_id == course_id,
+        CourseContentDeployment.workflow_id.isnot(None)
     )
+    if deployment_status is not None:
+        query = query.filter(CourseContentDeployment.deployment_status == deployment_status)
+    deployments = query.all()
     
-    # Cache the result
-    if cache:
-        await cache.set(cache_key, summary.dict(), ttl=300)  # 5 minutes
+    try:
+        workflows = await describe_workflows(d.workflow_id for d in deployments)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Failed to connect to Temporal: {str(e)}"
+        )
+    
+    changed = False
+    items = []
+    for deployment in deployments:
+        workflow_info = workflows[deployment.workflow_id]
+        changed |= sync_deployment_with_workflow(deployment, workflow_info)
+        items.append({
+            "course_content_id": str(deployment.course_content_id),
+            "deployment_status": deployment.deployment_status,
+            "workflow": workflow_info
+        })
+    
+    if changed:
+        db.commit()
+        await invalidate_deployment_summary(course_id)
     
-    return summary
+    return items
 
 
 @course_content_router.router.get(
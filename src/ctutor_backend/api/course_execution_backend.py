@@ -4,6 +4,7 @@ from fastapi import APIRouter
 from sqlalchemy.orm import Session
 
 from ctutor_backend.api.crud import create_db, list_db
+from ctutor_backend.api.pagination import set_list_headers
 from ctutor_backend.permissions.auth import get_current_permissions
 from ctutor_backend.permissions.core import check_course_permissions
 from ctutor_backend.permissions.principal import Principal
@@ -20,6 +21,6 @@ async def create_course_execution_backend(permissions: Annotated[Principal, Depe
 @course_execution_backend_router.get("", response_model=list[CourseExecutionBackendList])
 async def list_course_execution_backend(permissions: Annotated[Principal, Depends(get_current_permissions)], response: Response, params: CourseExecutionBackendQuery = Depends(), db: Session = Depends(get_db)):
 
-    data, total = await list_db(permissions, db, params, CourseExecutionBackendInterface)
-    response.headers["X-Total-Count"] = str(total)
-    return data
\ No newline at end of file
+    page = await list_db(permissions, db, params, CourseExecutionBackendInterface)
+    set_list_headers(response, page)
+    return page.items
\ No newline at end of file
@@ -1,3 +1,5 @@
+import base64
+import json
 from typing import Annotated
 from uuid import UUID
 from fastapi import Depends
@@ -9,13 +11,15 @@ from ctutor_backend.api.exceptions import BadRequestException, InternalServerExc
 from ctutor_backend.api.crud import update_db
 from ctutor_backend.api.filesystem import mirror_entity_to_filesystem
 from ctutor_backend.permissions.auth import get_current_permissions
-from ctutor_backend.permissions.core import check_permissions
+from ctutor_backend.permissions.core import check_course_permissions, check_permissions
 from ctutor_backend.permissions.principal import Principal
-from ctutor_backend.database import get_db
+from ctutor_backend.database import get_db, get_report_db
 from ctutor_backend.interface.course_execution_backends import CourseExecutionBackendGet, CourseExecutionBackendUpdate
 from ctutor_backend.api.api_builder import CrudRouter
-from ctutor_backend.model.course import CourseExecutionBackend
+from ctutor_backend.api.queries import course_gradebook_cells_query, course_gradebook_contents_query, course_gradebook_members_query
+from ctutor_backend.model.course import Course, CourseExecutionBackend
 from ctutor_backend.interface.courses import CourseGet, CourseInterface
+from ctutor_backend.interface.gradebook import GradebookContent, GradebookGet, GradebookMember, GradebookQuery
 course_router = CrudRouter(CourseInterface)
 
 @course_router.router.patch("/{course_id}/execution-backends/{execution_backend_id}", response_model=CourseExecutionBackendGet)
@@ -53,6 +57,77 @@ def delete_course_execution_backend(permissions: Annotated[Principal, Depends(ge
 
     return {"ok": True}
 
+def _encode_gradebook_cursor(member) -> str:
+    key = [member.sort_family_name, member.sort_given_name, str(member.id)]
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode()
+
+def _decode_gradebook_cursor(cursor: str) -> tuple:
+    try:
+        family_name, given_name, member_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return (str(family_name), str(given_name), str(UUID(member_id)))
+    except Exception:
+        raise BadRequestException(detail="Invalid gradebook cursor")
+
+@course_router.router.get("/{course_id}/gradebook", response_model=GradebookGet)
+def get_course_gradebook(permissions: Annotated[Principal, Depends(get_current_permissions)], course_id: UUID | str, params: GradebookQuery = Depends(), db: Session = Depends(get_report_db)):
+
+    if check_course_permissions(permissions,Course,"_tutor",db).filter(Course.id == course_id).first() == None:
+        raise NotFoundException()
+
+    after = _decode_gradebook_cursor(params.cursor) if params.cursor != None else None
+
+    contents = course_gradebook_contents_query(course_id, db).all()
+
+    # Fetch one extra member to know whether another page follows
+    members = course_gradebook_members_query(course_id, db, params.course_role_id, after).limit(params.limit + 1).all()
+    next_cursor = None
+    if len(members) > params.limit:
+        members = members[:params.limit]
+        next_cursor = _encode_gradebook_cursor(members[-1])
+
+    rows = {str(member.id): index for index, member in enumerate(members)}
+    columns = {str(content.id): index for index, content in enumerate(contents)}
+
+    def matrix(default):
+        return [[default] * len(contents) for _ in members]
+
+    latest_result, best_result, grading_status, grading = matrix(None), matrix(None), matrix(None), matrix(None)
+    submission_count = matrix(0)
+
+    if len(members) > 0 and len(contents) > 0:
+        for cell in course_gradebook_cells_query(course_id, list(rows.keys()), db):
+            column = columns.get(str(cell.course_content_id))
+            if column == None:
+                continue
+            row = rows[str(cell.course_member_id)]
+            latest_result[row][column] = cell.latest_result
+            best_result[row][column] = cell.best_result
+            submission_count[row][column] = cell.submitted_count
+            grading_status[row][column] = cell.grading_status
+            grading[row][column] = cell.grading
+
+    return GradebookGet(
+        course_id=str(course_id),
+        contents=[GradebookContent(id=str(content.id), path=str(content.path), title=content.title) for content in contents],
+        members=[
+            GradebookMember(
+                id=str(member.id),
+                user_id=str(member.user_id),
+                course_group_id=str(member.course_group_id) if member.course_group_id != None else None,
+                given_name=member.given_name,
+                family_name=member.family_name,
+                username=member.username,
+            )
+            for member in members
+        ],
+        latest_result=latest_result,
+        best_result=best_result,
+        submission_count=submission_count,
+        grading_status=grading_status,
+        grading=grading,
+        next_cursor=next_cursor,
+    )
+
 async def event_wrapper(entity: CourseGet, db: Session, permissions: Principal):
     try:
         await mirror_entity_to_filesystem(str(entity.id),CourseInterface,db)
@@ -1,19 +1,23 @@
-from uuid import UUID
+import asyncio
+import json
+from uuid import UUID, uuid4
 from typing import Any, Optional
 from datetime import datetime
 from enum import Enum
 from fastapi import HTTPException
-from pydantic import BaseModel
+from pydantic import BaseModel, ValidationError
 from sqlalchemy.orm import Session
-from sqlalchemy import exc
+from sqlalchemy import exc, func, literal_column, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from psycopg2.errors import NotNullViolation
 from ctutor_backend.api.exceptions import BadRequestException, NotFoundException, InternalServerException
+from ctutor_backend.api.pagination import ListPage, after_cursor, encode_cursor, estimate_count, keyset_query
 from ctutor_backend.permissions.core import check_permissions, can_perform_with_parents
 from ctutor_backend.permissions.handlers import permission_registry
 from ctutor_backend.permissions.principal import Principal
 
-from ctutor_backend.interface.filter import apply_filters
-from ctutor_backend.interface.base import EntityInterface, ListQuery
+from ctutor_backend.interface.filter import FilterError, apply_filters
+from ctutor_backend.interface.base import BulkUpsertResponse, BulkUpsertRowResult, BulkUpsertStatus, EntityInterface, ListQuery
 from sqlalchemy.inspection import inspect
 from ..custom_types import Ltree, LtreeType
 from sqlalchemy.exc import StatementError
@@ -63,7 +67,6 @@ async def create_db(permissions: Principal, db: Session, entity: BaseModel, db_t
         response = response_type.model_validate(db_item,from_attributes=True)
 
         if post_create != None:
-            import asyncio
             if asyncio.iscoroutinefunction(post_create):
                 await post_create(db_item, db)
             else:
@@ -89,6 +92,162 @@ async def create_db(permissions: Principal, db: Session, entity: BaseModel, db_t
         db.rollback()
         raise BadRequestException(detail=e.args)
 
+async def bulk_upsert_db(permissions: Principal, db: Session, rows: list[dict], interface: EntityInterface) -> BulkUpsertResponse:
+    """
+    Insert or update many entities in a single transaction.
+
+    Rows are validated with the interface's create model and checked against the
+    registered permission handler one by one. Valid rows are written with
+    INSERT ... ON CONFLICT (interface.bulk_upsert_keys) DO UPDATE, one statement
+    per distinct column set. If a statement violates another constraint, that
+    group is retried row by row inside savepoints so that every row gets its own
+    outcome in the report. The interface's post_create and post_update hooks run
+    for the created and updated rows after the commit.
+    """
+    db_type = interface.model
+    keys = tuple(interface.bulk_upsert_keys)
+    results: dict[int, BulkUpsertRowResult] = {}
+    pending: list[tuple[int, dict]] = []
+
+    handler = None if permissions.is_admin else permission_registry.get_handler(db_type)
+    mapper = inspect(db_type)
+    ltree_columns = [column for column in mapper.columns.keys() if isinstance(mapper.columns[column].type, LtreeType)]
+
+    seen_keys = set()
+    for index, row in enumerate(rows):
+        try:
+            values = interface.create.model_validate(row).model_dump(exclude_unset=True)
+        except ValidationError as e:
+            results[index] = BulkUpsertRowResult(index=index, status=BulkUpsertStatus.invalid, detail=e.errors(include_url=False, include_context=False))
+            continue
+
+        if not permissions.is_admin:
+            context = {k: str(v) for k, v in values.items() if k.endswith("_id") and v is not None}
+            if handler is None or not handler.can_perform_action(permissions, "create", resource_id=None, context=context):
+                results[index] = BulkUpsertRowResult(index=index, status=BulkUpsertStatus.forbidden)
+                continue
+
+        for column, value in values.items():
+            if column in ltree_columns and isinstance(value, str):
+                values[column] = Ltree(value)
+            elif isinstance(value, Enum):
+                values[column] = value.value
+
+        # Client-side ids let inserted rows be matched to their RETURNING row
+        values.setdefault("id", str(uuid4()))
+
+        conflict_key = tuple(values.get(key) for key in keys)
+        if None not in conflict_key:
+            if conflict_key in seen_keys:
+                results[index] = BulkUpsertRowResult(index=index, status=BulkUpsertStatus.duplicate, detail=f"Duplicate {', '.join(keys)} in request")
+                continue
+            seen_keys.add(conflict_key)
+
+        pending.append((index, values))
+
+    # Non-admins may only overwrite existing rows they are allowed to update
+    if not permissions.is_admin and pending and seen_keys:
+        key_columns = [getattr(db_type, key) for key in keys]
+        existing = {
+            tuple(str(value) for value in row[1:]): str(row[0])
+            for row in db.query(db_type.id, *key_columns).filter(tuple_(*key_columns).in_(list(seen_keys))).all()
+        }
+        if existing:
+            update_query = check_permissions(permissions, db_type, "update", db)
+            updatable = set() if update_query is None else {
+                str(row[0]) for row in update_query.with_entities(db_type.id).filter(db_type.id.in_(list(existing.values()))).all()
+            }
+            allowed = []
+            for index, values in pending:
+                existing_id = existing.get(tuple(str(values.get(key)) for key in keys))
+                if existing_id is not None and existing_id not in updatable:
+                    results[index] = BulkUpsertRowResult(index=index, status=BulkUpsertStatus.forbidden, id=existing_id)
+                else:
+                    allowed.append((index, values))
+            pending = allowed
+
+    # Snapshots of the rows about to be overwritten, passed to post_update like update_db does
+    old_items = {}
+    if interface.post_update is not None and pending and seen_keys:
+        key_columns = [getattr(db_type, key) for key in keys]
+        for db_item in db.query(db_type).filter(tuple_(*key_columns).in_(list(seen_keys))).all():
+            old_items[str(db_item.id)] = interface.get.model_validate(db_item, from_attributes=True)
+
+    groups: dict[tuple, list[tuple[int, dict]]] = {}
+    for index, values in pending:
+        groups.setdefault(tuple(sorted(values.keys())), []).append((index, values))
+
+    def upsert_statement(columns: tuple, values: list[dict]):
+        statement = pg_insert(db_type.__table__).values(values)
+        update_set = {column: statement.excluded[column] for column in columns if column not in keys and column != "id"}
+        if "updated_at" in db_type.__table__.columns:
+            update_set["updated_at"] = func.now()
+        return statement.on_conflict_do_update(index_elements=list(keys), set_=update_set).returning(
+            db_type.__table__.c.id,
+            literal_column("xmax = 0").label("inserted"),
+            *[db_type.__table__.c[key] for key in keys]
+        )
+
+    def record(group: list[tuple[int, dict]], returned: list):
+        by_id = {str(row.id): row for row in returned}
+        by_key = {tuple(str(row._mapping[key]) for key in keys): row for row in returned}
+        for index, values in group:
+            # Updated rows keep their existing id, so fall back to the conflict key
+            row = by_id.get(str(values["id"])) or by_key.get(tuple(str(values.get(key)) for key in keys))
+            if row is None:
+                results[index] = BulkUpsertRowResult(index=index, status=BulkUpsertStatus.failed, detail="Row was not written")
+                continue
+            results[index] = BulkUpsertRowResult(
+                index=index,
+                status=BulkUpsertStatus.created if row.inserted else BulkUpsertStatus.updated,
+                id=str(row.id)
+            )
+
+    try:
+        for columns, group in groups.items():
+            try:
+                with db.begin_nested():
+                    returned = db.execute(upsert_statement(columns, [values for _, values in group])).all()
+                record(group, returned)
+            except exc.IntegrityError:
+                for index, values in group:
+                    try:
+                        with db.begin_nested():
+                            returned = db.execute(upsert_statement(columns, [values])).all()
+                        record([(index, values)], returned)
+                    except exc.IntegrityError as e:
+                        error_msg = str(e.orig) if hasattr(e, 'orig') else str(e)
+                        results[index] = BulkUpsertRowResult(index=index, status=BulkUpsertStatus.failed, detail=error_msg.split('\n')[0])
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        raise BadRequestException(detail=str(e))
+
+    if interface.post_create is not None:
+        created_ids = [result.id for result in results.values() if result.status == BulkUpsertStatus.created]
+        for db_item in db.query(db_type).filter(db_type.id.in_(created_ids)).all() if created_ids else []:
+            if asyncio.iscoroutinefunction(interface.post_create):
+                await interface.post_create(db_item, db)
+            else:
+                interface.post_create(db_item, db)
+
+    if interface.post_update is not None:
+        updated_ids = [result.id for result in results.values() if result.status == BulkUpsertStatus.updated]
+        for db_item in db.query(db_type).filter(db_type.id.in_(updated_ids)).all() if updated_ids else []:
+            old_item = old_items.get(str(db_item.id))
+            if asyncio.iscoroutinefunction(interface.post_update):
+                await interface.post_update(db_item, old_item, db)
+            else:
+                interface.post_update(db_item, old_item, db)
+
+    ordered = [results[index] for index in sorted(results.keys())]
+    return BulkUpsertResponse(
+        created=sum(1 for result in ordered if result.status == BulkUpsertStatus.created),
+        updated=sum(1 for result in ordered if result.status == BulkUpsertStatus.updated),
+        failed=sum(1 for result in ordered if result.status not in (BulkUpsertStatus.created, BulkUpsertStatus.updated)),
+        results=ordered
+    )
+
 async def get_id_db(permissions: Principal, db: Session, id: UUID | str, interface: EntityInterface, scope: str = "get"):
 
     db_type = interface.model
@@ -115,7 +274,24 @@ async def get_id_db(permissions: Principal, db: Session, id: UUID | str, interfa
     except Exception as e:
         raise NotFoundException(detail=e.args)
 
-async def list_db(permissions: Principal, db: Session, params: ListQuery, interface: EntityInterface):
+def _apply_list_filter(query, interface: EntityInterface, filter: str):
+    if interface.filter_fields == None:
+        raise BadRequestException(detail=f"{interface.endpoint} does not support filters")
+
+    try:
+        filters = json.loads(filter)
+    except ValueError:
+        raise BadRequestException(detail="filter is not valid JSON")
+
+    if not isinstance(filters, dict):
+        raise BadRequestException(detail="filter must be a JSON object")
+
+    try:
+        return apply_filters(query, interface.model, filters, interface.filter_fields)
+    except FilterError as e:
+        raise BadRequestException(detail=str(e))
+
+async def list_db(permissions: Principal, db: Session, params: ListQuery, interface: EntityInterface) -> ListPage:
         
     db_type = interface.model
     query_func = interface.search
@@ -123,20 +299,60 @@ async def list_db(permissions: Principal, db: Session, params: ListQuery, interf
     query = check_permissions(permissions,db_type,"list",db)
 
     if query == None:
-        return []
+        return ListPage(items=[], total=0)
  
     query = query_func(db, query, params)
 
-    total = query.order_by(None).count()
+    if params.filter != None:
+        query = _apply_list_filter(query, interface, params.filter)
+
+    count_query = query
 
+    # Keyset pagination on the cursor sort key, None if the search sorts differently
+    keyset = keyset_query(query, interface)
+
+    if params.cursor != None:
+        if keyset == None:
+            raise BadRequestException(detail=f"{interface.endpoint} does not support cursor pagination")
+        query = after_cursor(keyset, interface, params.cursor)
+    elif keyset != None:
+        query = keyset
+
+    # One extra row tells whether there is a next page
     if params.limit != None:
-        query = query.limit(params.limit)
-    if params.skip != None:
-        query = query.offset(params.skip)
-    
-    query_result = [interface.list.model_validate(entity,from_attributes=True) for entity in query.all()]
+        query = query.limit(params.limit + 1)
+    skip = 0
+    if params.cursor == None and params.skip != None:
+        skip = params.skip
+        query = query.offset(skip)
+
+    entities = query.all()
+
+    has_more = params.limit != None and len(entities) > params.limit
+    if has_more:
+        entities = entities[:params.limit]
+
+    page = ListPage(
+        items=[interface.list.model_validate(entity,from_attributes=True) for entity in entities],
+        total=0,
+        next_cursor=encode_cursor(entities[-1], interface) if has_more and keyset != None else None
+    )
 
-    return query_result, total
+    if not params.exact_total and not has_more and params.cursor == None and (entities or skip == 0):
+        # The last page of an offset listing knows its total
+        page.total = skip + len(entities)
+        return page
+
+    estimate = estimate_count(db, count_query, interface) if not params.exact_total else None
+
+    if estimate == None:
+        page.total = count_query.order_by(None).count()
+    else:
+        # Never report fewer rows than the client has already seen
+        page.total = max(estimate, skip + len(entities) + int(has_more))
+        page.total_estimated = True
+
+    return page
 
 def update_db(permissions: Principal, db: Session, id: UUID | str | None, entity: Any, db_type: Any, response_type: BaseModel, db_item = None, post_update: Any = None):
     if id != None:
@@ -288,7 +504,7 @@ def archive_db(permissions: Principal, db: Session, id: UUID | str | None, db_ty
     
     return {"ok": True}
 
-async def filter_db(permissions: Principal, db: Session, db_type: Any, params: ListQuery, query_func, filter: Optional[dict] = None):
+async def filter_db(permissions: Principal, db: Session, db_type: Any, params: ListQuery, query_func, filter: Optional[dict] = None, allowed_fields: Optional[tuple] = None):
 
     query = check_permissions(permissions,db_type,"filter",db)
 
@@ -298,9 +514,10 @@ async def filter_db(permissions: Principal, db: Session, db_type: Any, params: L
     query = query_func(db, query, params)
 
     if filter != None and filter != {}:
-        query = query.filter(apply_filters(query, db_type, filter))
-
-        #print(f'{query.statement.compile(compile_kwargs={"literal_binds": True})}')
+        try:
+            query = apply_filters(query, db_type, filter, allowed_fields)
+        except FilterError as e:
+            raise BadRequestException(detail=str(e))
     
     if params.limit != None:
         query = query.limit(params.limit)
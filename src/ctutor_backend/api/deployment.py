@@ -34,6 +34,10 @@ class DeploymentRequest(BaseModel):
         False,
         description="If true, only validate the configuration without deploying"
     )
+    completed_nodes: Optional[Dict[str, Any]] = Field(
+        None,
+        description="result.nodes of a failed deployment of the same configuration, deployed nodes are skipped"
+    )
 
 
 class DeploymentResponse(BaseModel):
@@ -79,7 +83,8 @@ async def deploy_from_config(
             task_name="deploy_computor_hierarchy",
             parameters={
                 "deployment_config": config.model_dump(),
-                "user_id": str(permissions.user_id)
+                "user_id": str(permissions.user_id),
+                "completed_nodes": request.completed_nodes
             },
             queue="computor-tasks",
             workflow_id=workflow_id
@@ -37,6 +37,7 @@ from ..interface.example import (
 from ..model.example import ExampleRepository, Example, ExampleVersion, ExampleDependency
 from ..permissions.auth import get_current_permissions
 from ..api.crud import get_id_db, list_db
+from ..api.pagination import set_list_headers
 from ..api.exceptions import (
     NotFoundException,
     ForbiddenException,
@@ -251,8 +252,9 @@ async def list_examples(
     redis_client=Depends(get_redis_client),
 ):
     """List all examples."""
-    list_result, total = await list_db(permissions, db, params, ExampleInterface)
-    response.headers["X-Total-Count"] = str(total)
+    page = await list_db(permissions, db, params, ExampleInterface)
+    list_result = page.items
+    set_list_headers(response, page)
     
     # Cache the result
     # cache_data = {
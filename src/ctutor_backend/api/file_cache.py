@@ -0,0 +1,163 @@
+"""
+Parsed-file cache for course content files mirrored to the local filesystem.
+
+Files like ``meta.yaml`` and ``test.yaml`` are requested over and over by
+tutor dashboards. Entries are keyed by ``(path, mtime, size)`` so a changed
+file on disk is never served stale, and the cache evicts least recently used
+entries once the configured memory budget is exceeded.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+import yaml
+
+from ctutor_backend.api.exceptions import BadRequestException, NotFoundException
+
+FileKey = Tuple[str, int, int]
+
+
+@dataclass(frozen=True)
+class ParsedFile:
+    """A parsed course content file together with its validator."""
+    data: dict
+    etag: str
+    size: int
+
+
+def _make_etag(key: FileKey) -> str:
+    digest = hashlib.sha1(f"{key[0]}:{key[1]}:{key[2]}".encode()).hexdigest()
+    return f'"{digest}"'
+
+
+def _parse_file(path: str) -> dict:
+    """Read and parse a file. Runs in a worker thread."""
+    with open(path, "r") as file:
+        content = file.read()
+
+    if path.endswith(".yaml") or path.endswith(".yml"):
+        try:
+            data = yaml.safe_load(content)
+        except Exception:
+            raise BadRequestException()
+        # Non-mapping documents were never returned by the endpoint
+        return data if isinstance(data, dict) else None
+
+    if path.endswith(".json"):
+        try:
+            data = json.loads(content)
+        except Exception:
+            raise BadRequestException()
+        return data if isinstance(data, dict) else None
+
+    return {"content": content}
+
+
+class ParsedFileCache:
+    """
+    LRU cache of parsed files bounded by the total size of the source files.
+
+    Args:
+        max_bytes: Memory budget, measured as the summed size of cached files
+        max_entry_bytes: Files larger than this are parsed but never cached
+    """
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024, max_entry_bytes: int = 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self._entries: "OrderedDict[str, Tuple[FileKey, ParsedFile]]" = OrderedDict()
+        self._current_bytes = 0
+        self._lock = threading.Lock()
+
+    @property
+    def current_bytes(self) -> int:
+        return self._current_bytes
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _lookup(self, key: FileKey) -> Optional[ParsedFile]:
+        with self._lock:
+            entry = self._entries.get(key[0])
+            if entry is None:
+                return None
+            cached_key, parsed = entry
+            if cached_key != key:
+                # File changed on disk, drop the stale entry
+                self._remove(key[0])
+                return None
+            self._entries.move_to_end(key[0])
+            return parsed
+
+    def _store(self, key: FileKey, parsed: ParsedFile):
+        if parsed.size > self.max_entry_bytes or parsed.size > self.max_bytes:
+            return
+        with self._lock:
+            self._remove(key[0])
+            self._entries[key[0]] = (key, parsed)
+            self._current_bytes += parsed.size
+            while self._current_bytes > self.max_bytes and self._entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+
+    def _remove(self, path: str):
+        entry = self._entries.pop(path, None)
+        if entry is not None:
+            self._current_bytes -= entry[1].size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._current_bytes = 0
+
+    async def stat(self, path: str) -> FileKey:
+        """Return the cache key of a file, raising NotFoundException if missing."""
+        try:
+            st = await asyncio.to_thread(os.stat, path)
+        except (FileNotFoundError, NotADirectoryError):
+            raise NotFoundException()
+        return (path, st.st_mtime_ns, st.st_size)
+
+    async def get(self, path: str, key: Optional[FileKey] = None) -> ParsedFile:
+        """
+        Return the parsed file at ``path``.
+
+        The file is only read and parsed (off the event loop) if no entry
+        for its current ``(path, mtime, size)`` exists.
+        """
+        if key is None:
+            key = await self.stat(path)
+
+        parsed = self._lookup(key)
+        if parsed is not None:
+            return parsed
+
+        data = await asyncio.to_thread(_parse_file, path)
+        parsed = ParsedFile(data=data, etag=_make_etag(key), size=key[2])
+        self._store(key, parsed)
+        return parsed
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header value against an ETag."""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+_parsed_file_cache: Optional[ParsedFileCache] = None
+
+
+def get_parsed_file_cache() -> ParsedFileCache:
+    global _parsed_file_cache
+    if _parsed_file_cache is None:
+        max_bytes = int(os.environ.get("API_FILE_CACHE_MAX_BYTES", 32 * 1024 * 1024))
+        _parsed_file_cache = ParsedFileCache(max_bytes=max_bytes)
+    return _parsed_file_cache
@@ -68,7 +68,7 @@ async def get_vsc_extension_info():
         raise NotFoundException()
 
     with next(get_db()) as db:
-        query = db.query(Organization.properties).filter(Organization.properties["gitlab"].op("->>")("url") == vsc_config.gitlab_url).first()
+        query = db.query(Organization.properties).filter(Organization.gitlab_url == vsc_config.gitlab_url).first()
 
     if query == None:
         raise NotFoundException()
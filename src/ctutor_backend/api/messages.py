@@ -5,6 +5,7 @@ from fastapi import APIRouter, Depends, Response, status
 from sqlalchemy.orm import Session
 
 from ctutor_backend.api.crud import get_id_db, list_db, update_db, delete_db, create_db
+from ctutor_backend.api.pagination import set_list_headers
 from ctutor_backend.api.exceptions import BadRequestException
 from ctutor_backend.database import get_db
 from ctutor_backend.interface.messages import MessageInterface, MessageCreate, MessageGet, MessageList, MessageQuery, MessageUpdate
@@ -77,7 +78,8 @@ async def list_messages(
     params: MessageQuery = Depends(),
     db: Session = Depends(get_db),
 ):
-    items, total = await list_db(permissions, db, params, MessageInterface)
+    page = await list_db(permissions, db, params, MessageInterface)
+    items = page.items
     reader_user_id = permissions.user_id
 
     if reader_user_id and items:
@@ -96,7 +98,7 @@ async def list_messages(
 
     items = [item.model_copy(update={"is_read": item.id in read_ids}) for item in items]
 
-    response.headers["X-Total-Count"] = str(total)
+    set_list_headers(response, page)
     return items
 
 
@@ -0,0 +1,130 @@
+import json
+import base64
+import binascii
+from datetime import datetime
+from dataclasses import dataclass
+from typing import Any, Optional
+from fastapi import Response
+from sqlalchemy import DateTime, text, tuple_
+from sqlalchemy.orm import Query, Session
+from ctutor_backend.api.exceptions import BadRequestException
+from ctutor_backend.interface.base import EntityInterface
+
+DEFAULT_CURSOR_KEYS = ("created_at", "id")
+
+@dataclass
+class ListPage:
+    items: list
+    total: int
+    total_estimated: bool = False
+    next_cursor: Optional[str] = None
+
+def set_list_headers(response: Response, page: ListPage):
+    response.headers["X-Total-Count"] = str(page.total)
+    if page.total_estimated:
+        response.headers["X-Total-Count-Estimated"] = "true"
+    if page.next_cursor != None:
+        response.headers["X-Next-Cursor"] = page.next_cursor
+
+def cursor_columns(interface: EntityInterface) -> tuple[list, bool]:
+    """
+    Columns of the cursor sort key and whether they are sorted descending.
+
+    Interfaces without ``cursor_keys`` use ``created_at, id``, or only ``id``
+    for tables without a creation timestamp.
+    """
+    model = interface.model
+    table_keys = model.__table__.columns.keys()
+
+    keys = interface.cursor_keys
+    if keys == None:
+        keys = tuple(key for key in DEFAULT_CURSOR_KEYS if key in table_keys)
+
+    descending = {key.startswith("-") for key in keys}
+    if len(descending) != 1:
+        raise ValueError(f"{interface.__name__}.cursor_keys must sort all columns in the same direction")
+
+    return [getattr(model, key.lstrip("-")) for key in keys], descending.pop()
+
+def _orderings(columns: list, descending: bool) -> list:
+    return [column.desc() if descending else column.asc() for column in columns]
+
+def keyset_query(query: Query, interface: EntityInterface) -> Optional[Query]:
+    """
+    Order ``query`` by the cursor sort key.
+
+    An ordering applied by the interface search is kept compatible: it must
+    be a prefix of the sort key, which then only adds tie-breakers. Returns
+    None when the search sorts differently and the list can only be
+    paginated by offset.
+    """
+    columns, descending = cursor_columns(interface)
+    orderings = _orderings(columns, descending)
+
+    order_by = getattr(query, "_order_by_clauses", None)
+    search_order = [str(clause) for clause in order_by] if isinstance(order_by, (list, tuple)) else []
+    if search_order != [str(ordering) for ordering in orderings[:len(search_order)]]:
+        return None
+
+    return query.order_by(None).order_by(*orderings)
+
+def encode_cursor(entity: Any, interface: EntityInterface) -> str:
+    columns, _ = cursor_columns(interface)
+
+    values = []
+    for column in columns:
+        value = getattr(entity, column.key)
+        values.append(value.isoformat() if isinstance(value, datetime) else str(value))
+
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+def after_cursor(query: Query, interface: EntityInterface, cursor: str) -> Query:
+    """Restrict a keyset ordered query to the rows after ``cursor``."""
+    columns, descending = cursor_columns(interface)
+
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError()
+        values = [
+            datetime.fromisoformat(value) if isinstance(column.type, DateTime) else value
+            for column, value in zip(columns, values)
+        ]
+    except (ValueError, TypeError, binascii.Error):
+        raise BadRequestException(detail="Invalid cursor")
+
+    key, bound = tuple_(*columns), tuple_(*values)
+    return query.filter(key < bound if descending else key > bound)
+
+def estimate_count(db: Session, query: Query, interface: EntityInterface) -> Optional[int]:
+    """
+    Planner estimate of the number of rows ``query`` returns.
+
+    Unfiltered lists read ``pg_class.reltuples`` of the table, everything
+    else the row estimate of ``EXPLAIN``. Both only read statistics kept up
+    to date by autovacuum. Returns None when no estimate is available.
+    """
+    statement = query.order_by(None).statement
+    table = interface.model.__table__
+
+    try:
+        with db.begin_nested():
+            if statement.whereclause is None and list(statement.froms) == [table]:
+                estimate = db.execute(
+                    text("SELECT reltuples FROM pg_class WHERE oid = to_regclass(quote_ident(:table))"),
+                    {"table": table.name}
+                ).scalar()
+            else:
+                compiled = statement.compile(dialect=db.get_bind().dialect, compile_kwargs={"render_postcompile": True})
+                plan = db.connection().exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params).scalar()
+                if isinstance(plan, str):
+                    plan = json.loads(plan)
+                estimate = plan[0]["Plan"]["Plan Rows"]
+    except Exception:
+        return None
+
+    # Tables that were never analyzed report -1
+    if estimate == None or estimate < 0:
+        return None
+
+    return int(estimate)
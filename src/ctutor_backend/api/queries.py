@@ -1,12 +1,12 @@
 from typing import Optional
 from uuid import UUID
-from sqlalchemy import func, case, select, and_, literal
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import func, case, select, and_, literal, tuple_
+from sqlalchemy.orm import Session, noload, selectinload
 from ctutor_backend.api.exceptions import NotFoundException
 from ctutor_backend.model.course import CourseSubmissionGroupMember
 from ctutor_backend.model.result import Result
 from ctutor_backend.model.auth import User
-from ctutor_backend.model.course import Course, CourseContent, CourseContentKind, CourseMember, CourseSubmissionGroup, CourseSubmissionGroupGrading
+from ctutor_backend.model.course import Course, CourseContent, CourseContentKind, CourseMember, CourseMemberContentProgress, CourseSubmissionGroup, CourseSubmissionGroupGrading
 from ctutor_backend.model.message import Message, MessageRead
 
 def latest_result_subquery(user_id: UUID | str | None, course_member_id: UUID | str | None, course_content_id: UUID | str | None, db: Session, submission: Optional[bool] = None):
@@ -132,6 +132,26 @@ def message_unread_by_submission_group_subquery(reader_user_id: UUID | str | Non
         .subquery()
     )
 
+def course_content_result_loader_options():
+    """
+    Eager loads needed by ``course_member_course_content_result_mapper``.
+
+    Relationships are loaded with batched ``selectinload`` statements so the
+    main query carries no eager joins, and they start from the row's own
+    submission group rather than from every submission group of the content.
+    """
+    graded_by = selectinload(CourseSubmissionGroup.gradings).selectinload(CourseSubmissionGroupGrading.graded_by)
+
+    return (
+        selectinload(CourseContent.course_content_type),
+        selectinload(CourseContent.deployment),
+        graded_by.selectinload(CourseMember.user),
+        graded_by.selectinload(CourseMember.course_role),
+        selectinload(CourseSubmissionGroup.members)
+        .selectinload(CourseSubmissionGroupMember.course_member)
+        .selectinload(CourseMember.user),
+    )
+
 def user_course_content_query(user_id: UUID | str, course_content_id: UUID | str, db: Session):
 
     latest_result_sub = latest_result_subquery(user_id,None,course_content_id,db)
@@ -220,20 +240,7 @@ def user_course_content_query(user_id: UUID | str, course_content_id: UUID | str
             CourseSubmissionGroup.id == submission_group_unread_sub.c.course_submission_group_id,
         )
 
-    course_contents_query = course_contents_query.options(
-        joinedload(CourseContent.course_submission_groups)
-        .joinedload(CourseSubmissionGroup.gradings)
-        .joinedload(CourseSubmissionGroupGrading.graded_by)
-        .joinedload(CourseMember.user),
-        joinedload(CourseContent.course_submission_groups)
-        .joinedload(CourseSubmissionGroup.gradings)
-        .joinedload(CourseSubmissionGroupGrading.graded_by)
-        .joinedload(CourseMember.course_role),
-        joinedload(CourseContent.course_submission_groups)
-        .joinedload(CourseSubmissionGroup.members)
-        .joinedload(CourseSubmissionGroupMember.course_member)
-        .joinedload(CourseMember.user),
-    )
+    course_contents_query = course_contents_query.options(*course_content_result_loader_options())
 
     course_contents_result = course_contents_query.distinct().first()
         
@@ -330,25 +337,54 @@ def user_course_content_list_query(user_id: UUID | str, db: Session):
             CourseSubmissionGroup.id == submission_group_unread_sub.c.course_submission_group_id,
         )
 
-    query = query.options(
-        joinedload(CourseContent.course_submission_groups)
-        .joinedload(CourseSubmissionGroup.gradings)
-        .joinedload(CourseSubmissionGroupGrading.graded_by)
-        .joinedload(CourseMember.user),
-        joinedload(CourseContent.course_submission_groups)
-        .joinedload(CourseSubmissionGroup.gradings)
-        .joinedload(CourseSubmissionGroupGrading.graded_by)
-        .joinedload(CourseMember.course_role),
-        joinedload(CourseContent.course_submission_groups)
-        .joinedload(CourseSubmissionGroup.members)
-        .joinedload(CourseSubmissionGroupMember.course_member)
-        .joinedload(CourseMember.user),
-    )
+    query = query.options(*course_content_result_loader_options())
 
     query = query.distinct()
 
     return query
 
+def user_course_content_progress_list_query(user_id: UUID | str, db: Session):
+    """
+    Course contents of all courses the user is a member of, read from the
+    course_member_content_progress read model.
+
+    Returns the same row shape as ``user_course_content_list_query`` but
+    needs no aggregation: every content is joined to its progress row by
+    primary key, and the result and submission group by id.
+    """
+
+    query = db.query(
+            CourseContent,
+            func.coalesce(CourseMemberContentProgress.result_count, 0).label("total_results_count"),
+            Result,
+            CourseSubmissionGroup,
+            func.coalesce(CourseMemberContentProgress.submitted_count, 0).label("submitted_count"),
+            CourseMemberContentProgress.grading_status,
+            CourseMemberContentProgress.grading,
+            func.coalesce(CourseMemberContentProgress.content_unread_count, 0).label("content_unread_count"),
+            func.coalesce(CourseMemberContentProgress.submission_group_unread_count, 0).label("submission_group_unread_count"),
+        ) \
+        .select_from(CourseMember) \
+        .filter(CourseMember.user_id == user_id) \
+        .join(CourseContent, CourseContent.course_id == CourseMember.course_id) \
+        .outerjoin(CourseMemberContentProgress,
+                   (CourseMemberContentProgress.course_member_id == CourseMember.id) &
+                   (CourseMemberContentProgress.course_content_id == CourseContent.id)) \
+        .outerjoin(CourseSubmissionGroup, CourseSubmissionGroup.id == CourseMemberContentProgress.course_submission_group_id) \
+        .outerjoin(Result, Result.id == CourseMemberContentProgress.latest_result_id)
+
+    # The latest grading is part of the progress row, so gradings are not loaded
+    query = query.options(
+        selectinload(CourseContent.course_content_type),
+        selectinload(CourseContent.deployment),
+        noload(CourseSubmissionGroup.gradings),
+        selectinload(CourseSubmissionGroup.members)
+        .selectinload(CourseSubmissionGroupMember.course_member)
+        .selectinload(CourseMember.user),
+    )
+
+    return query
+
 def course_member_course_content_query(course_member_id: UUID | str, course_content_id: UUID | str, db: Session, reader_user_id: UUID | str | None = None):
 
     latest_result_sub = latest_result_subquery(None,course_member_id,course_content_id,db)
@@ -414,20 +450,7 @@ def course_member_course_content_query(course_member_id: UUID | str, course_cont
             CourseSubmissionGroup.id == submission_group_unread_sub.c.course_submission_group_id,
         )
 
-    course_contents_query = course_contents_query.options(
-        joinedload(CourseContent.course_submission_groups)
-        .joinedload(CourseSubmissionGroup.gradings)
-        .joinedload(CourseSubmissionGroupGrading.graded_by)
-        .joinedload(CourseMember.user),
-        joinedload(CourseContent.course_submission_groups)
-        .joinedload(CourseSubmissionGroup.gradings)
-        .joinedload(CourseSubmissionGroupGrading.graded_by)
-        .joinedload(CourseMember.course_role),
-        joinedload(CourseContent.course_submission_groups)
-        .joinedload(CourseSubmissionGroup.members)
-        .joinedload(CourseSubmissionGroupMember.course_member)
-        .joinedload(CourseMember.user),
-    )
+    course_contents_query = course_contents_query.options(*course_content_result_loader_options())
 
     course_contents_result = course_contents_query.first()
         
@@ -514,44 +537,37 @@ def course_member_course_content_list_query(course_member_id: UUID | str, db: Se
             CourseSubmissionGroup.id == submission_group_unread_sub.c.course_submission_group_id,
         )
 
-    query = query.options(
-        joinedload(CourseContent.course_submission_groups)
-        .joinedload(CourseSubmissionGroup.gradings)
-        .joinedload(CourseSubmissionGroupGrading.graded_by)
-        .joinedload(CourseMember.user),
-        joinedload(CourseContent.course_submission_groups)
-        .joinedload(CourseSubmissionGroup.gradings)
-        .joinedload(CourseSubmissionGroupGrading.graded_by)
-        .joinedload(CourseMember.course_role),
-        joinedload(CourseContent.course_submission_groups)
-        .joinedload(CourseSubmissionGroup.members)
-        .joinedload(CourseSubmissionGroupMember.course_member)
-        .joinedload(CourseMember.user),
-    )
+    query = query.options(*course_content_result_loader_options())
 
     return query
 
-def course_course_member_list_query(db: Session):
+def course_course_member_list_query(db: Session, course_ids = None, course_id: UUID | str | None = None):
+    """
+    Course members with the date of their latest submitted result.
+
+    ``course_ids`` (a list or a select of course ids) and ``course_id`` are
+    applied inside the aggregation as well, so only the submissions of the
+    requested courses are scanned. The per-member maximum is taken in a
+    single pass over ``result_submission_group_submit_status_created_idx``.
+    """
 
-    latest_result_subquery =  db.query(
-                    Result.course_content_id,
-                    CourseMember.id.label("course_member_id"),
+    latest_result_per_member = db.query(
+                    CourseSubmissionGroupMember.course_member_id,
                     func.max(Result.created_at).label("latest_result_date")
                 ) \
-        .join(CourseSubmissionGroup, CourseSubmissionGroup.id == Result.course_submission_group_id) \
-        .join(CourseSubmissionGroupMember, CourseSubmissionGroupMember.course_submission_group_id == CourseSubmissionGroup.id) \
-        .join(CourseMember, CourseMember.id == CourseSubmissionGroupMember.course_member_id) \
+        .join(Result, Result.course_submission_group_id == CourseSubmissionGroupMember.course_submission_group_id) \
         .filter(
-                Result.status == 0,
-                Result.submit == True
-        ) \
-        .group_by(Result.course_content_id, CourseMember.id).subquery()
+                Result.submit == True,
+                Result.status == 0
+        )
 
-    latest_result_per_member = db.query(
-        latest_result_subquery.c.course_member_id,
-        func.max(latest_result_subquery.c.latest_result_date).label("latest_result_date")
-    ) \
-        .group_by(latest_result_subquery.c.course_member_id) \
+    if course_ids is not None:
+        latest_result_per_member = latest_result_per_member.filter(CourseSubmissionGroupMember.course_id.in_(course_ids))
+    if course_id is not None:
+        latest_result_per_member = latest_result_per_member.filter(CourseSubmissionGroupMember.course_id == course_id)
+
+    latest_result_per_member = latest_result_per_member \
+        .group_by(CourseSubmissionGroupMember.course_member_id) \
         .subquery()
 
     course_member_results = db.query(
@@ -561,4 +577,70 @@ def course_course_member_list_query(db: Session):
         .select_from(CourseMember) \
         .outerjoin(latest_result_per_member,latest_result_per_member.c.course_member_id == CourseMember.id)
 
+    if course_ids is not None:
+        course_member_results = course_member_results.filter(CourseMember.course_id.in_(course_ids))
+    if course_id is not None:
+        course_member_results = course_member_results.filter(CourseMember.course_id == course_id)
+
     return course_member_results
+
+def course_gradebook_contents_query(course_id: UUID | str, db: Session):
+    """Submittable, non-archived contents of a course: the gradebook columns."""
+
+    return db.query(CourseContent.id, CourseContent.path, CourseContent.title) \
+        .filter(
+            CourseContent.course_id == course_id,
+            CourseContent.archived_at.is_(None),
+            CourseContent.is_submittable == True
+        ) \
+        .order_by(CourseContent.path)
+
+def course_gradebook_members_query(course_id: UUID | str, db: Session, course_role_id: str | None = None, after: tuple | None = None):
+    """
+    Members of a course ordered by name: the gradebook rows.
+
+    ``after`` is the ``(sort_family_name, sort_given_name, id)`` key of the
+    last member of the previous page.
+    """
+
+    sort_family_name = func.coalesce(User.family_name, "")
+    sort_given_name = func.coalesce(User.given_name, "")
+
+    query = db.query(
+            CourseMember.id,
+            CourseMember.user_id,
+            CourseMember.course_group_id,
+            User.given_name,
+            User.family_name,
+            User.username,
+            sort_family_name.label("sort_family_name"),
+            sort_given_name.label("sort_given_name"),
+        ) \
+        .join(User, User.id == CourseMember.user_id) \
+        .filter(CourseMember.course_id == course_id)
+
+    if course_role_id != None:
+        query = query.filter(CourseMember.course_role_id == course_role_id)
+
+    if after != None:
+        query = query.filter(tuple_(sort_family_name, sort_given_name, CourseMember.id) > tuple_(*after))
+
+    return query.order_by(sort_family_name, sort_given_name, CourseMember.id)
+
+def course_gradebook_cells_query(course_id: UUID | str, course_member_ids: list, db: Session):
+    """Progress of a page of members on every content of the course."""
+
+    return db.query(
+            CourseMemberContentProgress.course_member_id,
+            CourseMemberContentProgress.course_content_id,
+            Result.result.label("latest_result"),
+            CourseMemberContentProgress.best_result,
+            CourseMemberContentProgress.submitted_count,
+            CourseMemberContentProgress.grading_status,
+            CourseMemberContentProgress.grading,
+        ) \
+        .outerjoin(Result, Result.id == CourseMemberContentProgress.latest_result_id) \
+        .filter(
+            CourseMemberContentProgress.course_id == course_id,
+            CourseMemberContentProgress.course_member_id.in_(course_member_ids)
+        )
@@ -5,6 +5,7 @@ from fastapi import APIRouter, Depends, Response, status
 from sqlalchemy.orm import Session
 
 from ctutor_backend.api.crud import create_db, delete_db, get_id_db, list_db, update_db
+from ctutor_backend.api.pagination import set_list_headers
 from ctutor_backend.api.exceptions import NotFoundException
 from ctutor_backend.database import get_db
 from ctutor_backend.interface.results import (
@@ -43,9 +44,9 @@ async def list_results(
     params: ResultQuery = Depends(),
     db: Session = Depends(get_db),
 ) -> list[ResultList]:
-    results, total = await list_db(permissions, db, params, ResultInterface)
-    response.headers["X-Total-Count"] = str(total)
-    return results
+    page = await list_db(permissions, db, params, ResultInterface)
+    set_list_headers(response, page)
+    return page.items
 
 
 @result_router.get("/{result_id}", response_model=ResultGet)
@@ -83,7 +83,7 @@ async def gitlab_signup(gitlab_signup: GitlabSignup):
         query = db.query(CourseMember,Course,Organization.properties) \
             .join(Course,Course.id == CourseMember.course_id) \
                 .join(Organization,Organization.id == Course.organization_id) \
-                    .filter(CourseMember.user_id == user.id, Course.properties["gitlab"].op("->>")("url") == gitlab_signup.provider).all()
+                    .filter(CourseMember.user_id == user.id, Course.gitlab_url == gitlab_signup.provider).all()
         
         if query == None:
             raise NotFoundException()
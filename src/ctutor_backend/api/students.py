@@ -10,7 +10,7 @@ from ctutor_backend.api.exceptions import BadRequestException, InternalServerExc
 from ctutor_backend.api.mappers import course_member_course_content_result_mapper
 from ctutor_backend.permissions.core import check_course_permissions
 from ctutor_backend.permissions.principal import Principal
-from ctutor_backend.api.queries import user_course_content_list_query, user_course_content_query
+from ctutor_backend.api.queries import user_course_content_progress_list_query, user_course_content_query
 from ctutor_backend.interface.course_contents import CourseContentGet
 from ctutor_backend.interface.course_members import CourseMemberProperties
 from ctutor_backend.interface.student_course_contents import (
@@ -20,7 +20,7 @@ from ctutor_backend.interface.student_course_contents import (
     CourseContentStudentGet,
 )
 from ctutor_backend.permissions.auth import get_current_permissions
-from ctutor_backend.database import get_db
+from ctutor_backend.database import get_db, get_read_db
 from ctutor_backend.interface.student_courses import CourseStudentGet, CourseStudentInterface, CourseStudentList, CourseStudentQuery, CourseStudentRepository
 from ctutor_backend.model.auth import User
 from ctutor_backend.model.course import Course, CourseContent, CourseMember, CourseSubmissionGroup, CourseSubmissionGroupMember
@@ -81,9 +81,9 @@ def student_get_course_content(course_content_id: UUID | str, permissions: Annot
     return course_member_course_content_result_mapper(course_contents_result, db, detailed=True)
 
 @student_router.get("/course-contents", response_model=list[CourseContentStudentList])
-def student_list_course_contents(permissions: Annotated[Principal, Depends(get_current_permissions)], params: CourseContentStudentQuery = Depends(), db: Session = Depends(get_db)):
+def student_list_course_contents(permissions: Annotated[Principal, Depends(get_current_permissions)], params: CourseContentStudentQuery = Depends(), db: Session = Depends(get_read_db)):
 
-    query = user_course_content_list_query(permissions.get_user_id_or_throw(),db)
+    query = user_course_content_progress_list_query(permissions.get_user_id_or_throw(),db)
 
     course_contents_results = CourseContentStudentInterface.search(db,query,params).all()
 
@@ -95,7 +95,7 @@ def student_list_course_contents(permissions: Annotated[Principal, Depends(get_c
     return response_list
 
 @student_router.get("/courses", response_model=list[CourseStudentList])
-async def student_list_courses(permissions: Annotated[Principal, Depends(get_current_permissions)], params: CourseStudentQuery = Depends(), db: Session = Depends(get_db)):
+async def student_list_courses(permissions: Annotated[Principal, Depends(get_current_permissions)], params: CourseStudentQuery = Depends(), db: Session = Depends(get_read_db)):
 
     # TODO: query should be improved: course_contents for course_group_members shall be available. All ascendant sould be included afterwards, but in one query.
 
@@ -112,8 +112,8 @@ async def student_list_courses(permissions: Annotated[Principal, Depends(get_cur
             organization_id=course.organization_id,
             path=course.path,
             repository=CourseStudentRepository(
-                provider_url=course.properties.get("gitlab", {}).get("url") if course.properties else None,
-                full_path=course.properties.get("gitlab", {}).get("full_path") if course.properties else None
+                provider_url=course.gitlab_url,
+                full_path=course.gitlab_full_path
             ) if course.properties and course.properties.get("gitlab") else None
         ))
 
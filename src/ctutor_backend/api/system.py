@@ -31,6 +31,7 @@ from ctutor_backend.interface.system import (
     PendingChange, PendingChangesResponse, GenerateTemplateRequest, GenerateTemplateResponse,
     BulkAssignExamplesRequest,
     GenerateAssignmentsRequest, GenerateAssignmentsResponse,
+    ProvisionStudentRepositoriesRequest, ProvisionStudentRepositoriesResponse,
 )
 from ctutor_backend.model.course import Course, CourseContent, CourseContentType, CourseFamily, CourseGroup, CourseMember
 from ctutor_backend.model.organization import Organization  
@@ -976,6 +977,45 @@ async def generate_assignments(
         contents_to_process=count_estimate or 0
     )
 
+@system_router.post(
+    "/courses/{course_id}/student-repositories",
+    response_model=ProvisionStudentRepositoriesResponse
+)
+async def provision_student_repositories(
+    course_id: str,
+    request: ProvisionStudentRepositoriesRequest,
+    permissions: Annotated[Principal, Depends(get_current_permissions)],
+    db: Session = Depends(get_db)
+):
+    """Create the repositories of all students of a course that have none, in one batch workflow."""
+    if check_course_permissions(permissions, Course, "_lecturer", db).filter(Course.id == course_id).first() is None:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized")
+
+    members_q = db.query(func.count(CourseMember.id)).filter(
+        CourseMember.course_id == course_id,
+        CourseMember.course_role_id == "_student",
+        CourseMember.gitlab_full_path.is_(None)
+    )
+    if request.course_member_ids:
+        members_q = members_q.filter(CourseMember.id.in_(request.course_member_ids))
+
+    task_executor = get_task_executor()
+    task_submission = TaskSubmission(
+        task_name="CourseStudentRepositoriesWorkflow",
+        parameters={
+            'course_id': course_id,
+            'course_member_ids': request.course_member_ids,
+        },
+        queue="computor-tasks"
+    )
+    workflow_id = await task_executor.submit_task(task_submission)
+
+    return ProvisionStudentRepositoriesResponse(
+        workflow_id=workflow_id,
+        status="started",
+        members_to_process=members_q.scalar() or 0
+    )
+
 # @system_router.post(
 #     "/courses/{course_id}/assign-examples",
 #     response_model=Dict[str, Any]
@@ -2,6 +2,7 @@
 FastAPI endpoints for task management.
 """
 
+from datetime import datetime
 from fastapi import APIRouter, HTTPException, BackgroundTasks, Query
 from typing import Dict, List, Any, Optional
 
@@ -19,33 +20,58 @@ tasks_router = APIRouter(prefix="/tasks", tags=["tasks"])
 @tasks_router.get("", response_model=Dict[str, Any])
 async def list_tasks(
     limit: int = Query(100, ge=1, le=1000, description="Maximum number of tasks to return"),
-    offset: int = Query(0, ge=0, description="Number of tasks to skip"),
-    status: Optional[str] = Query(None, description="Filter by task status (PENDING, STARTED, SUCCESS, FAILURE, RETRY, REVOKED)")
+    offset: int = Query(0, ge=0, description="Number of tasks to skip, ignored with page_token"),
+    status: Optional[str] = Query(None, description="Filter by task status (PENDING, STARTED, SUCCESS, FAILURE, RETRY, REVOKED)"),
+    task_name: Optional[str] = Query(None, description="Filter by task type"),
+    started_after: Optional[datetime] = Query(None, description="Only tasks started at or after this time"),
+    started_before: Optional[datetime] = Query(None, description="Only tasks started before this time"),
+    page_token: Optional[str] = Query(None, description="next_page_token of the previous page")
 ):
     """
     List tasks with optional filtering and pagination.
     
+    Filters are evaluated by Temporal. Follow next_page_token to page through
+    the results; deep offsets are slow.
+    
     Args:
         limit: Maximum number of tasks to return (1-1000)
         offset: Number of tasks to skip for pagination
         status: Optional status filter
+        task_name: Optional task type filter
+        started_after: Optional start time lower bound
+        started_before: Optional start time upper bound
+        page_token: Token of the page to return
         
     Returns:
         Dictionary containing:
         - tasks: List of task information
-        - total: Total number of tasks
+        - total: Total number of matching tasks, only on the first page
         - limit: Applied limit
         - offset: Applied offset
         - has_more: Whether more tasks are available
+        - next_page_token: Token of the next page
         
     Example:
-        GET /tasks?limit=10&offset=0&status=SUCCESS
+        GET /tasks?limit=10&status=SUCCESS&task_name=generate_student_template_v2
     """
     try:
         task_executor = get_task_executor()
-        result = await task_executor.list_tasks(limit=limit, offset=offset, status=status)
+        result = await task_executor.list_tasks(
+            limit=limit,
+            offset=offset,
+            status=status,
+            task_name=task_name,
+            started_after=started_after,
+            started_before=started_before,
+            page_token=page_token
+        )
         return result
     
+    except ValueError as e:
+        raise HTTPException(
+            status_code=400,
+            detail=str(e)
+        )
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -2,11 +2,11 @@ import json
 from uuid import UUID
 from typing import Annotated
 from pydantic import BaseModel
-from sqlalchemy import case
-from sqlalchemy.orm import Session
+from sqlalchemy import case, select
+from sqlalchemy.orm import Session, aliased
 from fastapi import APIRouter, Depends
 from aiocache import SimpleMemoryCache
-from ctutor_backend.database import get_db
+from ctutor_backend.database import get_db, get_read_db
 from ctutor_backend.interface.course_content_types import CourseContentTypeList
 from ctutor_backend.interface.course_member_comments import CourseMemberCommentList
 from ctutor_backend.interface.course_members import CourseMemberGet, CourseMemberInterface, CourseMemberProperties, CourseMemberQuery
@@ -65,7 +65,7 @@ def tutor_get_course_contents(course_content_id: UUID | str, course_member_id: U
     return course_member_course_content_result_mapper(course_contents_result, db, detailed=True)
 
 @tutor_router.get("/course-members/{course_member_id}/course-contents", response_model=list[CourseContentStudentList])
-def tutor_list_course_contents(course_member_id: UUID | str, permissions: Annotated[Principal, Depends(get_current_permissions)], params: CourseContentStudentQuery = Depends(), db: Session = Depends(get_db)):
+def tutor_list_course_contents(course_member_id: UUID | str, permissions: Annotated[Principal, Depends(get_current_permissions)], params: CourseContentStudentQuery = Depends(), db: Session = Depends(get_read_db)):
 
     if check_course_permissions(permissions,CourseMember,"_tutor",db).filter(CourseMember.id == course_member_id).first() == None:
         raise ForbiddenException()
@@ -181,7 +181,7 @@ async def tutor_get_courses(course_id: UUID | str, permissions: Annotated[Princi
             )
 
 @tutor_router.get("/courses", response_model=list[CourseTutorList])
-def tutor_list_courses(permissions: Annotated[Principal, Depends(get_current_permissions)], params: CourseStudentQuery = Depends(), db: Session = Depends(get_db)):
+def tutor_list_courses(permissions: Annotated[Principal, Depends(get_current_permissions)], params: CourseStudentQuery = Depends(), db: Session = Depends(get_read_db)):
 
     query = check_course_permissions(permissions,Course,"_tutor",db)
 
@@ -244,19 +244,19 @@ def tutor_get_course_members(course_member_id: UUID | str, permissions: Annotate
     return tutor_course_member
 
 @tutor_router.get("/course-members", response_model=list[TutorCourseMemberList])
-def tutor_list_course_members(permissions: Annotated[Principal, Depends(get_current_permissions)], params: CourseMemberQuery = Depends(), db: Session = Depends(get_db)):
+def tutor_list_course_members(permissions: Annotated[Principal, Depends(get_current_permissions)], params: CourseMemberQuery = Depends(), db: Session = Depends(get_read_db)):
 
-    subquery = db.query(Course.id).select_from(User).filter(User.id == permissions.get_user_id_or_throw()) \
-        .join(CourseMember, CourseMember.user_id == User.id) \
-            .join(Course, Course.id == CourseMember.course_id) \
-                .filter(CourseMember.course_role_id.in_((allowed_course_role_ids("_tutor")))).all()
+    course_ids = None
 
-    query = course_course_member_list_query(db)
+    if permissions.is_admin != True:
+        TutorMember = aliased(CourseMember)
+        course_ids = select(TutorMember.course_id) \
+            .where(TutorMember.user_id == permissions.get_user_id_or_throw()) \
+            .where(TutorMember.course_role_id.in_(allowed_course_role_ids("_tutor")))
 
-    query = CourseMemberInterface.search(db,query,params)
+    query = course_course_member_list_query(db, course_ids=course_ids, course_id=params.course_id)
 
-    if permissions.is_admin != True:
-        query = query.join(Course,Course.id == CourseMember.course_id).filter(Course.id.in_([r.id for r in subquery])).join(User,User.id == CourseMember.user_id).order_by(User.family_name).all()
+    query = CourseMemberInterface.search(db,query,params).all()
 
     response_list: list[TutorCourseMemberList] = []
 
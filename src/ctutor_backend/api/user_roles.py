@@ -7,6 +7,7 @@ from sqlalchemy import exc
 from ctutor_backend.api.exceptions import InternalServerException
 
 from ctutor_backend.api.crud import create_db, list_db
+from ctutor_backend.api.pagination import set_list_headers
 from ctutor_backend.api.exceptions import NotFoundException
 from ctutor_backend.permissions.auth import get_current_permissions
 from ctutor_backend.permissions.core import check_permissions
@@ -25,10 +26,10 @@ async def list_user_roles(
 ):
     """List user roles"""
     
-    list_result, total = await list_db(permissions, db, params, UserRoleInterface)
-    response.headers["X-Total-Count"] = str(total)
+    page = await list_db(permissions, db, params, UserRoleInterface)
+    set_list_headers(response, page)
 
-    return list_result
+    return page.items
 
 @user_roles_router.get("/users/{user_id}/roles/{role_id}", response_model=UserRoleGet)
 async def get_user_role(
@@ -33,7 +33,7 @@ def get_course_id_from_url(gitlab_url: str, db: Session):
 
     provider, full_path = url_to_provider_path(gitlab_url)
 
-    return db.query(Course.properties).filter(Course.properties["gitlab"].op("->>")("url") == provider,Course.properties["gitlab"].op("->>")("full_path") == full_path).scalar()
+    return db.query(Course.properties).filter(Course.gitlab_url == provider,Course.gitlab_full_path == full_path).scalar()
 
 def get_course_content_id_from_url_and_directory(release_dir: str, gitlab_url: str, db: Session):
 
@@ -41,7 +41,7 @@ def get_course_content_id_from_url_and_directory(release_dir: str, gitlab_url: s
 
     return db.query(CourseContent.id) \
         .join(Course,Course.id == CourseContent.course_id) \
-            .filter(Course.properties["gitlab"].op("->>")("url") == provider, Course.properties["gitlab"].op("->>")("full_path") == full_path, CourseContent.properties["gitlab"].op("->>")("directory") == release_dir).scalar()
+            .filter(Course.gitlab_url == provider, Course.gitlab_full_path == full_path, CourseContent.gitlab_directory == release_dir).scalar()
 
 def getattrtuple(o: object, names: tuple) -> tuple:
     attrs = []
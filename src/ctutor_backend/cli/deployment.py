@@ -28,6 +28,7 @@ from ..interface.deployments_refactored import (
     EXAMPLE_MULTI_DEPLOYMENT
 )
 from .auth import authenticate, get_crud_client, get_custom_client
+from .deployment_engine import DEFAULT_MAX_WORKERS, CourseContentLookups, DeploymentEngine, report_user_results
 from .config import CLIAuthConfig
 from ..client.crud_client import CustomClient
 from ..interface.users import UserCreate, UserInterface, UserQuery
@@ -140,246 +141,12 @@ def init(output: str, format: str):
     click.echo(f"3. Run: ctutor deployment apply {output_path}")
 
 
-def _deploy_users(config: ComputorDeploymentConfig, auth: CLIAuthConfig):
+def _deploy_users(config: ComputorDeploymentConfig, auth: CLIAuthConfig, workers: int = DEFAULT_MAX_WORKERS):
     """Deploy users and their course memberships from configuration."""
-    
-    # Get API clients
-    user_client = get_crud_client(auth, UserInterface)
-    account_client = get_crud_client(auth, AccountInterface)
-    course_client = get_crud_client(auth, CourseInterface)
-    course_member_client = get_crud_client(auth, CourseMemberInterface)
-    course_group_client = get_crud_client(auth, CourseGroupInterface)
-    org_client = get_crud_client(auth, OrganizationInterface)
-    family_client = get_crud_client(auth, CourseFamilyInterface)
-    
-    processed_users = []
-    failed_users = []
-    
-    for user_deployment in config.users:
-        user_dep = user_deployment.user
-        click.echo(f"\n👤 Processing: {user_dep.display_name} ({user_dep.username})")
-        
-        try:
-            # Check if user already exists by email or username
-            existing_users = []
-            if user_dep.email:
-                existing_users.extend(user_client.list(UserQuery(email=user_dep.email)))
-            
-            # Also check by username if not found by email
-            if not existing_users and user_dep.username:
-                existing_users.extend(user_client.list(UserQuery(username=user_dep.username)))
-            
-            if existing_users:
-                user = existing_users[0]
-                click.echo(f"  ℹ️  User already exists: {user.display_name}")
-            else:
-                # Create new user
-                user_create = UserCreate(
-                    given_name=user_dep.given_name,
-                    family_name=user_dep.family_name,
-                    email=user_dep.email,
-                    number=user_dep.number,
-                    username=user_dep.username,
-                    user_type=user_dep.user_type,
-                    properties=user_dep.properties
-                )
-                
-                user = user_client.create(user_create)
-                click.echo(f"  ✅ Created user: {user.display_name}")
-                
-            # Assign system roles if provided
-            if user_dep.roles:
-                role_client = get_crud_client(auth, RoleInterface)
-                user_role_client = get_crud_client(auth, UserRoleInterface)
-                
-                for role_id in user_dep.roles:
-                    try:
-                        # Check if role exists
-                        roles = role_client.list(RoleQuery(id=role_id))
-                        if not roles:
-                            click.echo(f"  ⚠️  Role not found: {role_id}")
-                            continue
-                        
-                        # Check if user already has this role
-                        existing_user_roles = user_role_client.list(UserRoleQuery(
-                            user_id=str(user.id),
-                            role_id=role_id
-                        ))
-                        
-                        if existing_user_roles:
-                            click.echo(f"  ℹ️  User already has role: {role_id}")
-                        else:
-                            # Assign role to user
-                            user_role_create = UserRoleCreate(
-                                user_id=str(user.id),
-                                role_id=role_id
-                            )
-                            user_role_client.create(user_role_create)
-                            click.echo(f"  ✅ Assigned role: {role_id}")
-                    except Exception as e:
-                        click.echo(f"  ⚠️  Failed to assign role {role_id}: {e}")
-                
-            # Set password if provided
-            if user_dep.password:
-                try:
-                    # Use get_custom_client to get the authenticated client
-                    client = get_custom_client(auth)
-                    
-                    password_payload = {
-                        "username": user_dep.username,
-                        "password": user_dep.password
-                    }
-                    client.create("/user/password", password_payload)
-                    click.echo(f"  ✅ Set password for user: {user.display_name}")
-                except Exception as e:
-                    click.echo(f"  ⚠️  Failed to set password: {e}")
-            
-            # Create accounts
-            for account_dep in user_deployment.accounts:
-                # Check if account already exists for this user
-                existing_accounts = account_client.list(AccountQuery(
-                    provider_account_id=account_dep.provider_account_id,
-                    user_id=str(user.id)
-                ))
-                
-                if existing_accounts:
-                    click.echo(f"  Account already exists: {account_dep.type} @ {account_dep.provider}")
-                else:
-                    # Create new account
-                    account_create = AccountCreate(
-                        provider=account_dep.provider,
-                        type=account_dep.type,
-                        provider_account_id=account_dep.provider_account_id,
-                        user_id=str(user.id),
-                        properties=account_dep.properties or {}
-                    )
-                    
-                    account_client.create(account_create)
-                    click.echo(f"  ✅ Created account: {account_dep.type} @ {account_dep.provider}")
-            
-            # Create course memberships
-            for cm_dep in user_deployment.course_members:
-                try:
-                    course = None
-                    
-                    # Resolve course by path or ID
-                    if cm_dep.is_path_based:
-                        # Find organization
-                        orgs = org_client.list(OrganizationQuery(path=cm_dep.organization))
-                        if not orgs:
-                            click.echo(f"  ⚠️  Organization not found: {cm_dep.organization}")
-                            continue
-                        org = orgs[0]
-                        
-                        # Find course family
-                        families = family_client.list(CourseFamilyQuery(
-                            organization_id=str(org.id),
-                            path=cm_dep.course_family
-                        ))
-                        if not families:
-                            click.echo(f"  ⚠️  Course family not found: {cm_dep.course_family}")
-                            continue
-                        family = families[0]
-                        
-                        # Find course
-                        courses = course_client.list(CourseQuery(
-                            course_family_id=str(family.id),
-                            path=cm_dep.course
-                        ))
-                        if not courses:
-                            click.echo(f"  ⚠️  Course not found: {cm_dep.course}")
-                            continue
-                        course = courses[0]
-                    
-                    elif cm_dep.is_id_based:
-                        # Direct course lookup by ID
-                        course = course_client.get(cm_dep.id)
-                        if not course:
-                            click.echo(f"  ⚠️  Course not found: {cm_dep.id}")
-                            continue
-                    
-                    if course:
-                        # Handle course group for students
-                        course_group_id = None
-                        if cm_dep.role == "_student" and cm_dep.group:
-                            # Find or create course group
-                            groups = course_group_client.list(CourseGroupQuery(
-                                course_id=str(course.id),
-                                title=cm_dep.group
-                            ))
-                            if groups:
-                                course_group_id = str(groups[0].id)
-                                click.echo(f"  Using existing group: {cm_dep.group}")
-                            else:
-                                # Create the course group
-                                try:
-                                    group_create = CourseGroupCreate(
-                                        title=cm_dep.group,
-                                        description=f"Course group {cm_dep.group}",
-                                        course_id=str(course.id)
-                                    )
-                                    new_group = course_group_client.create(group_create)
-                                    course_group_id = str(new_group.id)
-                                    click.echo(f"  ✅ Created course group: {cm_dep.group}")
-                                except Exception as e:
-                                    click.echo(f"  ⚠️  Failed to create course group {cm_dep.group}: {e}")
-                                    continue
-                        
-                        # Check if course member already exists
-                        existing_members = course_member_client.list(CourseMemberQuery(
-                            user_id=str(user.id),
-                            course_id=str(course.id)
-                        ))
-                        
-                        if existing_members:
-                            existing_member = existing_members[0]
-                            # Check if we need to update role or group
-                            needs_update = False
-                            if existing_member.course_role_id != cm_dep.role:
-                                click.echo(f"  Updating role from {existing_member.course_role_id} to {cm_dep.role}")
-                                needs_update = True
-                            if course_group_id and existing_member.course_group_id != course_group_id:
-                                click.echo(f"  Updating group assignment")
-                                needs_update = True
-                            
-                            if needs_update:
-                                # Update existing member
-                                member_update = {
-                                    'course_role_id': cm_dep.role,
-                                    'course_group_id': course_group_id
-                                }
-                                course_member_client.update(str(existing_member.id), member_update)
-                                click.echo(f"  ✅ Updated course membership: {course.path} as {cm_dep.role}")
-                            else:
-                                click.echo(f"  Already member of course: {course.path} as {cm_dep.role}")
-                        else:
-                            # Create new course member
-                            member_create = CourseMemberCreate(
-                                user_id=str(user.id),
-                                course_id=str(course.id),
-                                course_role_id=cm_dep.role,
-                                course_group_id=course_group_id
-                            )
-                            
-                            course_member_client.create(member_create)
-                            click.echo(f"  ✅ Added to course: {course.path} as {cm_dep.role}")
-                        
-                except Exception as e:
-                    click.echo(f"  ⚠️  Failed to add course membership: {e}")
-            
-            processed_users.append(user_dep)
-            
-        except Exception as e:
-            click.echo(f"  ❌ Failed to process user: {e}")
-            failed_users.append(user_dep)
-    
-    # Summary
-    click.echo(f"\n📊 User Deployment Summary:")
-    click.echo(f"  ✅ Successfully processed: {len(processed_users)} users")
-    if failed_users:
-        click.echo(f"  ❌ Failed: {len(failed_users)} users")
-        for user_dep in failed_users:
-            click.echo(f"    - {user_dep.display_name}")
+
+    engine = DeploymentEngine(auth, max_workers=workers)
+    results = engine.deploy_users(config)
+    report_user_results(results)
 
 
 def _deploy_execution_backends(config: ComputorDeploymentConfig, auth: CLIAuthConfig):
@@ -428,7 +195,7 @@ def _deploy_execution_backends(config: ComputorDeploymentConfig, auth: CLIAuthCo
             click.echo(f"    ❌ Failed to deploy backend {backend_config.slug}: {e}")
 
 
-def _deploy_course_contents(course_id: str, course_config: HierarchicalCourseConfig, auth: CLIAuthConfig, parent_path: str = None, position_counter: list = None):
+def _deploy_course_contents(course_id: str, course_config: HierarchicalCourseConfig, auth: CLIAuthConfig, parent_path: str = None, position_counter: list = None, lookups: CourseContentLookups = None):
     """Deploy course contents for a course."""
     
     if not course_config.contents:
@@ -445,6 +212,10 @@ def _deploy_course_contents(course_id: str, course_config: HierarchicalCourseCon
     example_client = get_crud_client(auth, ExampleInterface)
     backend_client = get_crud_client(auth, ExecutionBackendInterface)
     custom_client = get_custom_client(auth)
+
+    # Fetch content types, kinds and existing contents once per course
+    if lookups is None:
+        lookups = CourseContentLookups(course_id, content_client, content_type_client, content_kind_client, backend_client)
     
     for content_config in course_config.contents:
         try:
@@ -452,25 +223,14 @@ def _deploy_course_contents(course_id: str, course_config: HierarchicalCourseCon
             full_path = None
             
             # Find the content type
-            content_types = content_type_client.list(CourseContentTypeQuery(
-                course_id=course_id,
-                slug=content_config.content_type
-            ))
+            content_type = lookups.content_types.get(content_config.content_type)
             
-            if not content_types:
+            if content_type is None:
                 click.echo(f"    ⚠️  Content type not found: {content_config.content_type}")
                 continue
             
-            content_type = content_types[0]
-            
             # Determine if submittable by content kind (needed to fetch example metadata)
-            is_submittable = False
-            if content_type.course_content_kind_id:
-                content_kinds = content_kind_client.list(CourseContentKindQuery(
-                    id=content_type.course_content_kind_id
-                ))
-                if content_kinds and len(content_kinds) > 0:
-                    is_submittable = content_kinds[0].submittable
+            is_submittable = lookups.is_submittable(content_type)
             
             # Prefetch example/version to derive defaults when missing
             example = None
@@ -537,8 +297,7 @@ def _deploy_course_contents(course_id: str, course_config: HierarchicalCourseCon
                 candidate = f"{parent_path}.{seg}" if parent_path else seg
                 idx = 1
                 while True:
-                    existing = content_client.list(CourseContentQuery(course_id=course_id, path=candidate))
-                    if not existing:
+                    if candidate not in lookups.contents:
                         full_path = candidate
                         break
                     idx += 1
@@ -553,13 +312,9 @@ def _deploy_course_contents(course_id: str, course_config: HierarchicalCourseCon
                     return seg
 
             # Check if content already exists
-            existing_contents = content_client.list(CourseContentQuery(
-                course_id=course_id,
-                path=full_path
-            ))
+            content = lookups.contents.get(full_path)
             
-            if existing_contents:
-                content = existing_contents[0]
+            if content is not None:
                 click.echo(f"    ℹ️  Content already exists: {content.title} ({full_path})")
                 # Only update description if explicitly provided in deployment, otherwise if empty use meta_yaml.description
                 to_update = {}
@@ -591,9 +346,7 @@ def _deploy_course_contents(course_id: str, course_config: HierarchicalCourseCon
                 # Determine execution backend ID
                 execution_backend_id = None
                 if content_config.execution_backend:
-                    backends = backend_client.list(ExecutionBackendQuery(slug=content_config.execution_backend))
-                    if backends:
-                        execution_backend_id = str(backends[0].id)
+                    execution_backend_id = lookups.execution_backend_id(content_config.execution_backend)
                 
                 # Derive title/description defaults: description only from meta_yaml when not given
                 fallback_seg = None
@@ -620,6 +373,7 @@ def _deploy_course_contents(course_id: str, course_config: HierarchicalCourseCon
                 )
                 
                 content = content_client.create(content_create)
+                lookups.contents[full_path] = content
                 click.echo(f"    ✅ Created content: {effective_title} ({full_path})")
             
             # Handle example deployment for submittable content
@@ -717,7 +471,7 @@ def _deploy_course_contents(course_id: str, course_config: HierarchicalCourseCon
             if content_config.contents:
                 # Create a temporary course config with just the nested contents
                 nested_config = type('obj', (object,), {'contents': content_config.contents})()
-                _deploy_course_contents(course_id, nested_config, auth, full_path, position_counter)
+                _deploy_course_contents(course_id, nested_config, auth, full_path, position_counter, lookups)
                 
         except Exception as e:
             click.echo(f"    ❌ Failed to create content {content_config.title}: {e}")
@@ -1154,8 +908,15 @@ def _upload_examples_from_directory(examples_dir: Path, repo_name: str, auth: CL
     default=False,
     help='Generate GitLab student template repositories after creating course contents'
 )
+@click.option(
+    '--workers',
+    type=int,
+    default=DEFAULT_MAX_WORKERS,
+    show_default=True,
+    help='Number of concurrent API requests used when deploying users'
+)
 @authenticate
-def apply(config_file: str, dry_run: bool, wait: bool, generate_student_template: bool, auth: CLIAuthConfig):
+def apply(config_file: str, dry_run: bool, wait: bool, generate_student_template: bool, workers: int, auth: CLIAuthConfig):
     """
     Apply a deployment configuration to create the hierarchy.
     
@@ -1293,7 +1054,7 @@ def apply(config_file: str, dry_run: bool, wait: bool, generate_student_template
                             # Deploy users if configured
                             if config.users:
                                 click.echo(f"\n📥 Creating {len(config.users)} users...")
-                                _deploy_users(config, auth)
+                                _deploy_users(config, auth, workers)
                             break
                         elif status_data.get('status') == 'failed':
                             click.echo(f"\n❌ Deployment failed: {status_data.get('error')}", err=True)
@@ -1313,7 +1074,7 @@ def apply(config_file: str, dry_run: bool, wait: bool, generate_student_template
                 
                 if config.users:
                     click.echo(f"\n📥 Creating {len(config.users)} users (hierarchy might still be deploying)...")
-                    _deploy_users(config, auth)
+                    _deploy_users(config, auth, workers)
         else:
             click.echo("❌ Failed to start deployment", err=True)
             sys.exit(1)
@@ -0,0 +1,523 @@
+"""
+Concurrent bulk deployment engine used by ``ctutor deployment apply``.
+
+Instead of walking the deployment config one user at a time and looking up
+every referenced entity with its own request, the engine works in phases:
+
+1. resolve every referenced course (organization -> family -> course) once
+2. prefetch existing course members and course groups per course in bulk
+3. create missing course groups once per (course, group)
+4. prefetch the existing users, accounts and role assignments of the config,
+   listed through the ``filter`` parameter in chunks of config identities
+5. diff the config against the prefetched state and write only the changes:
+   users, accounts and memberships through the ``/bulk`` upsert routes,
+   role assignments and passwords one request each
+
+All requests go through the shared, pooled API clients; independent
+requests are spread over a bounded thread pool.
+"""
+
+import json
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import click
+from alive_progress import alive_bar
+from pydantic import BaseModel
+
+from .auth import get_crud_client, get_custom_client
+from .config import CLIAuthConfig
+from ..interface.deployments_refactored import (
+    ComputorDeploymentConfig,
+    CourseMemberDeployment,
+    UserAccountDeployment,
+)
+from ..interface.base import BulkUpsertRowResult, BulkUpsertStatus
+from ..interface.users import UserCreate, UserInterface, UserQuery
+from ..interface.accounts import AccountCreate, AccountInterface, AccountQuery
+from ..interface.courses import CourseInterface, CourseQuery
+from ..interface.course_members import CourseMemberCreate, CourseMemberInterface, CourseMemberQuery
+from ..interface.course_groups import CourseGroupCreate, CourseGroupInterface, CourseGroupQuery
+from ..interface.organizations import OrganizationInterface, OrganizationQuery
+from ..interface.course_families import CourseFamilyInterface, CourseFamilyQuery
+from ..interface.roles import RoleInterface, RoleQuery
+from ..interface.user_roles import UserRoleCreate, UserRoleInterface, UserRoleQuery
+
+DEFAULT_MAX_WORKERS = 8
+BULK_CHUNK_SIZE = 500
+# Values per filter of a prefetch listing, keeps the query string short
+PREFETCH_CHUNK_SIZE = 100
+
+UPSERTED = (BulkUpsertStatus.created, BulkUpsertStatus.updated)
+
+CourseKey = Tuple[str, ...]
+
+
+def _chunks(items: list, size: int) -> List[list]:
+    return [items[start:start + size] for start in range(0, len(items), size)]
+
+
+def progress_steps(user_deployment: UserAccountDeployment) -> int:
+    """Progress bar steps of a user: the user, its roles, password, accounts and memberships."""
+    return (
+        1
+        + len(user_deployment.user.roles or [])
+        + int(bool(user_deployment.user.password))
+        + len(user_deployment.accounts)
+        + len(user_deployment.course_members)
+    )
+
+
+def course_key(cm_dep: CourseMemberDeployment) -> Optional[CourseKey]:
+    """Key identifying the course a membership refers to."""
+    if cm_dep.is_path_based:
+        return ("path", cm_dep.organization, cm_dep.course_family, cm_dep.course)
+    if cm_dep.is_id_based:
+        return ("id", cm_dep.id)
+    return None
+
+
+@dataclass
+class UserDeploymentResult:
+    user_deployment: UserAccountDeployment
+    messages: List[str] = field(default_factory=list)
+    error: Optional[str] = None
+    user_id: Optional[str] = None
+
+
+class DeploymentEngine:
+    """Resolves, diffs and applies the user section of a deployment config."""
+
+    def __init__(self, auth: CLIAuthConfig, max_workers: int = DEFAULT_MAX_WORKERS):
+        self.auth = auth
+        self.max_workers = max(1, max_workers)
+
+        self.user_client = get_crud_client(auth, UserInterface)
+        self.account_client = get_crud_client(auth, AccountInterface)
+        self.course_client = get_crud_client(auth, CourseInterface)
+        self.course_member_client = get_crud_client(auth, CourseMemberInterface)
+        self.course_group_client = get_crud_client(auth, CourseGroupInterface)
+        self.org_client = get_crud_client(auth, OrganizationInterface)
+        self.family_client = get_crud_client(auth, CourseFamilyInterface)
+        self.role_client = get_crud_client(auth, RoleInterface)
+        self.user_role_client = get_crud_client(auth, UserRoleInterface)
+        self.custom_client = get_custom_client(auth)
+
+        self.courses: Dict[CourseKey, Any] = {}
+        self.course_errors: Dict[CourseKey, str] = {}
+        self.members: Dict[Tuple[str, str], Any] = {}
+        self.groups: Dict[Tuple[str, str], str] = {}
+        self.group_errors: Dict[Tuple[str, str], str] = {}
+        self.roles: Optional[set] = None
+        self.users_by_email: Dict[str, str] = {}
+        self.users_by_username: Dict[str, str] = {}
+        self.accounts: Dict[Tuple[str, str, str], str] = {}
+        self.user_roles: set = set()
+
+        # Advances the progress bar of deploy_users
+        self._advance: Callable[[int], Any] = lambda count=1: None
+
+    def _map(self, func: Callable, items: Iterable, steps: Optional[Callable[[Any], int]] = None) -> list:
+        """``func`` over ``items`` on the thread pool, advancing the progress bar by ``steps(result)`` per result."""
+        items = list(items)
+        if not items:
+            return []
+        results = []
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            for result in pool.map(func, items):
+                results.append(result)
+                if steps is not None:
+                    self._advance(steps(result))
+        return results
+
+    def _list_filtered(self, client, query_type, filters: List[dict]) -> list:
+        """Every entity matching any of ``filters``, one listing per filter."""
+        listings = self._map(lambda filter: client.list_all(query_type(filter=json.dumps(filter))), filters)
+        return [entity for entities in listings for entity in entities]
+
+    # Phase 1: resolve the course hierarchy once
+
+    def resolve_courses(self, user_deployments: List[UserAccountDeployment]):
+        keys = {
+            key
+            for user_deployment in user_deployments
+            for cm_dep in user_deployment.course_members
+            if (key := course_key(cm_dep)) is not None
+        }
+
+        org_paths = {key[1] for key in keys if key[0] == "path"}
+        orgs = dict(zip(org_paths, self._map(
+            lambda path: next(iter(self.org_client.list(OrganizationQuery(path=path))), None),
+            org_paths
+        )))
+
+        family_keys = {(key[1], key[2]) for key in keys if key[0] == "path" and orgs.get(key[1])}
+        families = dict(zip(family_keys, self._map(
+            lambda fk: next(iter(self.family_client.list(CourseFamilyQuery(
+                organization_id=str(orgs[fk[0]].id), path=fk[1]
+            ))), None),
+            family_keys
+        )))
+
+        def resolve(key: CourseKey):
+            try:
+                if key[0] == "id":
+                    return key, self.course_client.get(key[1]), None
+                org = orgs.get(key[1])
+                if org is None:
+                    return key, None, f"Organization not found: {key[1]}"
+                family = families.get((key[1], key[2]))
+                if family is None:
+                    return key, None, f"Course family not found: {key[2]}"
+                course = next(iter(self.course_client.list(CourseQuery(
+                    course_family_id=str(family.id), path=key[3]
+                ))), None)
+                return key, course, None if course else f"Course not found: {key[3]}"
+            except Exception as e:
+                return key, None, f"Course not found: {key[-1]} ({e})"
+
+        for key, course, error in self._map(resolve, keys):
+            if course is not None:
+                self.courses[key] = course
+            else:
+                self.course_errors[key] = error
+
+    # Phase 2: prefetch server state per course
+
+    def prefetch_course_state(self):
+        course_ids = {str(course.id) for course in self.courses.values()}
+
+        def fetch(course_id: str):
+            members = self.course_member_client.list_all(CourseMemberQuery(course_id=course_id))
+            groups = self.course_group_client.list_all(CourseGroupQuery(course_id=course_id))
+            return course_id, members, groups
+
+        for course_id, members, groups in self._map(fetch, course_ids):
+            for member in members:
+                self.members[(course_id, str(member.user_id))] = member
+            for group in groups:
+                self.groups[(course_id, group.title)] = str(group.id)
+
+    def prefetch_roles(self, user_deployments: List[UserAccountDeployment]):
+        if any(ud.user.roles for ud in user_deployments):
+            self.roles = {str(role.id) for role in self.role_client.list_all(RoleQuery())}
+
+    # Phase 3: create missing course groups once
+
+    def ensure_groups(self, user_deployments: List[UserAccountDeployment]):
+        missing = set()
+        for user_deployment in user_deployments:
+            for cm_dep in user_deployment.course_members:
+                course = self.courses.get(course_key(cm_dep))
+                if course is None or cm_dep.role != "_student" or not cm_dep.group:
+                    continue
+                if (str(course.id), cm_dep.group) not in self.groups:
+                    missing.add((str(course.id), cm_dep.group))
+
+        def create(group_key: Tuple[str, str]):
+            course_id, title = group_key
+            try:
+                group = self.course_group_client.create(CourseGroupCreate(
+                    title=title,
+                    description=f"Course group {title}",
+                    course_id=course_id
+                ))
+                return group_key, str(group.id), None
+            except Exception as e:
+                return group_key, None, str(e)
+
+        for group_key, group_id, error in self._map(create, missing):
+            if group_id is not None:
+                self.groups[group_key] = group_id
+            else:
+                self.group_errors[group_key] = error
+
+    # Phase 4: prefetch the users, accounts and role assignments of the config
+
+    def prefetch_users(self, user_deployments: List[UserAccountDeployment]):
+        user_filters = []
+        for chunk in _chunks(user_deployments, PREFETCH_CHUNK_SIZE):
+            emails = sorted({ud.user.email for ud in chunk if ud.user.email})
+            usernames = sorted({ud.user.username for ud in chunk if ud.user.username})
+            identities = [{field: {"in": values}} for field, values in (("email", emails), ("username", usernames)) if values]
+            if identities:
+                user_filters.append({"or": identities})
+
+        for user in self._list_filtered(self.user_client, UserQuery, user_filters):
+            if user.email:
+                self.users_by_email[user.email] = str(user.id)
+            if user.username:
+                self.users_by_username[user.username] = str(user.id)
+
+        # Accounts are matched by their id at the provider, so accounts of users
+        # outside of the config are found as well
+        provider_account_ids = sorted({account.provider_account_id for ud in user_deployments for account in ud.accounts})
+        for account in self._list_filtered(self.account_client, AccountQuery, [
+            {"provider_account_id": {"in": chunk}} for chunk in _chunks(provider_account_ids, PREFETCH_CHUNK_SIZE)
+        ]):
+            self.accounts[(account.provider, account.type, account.provider_account_id)] = str(account.user_id)
+
+        if any(ud.user.roles for ud in user_deployments):
+            user_ids = sorted({*self.users_by_email.values(), *self.users_by_username.values()})
+            self.user_roles = {
+                (str(user_role.user_id), str(user_role.role_id))
+                for user_role in self._list_filtered(self.user_role_client, UserRoleQuery, [
+                    {"user_id": {"in": chunk}} for chunk in _chunks(user_ids, PREFETCH_CHUNK_SIZE)
+                ])
+            }
+
+    def _bulk_upsert(self, client, rows: List[Tuple[Any, BaseModel]]) -> List[Tuple[Any, BulkUpsertRowResult]]:
+        """Write ``rows`` through the ``/bulk`` route of ``client``, ``BULK_CHUNK_SIZE`` rows per request."""
+        chunks = _chunks(rows, BULK_CHUNK_SIZE)
+
+        def send(chunk):
+            try:
+                results = {row.index: row for row in client.bulk_upsert([entity for _, entity in chunk]).results}
+            except Exception as e:
+                results = {}
+                error = str(e)
+            else:
+                error = "Row was not written"
+            return [
+                (owner, results.get(index) or BulkUpsertRowResult(index=index, status=BulkUpsertStatus.failed, detail=error))
+                for index, (owner, _) in enumerate(chunk)
+            ]
+
+        return [row for chunk_rows in self._map(send, chunks, len) for row in chunk_rows]
+
+    # Phase 5: create missing users, then their roles, accounts and memberships
+
+    def _existing_user(self, user_dep) -> Optional[str]:
+        if user_dep.email and user_dep.email in self.users_by_email:
+            return self.users_by_email[user_dep.email]
+        if user_dep.username and user_dep.username in self.users_by_username:
+            return self.users_by_username[user_dep.username]
+        return None
+
+    def apply_users(self, results: List[UserDeploymentResult]):
+        rows = []
+        for result in results:
+            user_dep = result.user_deployment.user
+            result.user_id = self._existing_user(user_dep)
+            if result.user_id is not None:
+                self._advance(1)
+            else:
+                rows.append((result, UserCreate(
+                    given_name=user_dep.given_name,
+                    family_name=user_dep.family_name,
+                    email=user_dep.email,
+                    number=user_dep.number,
+                    username=user_dep.username,
+                    user_type=user_dep.user_type,
+                    properties=user_dep.properties
+                )))
+
+        for result, row in self._bulk_upsert(self.user_client, rows):
+            if row.status in UPSERTED:
+                result.user_id = row.id
+                result.messages.append(f"✅ Created user: {result.user_deployment.user.display_name}")
+            else:
+                result.error = f"Failed to create user ({row.status.value}): {row.detail}"
+
+    def apply_roles(self, results: List[UserDeploymentResult]):
+        assignments = []
+        for result in results:
+            for role_id in result.user_deployment.user.roles or []:
+                if self.roles is not None and role_id not in self.roles:
+                    result.messages.append(f"⚠️  Role not found: {role_id}")
+                elif (result.user_id, role_id) not in self.user_roles:
+                    assignments.append((result, role_id))
+                    continue
+                self._advance(1)
+
+        def assign(assignment):
+            result, role_id = assignment
+            try:
+                self.user_role_client.create(UserRoleCreate(user_id=result.user_id, role_id=role_id))
+                return result, f"✅ Assigned role: {role_id}"
+            except Exception as e:
+                return result, f"⚠️  Failed to assign role {role_id}: {e}"
+
+        for result, message in self._map(assign, assignments, lambda _: 1):
+            result.messages.append(message)
+
+    def apply_passwords(self, results: List[UserDeploymentResult]):
+        def set_password(result: UserDeploymentResult):
+            user_dep = result.user_deployment.user
+            try:
+                self.custom_client.create("/user/password", {
+                    "username": user_dep.username,
+                    "password": user_dep.password
+                })
+                return result, None
+            except Exception as e:
+                return result, f"⚠️  Failed to set password: {e}"
+
+        for result, message in self._map(set_password, [result for result in results if result.user_deployment.user.password], lambda _: 1):
+            if message is not None:
+                result.messages.append(message)
+
+    def apply_accounts(self, results: List[UserDeploymentResult]):
+        rows = []
+        for result in results:
+            for account_dep in result.user_deployment.accounts:
+                owner = self.accounts.get((account_dep.provider, account_dep.type, account_dep.provider_account_id))
+                if owner is not None:
+                    if owner != result.user_id:
+                        result.messages.append(f"⚠️  Account {account_dep.type} @ {account_dep.provider} belongs to another user")
+                    self._advance(1)
+                    continue
+                rows.append(((result, account_dep), AccountCreate(
+                    provider=account_dep.provider,
+                    type=account_dep.type,
+                    provider_account_id=account_dep.provider_account_id,
+                    user_id=result.user_id,
+                    properties=account_dep.properties or {}
+                )))
+
+        for (result, account_dep), row in self._bulk_upsert(self.account_client, rows):
+            if row.status in UPSERTED:
+                result.messages.append(f"✅ Created account: {account_dep.type} @ {account_dep.provider}")
+            else:
+                result.messages.append(f"⚠️  Failed to create account {account_dep.type} @ {account_dep.provider}: {row.detail}")
+
+    def _membership_row(self, user_id: str, cm_dep: CourseMemberDeployment, log: Callable[[str], None]) -> Optional[Tuple[Any, CourseMemberCreate]]:
+        """The course and the row creating or updating the membership, None when there is nothing to write."""
+        key = course_key(cm_dep)
+        course = self.courses.get(key)
+        if course is None:
+            log(f"⚠️  {self.course_errors.get(key, 'Course not found')}")
+            return None
+        course_id = str(course.id)
+
+        course_group_id = None
+        if cm_dep.role == "_student" and cm_dep.group:
+            course_group_id = self.groups.get((course_id, cm_dep.group))
+            if course_group_id is None:
+                log(f"⚠️  Failed to create course group {cm_dep.group}: {self.group_errors.get((course_id, cm_dep.group))}")
+                return None
+
+        existing = self.members.get((course_id, user_id))
+        if existing is not None and existing.course_role_id == cm_dep.role and not (course_group_id and existing.course_group_id != course_group_id):
+            return None
+
+        return course, CourseMemberCreate(
+            user_id=user_id,
+            course_id=course_id,
+            course_role_id=cm_dep.role,
+            course_group_id=course_group_id
+        )
+
+    def apply_memberships(self, results: List[UserDeploymentResult]):
+        rows = []
+        for result in results:
+            for cm_dep in result.user_deployment.course_members:
+                membership = self._membership_row(result.user_id, cm_dep, result.messages.append)
+                if membership is None:
+                    self._advance(1)
+                    continue
+                course, row = membership
+                rows.append(((result, course, cm_dep), row))
+
+        for (result, course, cm_dep), row in self._bulk_upsert(self.course_member_client, rows):
+            if row.status == BulkUpsertStatus.created:
+                result.messages.append(f"✅ Added to course: {course.path} as {cm_dep.role}")
+            elif row.status == BulkUpsertStatus.updated:
+                result.messages.append(f"✅ Updated course membership: {course.path} as {cm_dep.role}")
+            else:
+                result.messages.append(f"⚠️  Failed to add course membership: {row.detail}")
+
+    def deploy_users(self, config: ComputorDeploymentConfig) -> List[UserDeploymentResult]:
+        user_deployments = list(config.users)
+        if not user_deployments:
+            return []
+
+        click.echo(f"  Resolving courses and prefetching server state ({self.max_workers} workers)...")
+        self.resolve_courses(user_deployments)
+        self.prefetch_course_state()
+        self.prefetch_roles(user_deployments)
+        self.ensure_groups(user_deployments)
+        self.prefetch_users(user_deployments)
+
+        results = [UserDeploymentResult(user_deployment=user_deployment) for user_deployment in user_deployments]
+
+        with alive_bar(sum(progress_steps(ud) for ud in user_deployments), title="Users", spinner='twirls') as bar:
+            self._advance = bar
+            try:
+                self.apply_users(results)
+                deployed = [result for result in results if result.error is None]
+                # Users that were not created skip their remaining steps
+                bar(sum(progress_steps(result.user_deployment) - 1 for result in results if result.error is not None))
+                self.apply_roles(deployed)
+                self.apply_passwords(deployed)
+                self.apply_accounts(deployed)
+                self.apply_memberships(deployed)
+            finally:
+                self._advance = lambda count=1: None
+
+        return results
+
+
+def report_user_results(results: List[UserDeploymentResult]):
+    """Print per-user messages and a deployment summary."""
+    failed = [result for result in results if result.error is not None]
+
+    for result in results:
+        if not result.messages and result.error is None:
+            continue
+        user_dep = result.user_deployment.user
+        click.echo(f"\n👤 {user_dep.display_name} ({user_dep.username})")
+        for message in result.messages:
+            click.echo(f"  {message}")
+        if result.error is not None:
+            click.echo(f"  ❌ Failed to process user: {result.error}")
+
+    click.echo(f"\n📊 User Deployment Summary:")
+    click.echo(f"  ✅ Successfully processed: {len(results) - len(failed)} users")
+    if failed:
+        click.echo(f"  ❌ Failed: {len(failed)} users")
+        for result in failed:
+            click.echo(f"    - {result.user_deployment.user.display_name}")
+
+
+class CourseContentLookups:
+    """
+    Per-course lookup tables for course content deployment.
+
+    Content types, content kinds, execution backends and existing contents
+    are fetched once per course instead of once per content entry.
+    """
+
+    def __init__(self, course_id: str, content_client, content_type_client, content_kind_client, backend_client):
+        from ..interface.course_contents import CourseContentQuery
+        from ..interface.course_content_types import CourseContentTypeQuery
+        from ..interface.course_content_kind import CourseContentKindQuery
+
+        self.backend_client = backend_client
+
+        self.content_types = {
+            content_type.slug: content_type
+            for content_type in content_type_client.list_all(CourseContentTypeQuery(course_id=course_id))
+        }
+        self.content_kinds = {
+            str(kind.id): kind
+            for kind in content_kind_client.list_all(CourseContentKindQuery())
+        }
+        self.contents = {
+            str(content.path): content
+            for content in content_client.list_all(CourseContentQuery(course_id=course_id))
+        }
+        self._backends: Dict[str, Optional[str]] = {}
+
+    def is_submittable(self, content_type) -> bool:
+        kind = self.content_kinds.get(str(content_type.course_content_kind_id)) if content_type.course_content_kind_id else None
+        return bool(kind and kind.submittable)
+
+    def execution_backend_id(self, slug: str) -> Optional[str]:
+        from ..interface.execution_backends import ExecutionBackendQuery
+
+        if slug not in self._backends:
+            backends = self.backend_client.list(ExecutionBackendQuery(slug=slug))
+            self._backends[slug] = str(backends[0].id) if backends else None
+        return self._backends[slug]
@@ -6,11 +6,8 @@ import click
 import asyncio
 from typing import Optional, List
 
-from ctutor_backend.tasks.temporal_worker import run_worker
-from ctutor_backend.tasks.temporal_client import (
-    get_temporal_client,
-    DEFAULT_TASK_QUEUE
-)
+from ctutor_backend.tasks.temporal_worker import run_worker, worker_profiles, PROFILE_NAMES
+from ctutor_backend.tasks.temporal_client import get_temporal_client
 
 
 @click.group()
@@ -21,13 +18,17 @@ def worker():
 
 @worker.command()
 @click.option('--queues', default=None, help='Comma-separated list of queue names')
-def start(queues: str):
+@click.option('--profiles', default=None,
+              help=f"Comma-separated list of worker profiles ({', '.join(PROFILE_NAMES)})")
+def start(queues: str, profiles: str):
     """
     Start a Temporal worker to process workflows.
     
     Examples:
         ctutor worker start
         ctutor worker start --queues=computor-tasks
+        ctutor worker start --profiles=testing
+        ctutor worker start --profiles=gitlab,generation
     """
     click.echo("Starting Temporal worker...")
     
@@ -36,16 +37,26 @@ def start(queues: str):
     if queues:
         queue_list = [q.strip() for q in queues.split(',')]
     
+    profile_list = None
+    if profiles:
+        profile_list = [p.strip() for p in profiles.split(',')]
+        unknown = [p for p in profile_list if p not in PROFILE_NAMES]
+        if unknown:
+            raise click.BadParameter(
+                f"Unknown profile(s): {', '.join(unknown)}. Choose from {', '.join(PROFILE_NAMES)}",
+                param_hint='--profiles'
+            )
+        click.echo(f"Worker profiles: {', '.join(profile_list)}")
+    
     if queue_list:
         click.echo(f"Processing queues: {', '.join(queue_list)}")
     else:
-        # Default to processing default queue
-        queue_list = [DEFAULT_TASK_QUEUE]
-        click.echo(f"Processing queue: {DEFAULT_TASK_QUEUE}")
+        # Default to the queues of the profiles
+        click.echo("Processing the task queues of the worker profiles")
     
     try:
         # Run the worker
-        asyncio.run(run_worker(queue_list))
+        asyncio.run(run_worker(queue_list, profile_list))
     except KeyboardInterrupt:
         click.echo("\nWorker stopped by user")
     except Exception as e:
@@ -68,9 +79,10 @@ def status():
             click.echo(f"  Server: {client.service_client.target_host}")
             click.echo(f"  Namespace: {client.namespace}")
             
-            # Show task queue
-            click.echo("\nTask Queue:")
-            click.echo(f"  - {DEFAULT_TASK_QUEUE}")
+            # Show task queues
+            click.echo("\nTask Queues:")
+            for profile in worker_profiles().values():
+                click.echo(f"  - {profile.task_queue} ({profile.name})")
             
             click.echo("\nNote: Use Temporal Web UI at http://localhost:8088 for detailed worker and workflow status")
             
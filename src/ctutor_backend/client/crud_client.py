@@ -1,82 +1,184 @@
 import json
 import random
 import base64
+import asyncio
 from abc import ABC
-from typing import Any
+from typing import Any, List
 from uuid import UUID
-from httpx import Client, Headers, Response
+from httpx import AsyncClient, Client, Headers, Response
 from pydantic import BaseModel
 from ctutor_backend.api.exceptions import response_to_http_exception
-from ctutor_backend.interface.base import EntityInterface, ListQuery
+from ctutor_backend.client.transport import get_async_client, get_sync_client, next_cursor, total_count
+from ctutor_backend.interface.base import BulkUpsertResponse, EntityInterface, ListQuery
+
+PAGE_SIZE = 500
 
 def raise_if_response_is_error(response: Response):
     if response.is_error:
         response_exception = response_to_http_exception(response.status_code,response.json())
         raise response_exception if response_exception != None else response.raise_for_status()
 
+def _query_params(params: ListQuery | dict | None) -> dict | None:
+    if isinstance(params,ListQuery):
+        return params.model_dump(exclude_unset=True)
+    return params
+
+def _next_page(fetched: int, page_length: int, page_size: int, total: int | None) -> bool:
+    if page_length == 0:
+        return False
+    if total != None:
+        return fetched < total
+    return page_length >= page_size
+
 class BaseClient(ABC):
-    pass
+    """
+    Common transport handling of the API clients.
 
-class CrudClient(BaseClient):
+    Connections come from the pools in ``client.transport``, shared by all
+    clients talking to the same ``url_base``. Credentials and headers are
+    kept per client and sent with every request.
+    """
 
-    def __init__(self, url_base: str, entity_interface: EntityInterface, auth: tuple[str,str] = None, headers: Headers = {}, glp_auth_header: dict = None):
+    def __init__(self, url_base: str, auth: tuple[str,str] = None, headers: Headers = {}, glp_auth_header: dict = None):
         self.url_base = url_base
-        self.url = entity_interface.endpoint
         self.auth = auth
-        self.client = Client(base_url=self.url_base, auth=auth,timeout=10)
-        self.entity_interface = entity_interface
-
-        self.client.headers = headers
+        self.headers = dict(headers)
 
         if glp_auth_header != None:
             crypt = base64.b64encode(bytes(json.dumps(glp_auth_header),encoding="utf-8"))
-            self.client.headers.update({"GLP-CREDS": str(crypt,"utf-8") })
+            self.headers.update({"GLP-CREDS": str(crypt,"utf-8") })
+
+    @property
+    def client(self) -> Client:
+        return get_sync_client(self.url_base)
+
+    @property
+    def async_client(self) -> AsyncClient:
+        return get_async_client(self.url_base)
+
+    def _request(self, method: str, url: str, **kwargs) -> Response:
+        return self.client.request(method, url, auth=self.auth, headers=self.headers, **kwargs)
+
+    async def _arequest(self, method: str, url: str, **kwargs) -> Response:
+        return await self.async_client.request(method, url, auth=self.auth, headers=self.headers, **kwargs)
+
+    def _paginate(self, url: str, params: dict | None, wrapper, page_size: int) -> list:
+        params = {key: value for key, value in (params or {}).items() if key not in ("skip", "limit", "cursor")}
+
+        entities: list = []
+        paging = {"skip": 0}
+        while True:
+            response = self._request("GET", url, params={**params, **paging, "limit": page_size})
+            page = wrapper(response)
+            entities.extend(page)
+
+            # Follow keyset cursors once the server hands them out
+            cursor = next_cursor(response)
+            if cursor != None:
+                paging = {"cursor": cursor}
+                continue
+
+            if "cursor" in paging or not _next_page(len(entities), len(page), page_size, total_count(response)):
+                return entities
+            paging = {"skip": len(entities)}
+
+    async def _apaginate(self, url: str, params: dict | None, wrapper, page_size: int) -> list:
+        params = {key: value for key, value in (params or {}).items() if key not in ("skip", "limit", "cursor")}
+
+        response = await self._arequest("GET", url, params={**params, "skip": 0, "limit": page_size})
+        entities: list = wrapper(response)
+        total = total_count(response)
+
+        if total == None and next_cursor(response) != None:
+            # Keyset pages depend on each other and are walked in order
+            cursor = next_cursor(response)
+            while cursor != None:
+                response = await self._arequest("GET", url, params={**params, "cursor": cursor, "limit": page_size})
+                entities.extend(wrapper(response))
+                cursor = next_cursor(response)
+            return entities
 
-    def get(self, id: UUID | str) -> BaseModel:
-        try:
-            response = self.client.get(f"{self.url}/{id}")
+        if total == None:
+            # Without a total the pages can only be walked one after another
+            page = entities
+            while len(page) >= page_size:
+                response = await self._arequest("GET", url, params={**params, "skip": len(entities), "limit": page_size})
+                page = wrapper(response)
+                entities.extend(page)
+            return entities
 
-            raise_if_response_is_error(response)
+        if len(entities) == 0 or len(entities) >= total:
+            return entities
+
+        # The server may cap the page size, so step by what it actually returned
+        step = len(entities)
+
+        async def fetch(skip: int) -> list:
+            return wrapper(await self._arequest("GET", url, params={**params, "skip": skip, "limit": step}))
+
+        pages = await asyncio.gather(*(fetch(skip) for skip in range(step, total, step)))
+        for page in pages:
+            entities.extend(page)
+        return entities
+
+class CrudClient(BaseClient):
+
+    def __init__(self, url_base: str, entity_interface: EntityInterface, auth: tuple[str,str] = None, headers: Headers = {}, glp_auth_header: dict = None):
+        super().__init__(url_base, auth=auth, headers=headers, glp_auth_header=glp_auth_header)
+        self.url = entity_interface.endpoint
+        self.entity_interface = entity_interface
+
+    def _return_get(self, response: Response) -> BaseModel:
+        raise_if_response_is_error(response)
 
-        except Exception as e:
-            raise e
-            
         try:
             return self.entity_interface.get(**response.json())
         except Exception as e:
             raise Exception(response)
-        
-    def list(self, params: ListQuery | dict | None = None) -> list[BaseModel]:
-    
-        try:
-            if params != None:
-                if isinstance(params,ListQuery):
-                    params = params.model_dump(exclude_unset=True)
 
-        except Exception as e:
-            raise e
-        
-        try:
-            response = self.client.get(self.url, params=params)
+    def _return_list(self, response: Response) -> list[BaseModel]:
+        raise_if_response_is_error(response)
 
-            raise_if_response_is_error(response)
-        
+        try:
+            return [self.entity_interface.list(**entity_response) for entity_response in response.json()]
         except Exception as e:
-            raise e
+            raise Exception(response)
+
+    def _return_created(self, response: Response) -> BaseModel:
+        raise_if_response_is_error(response)
 
         try:
-            json_response = response.json()
-        
-            entities: list = []
+            return self.entity_interface.get(**response.json())
+        except Exception as e:
+            raise Exception(response.json())
 
-            for entity_response in json_response:
-                entity = self.entity_interface.list(**entity_response)
-                entities.append(entity)
-            
-            return entities
+    def _return_deleted(self, response: Response) -> Response:
+        raise_if_response_is_error(response)
+        return response
+
+    def _return_bulk(self, response: Response) -> BulkUpsertResponse:
+        raise_if_response_is_error(response)
+
+        try:
+            return BulkUpsertResponse(**response.json())
         except Exception as e:
             raise Exception(response)
-        
+
+    @staticmethod
+    def _bulk_rows(entities: List[BaseModel | dict]) -> list[dict]:
+        # Unset fields are left out, the upsert only overwrites the columns it is sent
+        return [entity.model_dump(exclude_unset=True) if isinstance(entity, BaseModel) else entity for entity in entities]
+
+    def get(self, id: UUID | str) -> BaseModel:
+        return self._return_get(self._request("GET", f"{self.url}/{id}"))
+
+    def list(self, params: ListQuery | dict | None = None) -> list[BaseModel]:
+        return self._return_list(self._request("GET", self.url, params=_query_params(params)))
+
+    def list_all(self, params: ListQuery | dict | None = None, page_size: int = PAGE_SIZE) -> List[BaseModel]:
+        """List every matching entity, following ``X-Total-Count`` across pages."""
+        return self._paginate(self.url, _query_params(params), self._return_list, page_size)
+
     def get_first_or_default(self, params: BaseModel | None = None, default: Any = None):
         entities = self.list(params)
         
@@ -98,50 +200,39 @@ class CrudClient(BaseClient):
             return default
         
     def create(self, entity: BaseModel):
-        
-        create_entity = entity.model_dump()
-        
-        try:
-            response = self.client.post(f"{self.url}",json=create_entity)
-
-            raise_if_response_is_error(response)
-                
-        except Exception as e:
-            raise e
-            
-        try:
-            return self.entity_interface.get(**response.json())
-        except Exception as e:
-            raise Exception(response.json())
+        return self._return_created(self._request("POST", f"{self.url}", json=entity.model_dump()))
         
     def update(self, id: UUID | str, entity: BaseModel):
-        
-        update_entity = entity.model_dump(exclude_unset=True)
-
-        try:
-            response = self.client.patch(f"{self.url}/{id}",json=update_entity)
-
-            raise_if_response_is_error(response)
-            
-        except Exception as e:
-            raise e
-            
-        try:
-            return self.entity_interface.get(**response.json())
-        except Exception as e:
-            raise Exception(response)
+        return self._return_get(self._request("PATCH", f"{self.url}/{id}", json=entity.model_dump(exclude_unset=True)))
     
     def delete(self, id: UUID | str):
-    
-        try:
-            response = self.client.delete(f"{self.url}/{id}")
+        return self._return_deleted(self._request("DELETE", f"{self.url}/{id}"))
 
-            raise_if_response_is_error(response)
-        
-        except Exception as e:
-            raise e
-            
-        return response
+    def bulk_upsert(self, entities: List[BaseModel | dict]) -> BulkUpsertResponse:
+        """Insert or update ``entities`` through the ``/bulk`` route, with a result per row."""
+        return self._return_bulk(self._request("POST", f"{self.url}/bulk", json=self._bulk_rows(entities)))
+
+    async def aget(self, id: UUID | str) -> BaseModel:
+        return self._return_get(await self._arequest("GET", f"{self.url}/{id}"))
+
+    async def alist(self, params: ListQuery | dict | None = None) -> List[BaseModel]:
+        return self._return_list(await self._arequest("GET", self.url, params=_query_params(params)))
+
+    async def alist_all(self, params: ListQuery | dict | None = None, page_size: int = PAGE_SIZE) -> List[BaseModel]:
+        """List every matching entity, fetching the remaining pages concurrently."""
+        return await self._apaginate(self.url, _query_params(params), self._return_list, page_size)
+
+    async def acreate(self, entity: BaseModel):
+        return self._return_created(await self._arequest("POST", f"{self.url}", json=entity.model_dump()))
+
+    async def aupdate(self, id: UUID | str, entity: BaseModel):
+        return self._return_get(await self._arequest("PATCH", f"{self.url}/{id}", json=entity.model_dump(exclude_unset=True)))
+
+    async def adelete(self, id: UUID | str):
+        return self._return_deleted(await self._arequest("DELETE", f"{self.url}/{id}"))
+
+    async def abulk_upsert(self, entities: List[BaseModel | dict]) -> BulkUpsertResponse:
+        return self._return_bulk(await self._arequest("POST", f"{self.url}/bulk", json=self._bulk_rows(entities)))
 
     # def filter(self, params: ListQuery | dict | None = None, filters: FilterSchema | dict | None = None):
 
@@ -185,24 +276,17 @@ class CrudClient(BaseClient):
     #     except Exception as e:
     #         raise Exception(response)
     
+
 class CustomClient(BaseClient):
 
     def __init__(self, url_base: str, auth: tuple[str,str] = None, headers: Headers = {}, glp_auth_header: dict = None):
-        self.url_base = url_base
-        self.auth = auth
-        self.client = Client(base_url=self.url_base, auth=auth, timeout=10)
-
-        self.client.headers = headers
-
-        if glp_auth_header != None:
-            crypt = base64.b64encode(bytes(json.dumps(glp_auth_header),encoding="utf-8"))
-            self.client.headers.update({"GLP-CREDS": str(crypt,"utf-8") })
+        super().__init__(url_base, auth=auth, headers=headers, glp_auth_header=glp_auth_header)
 
     def create(self, endpoint, payload = None, params: dict = None, files = None):
         return self._call(
             endpoint=endpoint,
             params=params,
-            func_method=self.client.post,
+            method="POST",
             wrapper=self._return_one,
             payload=payload,
             files=files)
@@ -211,28 +295,32 @@ class CustomClient(BaseClient):
         return self._call(
             endpoint=endpoint,
             params=params,
-            func_method=self.client.get,
+            method="GET",
             wrapper=self._return_one)
 
     def get_file(self, endpoint, params: dict = None):
         return self._call(
             endpoint=endpoint,
             params=params,
-            func_method=self.client.get,
+            method="GET",
             wrapper=self._return_file)
         
     def list(self, endpoint, params: dict = None):
         return self._call(
             endpoint=endpoint,
             params=params,
-            func_method=self.client.get,
+            method="GET",
             wrapper=self._return_list)
 
+    def list_all(self, endpoint, params: dict = None, page_size: int = PAGE_SIZE):
+        """List every item of ``endpoint``, following ``X-Total-Count`` across pages."""
+        return self._paginate(endpoint, params, self._return_list, page_size)
+
     def update(self, endpoint, payload, params: dict = None):
         return self._call(
             endpoint=endpoint,
             params=params,
-            func_method=self.client.patch,
+            method="PATCH",
             wrapper=self._return_one,
             payload=payload)
         
@@ -240,9 +328,28 @@ class CustomClient(BaseClient):
         return self._call(
             endpoint=endpoint,
             params=params,
-            func_method=self.client.delete,
+            method="DELETE",
             wrapper=self._return_one)
 
+    async def acreate(self, endpoint, payload = None, params: dict = None):
+        return self._return_one(await self._arequest("POST", f"{endpoint}", **self._request_kwargs(payload, params)))
+
+    async def aget(self, endpoint, params: dict = None):
+        return self._return_one(await self._arequest("GET", f"{endpoint}", params=params))
+
+    async def alist(self, endpoint, params: dict = None):
+        return self._return_list(await self._arequest("GET", f"{endpoint}", params=params))
+
+    async def alist_all(self, endpoint, params: dict = None, page_size: int = PAGE_SIZE):
+        """List every item of ``endpoint``, fetching the remaining pages concurrently."""
+        return await self._apaginate(endpoint, params, self._return_list, page_size)
+
+    async def aupdate(self, endpoint, payload, params: dict = None):
+        return self._return_one(await self._arequest("PATCH", f"{endpoint}", **self._request_kwargs(payload, params)))
+
+    async def adelete(self, endpoint, params: dict = None):
+        return self._return_one(await self._arequest("DELETE", f"{endpoint}", params=params))
+
     def _return_one(self, response: Response):
 
         raise_if_response_is_error(response)
@@ -285,20 +392,20 @@ class CustomClient(BaseClient):
         except Exception as e:
             raise Exception(response)
 
-    def _call(self, endpoint, func_method, wrapper, payload: dict = None, params: dict = None, files = None):
-        try:
-            if files != None:
-                if params != None:
-                    response = func_method(f"{endpoint}",params=params,files=files)
-                else:
-                    response = func_method(f"{endpoint}",files=files)
-                return
-
-            if payload == None:
-                response = func_method(f"{endpoint}",params=params)
+    @staticmethod
+    def _request_kwargs(payload: dict = None, params: dict = None) -> dict:
+        if payload == None:
+            return {"params": params}
+        return {"json": payload, "params": params}
+
+    def _call(self, endpoint, method, wrapper, payload: dict = None, params: dict = None, files = None):
+        if files != None:
+            if params != None:
+                response = self._request(method, f"{endpoint}", params=params, files=files)
             else:
-                response = func_method(f"{endpoint}",json=payload,params=params)
-        except Exception as e:
-            raise e
+                response = self._request(method, f"{endpoint}", files=files)
+            return
+
+        response = self._request(method, f"{endpoint}", **self._request_kwargs(payload, params))
             
-        return wrapper(response)
\ No newline at end of file
+        return wrapper(response)
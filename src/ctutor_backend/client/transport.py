@@ -0,0 +1,115 @@
+"""
+Shared HTTP transports for the API clients.
+
+Every ``CrudClient``/``CustomClient`` used to open its own ``httpx.Client``
+and with it its own connection pool. The clients here are pooled per base
+URL instead, so the many short-lived client objects created by the CLI,
+the API-client helpers and the workers reuse a handful of keep-alive
+connections. Credentials are sent per request, which lets clients with
+different logins share a pool.
+
+HTTP/2 is negotiated when the optional ``h2`` package is installed
+(``pip install httpx[http2]``), otherwise the pools fall back to HTTP/1.1
+keep-alive.
+"""
+
+import asyncio
+import importlib.util
+import os
+import threading
+from typing import Optional
+
+import httpx
+
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+DEFAULT_TIMEOUT = httpx.Timeout(10.0)
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=int(os.environ.get("API_CLIENT_MAX_CONNECTIONS", 20)),
+        max_keepalive_connections=int(os.environ.get("API_CLIENT_MAX_KEEPALIVE", 10)),
+        keepalive_expiry=30.0,
+    )
+
+
+_lock = threading.Lock()
+_sync_clients: dict[str, httpx.Client] = {}
+_async_clients: dict[tuple[str, int], tuple[asyncio.AbstractEventLoop, httpx.AsyncClient]] = {}
+
+
+def get_sync_client(url_base: str) -> httpx.Client:
+    """Return the pooled synchronous client for ``url_base``."""
+    with _lock:
+        client = _sync_clients.get(url_base)
+        if client is None or client.is_closed:
+            client = httpx.Client(
+                base_url=url_base,
+                timeout=DEFAULT_TIMEOUT,
+                limits=_limits(),
+                http2=HTTP2_AVAILABLE,
+            )
+            _sync_clients[url_base] = client
+        return client
+
+
+def get_async_client(url_base: str) -> httpx.AsyncClient:
+    """
+    Return the pooled asynchronous client for ``url_base``.
+
+    Async connections are bound to the event loop that opened them, so
+    pools are kept per running loop.
+    """
+    loop = asyncio.get_running_loop()
+    key = (url_base, id(loop))
+    with _lock:
+        entry = _async_clients.get(key)
+        if entry is None or entry[0] is not loop or entry[1].is_closed:
+            client = httpx.AsyncClient(
+                base_url=url_base,
+                timeout=DEFAULT_TIMEOUT,
+                limits=_limits(),
+                http2=HTTP2_AVAILABLE,
+            )
+            # Forget pools of loops that are gone
+            for stale_key in [k for k, (stale_loop, _) in _async_clients.items() if stale_loop.is_closed()]:
+                del _async_clients[stale_key]
+            _async_clients[key] = (loop, client)
+            return client
+        return entry[1]
+
+
+def close_sync_clients():
+    """Close all pooled synchronous clients."""
+    with _lock:
+        clients = list(_sync_clients.values())
+        _sync_clients.clear()
+    for client in clients:
+        client.close()
+
+
+async def aclose_async_clients():
+    """Close the pooled asynchronous clients of the running event loop."""
+    loop = asyncio.get_running_loop()
+    with _lock:
+        keys = [key for key, (owner, _) in _async_clients.items() if owner is loop]
+        clients = [_async_clients.pop(key)[1] for key in keys]
+    for client in clients:
+        await client.aclose()
+
+
+def total_count(response: httpx.Response) -> Optional[int]:
+    """Parse the ``X-Total-Count`` header of a list response, None if it is only an estimate."""
+    if response.headers.get("X-Total-Count-Estimated") == "true":
+        return None
+    value = response.headers.get("X-Total-Count")
+    try:
+        return int(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def next_cursor(response: httpx.Response) -> Optional[str]:
+    """The ``X-Next-Cursor`` header of a list response, None on the last page."""
+    return response.headers.get("X-Next-Cursor") or None
@@ -1,8 +1,17 @@
 import os
-from typing import Generator
-from sqlalchemy import create_engine
+import time
+import logging
+import itertools
+from typing import Callable, Generator, Optional
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Connection, Engine
 from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import sessionmaker, Session
+from ctutor_backend.settings import settings
+from ctutor_backend.instrumentation import instrument_engine
+from ctutor_backend.api.cache import invalidate_written_tables
+
+logger = logging.getLogger(__name__)
 
 POSTGRES_HOST = os.environ.get("POSTGRES_HOST", "localhost")
 POSTGRES_PORT = os.environ.get("POSTGRES_PORT", "5432")
@@ -10,20 +19,115 @@ POSTGRES_USER = os.environ.get("POSTGRES_USER")
 POSTGRES_PASSWORD = os.environ.get("POSTGRES_PASSWORD")
 POSTGRES_DB = os.environ.get("POSTGRES_DB")
 
+# Comma separated host[:port] list of streaming replicas serving read-only sessions
+POSTGRES_REPLICA_HOSTS = os.environ.get("POSTGRES_REPLICA_HOSTS", "")
+
+# A replica that cannot be reached is skipped for this many seconds, reads go
+# to the next replica or the primary in the meantime
+DB_REPLICA_CONNECT_TIMEOUT = int(os.environ.get("DB_REPLICA_CONNECT_TIMEOUT", "2"))
+DB_REPLICA_RETRY_SECONDS = float(os.environ.get("DB_REPLICA_RETRY_SECONDS", "30"))
+
+# Statement timeouts in milliseconds, 0 disables them
+DB_STATEMENT_TIMEOUT_MS = int(os.environ.get("DB_STATEMENT_TIMEOUT_MS", "0"))
+DB_READ_STATEMENT_TIMEOUT_MS = int(os.environ.get("DB_READ_STATEMENT_TIMEOUT_MS", str(DB_STATEMENT_TIMEOUT_MS)))
+# Reports such as the course gradebook, unset uses the read timeout
+DB_REPORT_STATEMENT_TIMEOUT_MS = os.environ.get("DB_REPORT_STATEMENT_TIMEOUT_MS")
+
+# PgBouncer in transaction mode neither keeps session state nor accepts
+# startup options, so every setting is applied per transaction instead
+DB_PGBOUNCER = os.environ.get("DB_PGBOUNCER", "false").lower() in ["true", "1", "yes", "on"]
+
 _database_options = {
-    "pool_pre_ping": True,
-    "pool_size": 10,
-    "max_overflow": 5,
-    "pool_timeout": 30,
-    "pool_recycle": 300
+    "pool_pre_ping": os.environ.get("DB_POOL_PRE_PING", "false" if DB_PGBOUNCER else "true").lower() in ["true", "1", "yes", "on"],
+    "pool_size": int(os.environ.get("DB_POOL_SIZE", "10")),
+    "max_overflow": int(os.environ.get("DB_MAX_OVERFLOW", "5")),
+    "pool_timeout": int(os.environ.get("DB_POOL_TIMEOUT", "30")),
+    "pool_recycle": int(os.environ.get("DB_POOL_RECYCLE", "300")),
+}
+
+_replica_options = {
+    **_database_options,
+    "pool_size": int(os.environ.get("DB_REPLICA_POOL_SIZE", str(_database_options["pool_size"]))),
+    "max_overflow": int(os.environ.get("DB_REPLICA_MAX_OVERFLOW", str(_database_options["max_overflow"]))),
 }
 
-_engine = create_engine(f"postgresql://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{POSTGRES_HOST}:{POSTGRES_PORT}/{POSTGRES_DB}", **_database_options)
+def _database_url(host: str, port: str) -> str:
+    return f"postgresql://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{host}:{port}/{POSTGRES_DB}"
+
+def _create_engine(host: str, port: str, options: dict, statement_timeout: int, connect_timeout: Optional[int] = None) -> Engine:
+    connect_args = {}
+    if connect_timeout:
+        connect_args["connect_timeout"] = connect_timeout
+    if statement_timeout and not DB_PGBOUNCER:
+        # Default timeout of every session on the connection, without a round trip
+        connect_args["options"] = f"-c statement_timeout={statement_timeout}"
+
+    engine = create_engine(_database_url(host, port), connect_args=connect_args, **options)
+
+    if settings.SQL_INSTRUMENTATION:
+        instrument_engine(engine)
+
+    return engine
+
+def _replica_addresses(hosts: str) -> list[tuple[str, str]]:
+    addresses = []
+    for address in hosts.split(","):
+        address = address.strip()
+        if address:
+            host, _, port = address.partition(":")
+            addresses.append((host, port or POSTGRES_PORT))
+    return addresses
+
+_engine = _create_engine(POSTGRES_HOST, POSTGRES_PORT, _database_options, DB_STATEMENT_TIMEOUT_MS)
+_replica_engines = [
+    _create_engine(host, port, _replica_options, DB_READ_STATEMENT_TIMEOUT_MS, DB_REPLICA_CONNECT_TIMEOUT)
+    for host, port in _replica_addresses(POSTGRES_REPLICA_HOSTS)
+]
+_replica_cycle = itertools.cycle(_replica_engines)
+_replica_down_until: dict[Engine, float] = {}
+
 _SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=_engine)
+invalidate_written_tables(_SessionLocal)
+
+def _read_engines() -> list[Engine]:
+    """Engines to try for a read-only session: the replicas round robin, skipping those found down, then the primary."""
+    if not _replica_engines:
+        return [_engine]
+    start = _replica_engines.index(next(_replica_cycle))
+    now = time.monotonic()
+    replicas = _replica_engines[start:] + _replica_engines[:start]
+    return [replica for replica in replicas if _replica_down_until.get(replica, 0) <= now] + [_engine]
+
+def _read_connection() -> Connection:
+    """Connection of the first engine in ``_read_engines`` that accepts one."""
+    for engine in _read_engines():
+        if engine is _engine:
+            break
+        try:
+            return engine.connect()
+        except OperationalError as e:
+            _replica_down_until[engine] = time.monotonic() + DB_REPLICA_RETRY_SECONDS
+            logger.warning(f"Read replica {engine.url.host} unavailable, skipped for {DB_REPLICA_RETRY_SECONDS}s: {e}")
+    return _engine.connect()
+
+@event.listens_for(_SessionLocal, "after_begin")
+def _apply_transaction_settings(session: Session, transaction, connection):
+    statement_timeout = session.info.get("statement_timeout")
+    if statement_timeout != None:
+        connection.exec_driver_sql(f"SET LOCAL statement_timeout = {int(statement_timeout)}")
+
+def _statement_timeout(read_only: bool, statement_timeout: Optional[int]) -> Optional[int]:
+    if statement_timeout != None:
+        return statement_timeout
+    if DB_PGBOUNCER:
+        # The startup option is not available, apply the default per transaction
+        default = DB_READ_STATEMENT_TIMEOUT_MS if read_only else DB_STATEMENT_TIMEOUT_MS
+        return default or None
+    return None
 
 def get_db() -> Generator[Session, None, None]:
 
-    db = _SessionLocal()
+    db = _SessionLocal(info={"statement_timeout": _statement_timeout(False, None)})
 
     try:
         yield db
@@ -33,3 +137,52 @@ def get_db() -> Generator[Session, None, None]:
         raise
     finally:
         db.close()
+
+def db_session(read_only: bool = False, statement_timeout: Optional[int] = None) -> Callable[[], Generator[Session, None, None]]:
+    """
+    Session dependency with per-route settings.
+
+    ``read_only`` sessions are bound to a read replica, round robin over
+    ``POSTGRES_REPLICA_HOSTS``. A replica that refuses the connection is
+    skipped for ``DB_REPLICA_RETRY_SECONDS``, the session uses the next one,
+    or the primary when none is left.
+    ``statement_timeout`` (milliseconds) overrides the default timeout for
+    the transactions of the route.
+    """
+    def dependency() -> Generator[Session, None, None]:
+        connection = _read_connection() if read_only else None
+        db = _SessionLocal(
+            bind=connection if connection != None else _engine,
+            info={"statement_timeout": _statement_timeout(read_only, statement_timeout)}
+        )
+
+        try:
+            yield db
+        except OperationalError as e:
+            print("Database connection failed")
+            db.rollback()
+            raise
+        finally:
+            db.close()
+            if connection != None:
+                connection.close()
+
+    return dependency
+
+# Heavy list endpoints that tolerate replication lag
+get_read_db = db_session(read_only=True)
+
+# Reports scanning a whole course, with their own timeout
+get_report_db = db_session(
+    read_only=True,
+    statement_timeout=int(DB_REPORT_STATEMENT_TIMEOUT_MS) if DB_REPORT_STATEMENT_TIMEOUT_MS else None
+)
+
+def dispose_inherited_connections():
+    """
+    Forget the pooled connections copied from the parent into a forked process.
+
+    The parent keeps using them, the child opens its own.
+    """
+    for engine in [_engine, *_replica_engines]:
+        engine.dispose(close=False)
@@ -12,6 +12,7 @@ import logging
 import tempfile
 import os
 import yaml
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import datetime, timezone
 from typing import Dict, Any, Optional, Tuple
 from gitlab import Gitlab
@@ -44,11 +45,41 @@ from ctutor_backend.model.organization import Organization
 from ctutor_backend.model.course import CourseFamily, Course
 from ctutor_backend.repositories.organization import OrganizationRepository
 from ctutor_backend.services.git_service import GitService
+from ctutor_backend.gitlab_clients import find_group, gitlab_client, remember_group, resolve_project_id, remember_project
 from ..custom_types import Ltree
 
 
 logger = logging.getLogger(__name__)
 
+# GitLab requests running at once when setting up the groups and projects of a course
+GITLAB_BUILDER_CONCURRENCY = int(os.environ.get("GITLAB_BUILDER_CONCURRENCY", "4"))
+
+# Shared by every builder, so its threads and their GitLab clients (see
+# gitlab_clients.gitlab_client) are reused across courses
+_builder_executor = ThreadPoolExecutor(max_workers=GITLAB_BUILDER_CONCURRENCY, thread_name_prefix="gitlab-builder")
+
+
+def course_project_configs(course_title: str) -> list[Dict[str, Any]]:
+    """The projects of every course.
+    
+    - student-template: Processed version for students (no solutions)
+    - assignments: Full example content with solutions for lecturers/tutors (reference repository)
+    """
+    return [
+        {
+            "name": "Student Template",
+            "path": "student-template",
+            "description": f"Template repository for students in {course_title}",
+            "visibility": "private"
+        },
+        {
+            "name": "Assignments",
+            "path": "assignments",
+            "description": f"Reference repository with full example content for {course_title}",
+            "visibility": "private"
+        }
+    ]
+
 
 class EnhancedGitLabConfig(GitLabConfig):
     """Enhanced GitLab configuration with complete metadata."""
@@ -73,7 +104,8 @@ class GitLabBuilder:
         db_session: Session,
         gitlab_url: str,
         gitlab_token: str,
-        git_service: Optional[GitService] = None
+        git_service: Optional[GitService] = None,
+        gitlab: Optional[Gitlab] = None
     ):
         """
         Initialize the GitLab builder.
@@ -83,26 +115,32 @@ class GitLabBuilder:
             gitlab_url: GitLab instance URL
             gitlab_token: GitLab access token
             git_service: Optional GitService for repository operations
+            gitlab: Optional already authenticated client for gitlab_url and
+                gitlab_token, e.g. from gitlab_clients.gitlab_client
         """
         self.db = db_session
         self.gitlab_url = gitlab_url  # Store original URL for database
         self.gitlab_token = gitlab_token
         self.git_service = git_service
         
-        # Transform URL for Docker environment if needed (API calls only)
-        from ..utils.docker_utils import transform_localhost_url
-        api_url = transform_localhost_url(gitlab_url)
-        
-        # Initialize GitLab connection with transformed URL
-        self.gitlab = Gitlab(url=api_url, private_token=gitlab_token, keep_base_url=True)
-        try:
-            # For group tokens, gl.auth() doesn't work properly
-            # Test with a simple API call instead
-            self.gitlab.version()  # Test API access
-            logger.info(f"Successfully authenticated with GitLab at {api_url}")
-        except Exception as e:
-            logger.error(f"Failed to authenticate with GitLab: {e}")
-            raise
+        if gitlab is not None:
+            # Shared client, access was tested when it was created
+            self.gitlab = gitlab
+        else:
+            # Transform URL for Docker environment if needed (API calls only)
+            from ..utils.docker_utils import transform_localhost_url
+            api_url = transform_localhost_url(gitlab_url)
+            
+            # Initialize GitLab connection with transformed URL
+            self.gitlab = Gitlab(url=api_url, private_token=gitlab_token, keep_base_url=True)
+            try:
+                # For group tokens, gl.auth() doesn't work properly
+                # Test with a simple API call instead
+                self.gitlab.version()  # Test API access
+                logger.info(f"Successfully authenticated with GitLab at {api_url}")
+            except Exception as e:
+                logger.error(f"Failed to authenticate with GitLab: {e}")
+                raise
         
         # Initialize repositories
         self.org_repo = OrganizationRepository(db_session)
@@ -659,42 +697,12 @@ class GitLabBuilder:
                         gitlab_config
                     )
                 
-                # Ensure students group exists for existing course
+                # Ensure students and tutors groups and course projects exist for existing course
                 if result.get("gitlab_group"):
-                    students_group_result = self._create_students_group(
-                        course=existing_course,
-                        parent_group=result["gitlab_group"],
-                        deployment=deployment
-                    )
-                    
-                    if not students_group_result["success"]:
-                        logger.warning(f"Failed to create students group: {students_group_result['error']}")
-                    else:
-                        logger.info(f"Ensured students group exists: {students_group_result['gitlab_group'].full_path}")
-                    
-                    # Ensure tutors group exists for existing course
-                    tutors_group_result = self._create_tutors_group(
+                    self._create_course_groups_and_projects(
                         course=existing_course,
-                        parent_group=result["gitlab_group"],
-                        deployment=deployment
+                        parent_group=result["gitlab_group"]
                     )
-                    
-                    if not tutors_group_result["success"]:
-                        logger.warning(f"Failed to create tutors group: {tutors_group_result['error']}")
-                    else:
-                        logger.info(f"Ensured tutors group exists: {tutors_group_result['gitlab_group'].full_path}")
-                    
-                    # Ensure course projects exist for existing course
-                    projects_result = self._create_course_projects(
-                        course=existing_course,
-                        parent_group=result["gitlab_group"],
-                        deployment=deployment
-                    )
-                    
-                    if not projects_result["success"]:
-                        logger.warning(f"Failed to create course projects: {projects_result['error']}")
-                    else:
-                        logger.info(f"Ensured course projects exist: {', '.join(projects_result['created_projects'])}")
                 
                 result["success"] = True
                 return result
@@ -754,45 +762,13 @@ class GitLabBuilder:
             result["course"] = new_course
             result["db_created"] = True
             
-            # Create students group under the course
-            students_group_result = self._create_students_group(
-                course=new_course,
-                parent_group=gitlab_group,
-                deployment=deployment
-            )
-            
-            if not students_group_result["success"]:
-                logger.warning(f"Failed to create students group: {students_group_result['error']}")
-                # Don't fail the entire course creation, just log the warning
-            else:
-                logger.info(f"Created students group: {students_group_result['gitlab_group'].full_path}")
-            
-            # Create tutors group under the course
-            tutors_group_result = self._create_tutors_group(
+            # Create students and tutors groups and course projects under the course
+            # Failures are logged, they don't fail the entire course creation
+            self._create_course_groups_and_projects(
                 course=new_course,
-                parent_group=gitlab_group,
-                deployment=deployment
+                parent_group=gitlab_group
             )
             
-            if not tutors_group_result["success"]:
-                logger.warning(f"Failed to create tutors group: {tutors_group_result['error']}")
-                # Don't fail the entire course creation, just log the warning
-            else:
-                logger.info(f"Created tutors group: {tutors_group_result['gitlab_group'].full_path}")
-            
-            # Create course projects (assignments, student-template, reference)
-            projects_result = self._create_course_projects(
-                course=new_course,
-                parent_group=gitlab_group,
-                deployment=deployment
-            )
-            
-            if not projects_result["success"]:
-                logger.warning(f"Failed to create course projects: {projects_result['error']}")
-                # Don't fail the entire course creation, just log the warning
-            else:
-                logger.info(f"Created course projects: {', '.join(projects_result['created_projects'])}")
-            
             result["success"] = True
             
             logger.info(f"Created course: {new_course.path} (ID: {new_course.id})")
@@ -833,13 +809,11 @@ class GitLabBuilder:
         else:
             full_path = path
         
-        # Search for existing group
+        # Look up existing group by its full path
         try:
-            groups = self.gitlab.groups.list(all=True)
-            existing_groups = [g for g in groups if g.full_path == full_path]
+            group = find_group(self.gitlab, full_path)
             
-            if existing_groups:
-                group = self.gitlab.groups.get(existing_groups[0].id)
+            if group:
                 logger.info(f"Found existing GitLab group: {group.full_path}")
                 
                 # Update description if needed
@@ -867,6 +841,7 @@ class GitLabBuilder:
             logger.info(f"Creating GitLab group with payload: {payload}")
             group = self.gitlab.groups.create(payload)
             logger.info(f"Created new GitLab group: {group.full_path}")
+            remember_group(self.gitlab, group.full_path, group.id)
             
             # Return group with basic metadata (config will be created by caller)
             return group, {}
@@ -875,10 +850,8 @@ class GitLabBuilder:
             # Check if it's a duplicate error
             if "has already been taken" in str(e):
                 # Try to find the existing group
-                groups = self.gitlab.groups.list(all=True)
-                existing_groups = [g for g in groups if g.full_path == full_path]
-                if existing_groups:
-                    group = self.gitlab.groups.get(existing_groups[0].id)
+                group = find_group(self.gitlab, full_path)
+                if group:
                     logger.info(f"Found existing GitLab group after create error: {group.full_path}")
                     return group, {}
             raise
@@ -989,262 +962,205 @@ class GitLabBuilder:
         
         logger.info(f"Updated course {course.path} with GitLab properties")
     
-    def _create_students_group(
-        self,
-        course: Course,
-        parent_group: Group,
-        deployment: ComputorDeploymentConfig
-    ) -> Dict[str, Any]:
-        """Create students group under a course."""
-        result = {
+    def _create_course_groups_and_projects(self, course: Course, parent_group: Group) -> Dict[str, Any]:
+        """
+        Create the students and tutors groups and the course projects under a course.
+        
+        They don't depend on each other: the GitLab requests run concurrently
+        on the shared builder pool, up to GITLAB_BUILDER_CONCURRENCY at a time,
+        each pool thread with its own GitLab client. The course properties are
+        updated afterwards, in this thread, as the session is not thread-safe.
+        """
+        subgroups = {
+            "students_group": ("students", "Students", f"Students group for {course.title}"),
+            "tutors_group": ("tutors", "Tutors", f"Tutors group for {course.title}"),
+        }
+        projects = course_project_configs(course.title)
+        
+        subgroup_futures = {
+            key: _builder_executor.submit(self._ensure_course_subgroup, parent_group, path, name, description)
+            for key, (path, name, description) in subgroups.items()
+        }
+        project_futures = [
+            _builder_executor.submit(self._ensure_course_project, parent_group, project_config)
+            for project_config in projects
+        ]
+        wait([*subgroup_futures.values(), *project_futures])
+        
+        results = {}
+        for key, future in subgroup_futures.items():
+            group_result = future.result()
+            results[key] = group_result
+            if not group_result["success"]:
+                logger.warning(f"Failed to create {key.replace('_', ' ')}: {group_result['error']}")
+            elif group_result["created"]:
+                self._record_course_group(course, key, group_result["gitlab_group"])
+        
+        projects_result = {
             "success": False,
-            "gitlab_group": None,
+            "created_projects": [],
+            "existing_projects": [],
             "error": None
         }
+        errors = []
+        for project_config, future in zip(projects, project_futures):
+            try:
+                created = future.result()
+            except Exception as e:
+                logger.error(f"Failed to create course project {project_config['path']}: {e}")
+                errors.append(f"{project_config['path']}: {e}")
+                continue
+            key = "created_projects" if created else "existing_projects"
+            projects_result[key].append(project_config["path"])
+        
+        if errors:
+            # The project properties are only stored once all projects exist
+            projects_result["error"] = "; ".join(errors)
+            logger.warning(f"Failed to create course projects: {projects_result['error']}")
+        else:
+            self._record_course_projects(course, parent_group)
+            projects_result["success"] = True
+            logger.info(f"Ensured course projects exist, created: {', '.join(projects_result['created_projects']) or 'none'}")
+        results["projects"] = projects_result
         
         try:
-            # Check if students group already exists
-            students_path = "students"
-            full_path = f"{parent_group.full_path}/{students_path}"
-            
-            # Try to find existing students group
-            existing_groups = parent_group.subgroups.list(search=students_path)
-            students_group = None
-            
-            for group in existing_groups:
-                if group.path == students_path:
-                    students_group = self.gitlab.groups.get(group.id)
-                    logger.info(f"Students group already exists: {students_group.full_path}")
-                    result["gitlab_group"] = students_group
-                    result["success"] = True
-                    return result
-            
-            # Create students group
-            group_data = {
-                'name': 'Students',
-                'path': students_path,
-                'parent_id': parent_group.id,
-                'description': f'Students group for {course.title}',
-                'visibility': 'private'  # Students group should be private
-            }
-            
-            students_group = self.gitlab.groups.create(group_data)
-            logger.info(f"Created students group: {students_group.full_path}")
-            
-            # Update course properties to include students group info
-            if not course.properties:
-                course.properties = {}
-            
-            if "gitlab" not in course.properties:
-                course.properties["gitlab"] = {}
-            
-            course.properties["gitlab"]["students_group"] = {
-                "group_id": students_group.id,
-                "full_path": students_group.full_path,
-                "web_url": f"{self.gitlab_url}/groups/{students_group.full_path}",
-                "created_at": datetime.now().isoformat()
-            }
-            
-            flag_modified(course, "properties")
             self.db.flush()
             self.db.refresh(course)
-            
-            result["gitlab_group"] = students_group
-            result["success"] = True
-            
-        except GitlabCreateError as e:
-            logger.error(f"Failed to create students group: {e}")
-            result["error"] = str(e)
         except Exception as e:
-            logger.error(f"Unexpected error creating students group: {e}")
-            result["error"] = str(e)
+            logger.error(f"Failed to store course GitLab properties: {e}")
         
-        return result
+        return results
     
-    def _create_tutors_group(
+    def _thread_gitlab(self) -> Gitlab:
+        """GitLab client of the calling pool thread, python-gitlab clients are not thread-safe."""
+        return gitlab_client(self.gitlab_url, self.gitlab_token)
+    
+    def _ensure_course_subgroup(
         self,
-        course: Course,
         parent_group: Group,
-        deployment: ComputorDeploymentConfig
+        path: str,
+        name: str,
+        description: str
     ) -> Dict[str, Any]:
-        """Create tutors group under a course."""
+        """Get or create a private subgroup of a course group, GitLab requests only."""
         result = {
             "success": False,
             "gitlab_group": None,
+            "created": False,
             "error": None
         }
         
+        gitlab = self._thread_gitlab()
+        
         try:
-            # Check if tutors group already exists
-            tutors_path = "tutors"
-            full_path = f"{parent_group.full_path}/{tutors_path}"
-            
-            # Try to find existing tutors group
-            existing_groups = parent_group.subgroups.list(search=tutors_path)
-            tutors_group = None
+            # Try to find existing group
+            existing_groups = gitlab.groups.get(parent_group.id, lazy=True).subgroups.list(search=path)
             
             for group in existing_groups:
-                if group.path == tutors_path:
-                    tutors_group = self.gitlab.groups.get(group.id)
-                    logger.info(f"Tutors group already exists: {tutors_group.full_path}")
-                    result["gitlab_group"] = tutors_group
+                if group.path == path:
+                    existing_group = gitlab.groups.get(group.id)
+                    logger.info(f"{name} group already exists: {existing_group.full_path}")
+                    result["gitlab_group"] = existing_group
                     result["success"] = True
                     return result
             
-            # Create tutors group
             group_data = {
-                'name': 'Tutors',
-                'path': tutors_path,
+                'name': name,
+                'path': path,
                 'parent_id': parent_group.id,
-                'description': f'Tutors group for {course.title}',
-                'visibility': 'private'  # Tutors group should be private
+                'description': description,
+                'visibility': 'private'  # Students and tutors groups should be private
             }
             
-            tutors_group = self.gitlab.groups.create(group_data)
-            logger.info(f"Created tutors group: {tutors_group.full_path}")
-            
-            # Update course properties to include tutors group info
-            if not course.properties:
-                course.properties = {}
-            
-            if "gitlab" not in course.properties:
-                course.properties["gitlab"] = {}
-            
-            course.properties["gitlab"]["tutors_group"] = {
-                "group_id": tutors_group.id,
-                "full_path": tutors_group.full_path,
-                "web_url": f"{self.gitlab_url}/groups/{tutors_group.full_path}",
-                "created_at": datetime.now().isoformat()
-            }
+            group = gitlab.groups.create(group_data)
+            logger.info(f"Created {path} group: {group.full_path}")
             
-            flag_modified(course, "properties")
-            self.db.flush()
-            self.db.refresh(course)
-            
-            result["gitlab_group"] = tutors_group
+            result["gitlab_group"] = group
+            result["created"] = True
             result["success"] = True
             
         except GitlabCreateError as e:
-            logger.error(f"Failed to create tutors group: {e}")
+            logger.error(f"Failed to create {path} group: {e}")
             result["error"] = str(e)
         except Exception as e:
-            logger.error(f"Unexpected error creating tutors group: {e}")
+            logger.error(f"Unexpected error creating {path} group: {e}")
             result["error"] = str(e)
         
         return result
     
-    def _create_course_projects(
-        self,
-        course: Course,
-        parent_group: Group,
-        deployment: ComputorDeploymentConfig
-    ) -> Dict[str, Any]:
-        """Create course projects (student-template and assignments) under a course.
+    def _ensure_course_project(self, parent_group: Group, project_config: Dict[str, Any]) -> bool:
+        """Create a course project unless it exists, GitLab requests only. Returns whether it was created."""
+        gitlab = self._thread_gitlab()
+        project_path = project_config["path"]
+        full_path = f"{parent_group.full_path}/{project_path}"
         
-        Creates:
-        - student-template: Processed version for students (no solutions)
-        - assignments: Full example content with solutions for lecturers/tutors (reference repository)
-        """
-        result = {
-            "success": False,
-            "created_projects": [],
-            "existing_projects": [],
-            "error": None
+        # Check if project already exists
+        if resolve_project_id(gitlab, full_path):
+            logger.info(f"Project already exists: {full_path}")
+            return False
+        
+        project_data = {
+            'name': project_config["name"],
+            'path': project_path,
+            'namespace_id': parent_group.id,
+            'description': project_config["description"],
+            'visibility': project_config["visibility"],
+            'initialize_with_readme': True,
+            'default_branch': 'main'
         }
         
-        # Create both student-template and assignments repositories
-        project_configs = [
-            {
-                "name": "Student Template",
+        project = gitlab.projects.create(project_data)
+        logger.info(f"Created project: {project.path_with_namespace}")
+        remember_project(gitlab, full_path, project.id)
+        return True
+    
+    def _record_course_group(self, course: Course, key: str, group: Group):
+        """Store a created students or tutors group in the course properties."""
+        if not course.properties:
+            course.properties = {}
+        
+        if "gitlab" not in course.properties:
+            course.properties["gitlab"] = {}
+        
+        course.properties["gitlab"][key] = {
+            "group_id": group.id,
+            "full_path": group.full_path,
+            "web_url": f"{self.gitlab_url}/groups/{group.full_path}",
+            "created_at": datetime.now().isoformat()
+        }
+        
+        flag_modified(course, "properties")
+    
+    def _record_course_projects(self, course: Course, parent_group: Group):
+        """Store the course projects (student-template and assignments) in the course properties."""
+        if not course.properties:
+            course.properties = {}
+        
+        if "gitlab" not in course.properties:
+            course.properties["gitlab"] = {}
+        
+        course.properties["gitlab"]["projects"] = {
+            "student_template": {
                 "path": "student-template",
-                "description": f"Template repository for students in {course.title}",
-                "visibility": "private"
+                "full_path": f"{parent_group.full_path}/student-template",
+                "web_url": f"{self.gitlab_url}/{parent_group.full_path}/student-template",
+                "description": "Template repository for students"
             },
-            {
-                "name": "Assignments",
+            "assignments": {
                 "path": "assignments",
-                "description": f"Reference repository with full example content for {course.title}",
-                "visibility": "private"
-            }
-        ]
+                "full_path": f"{parent_group.full_path}/assignments",
+                "web_url": f"{self.gitlab_url}/{parent_group.full_path}/assignments",
+                "description": "Reference repository with full example content"
+            },
+            "created_at": datetime.now().isoformat()
+        }
         
-        try:
-            for project_config in project_configs:
-                project_path = project_config["path"]
-                full_path = f"{parent_group.full_path}/{project_path}"
-                
-                # Check if project already exists
-                existing_projects = self.gitlab.projects.list(
-                    search=project_path,
-                    namespace_id=parent_group.id
-                )
-                
-                project_exists = False
-                for existing in existing_projects:
-                    # Handle namespace as dict or object
-                    namespace_id = existing.namespace.get('id') if hasattr(existing.namespace, 'get') else existing.namespace.id
-                    if existing.path == project_path and namespace_id == parent_group.id:
-                        logger.info(f"Project already exists: {existing.path_with_namespace}")
-                        result["existing_projects"].append(project_path)
-                        project_exists = True
-                        break
-                
-                if not project_exists:
-                    # Create project
-                    project_data = {
-                        'name': project_config["name"],
-                        'path': project_path,
-                        'namespace_id': parent_group.id,
-                        'description': project_config["description"],
-                        'visibility': project_config["visibility"],
-                        'initialize_with_readme': True,
-                        'default_branch': 'main'
-                    }
-                    
-                    project = self.gitlab.projects.create(project_data)
-                    logger.info(f"Created project: {project.path_with_namespace}")
-                    result["created_projects"].append(project_path)
-            
-            # Update course properties to include projects info
-            if not course.properties:
-                course.properties = {}
-            
-            if "gitlab" not in course.properties:
-                course.properties["gitlab"] = {}
-            
-            course.properties["gitlab"]["projects"] = {
-                "student_template": {
-                    "path": "student-template",
-                    "full_path": f"{parent_group.full_path}/student-template",
-                    "web_url": f"{self.gitlab_url}/{parent_group.full_path}/student-template",
-                    "description": "Template repository for students"
-                },
-                "assignments": {
-                    "path": "assignments",
-                    "full_path": f"{parent_group.full_path}/assignments",
-                    "web_url": f"{self.gitlab_url}/{parent_group.full_path}/assignments",
-                    "description": "Reference repository with full example content"
-                },
-                "created_at": datetime.now().isoformat()
-            }
-            
-            # Store URLs at the top level for easy access
-            course.properties["gitlab"]["student_template_url"] = f"{self.gitlab_url}/{parent_group.full_path}/student-template"
-            course.properties["gitlab"]["assignments_url"] = f"{self.gitlab_url}/{parent_group.full_path}/assignments"
-            
-            # Tell SQLAlchemy that the properties field has been modified
-            flag_modified(course, "properties")
-            
-            self.db.flush()
-            self.db.refresh(course)
-            
-            result["success"] = True
-            
-        except Exception as e:
-            logger.error(f"Failed to create course projects: {e}")
-            result["error"] = str(e)
+        # Store URLs at the top level for easy access
+        course.properties["gitlab"]["student_template_url"] = f"{self.gitlab_url}/{parent_group.full_path}/student-template"
+        course.properties["gitlab"]["assignments_url"] = f"{self.gitlab_url}/{parent_group.full_path}/assignments"
         
-        return result
+        # Tell SQLAlchemy that the properties field has been modified
+        flag_modified(course, "properties")
     
     def add_member_to_group(
         self,
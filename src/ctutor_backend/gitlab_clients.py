@@ -0,0 +1,221 @@
+"""
+Long-lived GitLab clients and path lookups shared by the workers.
+
+Building a python-gitlab client per activity re-authenticates and opens new
+connections on every call. ``gitlab_client`` keeps one authenticated client
+per GitLab URL, token and thread, whose ``requests`` session reuses its
+connections. Clients are not shared between threads, python-gitlab and
+``requests`` sessions are not thread-safe; the threads of activity executors
+and pools are long-lived, so their clients are still reused. A client whose
+token is rejected (401) is dropped, the next call authenticates again.
+
+Group and project IDs resolved by full path are kept for
+``GITLAB_LOOKUP_CACHE_TTL`` seconds, so repeated provisioning does not look up
+the same namespaces and templates again. Paths that do not exist are not
+cached, they are usually created right after the lookup.
+"""
+
+import os
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+from gitlab import Gitlab
+from gitlab.exceptions import GitlabGetError
+from .utils.docker_utils import transform_localhost_url
+
+logger = logging.getLogger(__name__)
+
+GITLAB_CLIENT_CACHE_SIZE = int(os.environ.get("GITLAB_CLIENT_CACHE_SIZE", "128"))
+GITLAB_LOOKUP_CACHE_TTL = float(os.environ.get("GITLAB_LOOKUP_CACHE_TTL", "300"))
+GITLAB_LOOKUP_CACHE_SIZE = int(os.environ.get("GITLAB_LOOKUP_CACHE_SIZE", "10000"))
+
+GROUP = "group"
+PROJECT = "project"
+
+
+def token_fingerprint(token: str) -> str:
+    """Identifies a token in cache keys and logs without keeping it in plain text."""
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()[:16]
+
+
+_clients: "OrderedDict[tuple[str, str, int], Gitlab]" = OrderedDict()
+_clients_lock = threading.Lock()
+
+
+def gitlab_client(gitlab_url: str, token: str) -> Gitlab:
+    """
+    Authenticated client for ``gitlab_url``, shared by all callers in this thread using the same token.
+
+    The API access is checked once, when the client is created. Raises the
+    GitLab error if the token is not accepted.
+    """
+    api_url = transform_localhost_url(gitlab_url)
+    key = (api_url, token_fingerprint(token), threading.get_ident())
+
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is not None:
+            _clients.move_to_end(key)
+            return client
+
+    client = Gitlab(url=api_url, private_token=token, keep_base_url=True)
+    # Group tokens cannot use gl.auth(), any API call validates the token
+    client.version()
+    client.session.hooks.setdefault("response", []).append(_discard_when_unauthorized(api_url, key[1]))
+    logger.info(f"Authenticated GitLab client for {api_url} (token {key[1]})")
+
+    with _clients_lock:
+        # Another caller may have created one in the meantime, keep the first
+        client = _clients.setdefault(key, client)
+        _clients.move_to_end(key)
+        while len(_clients) > GITLAB_CLIENT_CACHE_SIZE:
+            _, evicted = _clients.popitem(last=False)
+            evicted.session.close()
+
+    return client
+
+
+def _discard_when_unauthorized(api_url: str, fingerprint: str) -> Callable:
+    """Response hook dropping the clients of a token once GitLab rejects it, e.g. after it was revoked."""
+    def hook(response, *args, **kwargs):
+        if response.status_code == 401:
+            with _clients_lock:
+                for key in [key for key in _clients if key[:2] == (api_url, fingerprint)]:
+                    # Not closed, the session may still be in use by its thread
+                    del _clients[key]
+            logger.warning(f"GitLab rejected token {fingerprint} for {api_url}, clients discarded")
+    return hook
+
+
+class PathLookupCache:
+    """IDs and paths of GitLab groups and projects, with a TTL."""
+
+    def __init__(
+        self,
+        ttl: float = GITLAB_LOOKUP_CACHE_TTL,
+        max_size: int = GITLAB_LOOKUP_CACHE_SIZE,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.clock = clock
+        self._entries: "OrderedDict[tuple, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires <= self.clock():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: tuple, value: Any):
+        with self._lock:
+            self._entries[key] = (self.clock() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def discard(self, key: tuple):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+lookup_cache = PathLookupCache()
+
+
+def _lookup_key(gitlab: Gitlab, kind: str, full_path: str) -> tuple:
+    # IDs are unique per instance, whichever token resolved them
+    return (gitlab.url, kind, full_path.strip("/"))
+
+
+def _manager(gitlab: Gitlab, kind: str):
+    return gitlab.groups if kind == GROUP else gitlab.projects
+
+
+def _find(gitlab: Gitlab, kind: str, full_path: str) -> Optional[Any]:
+    key = _lookup_key(gitlab, kind, full_path)
+    manager = _manager(gitlab, kind)
+
+    cached_id = lookup_cache.get(key)
+    if cached_id is not None:
+        try:
+            return manager.get(cached_id)
+        except GitlabGetError:
+            # Deleted since it was cached, look the path up again
+            lookup_cache.discard(key)
+
+    try:
+        obj = manager.get(full_path.strip("/"))
+    except GitlabGetError:
+        return None
+
+    # GitLab also resolves paths case-insensitively and through the redirects
+    # of renamed namespaces, only the exact path counts as found
+    path_attribute = "full_path" if kind == GROUP else "path_with_namespace"
+    if getattr(obj, path_attribute, None) != full_path.strip("/"):
+        return None
+
+    lookup_cache.set(key, obj.id)
+    return obj
+
+
+def _resolve_id(gitlab: Gitlab, kind: str, full_path: str) -> Optional[int]:
+    cached_id = lookup_cache.get(_lookup_key(gitlab, kind, full_path))
+    if cached_id is not None:
+        return cached_id
+    obj = _find(gitlab, kind, full_path)
+    return obj.id if obj is not None else None
+
+
+def find_group(gitlab: Gitlab, full_path: str) -> Optional[Any]:
+    """The group at exactly ``full_path``, or None."""
+    return _find(gitlab, GROUP, full_path)
+
+
+def find_project(gitlab: Gitlab, full_path: str) -> Optional[Any]:
+    """The project at exactly ``full_path``, or None."""
+    return _find(gitlab, PROJECT, full_path)
+
+
+def resolve_group_id(gitlab: Gitlab, full_path: str) -> Optional[int]:
+    """ID of the group at ``full_path``, without a request while it is cached."""
+    return _resolve_id(gitlab, GROUP, full_path)
+
+
+def resolve_project_id(gitlab: Gitlab, full_path: str) -> Optional[int]:
+    """ID of the project at ``full_path``, without a request while it is cached."""
+    return _resolve_id(gitlab, PROJECT, full_path)
+
+
+def group_full_path(gitlab: Gitlab, group_id: int) -> str:
+    """Full path of the group ``group_id``, without a request while it is cached."""
+    key = (gitlab.url, "group_path", int(group_id))
+    full_path = lookup_cache.get(key)
+    if full_path is None:
+        full_path = gitlab.groups.get(group_id).full_path
+        lookup_cache.set(key, full_path)
+    return full_path
+
+
+def remember_group(gitlab: Gitlab, full_path: str, group_id: int):
+    """Cache a group the caller has just created or fetched."""
+    lookup_cache.set(_lookup_key(gitlab, GROUP, full_path), group_id)
+
+
+def remember_project(gitlab: Gitlab, full_path: str, project_id: int):
+    """Cache a project the caller has just created or fetched."""
+    lookup_cache.set(_lookup_key(gitlab, PROJECT, full_path), project_id)
+
@@ -0,0 +1,233 @@
+"""
+Opt-in statement-level instrumentation of the API.
+
+With ``SQL_INSTRUMENTATION=true`` every statement executed while serving a
+request is tagged with a trailing comment naming the route, principal type and
+request id, so it can be found in ``pg_stat_activity`` and the Postgres log.
+Per request the number of statements, the total database time and the
+``SQL_SLOWEST_STATEMENTS`` slowest statements are collected. They are returned
+in the ``Server-Timing`` header, statements slower than ``SQL_SLOW_QUERY_MS``
+are logged, and Prometheus metrics are recorded when ``prometheus_client`` is
+installed.
+"""
+
+import re
+import time
+import uuid
+import heapq
+import logging
+import importlib.util
+from dataclasses import dataclass, field
+from contextvars import ContextVar
+from typing import Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from ctutor_backend.settings import settings
+
+logger = logging.getLogger(__name__)
+
+PROMETHEUS_AVAILABLE = importlib.util.find_spec("prometheus_client") is not None
+
+REQUEST_ID_HEADER = "X-Request-ID"
+
+UNMATCHED_ROUTE = "unmatched"
+
+# Tag values end up inside an SQL comment, anything else is replaced
+_TAG_UNSAFE = re.compile(r"[^A-Za-z0-9_.:/{}-]")
+
+_STATEMENT_PREVIEW = 500
+
+if PROMETHEUS_AVAILABLE:
+    from prometheus_client import Counter, Histogram
+
+    REQUEST_DB_SECONDS = Histogram(
+        "ctutor_request_db_seconds",
+        "Total database time per request",
+        ["method", "route"],
+    )
+    REQUEST_DB_STATEMENTS = Histogram(
+        "ctutor_request_db_statements",
+        "Number of SQL statements per request",
+        ["method", "route"],
+        buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500, 1000),
+    )
+    SLOW_STATEMENTS = Counter(
+        "ctutor_slow_statements_total",
+        "SQL statements slower than SQL_SLOW_QUERY_MS",
+        ["method", "route"],
+    )
+
+
+def _tag_value(value: str) -> str:
+    return _TAG_UNSAFE.sub("_", value)[:128]
+
+
+@dataclass
+class RequestStatements:
+    """Statements executed on behalf of one request."""
+    scope: dict
+    request_id: str
+    principal_type: str = "anonymous"
+    count: int = 0
+    duration: float = 0.0
+    slow: int = 0
+    slowest: list = field(default_factory=list)
+
+    @property
+    def method(self) -> str:
+        return self.scope.get("method", "")
+
+    @property
+    def route(self) -> str:
+        # Set by the router once the request was matched
+        route = self.scope.get("route")
+        return getattr(route, "path", None) or UNMATCHED_ROUTE
+
+    def comment(self) -> str:
+        return (
+            f" /* route='{_tag_value(self.route)}',principal='{self.principal_type}',"
+            f"request_id='{self.request_id}' */"
+        )
+
+    def record(self, statement: str, duration: float):
+        self.count += 1
+        self.duration += duration
+
+        entry = (duration, self.count, statement)
+        if len(self.slowest) < settings.SQL_SLOWEST_STATEMENTS:
+            heapq.heappush(self.slowest, entry)
+        elif self.slowest and duration > self.slowest[0][0]:
+            heapq.heapreplace(self.slowest, entry)
+
+        if duration * 1000 >= settings.SQL_SLOW_QUERY_MS:
+            self.slow += 1
+            logger.warning(
+                "Slow query %.1f ms [%s %s principal=%s request_id=%s]: %s",
+                duration * 1000, self.method, self.route, self.principal_type,
+                self.request_id, statement[:_STATEMENT_PREVIEW]
+            )
+
+    def slowest_statements(self) -> list[tuple[float, str]]:
+        """The slowest statements in descending order of duration."""
+        return [(duration, statement) for duration, _, statement in sorted(self.slowest, reverse=True)]
+
+    def server_timing(self) -> str:
+        return f'db;dur={self.duration * 1000:.1f};desc="{self.count} statements"'
+
+
+_current: ContextVar[Optional[RequestStatements]] = ContextVar("ctutor_request_statements", default=None)
+
+
+def current_statements() -> Optional[RequestStatements]:
+    return _current.get()
+
+
+def set_request_principal(principal):
+    """Record the principal type of the current request, if instrumented."""
+    statements = _current.get()
+    if statements is None:
+        return
+
+    if principal.is_admin:
+        statements.principal_type = "admin"
+    elif principal.user_id != None:
+        statements.principal_type = "user"
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    statements = _current.get()
+    if statements is None:
+        return statement, parameters
+
+    conn.info.setdefault("ctutor_statement_start", []).append(time.perf_counter())
+    return statement + statements.comment(), parameters
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    statements = _current.get()
+    if statements is None:
+        return
+
+    starts = conn.info.get("ctutor_statement_start")
+    if not starts:
+        return
+
+    statements.record(statement.rsplit(" /* route=", 1)[0], time.perf_counter() - starts.pop())
+
+
+def _handle_error(exception_context):
+    # Failed statements never reach after_cursor_execute
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("ctutor_statement_start"):
+        connection.info["ctutor_statement_start"].pop()
+
+
+def instrument_engine(engine: Engine):
+    """Attach the statement listeners to ``engine``, once."""
+    if event.contains(engine, "after_cursor_execute", _after_cursor_execute):
+        return
+
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute, retval=True)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+
+def _request_id(scope: dict) -> str:
+    for name, value in scope.get("headers", []):
+        if name.decode("latin-1").lower() == REQUEST_ID_HEADER.lower():
+            request_id = _tag_value(value.decode("latin-1"))
+            if request_id:
+                return request_id
+    return uuid.uuid4().hex
+
+
+def _observe(statements: RequestStatements):
+    if statements.slow:
+        logger.info(
+            "%s %s request_id=%s: %d statements in %.1f ms, slowest: %s",
+            statements.method, statements.route, statements.request_id, statements.count,
+            statements.duration * 1000,
+            "; ".join(f"{duration * 1000:.1f} ms {statement[:_STATEMENT_PREVIEW]}"
+                      for duration, statement in statements.slowest_statements())
+        )
+
+    if PROMETHEUS_AVAILABLE:
+        labels = (statements.method, statements.route)
+        REQUEST_DB_SECONDS.labels(*labels).observe(statements.duration)
+        REQUEST_DB_STATEMENTS.labels(*labels).observe(statements.count)
+        if statements.slow:
+            SLOW_STATEMENTS.labels(*labels).inc(statements.slow)
+
+
+class SQLInstrumentationMiddleware:
+    """
+    Collects the statements of every HTTP request.
+
+    Responses carry the request id in ``X-Request-ID`` (taken from the
+    request when present) and the database time in ``Server-Timing``.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        statements = RequestStatements(scope=scope, request_id=_request_id(scope))
+        token = _current.set(statements)
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", statements.server_timing().encode("latin-1")))
+                headers.append((REQUEST_ID_HEADER.lower().encode("latin-1"), statements.request_id.encode("latin-1")))
+                message["headers"] = headers
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            _observe(statements)
@@ -113,4 +113,6 @@ class AccountInterface(EntityInterface):
     search = account_search
     endpoint = "accounts"
     model = Account
-    cache_ttl = 180  # 3 minutes cache for account data
\ No newline at end of file
+    cache_ttl = 180  # 3 minutes cache for account data
+    bulk_upsert_keys = ("provider", "type", "provider_account_id")
+    filter_fields = ("provider_account_id", "user_id")
@@ -1,11 +1,18 @@
 from abc import ABC
 from datetime import datetime
+from enum import Enum
 from typing import List, Optional, Any
 from pydantic import BaseModel, Field, field_validator, ConfigDict
 
 class ListQuery(BaseModel):
     skip: Optional[int] = 0
     limit: Optional[int] = 100
+    # Opaque X-Next-Cursor value of the previous page; replaces skip
+    cursor: Optional[str] = None
+    # Count all matches instead of estimating X-Total-Count from planner statistics
+    exact_total: Optional[bool] = False
+    # JSON filter expression (see interface/filter.py) over the filter_fields of the interface
+    filter: Optional[str] = None
 
 ACTIONS = {
     "create":  "create",
@@ -29,6 +36,19 @@ class EntityInterface(ABC):
     post_create: Any = None
     post_update: Any = None
 
+    # Unique columns used as ON CONFLICT target; enables the /bulk upsert route
+    bulk_upsert_keys: Optional[tuple[str, ...]] = None
+
+    # Fields the filter parameter of list may use: columns ("course_id"), columns of
+    # related models ("user.email") and JSONB paths ("properties.gitlab.url"), a
+    # trailing ".*" allows every path below an entry. None disables filtering.
+    filter_fields: Optional[tuple[str, ...]] = None
+
+    # Unique sort key of cursor pagination, "-" marks descending columns, defaults
+    # to ("created_at", "id"). An ordering applied by search must be a prefix of it;
+    # otherwise the list is paged by offset and a cursor is rejected with 400.
+    cursor_keys: Optional[tuple[str, ...]] = None
+
     def claim_values(self) -> List[tuple[str,str]]:
         model = self.model
         claims = []
@@ -48,3 +68,23 @@ class BaseEntityList(BaseModel):
 class BaseEntityGet(BaseEntityList):
     created_by: Optional[str] = None
     updated_by: Optional[str] = None
+
+class BulkUpsertStatus(str, Enum):
+    created = "created"
+    updated = "updated"
+    invalid = "invalid"
+    forbidden = "forbidden"
+    duplicate = "duplicate"
+    failed = "failed"
+
+class BulkUpsertRowResult(BaseModel):
+    index: int = Field(description="Position of the row in the request")
+    status: BulkUpsertStatus
+    id: Optional[str] = None
+    detail: Optional[Any] = None
+
+class BulkUpsertResponse(BaseModel):
+    created: int = 0
+    updated: int = 0
+    failed: int = 0
+    results: List[BulkUpsertRowResult] = Field(default_factory=list)
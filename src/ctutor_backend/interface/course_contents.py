@@ -400,6 +400,7 @@ class CourseContentInterface(EntityInterface):
     endpoint = "course-contents"
     model = CourseContent
     cache_ttl = 300  # 5 minutes cache for course content data
+    filter_fields = ("course_id", "course_content_type_id", "path", "position", "archived_at", "properties.gitlab.directory", "course_content_type.course_content_kind_id")
     post_create = post_create
     post_update = post_update
 
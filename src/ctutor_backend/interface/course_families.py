@@ -99,4 +99,5 @@ class CourseFamilyInterface(EntityInterface):
     search = course_family_search
     endpoint = "course-families"
     model = CourseFamily
-    cache_ttl=60
\ No newline at end of file
+    cache_ttl=60
+    filter_fields = ("organization_id", "path", "properties.gitlab.full_path", "properties.gitlab.group_id")
@@ -200,4 +200,6 @@ class CourseMemberInterface(EntityInterface):
     endpoint = "course-members"
     model = CourseMember
     post_create = post_create
-    cache_ttl = 300  # 5 minutes - membership changes moderately frequently
\ No newline at end of file
+    cache_ttl = 300  # 5 minutes - membership changes moderately frequently
+    filter_fields = ("user_id", "course_id", "course_group_id", "course_role_id", "properties.gitlab.url", "properties.gitlab.full_path", "user.email", "user.username")
+    bulk_upsert_keys = ("user_id", "course_id")
\ No newline at end of file
@@ -91,9 +91,9 @@ def course_search(db: Session, query, params: Optional[CourseQuery]):
     if params.organization_id != None:
         query = query.filter(Course.organization_id == params.organization_id)
     if params.provider_url != None:
-         query = query.filter(Course.properties["gitlab"].op("->>")("url") == params.provider_url)
+         query = query.filter(Course.gitlab_url == params.provider_url)
     if params.full_path != None:
-        query = query.filter(Course.properties["gitlab"].op("->>")("full_path") == params.full_path)
+        query = query.filter(Course.gitlab_full_path == params.full_path)
     return query
 
 class CourseInterface(EntityInterface):
@@ -105,4 +105,5 @@ class CourseInterface(EntityInterface):
     search = course_search
     endpoint = "courses"
     model = Course
-    cache_ttl = 300  # 5 minutes - course data changes moderately frequently
\ No newline at end of file
+    cache_ttl = 300  # 5 minutes - course data changes moderately frequently
+    filter_fields = ("course_family_id", "organization_id", "path", "properties.gitlab.url", "properties.gitlab.full_path", "properties.gitlab.group_id")
@@ -28,6 +28,7 @@ class DeploymentMetadata(BaseModel):
     git_commit: Optional[str] = Field(None, description="Git commit hash")
     error_details: Optional[Dict[str, Any]] = Field(None, description="Error details if deployment failed")
     migrated_properties: Optional[Dict[str, Any]] = Field(None, description="Properties migrated from old schema")
+    template_manifest: Optional[Dict[str, Any]] = Field(None, description="Inputs of the last student template generation")
     
     model_config = ConfigDict(extra='allow')
 
@@ -1,8 +1,11 @@
+from itertools import count
+from functools import lru_cache
 from pydantic import BaseModel, Field
-from typing import Any, List, Union
-from sqlalchemy import and_, or_, String
+from typing import Any, List, Optional, Union
+from sqlalchemy import and_, or_, bindparam
 from sqlalchemy.orm.relationships import RelationshipProperty
 from sqlalchemy.dialects.postgresql import JSONB
+from ctutor_backend.model.jsonb import jsonb_path
 
 class FilterBase(BaseModel):
     pass
@@ -66,94 +69,163 @@ FilterSchema = Union[
 AndFilter.model_rebuild()
 OrFilter.model_rebuild()
 
+class FilterError(ValueError):
+    pass
+
+# Operators taking one bound value, see _compile_condition for the others
+OPERATORS = {
+    "startswith": lambda column, value: column.startswith(value),
+    "endswith": lambda column, value: column.endswith(value),
+    "contains": lambda column, value: column.contains(value),
+    "eq": lambda column, value: column == value,
+    "neq": lambda column, value: column != value,
+    "gt": lambda column, value: column > value,
+    "geq": lambda column, value: column >= value,
+    "lt": lambda column, value: column < value,
+    "leq": lambda column, value: column <= value,
+    "like": lambda column, value: column.like(value),
+    "ilike": lambda column, value: column.ilike(value),
+}
+LIST_OPERATORS = {"in", "not_in"}
+NULL_OPERATORS = {"is_null", "not_null"}
+
 def get_jsonb_field(model, path):
-    keys:list = path.split(".")
-    column = getattr(model, keys[0])
-    i = 1
-    for key in keys[1:]:
-        if i != len(keys)-1:
-            column = (column.op('->')(key)).cast(JSONB)
-        else:
-            column = column.op('->>')(key).cast(String)
-        i += 1
-
-    return column
-
-def apply_filters(query, model, filters: dict):
-    if "or" in filters:
-        or_conditions = [apply_filters(query, model, sub_filter) for sub_filter in filters["or"]]
-        return or_(*or_conditions)
-
-    if "and" in filters:
-        and_conditions = [apply_filters(query, model, sub_filter) for sub_filter in filters["and"]]
-        return and_(*and_conditions)
-
-    filter_conditions = []
-    for field, condition in filters.items():
-
-        if isinstance(condition, dict):
-
-            field_splitted = field.split(".")
-            json_field = True if len(field_splitted) > 1 else False
-
-            if json_field:
-                column = get_jsonb_field(model, field)
-
-            else:
-                column = getattr(model, field)
-
-                if isinstance(column.property, RelationshipProperty):
-
-                    related_model = column.property.mapper.class_
-
-                    filter_conditions.append(apply_filters(query,related_model,condition))
-
-                    continue
-
-            for operator, value in condition.items():
-
-                if operator == "startswith":
-                    filter_conditions.append(column.startswith(value))
-                elif operator == "endswith":
-                    filter_conditions.append(column.endswith(value))
-                elif operator == "contains":
-                    filter_conditions.append(column.contains(value))
-                elif operator == "eq":
-                    filter_conditions.append(column == value)
-                elif operator == "neq":
-                    filter_conditions.append(column != value)
-                elif operator == "gt":
-                    filter_conditions.append(column > value)
-                elif operator == "geq":
-                    filter_conditions.append(column >= value)
-                elif operator == "lt":
-                    filter_conditions.append(column < value)
-                elif operator == "leq":
-                    filter_conditions.append(column <= value)
-                elif operator == 'in':
-                    filter_conditions.append(column.in_(value))
-                elif operator == 'not_in':
-                    filter_conditions.append(~column.in_(value))
-                elif operator == 'like':
-                    filter_conditions.append(column.like(value))
-                elif operator == 'ilike':
-                    filter_conditions.append(column.ilike(value))
-                elif operator == 'between':
-                    filter_conditions.append(column.between(value[0], value[1]))
-                elif operator == 'is_null':
-                    filter_conditions.append(column.is_(None))
-                elif operator == 'not_null':
-                    filter_conditions.append(column.isnot(None))
-
-        else:
-            field_splitted = field.split(".")
-            json_field = True if len(field_splitted) > 1 else False
-                
-            if json_field:
-                column = get_jsonb_field(model, field)
-                filter_conditions.append(column == condition)
-            else:
-                column = getattr(model, field)
-                filter_conditions.append(column == condition)
-
-    return and_(*filter_conditions) if filter_conditions else None
\ No newline at end of file
+    """``properties.gitlab.url`` as ``properties -> 'gitlab' ->> 'url'``, matching the promoted JSONB path indexes."""
+    column_name, json_path = path.split(".", 1)
+    column = getattr(model, column_name)
+
+    if not isinstance(column.type, JSONB):
+        raise FilterError(f"{column_name} is not a JSON column")
+
+    return jsonb_path(column, json_path)
+
+def allowed_field(path: str, allowed_fields) -> bool:
+    """
+    Whether ``path`` matches an entry of an EntityInterface.filter_fields.
+
+    Entries are column names (``course_id``), columns of related models
+    behind their relationship (``user.email``) and JSON paths below a JSONB
+    column (``properties.gitlab.url``). A trailing ``.*`` allows every path
+    below an entry (``properties.gitlab.*``). ``None`` allows everything.
+    """
+    if allowed_fields == None:
+        return True
+
+    for allowed in allowed_fields:
+        if path == allowed or (allowed.endswith(".*") and path.startswith(allowed[:-1])):
+            return True
+
+    return False
+
+def normalize_filters(model, filters: dict, allowed_fields: Optional[tuple] = None, prefix: str = "", values: Optional[list] = None) -> tuple[tuple, list]:
+    """
+    Split a filter dict into its shape and its values.
+
+    The shape is a hashable, canonical description of the filter (fields
+    sorted, values left out) and only depends on what is filtered, not by
+    which values. ``values`` holds the values in the order ``compile_filters``
+    binds them. Raises FilterError for unknown or not allowed fields and
+    operators, see ``allowed_field`` for the syntax of ``allowed_fields``.
+    """
+    values = [] if values == None else values
+
+    if "or" in filters or "and" in filters:
+        kind = "or" if "or" in filters else "and"
+        shapes = tuple(normalize_filters(model, sub_filter, allowed_fields, prefix, values)[0] for sub_filter in filters[kind])
+        return (kind, shapes), values
+
+    shapes = []
+    for field in sorted(filters):
+        condition = filters[field]
+        path = f"{prefix}{field}"
+
+        if "." not in field:
+            column = getattr(model, field, None)
+            if column is None or not hasattr(column, "property"):
+                raise FilterError(f"Unknown filter field {path}")
+
+            if isinstance(column.property, RelationshipProperty):
+                related_model = column.property.mapper.class_
+                # The fields of related models are checked one by one
+                shapes.append(("relationship", field, normalize_filters(related_model, condition, allowed_fields, f"{path}.", values)[0]))
+                continue
+        elif getattr(model, field.split(".")[0], None) is None:
+            raise FilterError(f"Unknown filter field {path}")
+
+        if not allowed_field(path, allowed_fields):
+            raise FilterError(f"Filtering by {path} is not allowed")
+
+        if not isinstance(condition, dict):
+            condition = {"eq": condition}
+
+        for operator in sorted(condition):
+            value = condition[operator]
+
+            if operator in OPERATORS:
+                values.append(value)
+            elif operator in LIST_OPERATORS:
+                values.append(list(value))
+            elif operator == "between":
+                if not isinstance(value, (list, tuple)) or len(value) != 2:
+                    raise FilterError(f"between of {path} needs two values")
+                values.extend(value)
+            elif operator not in NULL_OPERATORS:
+                raise FilterError(f"Unknown filter operator {operator}")
+
+            shapes.append(("condition", field, operator))
+
+    return ("and", tuple(shapes)), values
+
+def _compile_condition(model, field: str, operator: str, parameters):
+    column = get_jsonb_field(model, field) if "." in field else getattr(model, field)
+
+    def parameter(expanding: bool = False):
+        return bindparam(f"filter_{next(parameters)}", type_=column.type, expanding=expanding)
+
+    if operator in OPERATORS:
+        return OPERATORS[operator](column, parameter())
+    elif operator == "in":
+        return column.in_(parameter(expanding=True))
+    elif operator == "not_in":
+        return ~column.in_(parameter(expanding=True))
+    elif operator == "between":
+        return column.between(parameter(), parameter())
+    elif operator == "is_null":
+        return column.is_(None)
+    else:
+        return column.isnot(None)
+
+def _compile_shape(model, shape: tuple, parameters):
+    kind = shape[0]
+
+    if kind == "relationship":
+        relationship = getattr(model, shape[1])
+        criterion = _compile_shape(relationship.property.mapper.class_, shape[2], parameters)
+        return relationship.any(criterion) if relationship.property.uselist else relationship.has(criterion)
+
+    if kind == "condition":
+        return _compile_condition(model, shape[1], shape[2], parameters)
+
+    clauses = [_compile_shape(model, sub_shape, parameters) for sub_shape in shape[1]]
+    return or_(*clauses) if kind == "or" else and_(*clauses)
+
+@lru_cache(maxsize=1024)
+def compile_filters(model, shape: tuple):
+    """
+    SQL expression of a filter shape with ``filter_<n>`` bind parameters.
+
+    Expressions are built once per model and shape, so every request with
+    the same filter shape reuses the same statement structure and only
+    binds its values.
+    """
+    return _compile_shape(model, shape, count())
+
+def apply_filters(query, model, filters: dict, allowed_fields: Optional[tuple] = None):
+    shape, values = normalize_filters(model, filters, allowed_fields)
+
+    if shape == ("and", ()):
+        return query
+
+    return query.filter(compile_filters(model, shape)).params(
+        **{f"filter_{index}": value for index, value in enumerate(values)}
+    )
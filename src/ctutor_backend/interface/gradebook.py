@@ -0,0 +1,44 @@
+from pydantic import BaseModel, Field
+from typing import Optional
+
+
+class GradebookQuery(BaseModel):
+    limit: int = Field(100, ge=1, le=1000)
+    cursor: Optional[str] = None
+    course_role_id: Optional[str] = "_student"
+
+
+class GradebookContent(BaseModel):
+    id: str
+    path: str
+    title: Optional[str] = None
+
+
+class GradebookMember(BaseModel):
+    id: str
+    user_id: str
+    course_group_id: Optional[str] = None
+    given_name: Optional[str] = None
+    family_name: Optional[str] = None
+    username: Optional[str] = None
+
+
+class GradebookGet(BaseModel):
+    """
+    Members x contents matrix of a course in columnar form.
+
+    ``members`` are the rows and ``contents`` the columns of every matrix:
+    ``latest_result[i][j]`` belongs to ``members[i]`` and ``contents[j]``.
+    Cells without any submission activity are ``null`` (or ``0`` for counts).
+    """
+    course_id: str
+    contents: list[GradebookContent]
+    members: list[GradebookMember]
+
+    latest_result: list[list[Optional[float]]]
+    best_result: list[list[Optional[float]]]
+    submission_count: list[list[int]]
+    grading_status: list[list[Optional[int]]]
+    grading: list[list[Optional[float]]]
+
+    next_cursor: Optional[str] = None
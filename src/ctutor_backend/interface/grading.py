@@ -148,6 +148,7 @@ class CourseSubmissionGroupGradingInterface(EntityInterface):
     search = grading_search
     endpoint = "submission-group-gradings"
     model = CourseSubmissionGroupGrading
+    cursor_keys = ("-created_at", "-id")
     cache_ttl = 60  # 1 minute - gradings may change frequently
 
 
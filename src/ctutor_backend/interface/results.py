@@ -205,6 +205,7 @@ class ResultInterface(EntityInterface):
     search = result_search
     endpoint = "results"
     model = Result
+    cursor_keys = ("-created_at", "-id")
     cache_ttl = 60  # 1 minute - results change frequently as students submit work
 
 
@@ -172,11 +172,11 @@ def course_content_student_search(db: Session, query, params: Optional[CourseCon
 
     # TODO: only for gitlab courses. This has to be checked
     if params.directory != None:
-         query = query.filter(CourseContent.properties["gitlab"].op("->>")("directory") == params.directory)
+         query = query.filter(CourseContent.gitlab_directory == params.directory)
     if params.project != None:
-         query = query.filter(CourseMember.properties["gitlab"].op("->>")("full_path") == params.project)
+         query = query.filter(CourseMember.gitlab_full_path == params.project)
     if params.provider_url != None:
-         query = query.filter(CourseMember.properties["gitlab"].op("->>")("url") == params.provider_url)
+         query = query.filter(CourseMember.gitlab_url == params.provider_url)
 
     if params.nlevel != None:
         query = query.filter(func.nlevel(CourseContent.path) == params.nlevel)
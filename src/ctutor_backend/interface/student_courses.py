@@ -69,11 +69,11 @@ def course_student_search(db: Session, query, params: Optional[CourseStudentQuer
         query = query.filter(Course.organization_id == params.organization_id)
 
     if params.provider_url != None:
-        query = query.filter(Course.properties["gitlab"].op("->>")("url") == params.provider_url)
+        query = query.filter(Course.gitlab_url == params.provider_url)
     if params.full_path != None:
-        query = query.filter(Course.properties["gitlab"].op("->>")("full_path") == params.full_path)
+        query = query.filter(Course.gitlab_full_path == params.full_path)
     if params.full_path_student != None:
-        query = query.join(CourseMember,CourseMember.course_id == Course.id).filter(CourseMember.properties["gitlab"].op("->>")("full_path") == params.full_path_student)
+        query = query.join(CourseMember,CourseMember.course_id == Course.id).filter(CourseMember.gitlab_full_path == params.full_path_student)
 
     return query
 
@@ -199,3 +199,14 @@ class GenerateAssignmentsResponse(BaseModel):
     workflow_id: str
     status: str = "started"
     contents_to_process: int
+
+
+class ProvisionStudentRepositoriesRequest(BaseModel):
+    """Request to create the missing student repositories of a course."""
+    course_member_ids: Optional[List[str]] = Field(default=None, description="Restrict to these course members")
+
+
+class ProvisionStudentRepositoriesResponse(BaseModel):
+    workflow_id: str
+    status: str = "started"
+    members_to_process: int
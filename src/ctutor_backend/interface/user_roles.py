@@ -42,4 +42,5 @@ class UserRoleInterface(EntityInterface):
     query = UserRoleQuery
     search = user_role_search
     endpoint = "user-roles"
-    model = UserRole
\ No newline at end of file
+    model = UserRole
+    filter_fields = ("user_id",)
@@ -216,6 +216,8 @@ class UserInterface(EntityInterface):
     endpoint = "users"
     model = User
     cache_ttl = 300  # 5 minutes cache for user data
+    bulk_upsert_keys = ("email",)
+    filter_fields = ("email", "username")
 
 
 def replace_special_chars(name: str) -> str:
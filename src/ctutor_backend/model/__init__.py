@@ -14,7 +14,8 @@ from .course import (
     CourseSubmissionGroup,
     CourseSubmissionGroupMember,
     CourseSubmissionGroupGrading,
-    CourseMemberComment
+    CourseMemberComment,
+    CourseMemberContentProgress
 )
 from .execution import ExecutionBackend
 from .result import Result
@@ -52,6 +53,7 @@ __all__ = [
     'CourseSubmissionGroupMember',
     'CourseSubmissionGroupGrading',
     'CourseMemberComment',
+    'CourseMemberContentProgress',
     # Execution
     'ExecutionBackend',
     # Result
@@ -15,6 +15,7 @@ except ImportError:
     from ctutor_backend.custom_types import LtreeType
 
 from .base import Base
+from .jsonb import jsonb_path_index, promoted_jsonb_path
 
 if TYPE_CHECKING:
     from .result import Result
@@ -63,6 +64,8 @@ class CourseFamily(Base):
     __tablename__ = 'course_family'
     __table_args__ = (
         Index('course_family_path_key', 'organization_id', 'path', unique=True),
+        jsonb_path_index('course_family_gitlab_full_path_idx', 'gitlab.full_path'),
+        jsonb_path_index('course_family_gitlab_group_id_idx', 'gitlab.group_id'),
     )
 
     id = Column(UUID, primary_key=True, server_default=text("uuid_generate_v4()"))
@@ -77,6 +80,10 @@ class CourseFamily(Base):
     path = Column(LtreeType, nullable=False)
     organization_id = Column(ForeignKey('organization.id', ondelete='CASCADE', onupdate='RESTRICT'), nullable=False)
 
+    # Promoted JSONB paths, indexed through jsonb_path_index above
+    gitlab_full_path = promoted_jsonb_path('gitlab.full_path')
+    gitlab_group_id = promoted_jsonb_path('gitlab.group_id')
+
     # Relationships
     created_by_user = relationship('User', foreign_keys=[created_by])
     updated_by_user = relationship('User', foreign_keys=[updated_by])
@@ -88,6 +95,9 @@ class Course(Base):
     __tablename__ = 'course'
     __table_args__ = (
         Index('course_path_key', 'course_family_id', 'path', unique=True),
+        jsonb_path_index('course_gitlab_url_idx', 'gitlab.url'),
+        jsonb_path_index('course_gitlab_full_path_idx', 'gitlab.full_path'),
+        jsonb_path_index('course_gitlab_group_id_idx', 'gitlab.group_id'),
     )
 
     id = Column(UUID, primary_key=True, server_default=text("uuid_generate_v4()"))
@@ -103,6 +113,11 @@ class Course(Base):
     course_family_id = Column(ForeignKey('course_family.id', ondelete='CASCADE', onupdate='RESTRICT'), nullable=False)
     organization_id = Column(ForeignKey('organization.id', ondelete='CASCADE', onupdate='RESTRICT'), nullable=False)
 
+    # Promoted JSONB paths, indexed through jsonb_path_index above
+    gitlab_url = promoted_jsonb_path('gitlab.url')
+    gitlab_full_path = promoted_jsonb_path('gitlab.full_path')
+    gitlab_group_id = promoted_jsonb_path('gitlab.group_id')
+
     # Relationships
     course_family = relationship('CourseFamily', back_populates='courses')
     created_by_user = relationship('User', foreign_keys=[created_by])
@@ -196,6 +211,7 @@ class CourseContent(Base):
                            ['course_content_type.course_id', 'course_content_type.id'], 
                            ondelete='RESTRICT', onupdate='RESTRICT'),
         Index('course_content_path_key', 'course_id', 'path', unique=True),
+        jsonb_path_index('course_content_gitlab_directory_idx', 'gitlab.directory'),
         CheckConstraint("path::text ~ '^[a-z0-9_]+(\\.[a-z0-9_]+)*$'", name='course_content_path_format')
         # Note: Example-submittable validation is enforced by database trigger
         # validate_course_content_example_submittable_trigger
@@ -224,6 +240,9 @@ class CourseContent(Base):
     example_version_id = Column(UUID, ForeignKey('example_version.id', ondelete='SET NULL'), nullable=True)
     
 
+    # Promoted JSONB paths, indexed through jsonb_path_index above
+    gitlab_directory = promoted_jsonb_path('gitlab.directory')
+
     # Relationships
     course_content_type = relationship("CourseContentType", foreign_keys=[course_content_type_id], back_populates="course_contents", lazy="select")
     course = relationship('Course', foreign_keys=[course_id], back_populates='course_contents')
@@ -290,7 +309,9 @@ class CourseMember(Base):
         ForeignKeyConstraint(['course_id', 'course_group_id'], 
                            ['course_group.course_id', 'course_group.id'], 
                            ondelete='RESTRICT', onupdate='RESTRICT'),
-        Index('course_member_key', 'user_id', 'course_id', unique=True)
+        Index('course_member_key', 'user_id', 'course_id', unique=True),
+        jsonb_path_index('course_member_gitlab_url_idx', 'gitlab.url'),
+        jsonb_path_index('course_member_gitlab_full_path_idx', 'gitlab.full_path'),
     )
 
     id = Column(UUID, primary_key=True, server_default=text("uuid_generate_v4()"))
@@ -305,6 +326,10 @@ class CourseMember(Base):
     course_group_id = Column(ForeignKey('course_group.id', ondelete='RESTRICT', onupdate='RESTRICT'))
     course_role_id = Column(ForeignKey('course_role.id', ondelete='CASCADE', onupdate='RESTRICT'), nullable=False)
 
+    # Promoted JSONB paths, indexed through jsonb_path_index above
+    gitlab_url = promoted_jsonb_path('gitlab.url')
+    gitlab_full_path = promoted_jsonb_path('gitlab.full_path')
+
     # Relationships
     course_group = relationship('CourseGroup', foreign_keys=[course_group_id], back_populates='course_members')
     course = relationship("Course", foreign_keys=[course_id], back_populates="course_members", lazy="select")
@@ -494,3 +519,56 @@ class CourseMemberComment(Base):
     course_member = relationship("CourseMember", foreign_keys=[course_member_id], back_populates="comments_received", lazy="select")
     created_by_user = relationship('User', foreign_keys=[created_by])
     updated_by_user = relationship('User', foreign_keys=[updated_by])
+
+
+class CourseMemberContentProgress(Base):
+    """
+    Denormalized progress of a course member on a course content.
+
+    Read model behind the student course-content views. Rows are maintained
+    by database triggers on result, course_submission_group_grading,
+    course_submission_group_member, message and message_read (see the
+    ``ctutor_refresh_member_content_progress`` function), so they are always
+    consistent with the transaction that changed the source rows. Unread
+    counters are relative to the member's own user.
+    """
+    __tablename__ = 'course_member_content_progress'
+    __table_args__ = (
+        Index('course_member_content_progress_content_idx', 'course_content_id'),
+        Index('course_member_content_progress_course_member_idx', 'course_id', 'course_member_id'),
+        # Rows are written by the ctutor_progress_* triggers on these tables, see api/cache.py
+        {'info': {'maintained_by_triggers_on': (
+            'result', 'course_submission_group_grading', 'course_submission_group_member',
+            'course_submission_group', 'message', 'message_read', 'course_member',
+        )}},
+    )
+
+    course_member_id = Column(ForeignKey('course_member.id', ondelete='CASCADE', onupdate='RESTRICT'), primary_key=True)
+    course_content_id = Column(ForeignKey('course_content.id', ondelete='CASCADE', onupdate='RESTRICT'), primary_key=True)
+    course_id = Column(ForeignKey('course.id', ondelete='CASCADE', onupdate='RESTRICT'), nullable=False)
+    course_submission_group_id = Column(ForeignKey('course_submission_group.id', ondelete='SET NULL', onupdate='RESTRICT'))
+
+    latest_result_id = Column(ForeignKey('result.id', ondelete='SET NULL', onupdate='RESTRICT'))
+    latest_result_at = Column(DateTime(True))
+    latest_submitted_result_id = Column(ForeignKey('result.id', ondelete='SET NULL', onupdate='RESTRICT'))
+    latest_submitted_result_at = Column(DateTime(True))
+    best_result = Column(Float(53))
+    result_count = Column(Integer, nullable=False, server_default=text("0"))
+    submitted_count = Column(Integer, nullable=False, server_default=text("0"))
+
+    latest_grading_id = Column(ForeignKey('course_submission_group_grading.id', ondelete='SET NULL', onupdate='RESTRICT'))
+    grading_status = Column(Integer)
+    grading = Column(Float(53))
+
+    content_unread_count = Column(Integer, nullable=False, server_default=text("0"))
+    submission_group_unread_count = Column(Integer, nullable=False, server_default=text("0"))
+
+    updated_at = Column(DateTime(True), nullable=False, server_default=text("now()"))
+
+    # Relationships
+    course_member = relationship('CourseMember')
+    course_content = relationship('CourseContent')
+    course_submission_group = relationship('CourseSubmissionGroup')
+    latest_result = relationship('Result', foreign_keys=[latest_result_id])
+    latest_submitted_result = relationship('Result', foreign_keys=[latest_submitted_result_id])
+    latest_grading = relationship('CourseSubmissionGroupGrading')
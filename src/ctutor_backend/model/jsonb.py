@@ -0,0 +1,53 @@
+import json
+from sqlalchemy import Index, text
+from sqlalchemy.ext.hybrid import hybrid_property
+
+
+def jsonb_path(column, path: str):
+    """
+    Text value at the dotted ``path`` of a JSONB column.
+
+    Renders as ``properties -> 'gitlab' ->> 'url'``, the same expression the
+    indexes of ``jsonb_path_index`` are built on.
+    """
+    *parents, leaf = path.split(".")
+    for key in parents:
+        column = column[key]
+    return column[leaf].astext
+
+
+def jsonb_path_sql(path: str, column: str = "properties") -> str:
+    *parents, leaf = path.split(".")
+    expression = column
+    for key in parents:
+        expression = f"({expression} -> '{key}')"
+    return f"({expression} ->> '{leaf}')"
+
+
+def jsonb_path_index(name: str, path: str, column: str = "properties") -> Index:
+    """Expression index on a promoted JSONB path, for ``__table_args__``."""
+    return Index(name, text(jsonb_path_sql(path, column)))
+
+
+def promoted_jsonb_path(path: str, column: str = "properties") -> hybrid_property:
+    """
+    Read-only accessor of a promoted JSONB path.
+
+    On instances it returns the value like ``->>`` does, as text or None. On
+    the class it is the indexed SQL expression, so
+    ``Course.gitlab_url == url`` can use ``course_gitlab_url_idx``.
+    """
+    keys = path.split(".")
+
+    def getter(self):
+        value = getattr(self, column)
+        for key in keys:
+            value = value.get(key) if isinstance(value, dict) else None
+        if value is None:
+            return None
+        return json.dumps(value) if isinstance(value, (dict, list, bool)) else str(value)
+
+    def expression(cls):
+        return jsonb_path(getattr(cls, column), path)
+
+    return hybrid_property(getter, expr=expression)
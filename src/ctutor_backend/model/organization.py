@@ -11,6 +11,7 @@ except ImportError:
     from ctutor_backend.custom_types import LtreeType
 
 from .base import Base
+from .jsonb import jsonb_path_index, promoted_jsonb_path
 
 
 class Organization(Base):
@@ -19,7 +20,10 @@ class Organization(Base):
         CheckConstraint("((organization_type = 'user'::organization_type) AND (title IS NULL)) OR ((organization_type <> 'user'::organization_type) AND (title IS NOT NULL))"),
         CheckConstraint("((organization_type = 'user'::organization_type) AND (user_id IS NOT NULL)) OR ((organization_type <> 'user'::organization_type) AND (user_id IS NULL))"),
         Index('organization_path_key', 'organization_type', 'path', unique=True),
-        Index('organization_number_key', 'organization_type', 'number', unique=True)
+        Index('organization_number_key', 'organization_type', 'number', unique=True),
+        jsonb_path_index('organization_gitlab_url_idx', 'gitlab.url'),
+        jsonb_path_index('organization_gitlab_full_path_idx', 'gitlab.full_path'),
+        jsonb_path_index('organization_gitlab_group_id_idx', 'gitlab.group_id'),
     )
 
     id = Column(UUID, primary_key=True, server_default=text("uuid_generate_v4()"))
@@ -52,6 +56,11 @@ class Organization(Base):
         END
     ''', persisted=True))
 
+    # Promoted JSONB paths, indexed through jsonb_path_index above
+    gitlab_url = promoted_jsonb_path('gitlab.url')
+    gitlab_full_path = promoted_jsonb_path('gitlab.full_path')
+    gitlab_group_id = promoted_jsonb_path('gitlab.group_id')
+
     # Relationships
     created_by_user = relationship('User', foreign_keys=[created_by])
     updated_by_user = relationship('User', foreign_keys=[updated_by])
@@ -17,7 +17,9 @@ class Result(Base):
         Index('result_version_identifier_member_content_partial_key', 'course_member_id', 'version_identifier', 'course_content_id',
               unique=True, postgresql_where=text('status NOT IN (1, 2, 6)')),
         Index('result_version_identifier_group_content_partial_key', 'course_submission_group_id', 'version_identifier', 'course_content_id',
-              unique=True, postgresql_where=text('status NOT IN (1, 2, 6)'))
+              unique=True, postgresql_where=text('status NOT IN (1, 2, 6)')),
+        # Latest submission per group, used by the tutor and gradebook views
+        Index('result_submission_group_submit_status_created_idx', 'course_submission_group_id', 'submit', 'status', 'created_at')
     )
 
     id = Column(UUID, primary_key=True, server_default=text("uuid_generate_v4()"))
@@ -25,6 +25,7 @@ from ctutor_backend.model.auth import Account, User
 from ctutor_backend.model.role import UserRole
 from ctutor_backend.api.exceptions import NotFoundException, UnauthorizedException
 from ctutor_backend.redis_cache import get_redis_client
+from ctutor_backend.instrumentation import set_request_principal
 import logging
 
 # Import refactored permission components
@@ -279,7 +280,7 @@ async def get_current_principal(
             )
             
             # Build Principal without caching for basic auth
-            return PrincipalBuilder.build(auth_result, db)
+            principal = PrincipalBuilder.build(auth_result, db)
         
         elif isinstance(credentials, GLPAuthConfig):
             auth_result = AuthenticationService.authenticate_gitlab(credentials, db)
@@ -289,7 +290,7 @@ async def get_current_principal(
                 f"{credentials.url}::{credentials.token}".encode()
             ).hexdigest()
             
-            return await PrincipalBuilder.build_with_cache(auth_result, cache_key, db)
+            principal = await PrincipalBuilder.build_with_cache(auth_result, cache_key, db)
         
         elif isinstance(credentials, SSOAuthCredentials):
             auth_result = await AuthenticationService.authenticate_sso(
@@ -301,11 +302,14 @@ async def get_current_principal(
                 f"sso_permissions:{credentials.token}".encode()
             ).hexdigest()
             
-            return await PrincipalBuilder.build_with_cache(auth_result, cache_key, db)
+            principal = await PrincipalBuilder.build_with_cache(auth_result, cache_key, db)
         
         else:
             raise UnauthorizedException("Unknown authentication type")
 
+    set_request_principal(principal)
+    return principal
+
 
 # Backward compatibility aliases
 get_current_permissions = get_current_principal
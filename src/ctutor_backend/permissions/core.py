@@ -133,7 +133,7 @@ def check_course_permissions(permissions: Principal, entity: Any, course_role_id
     
     # Filter by course membership
     return CoursePermissionQueryBuilder.filter_by_course_membership(
-        db.query(entity), entity, permissions.user_id, course_role_id, db
+        db.query(entity), entity, permissions, course_role_id, db
     )
 
 
@@ -50,7 +50,7 @@ class UserPermissionHandler(PermissionHandler):
         
         # For list/get, users can see themselves and users in their courses (as tutor+)
         if action in ["list", "get"]:
-            return UserPermissionQueryBuilder.filter_visible_users(principal.user_id, db)
+            return UserPermissionQueryBuilder.filter_visible_users(principal, db)
         
         raise ForbiddenException(detail={"entity": self.resource_name})
 
@@ -155,7 +155,7 @@ class CoursePermissionHandler(PermissionHandler):
         min_role = self.ACTION_ROLE_MAP.get(action)
         if min_role:
             return CoursePermissionQueryBuilder.build_course_filtered_query(
-                self.entity, principal.user_id, min_role, db
+                self.entity, principal, min_role, db
             )
         
         raise ForbiddenException(detail={"entity": self.resource_name})
@@ -195,7 +195,7 @@ class OrganizationPermissionHandler(PermissionHandler):
         min_role = self.ACTION_ROLE_MAP.get(action)
         if min_role:
             return OrganizationPermissionQueryBuilder.filter_by_course_organization(
-                self.entity, principal.user_id, min_role, db
+                self.entity, principal, min_role, db
             )
         
         raise ForbiddenException(detail={"entity": self.resource_name})
@@ -238,10 +238,6 @@ class CourseFamilyPermissionHandler(PermissionHandler):
             
             cm_other = aliased(CourseMember)
             
-            subquery = CoursePermissionQueryBuilder.user_courses_subquery(
-                principal.user_id, min_role, db
-            )
-            
             query = (
                 db.query(self.entity)
                 .select_from(User)
@@ -249,7 +245,9 @@ class CourseFamilyPermissionHandler(PermissionHandler):
                 .outerjoin(Course, cm_other.course_id == Course.id)
                 .outerjoin(self.entity, self.entity.id == Course.course_family_id)
                 .filter(
-                    cm_other.course_id.in_(subquery)
+                    CoursePermissionQueryBuilder.user_courses_filter(
+                        cm_other.course_id, principal, min_role, db
+                    )
                 )
             )
             
@@ -341,16 +339,20 @@ class CourseContentTypePermissionHandler(PermissionHandler):
                     return db.query(self.entity).filter(self.entity.id == None)
             
             # For write operations, check role hierarchy
-            user_courses = CoursePermissionQueryBuilder.user_courses_subquery(
-                principal.user_id, min_role, db
-            )
+            claimed_courses = CoursePermissionQueryBuilder.claimed_course_ids(principal, min_role)
             
             # Check if user has required role in any course
-            has_required_role = db.query(
-                exists().where(
-                    CourseMember.course_id.in_(user_courses)
+            if claimed_courses is not None:
+                has_required_role = bool(claimed_courses)
+            else:
+                user_courses = CoursePermissionQueryBuilder.user_courses_subquery(
+                    principal.user_id, min_role, db
                 )
-            ).scalar()
+                has_required_role = db.query(
+                    exists().where(
+                        CourseMember.course_id.in_(user_courses)
+                    )
+                ).scalar()
             
             if has_required_role:
                 return db.query(self.entity)
@@ -416,17 +418,15 @@ class CourseContentPermissionHandler(PermissionHandler):
             
             cm_other = aliased(CourseMember)
             
-            subquery = CoursePermissionQueryBuilder.user_courses_subquery(
-                principal.user_id, min_role, db
-            )
-            
             query = (
                 db.query(self.entity)
                 .select_from(User)
                 .outerjoin(cm_other, cm_other.user_id == User.id)
                 .outerjoin(self.entity, self.entity.course_id == cm_other.course_id)
                 .filter(
-                    cm_other.course_id.in_(subquery)
+                    CoursePermissionQueryBuilder.user_courses_filter(
+                        cm_other.course_id, principal, min_role, db
+                    )
                 )
             )
             
@@ -488,10 +488,8 @@ class CourseMemberPermissionHandler(PermissionHandler):
             cm_other = aliased(CourseMember)
             
             # Base visibility: courses where user meets minimum role
-            base_filter = cm_other.course_id.in_(
-                CoursePermissionQueryBuilder.user_courses_subquery(
-                    principal.user_id, min_role, db
-                )
+            base_filter = CoursePermissionQueryBuilder.user_courses_filter(
+                cm_other.course_id, principal, min_role, db
             )
 
             filters = [base_filter]
@@ -586,10 +584,8 @@ class ResultPermissionHandler(PermissionHandler):
             else:
                 # For tutors/lecturers, filter by course membership with appropriate role
                 query = query.filter(
-                    CourseContent.course_id.in_(
-                        CoursePermissionQueryBuilder.user_courses_subquery(
-                            principal.user_id, min_role, db
-                        )
+                    CoursePermissionQueryBuilder.user_courses_filter(
+                        CourseContent.course_id, principal, min_role, db
                     )
                 )
             
@@ -703,35 +699,36 @@ class MessagePermissionHandler(PermissionHandler):
         filters.append(self.entity.course_id.in_(course_ids_subq))
 
         # Tutors/lecturers: include messages in courses where principal has required role
-        permitted_courses = CoursePermissionQueryBuilder.user_courses_subquery(principal.user_id, "_tutor", db)
-        if permitted_courses is not None:
-            # From course_member
-            filters.append(
-                self.entity.course_member_id.in_(
-                    db.query(CourseMember.id).filter(CourseMember.course_id.in_(permitted_courses))
-                )
-            )
-            # From submission group
-            filters.append(
-                self.entity.course_submission_group_id.in_(
-                    db.query(CourseSubmissionGroup.id).filter(CourseSubmissionGroup.course_id.in_(permitted_courses))
-                )
+        def permitted_courses(column):
+            return CoursePermissionQueryBuilder.user_courses_filter(column, principal, "_tutor", db)
+
+        # From course_member
+        filters.append(
+            self.entity.course_member_id.in_(
+                db.query(CourseMember.id).filter(permitted_courses(CourseMember.course_id))
             )
-            # From course group
-            filters.append(
-                self.entity.course_group_id.in_(
-                    db.query(CourseGroup.id).filter(CourseGroup.course_id.in_(permitted_courses))
-                )
+        )
+        # From submission group
+        filters.append(
+            self.entity.course_submission_group_id.in_(
+                db.query(CourseSubmissionGroup.id).filter(permitted_courses(CourseSubmissionGroup.course_id))
             )
-            # From course content
-            filters.append(
-                self.entity.course_content_id.in_(
-                    db.query(CourseContent.id).filter(CourseContent.course_id.in_(permitted_courses))
-                )
+        )
+        # From course group
+        filters.append(
+            self.entity.course_group_id.in_(
+                db.query(CourseGroup.id).filter(permitted_courses(CourseGroup.course_id))
             )
-            filters.append(
-                self.entity.course_id.in_(permitted_courses)
+        )
+        # From course content
+        filters.append(
+            self.entity.course_content_id.in_(
+                db.query(CourseContent.id).filter(permitted_courses(CourseContent.course_id))
             )
+        )
+        filters.append(
+            permitted_courses(self.entity.course_id)
+        )
 
         query = base.filter(or_(*filters))
 
@@ -1,8 +1,9 @@
-from typing import List, Type, Any
+from typing import List, Optional, Set, Type, Any
 from sqlalchemy.orm import Session, Query, aliased
-from sqlalchemy import or_, select
+from sqlalchemy import any_, bindparam, cast, or_, select
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
 from ctutor_backend.model.course import Course, CourseMember
-from ctutor_backend.permissions.principal import course_role_hierarchy
+from ctutor_backend.permissions.principal import Principal, course_role_hierarchy
 from ctutor_backend.model.auth import User
 
 
@@ -25,42 +26,71 @@ class CoursePermissionQueryBuilder:
             cm_alias.course_role_id.in_(cls.get_allowed_roles(minimum_role))
         )
     
+    @classmethod
+    def claimed_course_ids(cls, principal: Principal, minimum_role: str) -> Optional[Set[str]]:
+        """
+        Course IDs where the principal has at least the minimum role, taken
+        from its claims. Returns None when the principal carries no course
+        claims, so callers have to fall back to the database.
+        """
+        if principal.is_admin or "course" not in principal.claims.dependent:
+            return None
+        return principal.get_courses_with_role(minimum_role)
+
+    @classmethod
+    def user_courses_filter(cls, column, principal: Principal, minimum_role: str, db: Session):
+        """
+        Restrict a course id column to the courses where the principal has at
+        least the minimum role.
+
+        The course ids of the claims are bound as a single array parameter,
+        so the statement needs no course_member lookup and keeps the same
+        shape for any number of courses.
+        """
+        course_ids = cls.claimed_course_ids(principal, minimum_role)
+
+        if course_ids is None:
+            return column.in_(cls.user_courses_subquery(principal.user_id, minimum_role, db))
+
+        return column == any_(cast(
+            bindparam("permitted_course_ids", sorted(course_ids), unique=True),
+            ARRAY(UUID)
+        ))
+
     @classmethod
     def filter_by_course_membership(cls, query: Query, entity: Type[Any], 
-                                   user_id: str, minimum_role: str, 
+                                   principal: Principal, minimum_role: str, 
                                    db: Session) -> Query:
         """Filter query based on course membership"""
-        subquery = cls.user_courses_subquery(user_id, minimum_role, db)
-        
         # Check which foreign key the entity has
         table_keys = entity.__table__.columns.keys()
 
         if entity.__tablename__ == Course.__tablename__:
-            return query.filter(entity.id.in_(subquery))
+            return query.filter(cls.user_courses_filter(entity.id, principal, minimum_role, db))
         
         elif "course_id" in table_keys:
             # Direct course relationship
-            return query.filter(entity.course_id.in_(subquery))
+            return query.filter(cls.user_courses_filter(entity.course_id, principal, minimum_role, db))
         
         elif "course_content_id" in table_keys:
             # Indirect through CourseContent
             from ctutor_backend.model.course import CourseContent
             return (
                 query.join(CourseContent, CourseContent.id == entity.course_content_id)
-                .filter(CourseContent.course_id.in_(subquery))
+                .filter(cls.user_courses_filter(CourseContent.course_id, principal, minimum_role, db))
             )
         
         elif "course_member_id" in table_keys:
             # Indirect through CourseMember
             return (
                 query.join(CourseMember, CourseMember.id == entity.course_member_id)
-                .filter(CourseMember.course_id.in_(subquery))
+                .filter(cls.user_courses_filter(CourseMember.course_id, principal, minimum_role, db))
             )
         
         return query
     
     @classmethod
-    def build_course_filtered_query(cls, entity: Type[Any], user_id: str,
+    def build_course_filtered_query(cls, entity: Type[Any], principal: Principal,
                                    minimum_role: str, db: Session) -> Query:
         """Build a query filtered by course membership"""
         cm_other = aliased(CourseMember)
@@ -68,26 +98,24 @@ class CoursePermissionQueryBuilder:
         # Check if entity is Course or has course_id
         if entity.__name__ == 'Course':
             # For Course entity, use id field
-            subquery = cls.user_courses_subquery(user_id, minimum_role, db)
             query = (
                 db.query(entity)
                 .select_from(User)
                 .outerjoin(cm_other, cm_other.user_id == User.id)
                 .outerjoin(entity, entity.id == cm_other.course_id)
                 .filter(
-                    cm_other.course_id.in_(subquery)
+                    cls.user_courses_filter(cm_other.course_id, principal, minimum_role, db)
                 )
             )
         else:
             # For other entities with course_id field
-            subquery = cls.user_courses_subquery(user_id, minimum_role, db)
             query = (
                 db.query(entity)
                 .select_from(User)
                 .outerjoin(cm_other, cm_other.user_id == User.id)
                 .outerjoin(entity, entity.course_id == cm_other.course_id)
                 .filter(
-                    cm_other.course_id.in_(subquery)
+                    cls.user_courses_filter(cm_other.course_id, principal, minimum_role, db)
                 )
             )
         
@@ -98,13 +126,11 @@ class OrganizationPermissionQueryBuilder:
     """Utility class for building organization-related permission queries"""
     
     @classmethod
-    def filter_by_course_organization(cls, entity: Type[Any], user_id: str,
+    def filter_by_course_organization(cls, entity: Type[Any], principal: Principal,
                                      minimum_role: str, db: Session) -> Query:
         """Filter organizations based on course membership"""
         cm_other = aliased(CourseMember)
         
-        subquery = CoursePermissionQueryBuilder.user_courses_subquery(user_id, minimum_role, db)
-        
         query = (
             db.query(entity)
             .select_from(User)
@@ -112,7 +138,7 @@ class OrganizationPermissionQueryBuilder:
             .outerjoin(Course, cm_other.course_id == Course.id)
             .outerjoin(entity, entity.id == Course.organization_id)
             .filter(
-                cm_other.course_id.in_(subquery)
+                CoursePermissionQueryBuilder.user_courses_filter(cm_other.course_id, principal, minimum_role, db)
             )
         )
         
@@ -123,21 +149,18 @@ class UserPermissionQueryBuilder:
     """Utility class for building user-related permission queries"""
     
     @classmethod
-    def filter_visible_users(cls, user_id: str, db: Session) -> Query:
+    def filter_visible_users(cls, principal: Principal, db: Session) -> Query:
         """Filter users that are visible to the current user"""
         cm_other = aliased(CourseMember)
         
-        # Get the subquery for courses where user is at least a tutor
-        subquery = CoursePermissionQueryBuilder.user_courses_subquery(user_id, "_tutor", db)
-        
         # User can see themselves and other users in courses where they're at least a tutor
         query = (
             db.query(User)
             .outerjoin(cm_other, cm_other.user_id == User.id)
             .filter(
                 or_(
-                    User.id == user_id,
-                    cm_other.course_id.in_(subquery)
+                    User.id == principal.user_id,
+                    CoursePermissionQueryBuilder.user_courses_filter(cm_other.course_id, principal, "_tutor", db)
                 )
             )
             .distinct()
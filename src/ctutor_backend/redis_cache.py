@@ -1,4 +1,5 @@
 import os
+import redis
 from aiocache import Cache
 
 # Get Redis configuration from environment
@@ -16,4 +17,20 @@ _redis_cache = Cache(
 )
 
 async def get_redis_client() -> Cache:
-    return _redis_cache
\ No newline at end of file
+    return _redis_cache
+
+_sync_redis_client = None
+
+def get_sync_redis_client() -> redis.Redis:
+    """Blocking client on the same Redis, for code outside of an event loop, e.g. sync activities."""
+    global _sync_redis_client
+    if _sync_redis_client is None:
+        _sync_redis_client = redis.Redis(
+            host=REDIS_HOST,
+            port=REDIS_PORT,
+            password=REDIS_PASSWORD if REDIS_PASSWORD else None,
+            db=0,
+            socket_connect_timeout=2,
+            socket_timeout=2
+        )
+    return _sync_redis_client
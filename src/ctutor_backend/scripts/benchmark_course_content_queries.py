@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Benchmark the student and tutor course-content queries on a seeded course.
+
+For every sampled course member the list and detail queries are executed and
+mapped exactly like the endpoints do. Statement count, rows transferred from
+the database and latency are reported per endpoint, so eager loading
+strategies can be compared on realistic data. The student list is measured
+twice: with the progress table query the endpoint serves, and with the
+aggregating query it replaced.
+"""
+
+import os
+import sys
+import time
+import argparse
+import statistics
+from pathlib import Path
+from dotenv import load_dotenv
+from sqlalchemy import event
+
+# Add parent directories to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))  # ctutor_backend
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))  # src
+
+# Load environment variables
+env_path = Path(__file__).parent.parent.parent.parent / ".env"
+load_dotenv(env_path)
+
+from ctutor_backend.database import get_db
+from ctutor_backend.api.mappers import course_member_course_content_result_mapper
+from ctutor_backend.api.queries import (
+    course_member_course_content_list_query,
+    course_member_course_content_query,
+    user_course_content_list_query,
+    user_course_content_progress_list_query,
+    user_course_content_query,
+)
+from ctutor_backend.model.course import CourseContent, CourseMember
+
+
+class StatementCounter:
+    """Counts statements and fetched rows on a connection while attached."""
+
+    def __init__(self):
+        self.statements = 0
+        self.rows = 0
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements += 1
+        if cursor.rowcount is not None and cursor.rowcount > 0:
+            self.rows += cursor.rowcount
+
+
+def measure(db, name: str, run, samples: list, results: dict):
+    counter = StatementCounter()
+    connection = db.connection()
+    event.listen(connection, "after_cursor_execute", counter)
+
+    try:
+        for sample in samples:
+            # Start every sample from an empty identity map like a fresh request
+            db.expunge_all()
+            counter.statements = counter.rows = 0
+
+            start = time.perf_counter()
+            run(*sample)
+            elapsed = (time.perf_counter() - start) * 1000
+
+            results.setdefault(name, []).append((elapsed, counter.statements, counter.rows))
+    finally:
+        event.remove(connection, "after_cursor_execute", counter)
+
+
+def benchmark(db, course_id: str, members: int, repeat: int) -> dict:
+    course_members = db.query(CourseMember.id, CourseMember.user_id) \
+        .filter(CourseMember.course_id == course_id, CourseMember.course_role_id == "_student") \
+        .limit(members).all()
+
+    course_content = db.query(CourseContent.id) \
+        .filter(CourseContent.course_id == course_id, CourseContent.archived_at.is_(None)) \
+        .order_by(CourseContent.path).first()
+
+    if not course_members or course_content is None:
+        raise SystemExit(f"❌ Course {course_id} has no students or no course contents")
+
+    member_samples = [(str(member.id), str(member.user_id)) for member in course_members] * repeat
+
+    def student_list(course_member_id, user_id):
+        for row in user_course_content_progress_list_query(user_id, db).all():
+            course_member_course_content_result_mapper(row, db)
+
+    def student_list_aggregated(course_member_id, user_id):
+        for row in user_course_content_list_query(user_id, db).all():
+            course_member_course_content_result_mapper(row, db)
+
+    def student_get(course_member_id, user_id):
+        row = user_course_content_query(user_id, course_content.id, db)
+        course_member_course_content_result_mapper(row, db, detailed=True)
+
+    def tutor_list(course_member_id, user_id):
+        for row in course_member_course_content_list_query(course_member_id, db).all():
+            course_member_course_content_result_mapper(row, db)
+
+    def tutor_get(course_member_id, user_id):
+        row = course_member_course_content_query(course_member_id, course_content.id, db)
+        course_member_course_content_result_mapper(row, db, detailed=True)
+
+    results = {}
+    measure(db, "GET /students/course-contents", student_list, member_samples, results)
+    measure(db, "GET /students/course-contents (aggregating query)", student_list_aggregated, member_samples, results)
+    measure(db, "GET /students/course-contents/{id}", student_get, member_samples, results)
+    measure(db, "GET /tutors/course-members/{id}/course-contents", tutor_list, member_samples, results)
+    measure(db, "GET /tutors/course-members/{id}/course-contents/{id}", tutor_get, member_samples, results)
+
+    return results
+
+
+def report(results: dict):
+    print(f"{'endpoint':<55} {'p50 ms':>9} {'p95 ms':>9} {'stmts':>7} {'rows':>9}")
+    for name, samples in results.items():
+        latencies = sorted(sample[0] for sample in samples)
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+        statements = statistics.mean(sample[1] for sample in samples)
+        rows = statistics.mean(sample[2] for sample in samples)
+        print(f"{name:<55} {statistics.median(latencies):>9.1f} {p95:>9.1f} {statements:>7.1f} {rows:>9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the course-content list and detail queries')
+    parser.add_argument('--course-id', type=str, required=True, help='Seeded course to benchmark against')
+    parser.add_argument('--members', type=int, default=20, help='Number of students to sample (default: 20)')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per sampled student (default: 3)')
+    args = parser.parse_args()
+
+    print("⏱️  Benchmarking course-content queries")
+    print("=" * 50)
+
+    with next(get_db()) as db:
+        results = benchmark(db, args.course_id, args.members, args.repeat)
+        # Nothing is written, but never leave the read transaction open
+        db.rollback()
+
+    report(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Rebuild the course_member_content_progress read model.
+
+The table is kept up to date by database triggers. Run this after bulk data
+repairs, restores or imports that bypassed them, or to verify a course.
+"""
+
+import os
+import sys
+import argparse
+from pathlib import Path
+from dotenv import load_dotenv
+from sqlalchemy import text
+
+# Add parent directories to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))  # ctutor_backend
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))  # src
+
+# Load environment variables
+env_path = Path(__file__).parent.parent.parent.parent / ".env"
+load_dotenv(env_path)
+
+from ctutor_backend.database import get_db
+from ctutor_backend.model.course import Course
+
+
+def rebuild(db, course_id: str | None = None) -> int:
+    """Recompute the progress rows of one course, or of all courses."""
+    if course_id is not None:
+        course_ids = [course_id]
+    else:
+        course_ids = [str(row.id) for row in db.query(Course.id).all()]
+
+    for index, current_course_id in enumerate(course_ids, start=1):
+        # One transaction per course keeps lock times short on large installations
+        db.execute(
+            text("SELECT ctutor_refresh_member_content_progress(NULL, NULL, CAST(:course_id AS uuid))"),
+            {"course_id": current_course_id},
+        )
+        db.commit()
+        print(f"   [{index}/{len(course_ids)}] course {current_course_id}")
+
+    return len(course_ids)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Rebuild the per-member course content progress table')
+    parser.add_argument('--course-id', type=str, help='Only rebuild this course')
+    args = parser.parse_args()
+
+    print("🔄 Rebuilding course member progress")
+    print("=" * 50)
+
+    with next(get_db()) as db:
+        count = rebuild(db, args.course_id)
+
+    print("=" * 50)
+    print(f"✅ Rebuilt progress for {count} course(s)")
+
+
+if __name__ == "__main__":
+    main()
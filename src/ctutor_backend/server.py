@@ -39,6 +39,7 @@ from ctutor_backend.api.courses import course_router
 from ctutor_backend.api.system import system_router
 from ctutor_backend.api.course_contents import course_content_router
 from ctutor_backend.settings import settings 
+from ctutor_backend.instrumentation import PROMETHEUS_AVAILABLE, SQLInstrumentationMiddleware
 from ctutor_backend.api.students import student_router
 from ctutor_backend.api.results import result_router
 from ctutor_backend.api.tutor import tutor_router
@@ -185,9 +186,16 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
-    expose_headers=["X-Total-Count"],
+    expose_headers=["X-Total-Count", "X-Total-Count-Estimated", "X-Next-Cursor", "X-Request-ID", "Server-Timing"],
 )
 
+if settings.SQL_INSTRUMENTATION:
+    app.add_middleware(SQLInstrumentationMiddleware)
+
+    if PROMETHEUS_AVAILABLE:
+        from prometheus_client import make_asgi_app
+        app.mount("/metrics", make_asgi_app())
+
 CrudRouter(UserInterface).register_routes(app)
 CrudRouter(AccountInterface).register_routes(app)
 CrudRouter(GroupInterface).register_routes(app)
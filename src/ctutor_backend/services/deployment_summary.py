@@ -0,0 +1,120 @@
+"""
+Deployment summary of a course, cached in Redis.
+
+The summary is computed with two aggregate queries and cached under
+``course:{course_id}:deployment-summary``. Whoever changes the status of a
+deployment, the API or the student template workflow, invalidates the entry,
+so polling clients see the new numbers right away.
+``DEPLOYMENT_SUMMARY_CACHE_TTL`` only bounds how long changes made elsewhere,
+e.g. directly in the database, stay unnoticed.
+"""
+
+import os
+import logging
+from typing import Optional, Union
+from uuid import UUID
+from aiocache import BaseCache
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from ctutor_backend.interface.deployment import DeploymentSummary
+from ctutor_backend.model.course import CourseContent, CourseContentType, CourseContentKind
+from ctutor_backend.model.deployment import CourseContentDeployment
+from ctutor_backend.redis_cache import get_redis_client, get_sync_redis_client
+
+logger = logging.getLogger(__name__)
+
+DEPLOYMENT_SUMMARY_CACHE_TTL = int(os.environ.get("DEPLOYMENT_SUMMARY_CACHE_TTL", "300"))
+
+
+def deployment_summary_cache_key(course_id: Union[str, UUID]) -> str:
+    return f"course:{course_id}:deployment-summary"
+
+
+def compute_deployment_summary(db: Session, course_id: Union[str, UUID]) -> DeploymentSummary:
+    """Summary of the deployments of a course, counted in the database."""
+    submittable = CourseContentKind.submittable == True
+    total_content, submittable_content = db.query(
+        func.count(CourseContent.id),
+        func.count(CourseContent.id).filter(submittable)
+    ).outerjoin(
+        CourseContentType, CourseContent.course_content_type_id == CourseContentType.id
+    ).outerjoin(
+        CourseContentKind, CourseContentType.course_content_kind_id == CourseContentKind.id
+    ).filter(
+        CourseContent.course_id == course_id,
+        CourseContent.archived_at.is_(None)
+    ).one()
+
+    # Deployments of all contents, archived ones included, grouped by status
+    counts = {}
+    last_deployment = None
+    rows = db.query(
+        CourseContentDeployment.deployment_status,
+        func.count(CourseContentDeployment.id),
+        func.max(CourseContentDeployment.deployed_at)
+    ).join(
+        CourseContent, CourseContentDeployment.course_content_id == CourseContent.id
+    ).filter(
+        CourseContent.course_id == course_id
+    ).group_by(
+        CourseContentDeployment.deployment_status
+    ).all()
+    for deployment_status, count, deployed_at in rows:
+        counts[deployment_status] = count
+        if deployed_at and (last_deployment is None or deployed_at > last_deployment):
+            last_deployment = deployed_at
+
+    return DeploymentSummary(
+        course_id=course_id,
+        total_content=total_content,
+        submittable_content=submittable_content,
+        deployments_total=sum(counts.values()),
+        deployments_pending=counts.get("pending", 0),
+        deployments_deployed=counts.get("deployed", 0),
+        deployments_failed=counts.get("failed", 0),
+        last_deployment_at=last_deployment
+    )
+
+
+async def get_deployment_summary(
+    db: Session,
+    course_id: Union[str, UUID],
+    cache: Optional[BaseCache] = None
+) -> DeploymentSummary:
+    """The cached summary, computed and cached if there is none."""
+    key = deployment_summary_cache_key(course_id)
+    if cache:
+        try:
+            cached = await cache.get(key)
+            if cached:
+                return DeploymentSummary(**cached)
+        except Exception as e:
+            logger.warning(f"Failed to read deployment summary from Redis: {e}")
+
+    summary = compute_deployment_summary(db, course_id)
+
+    if cache:
+        try:
+            await cache.set(key, summary.model_dump(mode="json"), ttl=DEPLOYMENT_SUMMARY_CACHE_TTL)
+        except Exception as e:
+            logger.warning(f"Failed to cache deployment summary in Redis: {e}")
+
+    return summary
+
+
+async def invalidate_deployment_summary(course_id: Union[str, UUID], cache: Optional[BaseCache] = None):
+    """Drop the cached summary after deployments of the course changed, call after the commit."""
+    try:
+        cache = cache or await get_redis_client()
+        await cache.delete(deployment_summary_cache_key(course_id))
+    except Exception as e:
+        logger.warning(f"Failed to invalidate deployment summary of course {course_id}: {e}")
+
+
+def invalidate_deployment_summary_sync(course_id: Union[str, UUID]):
+    """``invalidate_deployment_summary`` for code outside of an event loop, e.g. sync activities."""
+    try:
+        get_sync_redis_client().delete(deployment_summary_cache_key(course_id))
+    except Exception as e:
+        logger.warning(f"Failed to invalidate deployment summary of course {course_id}: {e}")
@@ -1,7 +1,8 @@
+import asyncio
 import logging
 from datetime import datetime, timedelta, timezone
 from typing import BinaryIO, Optional, Dict, List, Tuple
-from minio.error import S3Error
+from minio.error import S3Error, ServerError
 from minio.datatypes import Object
 from minio.commonconfig import CopySource
 
@@ -118,6 +119,46 @@ class StorageService:
                 raise NotFoundException(f"Bucket not found: {bucket}")
             raise ServiceUnavailableException(f"Storage download error: {e}")
     
+    async def download_file_if_changed(
+        self,
+        object_key: str,
+        etag: Optional[str] = None,
+        bucket_name: Optional[str] = None
+    ) -> Optional[Tuple[bytes, str]]:
+        """
+        Download a file unless it still has ``etag`` (If-None-Match).
+
+        Returns None if the object is unchanged, otherwise its content and
+        current etag. The blocking MinIO call runs in a worker thread, so
+        downloads can run concurrently.
+        """
+        bucket = bucket_name or self.default_bucket
+        headers = {"If-None-Match": f'"{etag}"'} if etag else None
+
+        def get_object() -> Tuple[bytes, str]:
+            response = self.client.get_object(bucket, object_key, request_headers=headers)
+            try:
+                return response.read(), response.headers.get("ETag", "").replace('"', "")
+            finally:
+                response.close()
+                response.release_conn()
+
+        try:
+            return await asyncio.to_thread(get_object)
+
+        except ServerError as e:
+            if e.status_code == 304:
+                return None
+            logger.error(f"Error downloading file: {e}")
+            raise ServiceUnavailableException(f"Storage download error: {e}")
+        except S3Error as e:
+            logger.error(f"Error downloading file: {e}")
+            if e.code == 'NoSuchKey':
+                raise NotFoundException(f"Object not found: {object_key}")
+            if e.code == 'NoSuchBucket':
+                raise NotFoundException(f"Bucket not found: {bucket}")
+            raise ServiceUnavailableException(f"Storage download error: {e}")
+    
     async def get_file_stream(
         self, 
         object_key: str,
@@ -181,14 +222,15 @@ class StorageService:
         bucket = bucket_name or self.default_bucket
         
         try:
-            objects = self.client.list_objects(
+            # Listing pages through the bucket, keep the blocking requests off the event loop
+            objects = await asyncio.to_thread(lambda: list(self.client.list_objects(
                 bucket_name=bucket,
                 prefix=prefix,
                 recursive=recursive,
                 include_user_meta=include_user_metadata
-            )
+            )))
             
-            return list(objects)
+            return objects
             
         except S3Error as e:
             logger.error(f"Error listing objects: {e}")
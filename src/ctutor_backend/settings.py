@@ -11,6 +11,10 @@ class BackendSettings:
         # Authentication settings
         self.ENABLE_KEYCLOAK = os.environ.get("ENABLE_KEYCLOAK", "true").lower() in ["true", "1", "yes", "on"]
         self.AUTH_PLUGINS_CONFIG = os.environ.get("AUTH_PLUGINS_CONFIG", None)  # Path to plugin config file
+        # SQL instrumentation settings
+        self.SQL_INSTRUMENTATION = os.environ.get("SQL_INSTRUMENTATION", "false").lower() in ["true", "1", "yes", "on"]
+        self.SQL_SLOW_QUERY_MS = float(os.environ.get("SQL_SLOW_QUERY_MS", "500"))
+        self.SQL_SLOWEST_STATEMENTS = int(os.environ.get("SQL_SLOWEST_STATEMENTS", "5"))
 
     def __new__(cls):
         if cls._instance is None:
@@ -33,6 +33,7 @@ from . import temporal_student_template_v2
 
 # Import Temporal student repository tasks to auto-register
 from . import temporal_student_repository
+from . import temporal_student_repository_batch
 
 # Import Assignments repository tasks to auto-register
 from . import temporal_assignments_repository
@@ -18,6 +18,7 @@ from temporalio import workflow, activity
 from temporalio.common import RetryPolicy
 
 from .temporal_base import BaseWorkflow, WorkflowResult
+from .temporal_client import GENERATION_TASK_QUEUE
 from .registry import register_task
 
 
@@ -47,7 +48,7 @@ async def generate_assignments_repository_activity(
     from ..model.deployment import CourseContentDeployment, DeploymentHistory
     from ..model.example import ExampleVersion, Example
     from ..utils.docker_utils import transform_localhost_url
-    from ..tasks.temporal_student_template_v2 import download_example_files
+    from ..tasks.temporal_student_template_v2 import materialize_examples
 
     db_gen = next(get_db())
     db = db_gen
@@ -147,6 +148,18 @@ async def generate_assignments_repository_activity(
             processed = 0
             errors: List[str] = []
 
+            # Fetch the examples of every content that will be written, concurrently
+            to_download = []
+            for content in contents:
+                ev = content.deployment.example_version if content.deployment else None
+                if not ev or not ev.example or not ev.example.repository:
+                    continue
+                directory_name = content.deployment.deployment_path or str(ev.example.identifier)
+                if (Path(repo_path) / directory_name).exists() and overwrite_strategy != 'force_update':
+                    continue
+                to_download.append((ev.example.repository, ev))
+            materialized = await materialize_examples(to_download)
+
             # Write each content
             for content in contents:
                 try:
@@ -170,8 +183,10 @@ async def generate_assignments_repository_activity(
                         shutil.rmtree(target_dir)
                     target_dir.mkdir(parents=True, exist_ok=True)
 
-                    # Download full example content
-                    files = await download_example_files(example.repository, ev)
+                    # Full example content
+                    files = materialized[str(ev.id)]
+                    if isinstance(files, BaseException):
+                        raise files
                     for rel_path, data in files.items():
                         file_path = target_dir / rel_path
                         file_path.parent.mkdir(parents=True, exist_ok=True)
@@ -260,7 +275,7 @@ class GenerateAssignmentsRepositoryWorkflow(BaseWorkflow):
 
     @classmethod
     def get_task_queue(cls) -> str:
-        return "computor-tasks"
+        return GENERATION_TASK_QUEUE
 
     @classmethod
     def get_execution_timeout(cls) -> timedelta:
@@ -3,11 +3,16 @@ Temporal client configuration and initialization.
 """
 
 import os
+import time
+import logging
+from datetime import timedelta
 from temporalio.client import Client, TLSConfig
 from temporalio.common import RetryPolicy
 from typing import Optional
 import asyncio
 
+logger = logging.getLogger(__name__)
+
 
 # Temporal server configuration from environment
 TEMPORAL_HOST = os.environ.get('TEMPORAL_HOST', 'localhost')
@@ -19,9 +24,17 @@ TEMPORAL_TLS_CERT = os.environ.get('TEMPORAL_TLS_CERT')
 TEMPORAL_TLS_KEY = os.environ.get('TEMPORAL_TLS_KEY')
 TEMPORAL_TLS_CA = os.environ.get('TEMPORAL_TLS_CA')
 
+# Seconds between health checks of the shared client, 0 disables them
+TEMPORAL_HEALTH_CHECK_INTERVAL = float(os.environ.get('TEMPORAL_HEALTH_CHECK_INTERVAL', '30'))
+
 # Default task queue
 DEFAULT_TASK_QUEUE = "computor-tasks"
 
+# Task queues of the worker profiles, all on the default queue unless split up
+TESTING_TASK_QUEUE = os.environ.get('TEMPORAL_TESTING_TASK_QUEUE', DEFAULT_TASK_QUEUE)
+GITLAB_TASK_QUEUE = os.environ.get('TEMPORAL_GITLAB_TASK_QUEUE', DEFAULT_TASK_QUEUE)
+GENERATION_TASK_QUEUE = os.environ.get('TEMPORAL_GENERATION_TASK_QUEUE', DEFAULT_TASK_QUEUE)
+
 # Default retry policy
 DEFAULT_RETRY_POLICY = RetryPolicy(
     initial_interval=1,
@@ -33,18 +46,38 @@ DEFAULT_RETRY_POLICY = RetryPolicy(
 
 _client: Optional[Client] = None
 _client_lock = asyncio.Lock()
+_client_checked_at = 0.0
+
+
+async def _is_healthy(client: Client) -> bool:
+    try:
+        return await client.service_client.check_health(timeout=timedelta(seconds=5))
+    except Exception as e:
+        logger.warning(f"Temporal health check failed: {e}")
+        return False
 
 
 async def get_temporal_client() -> Client:
     """
-    Get or create a Temporal client instance.
+    Get or create the shared Temporal client instance.
+    
+    The client is checked at most every TEMPORAL_HEALTH_CHECK_INTERVAL
+    seconds and replaced by a new connection when the server does not answer.
     
     Returns:
         Configured Temporal client
     """
-    global _client
+    global _client, _client_checked_at
     
     async with _client_lock:
+        if _client is not None and TEMPORAL_HEALTH_CHECK_INTERVAL > 0 \
+                and time.monotonic() - _client_checked_at >= TEMPORAL_HEALTH_CHECK_INTERVAL:
+            if await _is_healthy(_client):
+                _client_checked_at = time.monotonic()
+            else:
+                logger.warning("Reconnecting to Temporal")
+                _client = None
+        
         if _client is None:
             tls_config = None
             
@@ -62,6 +95,7 @@ async def get_temporal_client() -> Client:
                 namespace=TEMPORAL_NAMESPACE,
                 tls=tls_config,
             )
+            _client_checked_at = time.monotonic()
         
         return _client
 
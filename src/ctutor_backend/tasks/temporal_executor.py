@@ -3,15 +3,25 @@ Task executor implementation using Temporal.
 """
 
 import uuid
+import base64
+import logging
+import binascii
 from datetime import datetime, timezone
 from typing import Any, Dict, Optional, List
+from temporalio.api.workflowservice.v1 import CountWorkflowExecutionsRequest
 from temporalio.client import WorkflowHandle, WorkflowExecutionStatus
 from temporalio.common import WorkflowIDReusePolicy
+from temporalio.service import RPCError
 from .temporal_client import get_temporal_client, get_task_queue_name, DEFAULT_TASK_QUEUE
 from .temporal_base import WorkflowResult
 from .base import TaskStatus, TaskResult, TaskInfo, TaskSubmission
 from .registry import task_registry
 
+logger = logging.getLogger(__name__)
+
+# Largest page the Temporal frontend returns, larger page sizes are capped
+TEMPORAL_LIST_MAX_PAGE_SIZE = 1000
+
 
 class TemporalTaskExecutor:
     """
@@ -277,102 +287,206 @@ class TemporalTaskExecutor:
     #         }
     #     }
     
-    async def list_tasks(self, limit: int = 100, offset: int = 0, status: Optional[str] = None) -> Dict[str, Any]:
+    # Task status filters and the visibility ExecutionStatus values they match
+    _status_filters = {
+        "QUEUED": ["Running"],
+        "PENDING": ["Running"],
+        "STARTED": ["Running"],
+        "RUNNING": ["Running"],
+        "RETRY": ["Running"],
+        "FINISHED": ["Completed"],
+        "SUCCESS": ["Completed"],
+        "COMPLETED": ["Completed"],
+        "FAILED": ["Failed", "TimedOut"],
+        "FAILURE": ["Failed", "TimedOut"],
+        "TIMED_OUT": ["TimedOut"],
+        "CANCELLED": ["Canceled", "Terminated"],
+        "CANCELED": ["Canceled", "Terminated"],
+        "REVOKED": ["Terminated"],
+        "TERMINATED": ["Terminated"],
+    }
+    
+    @staticmethod
+    def _query_literal(value: str) -> str:
+        if "'" in value or '"' in value:
+            raise ValueError(f"Invalid filter value: {value}")
+        return f"'{value}'"
+    
+    @staticmethod
+    def _query_time(value: datetime) -> str:
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return f"'{value.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')}'"
+    
+    def build_list_query(
+        self,
+        status: Optional[str] = None,
+        task_name: Optional[str] = None,
+        started_after: Optional[datetime] = None,
+        started_before: Optional[datetime] = None
+    ) -> str:
+        """
+        Build a Temporal visibility query for the task list filters.
+        
+        Raises:
+            ValueError: If the status is unknown or a value cannot be quoted
+        """
+        query_parts = []
+        
+        if status:
+            execution_statuses = self._status_filters.get(status.upper())
+            if execution_statuses is None:
+                raise ValueError(f"Unknown task status: {status}")
+            query_parts.append(
+                "ExecutionStatus IN (" + ", ".join(f"'{s}'" for s in execution_statuses) + ")"
+            )
+        
+        if task_name:
+            query_parts.append(f"WorkflowType = {self._query_literal(task_name)}")
+        
+        if started_after:
+            query_parts.append(f"StartTime >= {self._query_time(started_after)}")
+        
+        if started_before:
+            query_parts.append(f"StartTime < {self._query_time(started_before)}")
+        
+        return " AND ".join(query_parts)
+    
+    @staticmethod
+    def encode_page_token(token: Optional[bytes]) -> Optional[str]:
+        return base64.urlsafe_b64encode(token).decode("ascii") if token else None
+    
+    @staticmethod
+    def decode_page_token(token: Optional[str]) -> Optional[bytes]:
+        if not token:
+            return None
+        try:
+            return base64.urlsafe_b64decode(token.encode("ascii"))
+        except (binascii.Error, ValueError):
+            raise ValueError("Invalid page token")
+    
+    async def count_tasks(self, query: str = "") -> Optional[int]:
+        """
+        Number of workflows matching a visibility query.
+        
+        Returns None if the visibility store cannot count.
+        """
+        client = await get_temporal_client()
+        try:
+            response = await client.workflow_service.count_workflow_executions(
+                CountWorkflowExecutionsRequest(namespace=client.namespace, query=query)
+            )
+            return int(response.count)
+        except RPCError as e:
+            logger.warning(f"Error counting workflows: {e}")
+            return None
+    
+    def _task_list_item(self, workflow) -> Dict[str, Any]:
+        status_value = self._status_mapping.get(workflow.status, TaskStatus.QUEUED).value
+        
+        # Create shortened task ID for better display
+        short_task_id = workflow.id.split('-')[-1] if '-' in workflow.id else workflow.id
+        
+        # Determine if task has result
+        has_result = workflow.status in [WorkflowExecutionStatus.COMPLETED, WorkflowExecutionStatus.FAILED]
+        
+        return {
+            "task_id": workflow.id,
+            "short_task_id": short_task_id,
+            "task_name": workflow.workflow_type,
+            "status": status_value,
+            "status_display": status_value.upper(),
+            "created_at": workflow.start_time,
+            "started_at": workflow.start_time,
+            "finished_at": workflow.close_time,
+            "completed_at": workflow.close_time,  # Alternative field name for UI
+            "error": None,
+            "worker": workflow.task_queue or "unknown",
+            "queue": workflow.task_queue or "unknown",
+            "workflow_id": workflow.id,
+            "run_id": workflow.run_id,
+            "execution_time": workflow.execution_time,
+            "history_length": workflow.history_length,
+            "has_result": has_result,
+            "result_available": "Yes" if has_result else "No",
+            "duration": self._calculate_duration(workflow.start_time, workflow.close_time)
+        }
+    
+    async def list_tasks(
+        self,
+        limit: int = 100,
+        offset: int = 0,
+        status: Optional[str] = None,
+        task_name: Optional[str] = None,
+        started_after: Optional[datetime] = None,
+        started_before: Optional[datetime] = None,
+        page_token: Optional[str] = None
+    ) -> Dict[str, Any]:
         """
         List tasks with pagination and filtering.
         
+        Filters are evaluated by Temporal's visibility store. Pages are
+        continued with the returned next_page_token; offset is only applied
+        without a page token and still makes Temporal list that many workflows,
+        at most TEMPORAL_LIST_MAX_PAGE_SIZE per request.
+        
         Args:
             limit: Maximum number of tasks to return
             offset: Number of tasks to skip
             status: Optional status filter
+            task_name: Optional workflow type filter
+            started_after: Only tasks started at or after this time
+            started_before: Only tasks started before this time
+            page_token: Token of the page to return, from a previous next_page_token
             
         Returns:
-            Dictionary with task list and pagination info
+            Dictionary with task list and pagination info. total is only
+            counted for the first page and is None if it cannot be counted.
+            
+        Raises:
+            ValueError: If a filter or the page token is invalid
         """
+        query = self.build_list_query(status, task_name, started_after, started_before)
+        next_page_token = self.decode_page_token(page_token)
+        
         client = await get_temporal_client()
         
         try:
-            # Use Temporal's list_workflows API to get workflows
-            from temporalio.client import WorkflowExecutionStatus
-            
-            # Build query filter
-            query_parts = []
-            
-            # Note: Status filtering requires proper Temporal query syntax
-            # For now, we'll filter in Python after fetching results
-            status_filter = None
-            if status:
-                status_mapping = {
-                    "PENDING": [WorkflowExecutionStatus.RUNNING],
-                    "STARTED": [WorkflowExecutionStatus.RUNNING], 
-                    "FINISHED": [WorkflowExecutionStatus.COMPLETED],
-                    "SUCCESS": [WorkflowExecutionStatus.COMPLETED],
-                    "FAILED": [WorkflowExecutionStatus.FAILED, WorkflowExecutionStatus.TIMED_OUT],
-                    "CANCELLED": [WorkflowExecutionStatus.CANCELED, WorkflowExecutionStatus.TERMINATED],
-                    "REVOKED": [WorkflowExecutionStatus.TERMINATED]
-                }
-                status_filter = status_mapping.get(status.upper(), [])
-            
-            # Build query string
-            query = " AND ".join(query_parts) if query_parts else ""
-            
-            # List workflows using Temporal's visibility API
             workflows = []
-            async for workflow in client.list_workflows(
-                query=query or None,
-                page_size=min(limit * 2, 1000)  # Fetch more to account for filtering
-            ):
-                # Apply status filter if specified
-                if status_filter and workflow.status not in status_filter:
-                    continue
-                
-                # Convert to our TaskInfo format
-                status_value = self._status_mapping.get(workflow.status, TaskStatus.QUEUED).value
-                
-                # Create shortened task ID for better display
-                short_task_id = workflow.id.split('-')[-1] if '-' in workflow.id else workflow.id
-                
-                # Determine if task has result
-                has_result = workflow.status in [WorkflowExecutionStatus.COMPLETED, WorkflowExecutionStatus.FAILED]
-                
-                task_info = {
-                    "task_id": workflow.id,
-                    "short_task_id": short_task_id,
-                    "task_name": workflow.workflow_type,
-                    "status": status_value,
-                    "status_display": status_value.upper(),
-                    "created_at": workflow.start_time,
-                    "started_at": workflow.start_time,
-                    "finished_at": workflow.close_time,
-                    "completed_at": workflow.close_time,  # Alternative field name for UI
-                    "error": None,
-                    "worker": workflow.task_queue or "unknown",
-                    "queue": workflow.task_queue or "unknown",
-                    "workflow_id": workflow.id,
-                    "run_id": workflow.run_id,
-                    "execution_time": workflow.execution_time,
-                    "history_length": workflow.history_length,
-                    "has_result": has_result,
-                    "result_available": "Yes" if has_result else "No",
-                    "duration": self._calculate_duration(workflow.start_time, workflow.close_time)
-                }
-                workflows.append(task_info)
-                
-                # Apply manual offset/limit since Temporal doesn't support offset directly
-                if len(workflows) >= limit + offset:
-                    break
+            has_page = True
+            if next_page_token is None and offset > 0:
+                # Temporal has no offsets, skip pages until offset workflows are passed
+                remaining = offset
+                while remaining > 0 and has_page:
+                    skipped = client.list_workflows(
+                        query=query or None,
+                        page_size=min(remaining, TEMPORAL_LIST_MAX_PAGE_SIZE),
+                        next_page_token=next_page_token
+                    )
+                    await skipped.fetch_next_page()
+                    remaining -= len(skipped.current_page or [])
+                    next_page_token = skipped.next_page_token
+                    has_page = next_page_token is not None
+            
+            if has_page:
+                page = client.list_workflows(
+                    query=query or None,
+                    page_size=limit,
+                    next_page_token=next_page_token
+                )
+                await page.fetch_next_page()
+                workflows = [self._task_list_item(workflow) for workflow in page.current_page or []]
+                next_page_token = page.next_page_token
             
-            # Apply offset and limit
-            start_idx = min(offset, len(workflows))
-            end_idx = min(offset + limit, len(workflows))
-            paginated_workflows = workflows[start_idx:end_idx]
+            total = await self.count_tasks(query) if page_token is None else None
             
             return {
-                "tasks": paginated_workflows,
-                "total": len(workflows),  # This is approximate since we don't get total count from Temporal
+                "tasks": workflows,
+                "total": total,
                 "limit": limit,
                 "offset": offset,
-                "has_more": len(workflows) >= limit + offset
+                "has_more": next_page_token is not None,
+                "next_page_token": self.encode_page_token(next_page_token)
             }
             
         except Exception as e:
@@ -384,6 +498,7 @@ class TemporalTaskExecutor:
                 "limit": limit,
                 "offset": offset,
                 "has_more": False,
+                "next_page_token": None,
                 "error": str(e)
             }
     
@@ -0,0 +1,72 @@
+"""
+Heartbeats for blocking (non-async) activities.
+
+Activities doing blocking work, like running git or the test engines, run as
+sync activities on the worker's activity executor. While such an activity
+waits for a subprocess it cannot heartbeat itself; ``heartbeating`` sends the
+heartbeats from a background thread instead, so Temporal notices a lost worker
+after the activity's ``heartbeat_timeout`` rather than its full
+``start_to_close_timeout``.
+"""
+
+import os
+import logging
+import threading
+import contextvars
+from contextlib import contextmanager
+from typing import Any, Iterator
+from temporalio import activity
+
+logger = logging.getLogger(__name__)
+
+TEMPORAL_ACTIVITY_HEARTBEAT_INTERVAL = float(os.environ.get("TEMPORAL_ACTIVITY_HEARTBEAT_INTERVAL", "10"))
+
+
+class _Heartbeat:
+
+    def __init__(self, interval: float, active: bool):
+        self.interval = interval
+        self.active = active
+        self.details: tuple = ()
+        self._stopped = threading.Event()
+
+    def stage(self, *details: Any):
+        """Details sent with the following heartbeats, e.g. the current step."""
+        self.details = details
+        if self.active:
+            self._beat()
+
+    def _beat(self):
+        try:
+            activity.heartbeat(*self.details)
+        except Exception as e:
+            # The activity itself must not fail because a heartbeat could not be sent
+            logger.debug(f"Activity heartbeat failed: {e}")
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            self._beat()
+
+
+@contextmanager
+def heartbeating(interval: float = TEMPORAL_ACTIVITY_HEARTBEAT_INTERVAL) -> Iterator[_Heartbeat]:
+    """
+    Heartbeat every ``interval`` seconds while the block runs.
+
+    Outside of an activity, e.g. when the function is called directly, nothing
+    is sent.
+    """
+    heartbeat = _Heartbeat(interval, active=activity.in_activity())
+    if not heartbeat.active:
+        yield heartbeat
+        return
+
+    # The activity context is a context variable, the thread needs a copy of it
+    context = contextvars.copy_context()
+    thread = threading.Thread(target=context.run, args=(heartbeat._run,), daemon=True, name="activity-heartbeat")
+    thread.start()
+    try:
+        yield heartbeat
+    finally:
+        heartbeat._stopped.set()
+        thread.join()
@@ -1,14 +1,18 @@
 """
 Temporal workflows for organization, course family, and course hierarchy management.
 """
+import os
+import asyncio
 import logging
+from dataclasses import dataclass
 from datetime import timedelta
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from temporalio import workflow, activity
 from temporalio.common import RetryPolicy
 from sqlalchemy.orm import Session
 
 from .temporal_base import BaseWorkflow, WorkflowResult
+from .temporal_client import GITLAB_TASK_QUEUE
 from .registry import register_task
 from ..interface.deployments import ComputorDeploymentConfig, OrganizationConfig, GitLabConfig, CourseFamilyConfig, CourseConfig
 from ..database import get_db
@@ -30,6 +34,7 @@ async def create_organization_activity(
     """Activity to create an organization using GitLabBuilder."""
     # Import GitLabBuilder inside activity to avoid workflow sandbox restrictions
     from ..generator.gitlab_builder import GitLabBuilder
+    from ..gitlab_clients import gitlab_client
     
     logger.info(f"Starting organization creation activity for: {org_config.get('name')}")
     logger.info(f"GitLab URL: {gitlab_url}")
@@ -80,7 +85,7 @@ async def create_organization_activity(
         db = next(db_gen)
         try:
             logger.info("Database session created successfully")
-            builder = GitLabBuilder(db, gitlab_url, gitlab_token)
+            builder = GitLabBuilder(db, gitlab_url, gitlab_token, gitlab=gitlab_client(gitlab_url, gitlab_token))
             logger.info("GitLab builder created successfully")
             
             logger.info("Calling _create_organization method")
@@ -138,6 +143,7 @@ async def create_course_family_activity(
     """Activity to create a course family using GitLabBuilder."""
     # Import GitLabBuilder inside activity to avoid workflow sandbox restrictions
     from ..generator.gitlab_builder import GitLabBuilder
+    from ..gitlab_clients import gitlab_client
     
     logger.info(f"Starting course family creation activity for: {family_config.get('name')}")
     logger.info(f"Organization ID: {organization_id}")
@@ -217,7 +223,7 @@ async def create_course_family_activity(
             )
             
             # Create the builder and course family
-            builder = GitLabBuilder(db, gitlab_url, gitlab_token)
+            builder = GitLabBuilder(db, gitlab_url, gitlab_token, gitlab=gitlab_client(gitlab_url, gitlab_token))
             result = builder._create_course_family(deployment_config, org, user_id)
             
             if result["success"]:
@@ -271,6 +277,7 @@ async def create_course_activity(
     """Activity to create a course using GitLabBuilder."""
     # Import GitLabBuilder inside activity to avoid workflow sandbox restrictions
     from ..generator.gitlab_builder import GitLabBuilder
+    from ..gitlab_clients import gitlab_client
     
     logger.info(f"Starting course creation activity for: {course_config.get('name')}")
     logger.info(f"Course Family ID: {course_family_id}")
@@ -346,7 +353,7 @@ async def create_course_activity(
             )
             
             # Create the builder and course
-            builder = GitLabBuilder(db, gitlab_url, gitlab_token)
+            builder = GitLabBuilder(db, gitlab_url, gitlab_token, gitlab=gitlab_client(gitlab_url, gitlab_token))
             result = builder._create_course(deployment_config, org, family, user_id)
             
             if result["success"]:
@@ -508,7 +515,7 @@ class CreateOrganizationWorkflow(BaseWorkflow):
     
     @classmethod
     def get_task_queue(cls) -> str:
-        return "computor-tasks"
+        return GITLAB_TASK_QUEUE
     
     @classmethod
     def get_execution_timeout(cls) -> timedelta:
@@ -601,7 +608,7 @@ class CreateCourseFamilyWorkflow(BaseWorkflow):
     
     @classmethod
     def get_task_queue(cls) -> str:
-        return "computor-tasks"
+        return GITLAB_TASK_QUEUE
     
     @classmethod
     def get_execution_timeout(cls) -> timedelta:
@@ -692,7 +699,7 @@ class CreateCourseWorkflow(BaseWorkflow):
     
     @classmethod
     def get_task_queue(cls) -> str:
-        return "computor-tasks"
+        return GITLAB_TASK_QUEUE
     
     @classmethod
     def get_execution_timeout(cls) -> timedelta:
@@ -772,6 +779,68 @@ class CreateCourseWorkflow(BaseWorkflow):
             )
 
 
+# Nodes of a hierarchy deployment deployed at once, shared by all branches
+HIERARCHY_DEPLOY_CONCURRENCY = int(os.environ.get("TEMPORAL_HIERARCHY_DEPLOY_CONCURRENCY", "4"))
+
+# Result lists of the created entities by node kind
+_CREATED_ENTITY_LISTS = {
+    "organization": "organizations",
+    "course_family": "course_families",
+    "course": "courses",
+    "content_types": "content_types",
+}
+
+
+@dataclass
+class HierarchyNode:
+    """
+    One step of a hierarchy deployment, runnable once its parent has been deployed.
+    
+    ``key`` is derived from the entity path, e.g. ``course:org/family/course``.
+    It identifies the node across retries of a deployment and names its child workflow.
+    """
+    key: str
+    kind: str
+    path: str
+    config: Dict[str, Any]
+    parent: Optional[str] = None
+
+
+def hierarchy_nodes(deployment_config: Dict[str, Any]) -> List[HierarchyNode]:
+    """
+    The dependency DAG of a deployment configuration, parents before their children.
+    
+    Course families depend on their organization, courses on their course
+    family and content types on their course. Everything else, e.g. sibling
+    courses, is independent. An entity listed twice is deployed once, with its
+    first configuration.
+    """
+    nodes: Dict[str, HierarchyNode] = {}
+    
+    def add(kind: str, path: str, config: Dict[str, Any], parent: Optional[str] = None) -> str:
+        key = f"{kind}:{path}"
+        if key not in nodes:
+            nodes[key] = HierarchyNode(key=key, kind=kind, path=path, config=config, parent=parent)
+        return key
+    
+    for org_config in deployment_config.get("organizations", []):
+        org_path = org_config["path"]
+        org_key = add("organization", org_path, org_config)
+        
+        for family_config in org_config.get("course_families", []):
+            family_path = f"{org_path}/{family_config['path']}"
+            family_key = add("course_family", family_path, family_config, org_key)
+            
+            for course_config in family_config.get("courses", []):
+                course_path = f"{family_path}/{course_config['path']}"
+                course_key = add("course", course_path, course_config, family_key)
+                
+                if course_config.get("content_types"):
+                    add("content_types", course_path, course_config, course_key)
+    
+    return list(nodes.values())
+
+
 @register_task
 @workflow.defn(name="deploy_computor_hierarchy", sandboxed=False)
 class DeployComputorHierarchyWorkflow(BaseWorkflow):
@@ -781,6 +850,8 @@ class DeployComputorHierarchyWorkflow(BaseWorkflow):
     
     This workflow reuses the CreateOrganizationWorkflow, CreateCourseFamilyWorkflow,
     and CreateCourseWorkflow to create the full hierarchy from a YAML configuration.
+    Independent branches of the hierarchy, e.g. sibling courses, are deployed
+    concurrently, up to ``max_parallel`` nodes at a time.
     """
     
     @classmethod
@@ -789,7 +860,7 @@ class DeployComputorHierarchyWorkflow(BaseWorkflow):
     
     @classmethod
     def get_task_queue(cls) -> str:
-        return "computor-tasks"
+        return GITLAB_TASK_QUEUE
     
     @classmethod
     def get_execution_timeout(cls) -> timedelta:
@@ -806,6 +877,9 @@ class DeployComputorHierarchyWorkflow(BaseWorkflow):
             parameters: Dictionary containing:
                 - deployment_config: Hierarchical deployment configuration with organizations list
                 - user_id: ID of the user initiating the deployment
+                - max_parallel: Optional number of nodes deployed at once
+                - completed_nodes: Optional ``nodes`` of the result of an earlier
+                  run of the same configuration, these are not deployed again
             
         Returns:
             WorkflowResult with deployment status and created entity IDs
@@ -823,177 +897,97 @@ class DeployComputorHierarchyWorkflow(BaseWorkflow):
         
         deployment_config = parameters['deployment_config']
         user_id = parameters['user_id']
+        completed_nodes: Dict[str, Dict[str, Any]] = dict(parameters.get('completed_nodes') or {})
+        
+        # Track created entities
+        created_entities = {
+            "organizations": [],
+            "course_families": [],
+            "courses": [],
+            "content_types": []
+        }
+        # Results of the deployed nodes by key, the completed_nodes of a retry
+        node_results: Dict[str, Dict[str, Any]] = {}
+        errors: List[str] = []
         
         try:
             workflow.logger.info("Starting hierarchical deployment orchestration")
             
-            # Track created entities
-            created_entities = {
-                "organizations": [],
-                "course_families": [],
-                "courses": [],
-                "content_types": []
-            }
-            
             organizations = deployment_config.get("organizations", [])
             if not organizations:
                 raise Exception("No organizations specified in deployment configuration")
             
-            total_orgs = len(organizations)
-            total_families = sum(len(org.get("course_families", [])) for org in organizations)
-            total_courses = sum(
-                len(family.get("courses", []))
-                for org in organizations
-                for family in org.get("course_families", [])
-            )
+            nodes = hierarchy_nodes(deployment_config)
+            total_orgs = sum(1 for node in nodes if node.kind == "organization")
+            total_families = sum(1 for node in nodes if node.kind == "course_family")
+            total_courses = sum(1 for node in nodes if node.kind == "course")
             
             workflow.logger.info(f"Deploying {total_orgs} organizations, {total_families} course families, {total_courses} courses")
             
-            # Process each organization
-            for org_idx, org_config in enumerate(organizations):
-                workflow.logger.info(f"Processing organization {org_idx + 1}/{total_orgs}: {org_config['name']}")
-                
-                # Prepare GitLab configuration for this organization
-                # NOTE: This reads from deployment YAML, not database - token is not encrypted yet
-                gitlab_config = org_config.get("gitlab", {})
-                gitlab_url = gitlab_config.get("url", "")
-                gitlab_token = gitlab_config.get("token", "")
-                
-                # Handle environment variable substitution
-                if gitlab_token.startswith("${") and gitlab_token.endswith("}"):
-                    import os
-                    env_var = gitlab_token[2:-1]
-                    gitlab_token = os.environ.get(env_var, "")
-                
-                # Create organization
-                org_params = {
-                    "org_config": org_config,
-                    "gitlab_url": gitlab_url,
-                    "gitlab_token": gitlab_token,
-                    "user_id": user_id
-                }
-                
-                org_workflow_handle = await workflow.start_child_workflow(
-                    CreateOrganizationWorkflow.run,
-                    args=[org_params],
-                    id=f"create-org-{org_idx}-{workflow.info().workflow_id}",
-                    task_queue="computor-tasks",
-                    execution_timeout=timedelta(minutes=10)
-                )
+            semaphore = asyncio.Semaphore(parameters.get('max_parallel') or HIERARCHY_DEPLOY_CONCURRENCY)
+            tasks: Dict[str, asyncio.Task] = {}
+            
+            async def deploy(node: HierarchyNode) -> Optional[Dict[str, Any]]:
+                parent_result = None
+                if node.parent:
+                    parent_result = await tasks[node.parent]
+                    if parent_result is None:
+                        errors.append(f"{node.key}: skipped, {node.parent} was not deployed")
+                        return None
                 
-                org_result = await org_workflow_handle
-                if org_result.status != "completed":
-                    raise Exception(f"Organization '{org_config['name']}' creation failed: {org_result.error}")
+                if node.key in completed_nodes:
+                    workflow.logger.info(f"Skipping {node.key}: deployed by an earlier run")
+                    node_results[node.key] = completed_nodes[node.key]
+                    return completed_nodes[node.key]
                 
-                created_entities["organizations"].append(org_result.result)
-                org_id = org_result.result.get("organization_id")
+                async with semaphore:
+                    try:
+                        result = await self._deploy_node(node, parent_result, user_id)
+                    except Exception as e:
+                        workflow.logger.error(f"Deploying {node.key} failed: {str(e)}")
+                        errors.append(f"{node.key}: {str(e)}")
+                        return None
                 
-                # Process course families for this organization
-                course_families = org_config.get("course_families", [])
-                for family_idx, family_config in enumerate(course_families):
-                    workflow.logger.info(f"Processing course family {family_idx + 1}/{len(course_families)}: {family_config['name']}")
-                    
-                    # Create course family
-                    family_params = {
-                        "family_config": family_config,
-                        "organization_id": org_id,
-                        "user_id": user_id
-                    }
-                    
-                    family_workflow_handle = await workflow.start_child_workflow(
-                        CreateCourseFamilyWorkflow.run,
-                        args=[family_params],
-                        id=f"create-family-{org_idx}-{family_idx}-{workflow.info().workflow_id}",
-                        task_queue="computor-tasks",
-                        execution_timeout=timedelta(minutes=10)
-                    )
-                    
-                    family_result = await family_workflow_handle
-                    if family_result.status != "completed":
-                        raise Exception(f"Course family '{family_config['name']}' creation failed: {family_result.error}")
-                    
-                    created_entities["course_families"].append(family_result.result)
-                    family_id = family_result.result.get("course_family_id")
-                    
-                    # Process courses for this course family
-                    courses = family_config.get("courses", [])
-                    for course_idx, course_config in enumerate(courses):
-                        workflow.logger.info(f"Processing course {course_idx + 1}/{len(courses)}: {course_config['name']}")
-                        
-                        # Create course
-                        course_params = {
-                            "course_config": course_config,
-                            "course_family_id": family_id,
-                            "user_id": user_id
-                        }
-                        
-                        course_workflow_handle = await workflow.start_child_workflow(
-                            CreateCourseWorkflow.run,
-                            args=[course_params],
-                            id=f"create-course-{org_idx}-{family_idx}-{course_idx}-{workflow.info().workflow_id}",
-                            task_queue="computor-tasks",
-                            execution_timeout=timedelta(minutes=10)
-                        )
-                        
-                        course_result = await course_workflow_handle
-                        workflow.logger.info(f"Course creation result: {course_result}")
-                        
-                        if course_result.status != "completed":
-                            raise Exception(f"Course '{course_config['name']}' creation failed: {course_result.error}")
-                        
-                        created_entities["courses"].append(course_result.result)
-                        
-                        # Create content types if configured
-                        content_types = course_config.get('content_types', [])
-                        workflow.logger.info(f"Found {len(content_types)} content types for course: {course_config['name']}")
-                        
-                        if content_types:
-                            workflow.logger.info(f"Creating {len(content_types)} content types for course: {course_config['name']}")
-                            workflow.logger.info(f"Course result structure: {course_result.result}")
-                            
-                            course_id = course_result.result.get("course_id") if course_result.result else None
-                            workflow.logger.info(f"Extracted course_id: {course_id}")
-                            
-                            if not course_id:
-                                workflow.logger.error(f"No course ID found in result: {course_result.result}")
-                                continue
-                            
-                            content_types_result = await workflow.execute_activity(
-                                create_course_content_types_activity,
-                                args=[course_id, content_types, user_id],
-                                start_to_close_timeout=timedelta(minutes=3),
-                                retry_policy=RetryPolicy(
-                                    initial_interval=timedelta(seconds=1),
-                                    backoff_coefficient=2.0,
-                                    maximum_attempts=3,
-                                )
-                            )
-                            
-                            created_entities["content_types"].append(content_types_result)
-                            
-                            if content_types_result.get("status") == "success":
-                                workflow.logger.info(f"Created content types for course {course_config['name']}: {content_types_result.get('total_created')} created, {content_types_result.get('total_existing')} existing")
-                            else:
-                                workflow.logger.error(f"Failed to create content types for course {course_config['name']}: {content_types_result}")
+                node_results[node.key] = result
+                created_entities[_CREATED_ENTITY_LISTS[node.kind]].append(result)
+                return result
+            
+            # Parents come first, their tasks exist when a child waits for them
+            for node in nodes:
+                tasks[node.key] = asyncio.create_task(deploy(node))
+            await asyncio.gather(*tasks.values())
             
             # Calculate content types statistics
             total_content_types_created = sum(r.get("total_created", 0) for r in created_entities["content_types"] if r.get("status") == "success")
             total_content_types_existing = sum(r.get("total_existing", 0) for r in created_entities["content_types"] if r.get("status") == "success")
             
+            result = {
+                "created_entities": created_entities,
+                "nodes": node_results,
+                "counts": {
+                    "organizations": total_orgs,
+                    "course_families": total_families,
+                    "courses": total_courses,
+                    "content_types_created": total_content_types_created,
+                    "content_types_existing": total_content_types_existing
+                }
+            }
+            
+            if errors:
+                error_msg = f"Deployment orchestration failed: {'; '.join(errors)}"
+                workflow.logger.error(error_msg)
+                return WorkflowResult(
+                    status="failed",
+                    result=result,
+                    error=error_msg,
+                    metadata={"workflow_type": "deploy_computor_hierarchy"}
+                )
+            
             workflow.logger.info(f"Hierarchical deployment completed: {total_orgs} orgs, {total_families} families, {total_courses} courses, {total_content_types_created} content types created")
             
             return WorkflowResult(
                 status="completed",
-                result={
-                    "created_entities": created_entities,
-                    "counts": {
-                        "organizations": total_orgs,
-                        "course_families": total_families,  
-                        "courses": total_courses,
-                        "content_types_created": total_content_types_created,
-                        "content_types_existing": total_content_types_existing
-                    }
-                },
+                result=result,
                 metadata={"workflow_type": "deploy_computor_hierarchy"}
             )
             
@@ -1002,7 +996,121 @@ class DeployComputorHierarchyWorkflow(BaseWorkflow):
             workflow.logger.error(error_msg, exc_info=True)
             return WorkflowResult(
                 status="failed",
-                result=created_entities,
+                result={"created_entities": created_entities, "nodes": node_results},
                 error=error_msg,
                 metadata={"workflow_type": "deploy_computor_hierarchy"}
             )
+    
+    async def _deploy_node(
+        self,
+        node: HierarchyNode,
+        parent_result: Optional[Dict[str, Any]],
+        user_id: str
+    ) -> Dict[str, Any]:
+        """Deploy a single node, raises if it could not be deployed."""
+        child_workflow_id = f"deploy-{node.kind.replace('_', '-')}-{node.path}-{workflow.info().workflow_id}"
+        
+        if node.kind == "organization":
+            org_config = node.config
+            workflow.logger.info(f"Processing organization: {org_config['name']}")
+            
+            # Prepare GitLab configuration for this organization
+            # NOTE: This reads from deployment YAML, not database - token is not encrypted yet
+            gitlab_config = org_config.get("gitlab", {})
+            gitlab_url = gitlab_config.get("url", "")
+            gitlab_token = gitlab_config.get("token", "")
+            
+            # Handle environment variable substitution
+            if gitlab_token.startswith("${") and gitlab_token.endswith("}"):
+                env_var = gitlab_token[2:-1]
+                gitlab_token = os.environ.get(env_var, "")
+            
+            org_params = {
+                "org_config": org_config,
+                "gitlab_url": gitlab_url,
+                "gitlab_token": gitlab_token,
+                "user_id": user_id
+            }
+            
+            org_result = await workflow.execute_child_workflow(
+                CreateOrganizationWorkflow.run,
+                args=[org_params],
+                id=child_workflow_id,
+                task_queue=CreateOrganizationWorkflow.get_task_queue(),
+                execution_timeout=timedelta(minutes=10)
+            )
+            if org_result.status != "completed":
+                raise Exception(f"Organization '{org_config['name']}' creation failed: {org_result.error}")
+            return org_result.result
+        
+        if node.kind == "course_family":
+            family_config = node.config
+            workflow.logger.info(f"Processing course family: {family_config['name']}")
+            
+            family_params = {
+                "family_config": family_config,
+                "organization_id": parent_result.get("organization_id"),
+                "user_id": user_id
+            }
+            
+            family_result = await workflow.execute_child_workflow(
+                CreateCourseFamilyWorkflow.run,
+                args=[family_params],
+                id=child_workflow_id,
+                task_queue=CreateCourseFamilyWorkflow.get_task_queue(),
+                execution_timeout=timedelta(minutes=10)
+            )
+            if family_result.status != "completed":
+                raise Exception(f"Course family '{family_config['name']}' creation failed: {family_result.error}")
+            return family_result.result
+        
+        if node.kind == "course":
+            course_config = node.config
+            workflow.logger.info(f"Processing course: {course_config['name']}")
+            
+            course_params = {
+                "course_config": course_config,
+                "course_family_id": parent_result.get("course_family_id"),
+                "user_id": user_id
+            }
+            
+            course_result = await workflow.execute_child_workflow(
+                CreateCourseWorkflow.run,
+                args=[course_params],
+                id=child_workflow_id,
+                task_queue=CreateCourseWorkflow.get_task_queue(),
+                execution_timeout=timedelta(minutes=10)
+            )
+            workflow.logger.info(f"Course creation result: {course_result}")
+            
+            if course_result.status != "completed":
+                raise Exception(f"Course '{course_config['name']}' creation failed: {course_result.error}")
+            return course_result.result
+        
+        if node.kind == "content_types":
+            course_config = node.config
+            content_types = course_config.get('content_types', [])
+            course_id = parent_result.get("course_id")
+            if not course_id:
+                raise Exception(f"No course ID found in result: {parent_result}")
+            
+            workflow.logger.info(f"Creating {len(content_types)} content types for course: {course_config['name']}")
+            
+            content_types_result = await workflow.execute_activity(
+                create_course_content_types_activity,
+                args=[course_id, content_types, user_id],
+                start_to_close_timeout=timedelta(minutes=3),
+                retry_policy=RetryPolicy(
+                    initial_interval=timedelta(seconds=1),
+                    backoff_coefficient=2.0,
+                    maximum_attempts=3,
+                )
+            )
+            
+            if content_types_result.get("status") == "success":
+                workflow.logger.info(f"Created content types for course {course_config['name']}: {content_types_result.get('total_created')} created, {content_types_result.get('total_existing')} existing")
+            else:
+                workflow.logger.error(f"Failed to create content types for course {course_config['name']}: {content_types_result}")
+            return content_types_result
+        
+        raise Exception(f"Unknown hierarchy node kind: {node.kind}")
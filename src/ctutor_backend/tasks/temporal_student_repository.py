@@ -5,7 +5,7 @@ This workflow handles forking the student-template repository when students join
 import logging
 import json
 from datetime import timedelta
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 from uuid import UUID
 
 from temporalio import workflow, activity
@@ -15,12 +15,14 @@ from gitlab import Gitlab
 from gitlab.exceptions import GitlabGetError
 
 from .temporal_base import BaseWorkflow, WorkflowResult
+from .temporal_client import GITLAB_TASK_QUEUE
 from .registry import register_task
 from ..database import get_db
 from ..model.course import Course, CourseMember, CourseSubmissionGroup, CourseSubmissionGroupMember
 from ..model.organization import Organization
 from ..interface.tokens import decrypt_api_key
 from ..gitlab_utils import gitlab_fork_project, gitlab_unprotect_branches
+from ..gitlab_clients import gitlab_client, find_project, group_full_path, resolve_project_id
 
 logger = logging.getLogger(__name__)
 
@@ -69,14 +71,10 @@ async def fork_project_with_polling(
     await asyncio.sleep(initial_wait)
     
     # Poll for fork completion
-    forked_project = None
+    full_path = f"{group_full_path(gitlab, namespace_id)}/{dest_path}"
     for attempt in range(max_attempts):
         # Find the forked project
-        projects = gitlab.groups.get(namespace_id).projects.list(search=dest_path)
-        for project in projects:
-            if project.path == dest_path:
-                forked_project = gitlab.projects.get(project.id)
-                break
+        forked_project = find_project(gitlab, full_path)
         
         if forked_project:
             logger.info(f"Fork completed after {attempt + 1} attempt(s)")
@@ -142,16 +140,10 @@ async def add_members_to_project(
                 logger.warning(f"Could not add member {gitlab_user_id} to project: {e}")
 
 
-def get_gitlab_client(organization: Organization) -> Gitlab:
+def get_gitlab_credentials(organization: Organization) -> Tuple[str, str]:
     """
-    Get a configured GitLab client from organization settings.
-    
-    Args:
-        organization: The organization with GitLab configuration
-        
-    Returns:
-        Configured GitLab client
-        
+    GitLab URL and decrypted token from organization settings.
+
     Raises:
         ValueError: If GitLab configuration is missing or invalid
     """
@@ -163,13 +155,26 @@ def get_gitlab_client(organization: Organization) -> Gitlab:
     if not gitlab_url or not gitlab_token_encrypted:
         raise ValueError(f"Organization {organization.id} missing GitLab configuration")
     
-    gitlab_token = decrypt_api_key(gitlab_token_encrypted)
-    
-    # Transform URL for Docker environment if needed
-    from ..utils.docker_utils import transform_localhost_url
-    api_url = transform_localhost_url(gitlab_url)
+    return gitlab_url, decrypt_api_key(gitlab_token_encrypted)
+
+
+def get_gitlab_client(organization: Organization) -> Gitlab:
+    """
+    Get a configured GitLab client from organization settings.
+
+    The client is shared by every activity running in this worker thread that
+    uses the same GitLab instance and token.
     
-    return Gitlab(api_url, private_token=gitlab_token)
+    Args:
+        organization: The organization with GitLab configuration
+        
+    Returns:
+        Configured GitLab client
+        
+    Raises:
+        ValueError: If GitLab configuration is missing or invalid
+    """
+    return gitlab_client(*get_gitlab_credentials(organization))
 
 
 def get_course_gitlab_config(course: Course, gitlab: Optional[Gitlab] = None) -> Dict[str, Any]:
@@ -255,6 +260,64 @@ def get_course_gitlab_config(course: Course, gitlab: Optional[Gitlab] = None) ->
     }
 
 
+def student_repository_name(user: Any) -> tuple[str, str]:
+    """Name and path of the personal repository of ``user``."""
+    username = user.email.split('@')[0] if user.email else f"user_{user.id}"
+    return username, username.lower().replace(' ', '-').replace('_', '-')
+
+
+def student_repository_info(project: Dict[str, Any], gitlab_url: str, namespace_id: int) -> Dict[str, Any]:
+    """
+    Repository information stored in course member and submission group properties.
+
+    Args:
+        project: GitLab project attributes, as returned by the projects and fork APIs
+        gitlab_url: GitLab URL of the organization
+        namespace_id: Students group the repository belongs to
+    """
+    return {
+        "url": gitlab_url,
+        "full_path": project['path_with_namespace'],
+        "directory": None,  # Will be set per assignment
+        "web_url": project['web_url'],
+        "group_id": project['id'],
+        "namespace_id": namespace_id,
+        "namespace_path": project['namespace']['full_path'],
+        # Keep for backward compatibility
+        "gitlab_project_id": project['id'],
+        "gitlab_project_path": project['path_with_namespace'],
+        "http_url_to_repo": project.get('http_url_to_repo'),
+        "ssh_url_to_repo": project.get('ssh_url_to_repo')
+    }
+
+
+def resolve_student_template_id(gitlab: Gitlab, gitlab_config: Dict[str, Any], course_id: str) -> int:
+    """
+    Project ID of the student-template of a course.
+
+    Older courses only store the template path, which is then looked up.
+    """
+    student_template_id = gitlab_config.get('template_project_id')
+    if student_template_id:
+        return student_template_id
+
+    template_path = gitlab_config.get('template_path')
+    if not template_path:
+        raise ValueError(f"Course {course_id} missing student-template project configuration")
+    
+    # Look up project by its full path
+    try:
+        student_template_id = resolve_project_id(gitlab, template_path)
+        
+        if not student_template_id:
+            raise ValueError(f"Student template project not found at path: {template_path}")
+        
+        logger.info(f"Found student-template project with ID {student_template_id} at {template_path}")
+        return student_template_id
+    except Exception as e:
+        raise ValueError(f"Could not find student-template project at {template_path}: {e}")
+
+
 async def find_existing_repository(
     gitlab: Gitlab,
     namespace_id: int,
@@ -272,22 +335,12 @@ async def find_existing_repository(
         The existing project if found, None otherwise
     """
     try:
-        # Try to get the namespace group
-        namespace_group = gitlab.groups.get(namespace_id)
-        
-        # Method 1: Direct path access
-        full_path = f"{namespace_group.full_path}/{repo_path}"
-        try:
-            project = gitlab.projects.get(full_path.replace('/', '%2F'))
+        # Direct path access, the namespace path is cached per worker
+        full_path = f"{group_full_path(gitlab, namespace_id)}/{repo_path}"
+        project = find_project(gitlab, full_path)
+        if project:
             logger.info(f"Found existing repository: {project.path_with_namespace}")
             return project
-        except:
-            pass
-        
-        # Method 2: List projects in namespace
-        for project in namespace_group.projects.list(all=True):
-            if project.path == repo_path:
-                return gitlab.projects.get(project.id)
                 
     except Exception as e:
         logger.warning(f"Error checking for existing repository: {e}")
@@ -404,53 +457,11 @@ async def create_student_repository(
         gitlab_url = organization.properties.get('gitlab', {}).get('url')
         
         # Get student-template project ID
-        student_template_id = gitlab_config.get('template_project_id')
-        
-        # If not stored as ID, look it up from path (backward compatibility)
-        if not student_template_id:
-            template_path = gitlab_config.get('template_path')
-            if not template_path:
-                raise ValueError(f"Course {course_id} missing student-template project configuration")
-            
-            # Look up project by searching in the course namespace
-            try:
-                # Extract the project name from the full path
-                project_name = template_path.split('/')[-1]  # 'student-template'
-                course_group_id = gitlab_config.get('group_id')
-                
-                if not course_group_id:
-                    raise ValueError(f"Course {course_id} missing gitlab.group_id")
-                
-                # Search for the project in the course namespace
-                projects = gitlab.projects.list(
-                    search=project_name,
-                    search_namespaces=True,
-                    owned=True,
-                    all=True
-                )
-                
-                # Find the exact match by full path
-                student_template_project = None
-                for project in projects:
-                    if project.path_with_namespace == template_path:
-                        student_template_project = project
-                        break
-                
-                if not student_template_project:
-                    raise ValueError(f"Student template project not found at path: {template_path}")
-                
-                student_template_id = student_template_project.id
-                logger.info(f"Found student-template project with ID {student_template_id} at {template_path}")
-            except Exception as e:
-                raise ValueError(f"Could not find student-template project at {template_path}: {e}")
+        student_template_id = resolve_student_template_id(gitlab, gitlab_config, course_id)
             
         # Get user information for repository naming
-        user = course_member.user
-        username = user.email.split('@')[0] if user.email else f"user_{user.id}"
-        
-        # Generate repository name and path
+        username, repo_path = student_repository_name(course_member.user)
         repo_name = username
-        repo_path = repo_name.lower().replace(' ', '-').replace('_', '-')
         
         # Get the students group namespace
         gitlab_namespace_id = gitlab_config['students_group_id']
@@ -512,20 +523,7 @@ async def create_student_repository(
             )
         
         # Prepare repository information
-        repository_info = {
-            "url": gitlab_url,
-            "full_path": forked_project.path_with_namespace,
-            "directory": None,  # Will be set per assignment
-            "web_url": forked_project.web_url,
-            "group_id": forked_project.id,
-            "namespace_id": gitlab_namespace_id,
-            "namespace_path": forked_project.namespace['full_path'] if hasattr(forked_project.namespace, '__getitem__') else forked_project.namespace.full_path,
-            # Keep for backward compatibility
-            "gitlab_project_id": forked_project.id,
-            "gitlab_project_path": forked_project.path_with_namespace,
-            "http_url_to_repo": forked_project.http_url_to_repo,
-            "ssh_url_to_repo": forked_project.ssh_url_to_repo
-        }
+        repository_info = student_repository_info(forked_project.attributes, gitlab_url, gitlab_namespace_id)
         
         # Store repository info in course member properties
         from sqlalchemy.orm.attributes import flag_modified
@@ -592,24 +590,9 @@ async def create_team_repository(
         if not organization:
             raise ValueError(f"Organization for course {course_id} not found")
         
-        # Get GitLab credentials from organization
-        org_properties = organization.properties or {}
-        gitlab_config = org_properties.get('gitlab', {})
-        gitlab_url = gitlab_config.get('url')
-        gitlab_token_encrypted = gitlab_config.get('token')
-        
-        if not gitlab_url or not gitlab_token_encrypted:
-            raise ValueError(f"Organization {organization.id} missing GitLab configuration")
-        
-        # Decrypt the GitLab token
-        gitlab_token = decrypt_api_key(gitlab_token_encrypted)
-        
-        # Transform URL for Docker environment if needed
-        from ..utils.docker_utils import transform_localhost_url
-        api_url = transform_localhost_url(gitlab_url)
-        
-        # Initialize GitLab client with organization's credentials
-        gitlab = Gitlab(api_url, private_token=gitlab_token)
+        # GitLab client with organization's credentials
+        gitlab = get_gitlab_client(organization)
+        gitlab_url = organization.properties.get('gitlab', {}).get('url')
             
         # Get GitLab properties
         course_properties = course.properties or {}
@@ -641,29 +624,10 @@ async def create_team_repository(
             if len(path_parts) < 2:
                 raise ValueError(f"Invalid student template path: {student_template_path}")
             
-            project_name = path_parts[-1]  # Last part is the project name
-            
-            # Get the course group ID to search in the correct namespace
-            course_group_id = gitlab_props.get('group_id')
-            if not course_group_id:
-                raise ValueError(f"Course {course_id} missing gitlab.group_id")
-            
-            # Search for the project in the course namespace
-            projects = gitlab.projects.list(
-                search=project_name,
-                namespace_id=course_group_id
-            )
-            
-            student_template_project = None
-            for project in projects:
-                if project.path == project_name:
-                    student_template_project = gitlab.projects.get(project.id)
-                    break
-            
-            if not student_template_project:
-                raise ValueError(f"Student template project '{project_name}' not found in namespace {course_group_id}")
+            student_template_id = resolve_project_id(gitlab, student_template_path)
             
-            student_template_id = student_template_project.id
+            if not student_template_id:
+                raise ValueError(f"Student template project not found at path: {student_template_path}")
         except Exception as e:
             raise ValueError(f"Could not find student-template project at {student_template_path}: {e}")
             
@@ -772,6 +736,10 @@ class StudentRepositoryCreationWorkflow(BaseWorkflow):
         """Get the workflow name."""
         return "StudentRepositoryCreationWorkflow"
     
+    @classmethod
+    def get_task_queue(cls) -> str:
+        return GITLAB_TASK_QUEUE
+    
     @workflow.run
     async def run(self, params: Dict[str, Any]) -> WorkflowResult:
         """
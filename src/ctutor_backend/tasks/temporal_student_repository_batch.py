@@ -0,0 +1,514 @@
+"""
+Temporal workflow for provisioning the student repositories of a whole course.
+
+StudentRepositoryCreationWorkflow forks the student-template for one student
+and waits for the fork by searching for it. Onboarding a course with many
+students that way serializes thousands of GitLab calls and sleeps. The batch
+workflow pipelines the same steps for many students at once:
+
+1. Existing repositories of the students group are listed once.
+2. Forks are started concurrently, all GitLab calls share one token bucket
+   that follows GitLab's ``RateLimit-*`` and ``Retry-After`` headers.
+3. The import status of all pending forks is polled in one loop by project id.
+4. Finished forks are configured (unprotected branches, student maintainer)
+   and stored in the course member and submission group properties.
+"""
+import time
+import asyncio
+import logging
+import threading
+from datetime import timedelta
+from functools import partial
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Optional
+
+from temporalio import workflow, activity
+from temporalio.common import RetryPolicy
+
+from .temporal_base import BaseWorkflow, WorkflowResult
+from .temporal_client import GITLAB_TASK_QUEUE
+from .temporal_heartbeat import TEMPORAL_ACTIVITY_HEARTBEAT_INTERVAL
+from .registry import register_task
+
+logger = logging.getLogger(__name__)
+
+# Sustained GitLab requests per second, GitLab.com allows 2000 per minute per user
+GITLAB_REQUESTS_PER_SECOND = 10.0
+GITLAB_BURST = 20
+# Blocking GitLab calls running at the same time
+GITLAB_MAX_IN_FLIGHT = 8
+# Stop before the last requests of a rate limit window are used up
+RATE_LIMIT_RESERVE = 10
+
+FORK_POLL_INTERVAL = 3
+FORK_TIMEOUT = 600
+
+MEMBERS_PER_ACTIVITY = 200
+
+
+class TokenBucket:
+    """
+    Token bucket limiting the request rate against GitLab.
+
+    ``update_from_headers`` is called from the HTTP threads with every
+    response; once GitLab reports that the window is nearly used up (or
+    answers 429) all requests pause until the window resets.
+    """
+
+    def __init__(self, rate: float, capacity: int, reserve: int = RATE_LIMIT_RESERVE,
+                 clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.capacity = capacity
+        self.reserve = reserve
+        self.clock = clock
+        self.tokens = float(capacity)
+        self.updated = clock()
+        self.paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self) -> float:
+        """Seconds until the next request may be sent, taking a token if it is 0."""
+        now = self.clock()
+        if now < self.paused_until:
+            return self.paused_until - now
+
+        self._refill(now)
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                delay = self.delay()
+                if delay <= 0:
+                    return
+                await asyncio.sleep(delay)
+
+    def pause(self, seconds: float):
+        self.paused_until = max(self.paused_until, self.clock() + seconds)
+
+    def update_from_headers(self, status_code: int, headers: Any):
+        retry_after = headers.get("Retry-After")
+        if status_code == 429 and retry_after:
+            try:
+                self.pause(float(retry_after))
+            except ValueError:
+                self.pause(60)
+            return
+
+        remaining = headers.get("RateLimit-Remaining")
+        reset = headers.get("RateLimit-Reset")
+        if remaining is None or reset is None:
+            return
+
+        try:
+            if int(remaining) <= self.reserve:
+                # RateLimit-Reset is a unix timestamp
+                self.pause(max(0.0, float(reset) - time.time()))
+        except ValueError:
+            pass
+
+
+class GitLabScheduler:
+    """
+    Runs blocking python-gitlab calls in threads under a shared rate limit.
+
+    Clients are not shared between threads: every call gets the client of the
+    thread it runs in from ``client``, e.g. ``gitlab_clients.gitlab_client``
+    bound to a URL and token. ``close`` removes the response hooks the
+    scheduler added to the sessions of these long-lived clients.
+    """
+
+    def __init__(self, client: Callable[[], Any], bucket: TokenBucket, max_in_flight: int = GITLAB_MAX_IN_FLIGHT):
+        self.client = client
+        self.bucket = bucket
+        self.requests = 0
+        self._in_flight = asyncio.Semaphore(max_in_flight)
+        self._sessions: List[Any] = []
+        self._sessions_lock = threading.Lock()
+
+    def _observe(self, response, *args, **kwargs):
+        self.bucket.update_from_headers(response.status_code, response.headers)
+
+    def _thread_client(self) -> Any:
+        gitlab = self.client()
+        session = getattr(gitlab, "session", None)
+        if session is not None:
+            hooks = session.hooks.setdefault("response", [])
+            if self._observe not in hooks:
+                # Every response, including python-gitlab's own retries, updates the bucket
+                hooks.append(self._observe)
+                with self._sessions_lock:
+                    self._sessions.append(session)
+        return gitlab
+
+    async def call(self, function: Callable, *args, **kwargs) -> Any:
+        """Run ``function(gitlab, *args, **kwargs)`` in a thread, with that thread's client."""
+        await self.bucket.acquire()
+        async with self._in_flight:
+            self.requests += 1
+            return await asyncio.to_thread(lambda: function(self._thread_client(), *args, **kwargs))
+
+    def close(self):
+        with self._sessions_lock:
+            sessions, self._sessions = self._sessions, []
+        for session in sessions:
+            hooks = session.hooks.get("response", [])
+            if self._observe in hooks:
+                hooks.remove(self._observe)
+
+
+def _already_member(error: Exception) -> bool:
+    return getattr(error, "response_code", None) == 409 or "already" in str(error).lower()
+
+
+async def _provision_member(
+    scheduler: GitLabScheduler,
+    poller: "ImportPoller",
+    member: Any,
+    existing: Dict[str, Dict[str, Any]],
+    template_id: int,
+    namespace_id: int,
+) -> Dict[str, Any]:
+    """Fork (or reuse) the repository of one member and make the student maintainer."""
+    from .temporal_student_repository import student_repository_name
+    from ..gitlab_utils import gitlab_unprotect_branches
+
+    username, repo_path = student_repository_name(member.user)
+
+    project = existing.get(repo_path)
+    forked = project is None
+    if forked:
+        project = await scheduler.call(
+            lambda gitlab: gitlab.http_post(
+                f"/projects/{template_id}/fork",
+                post_data={"path": repo_path, "name": username, "namespace_id": namespace_id}
+            )
+        )
+        project = await poller.wait_for(project)
+
+        # Unprotect branches to allow student pushes
+        for branch in ["main", "master"]:
+            try:
+                await scheduler.call(gitlab_unprotect_branches, project["id"], branch)
+            except Exception as e:
+                logger.debug(f"Could not unprotect {branch} branch of {repo_path}: {e}")
+
+    gitlab_user_id = (member.properties or {}).get("gitlab_user_id")
+    if not gitlab_user_id and member.user.email:
+        users = await scheduler.call(lambda gitlab: gitlab.users.list(search=member.user.email))
+        gitlab_user_id = users[0].id if users else None
+
+    if gitlab_user_id:
+        try:
+            await scheduler.call(
+                lambda gitlab: gitlab.http_post(
+                    f"/projects/{project['id']}/members",
+                    post_data={"user_id": gitlab_user_id, "access_level": 40}
+                )
+            )
+        except Exception as e:
+            if not _already_member(e):
+                logger.warning(f"Could not add member {gitlab_user_id} to {repo_path}: {e}")
+    else:
+        logger.warning(f"No GitLab user found for course member {member.id}")
+
+    return {"project": project, "gitlab_user_id": gitlab_user_id, "forked": forked}
+
+
+class ImportPoller:
+    """
+    Polls the import status of all pending forks in one loop.
+
+    Each round requests ``/projects/:id/import`` once per pending fork and
+    wakes up the forks that finished, instead of every fork sleeping and
+    searching the group on its own.
+    """
+
+    def __init__(self, scheduler: GitLabScheduler, interval: float = FORK_POLL_INTERVAL, timeout: float = FORK_TIMEOUT):
+        self.scheduler = scheduler
+        self.interval = interval
+        self.timeout = timeout
+        self.pending: Dict[int, asyncio.Future] = {}
+        self.started: Dict[int, float] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    async def wait_for(self, project: Dict[str, Any]) -> Dict[str, Any]:
+        """Wait until the fork ``project`` (as returned by the fork API) is imported."""
+        if project.get("import_status") in (None, "finished", "none"):
+            return project
+
+        future = asyncio.get_running_loop().create_future()
+        self.pending[project["id"]] = future
+        self.started[project["id"]] = time.monotonic()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+        await future
+        return project
+
+    async def _check(self, project_id: int):
+        future = self.pending[project_id]
+        try:
+            status = await self.scheduler.call(lambda gitlab: gitlab.http_get(f"/projects/{project_id}/import"))
+        except Exception as e:
+            future.set_exception(e)
+            return
+
+        import_status = status.get("import_status")
+        if import_status in ("finished", "none"):
+            future.set_result(None)
+        elif import_status == "failed":
+            future.set_exception(ValueError(f"Fork {project_id} failed: {status.get('import_error')}"))
+        elif time.monotonic() - self.started[project_id] > self.timeout:
+            future.set_exception(TimeoutError(f"Fork {project_id} not finished after {self.timeout}s"))
+
+    async def _run(self):
+        while self.pending:
+            await asyncio.sleep(self.interval)
+            await asyncio.gather(*(self._check(project_id) for project_id in list(self.pending)))
+            for project_id in [pid for pid, future in self.pending.items() if future.done()]:
+                del self.pending[project_id]
+                del self.started[project_id]
+
+
+async def _completed_with_heartbeats(
+    tasks: Iterable[asyncio.Task],
+    progress: Callable[[], Dict[str, Any]],
+    interval: float = TEMPORAL_ACTIVITY_HEARTBEAT_INTERVAL
+) -> AsyncIterator[Any]:
+    """
+    Yield the results of ``tasks`` as they complete.
+
+    Heartbeats ``progress()`` after every round of completions and at least
+    every ``interval`` seconds, since waiting for forks can take longer than
+    the activity's heartbeat timeout.
+    """
+    pending = set(tasks)
+    while pending:
+        done, pending = await asyncio.wait(pending, timeout=interval, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            yield task.result()
+        activity.heartbeat(progress())
+
+
+@activity.defn(name="list_course_members_without_repository")
+async def list_course_members_without_repository(
+    course_id: str,
+    course_member_ids: Optional[List[str]] = None
+) -> List[str]:
+    """IDs of the students of a course that have no personal repository yet."""
+    from ..database import get_db
+    from ..model.course import CourseMember
+
+    with next(get_db()) as db:
+        query = db.query(CourseMember.id).filter(
+            CourseMember.course_id == course_id,
+            CourseMember.course_role_id == "_student",
+            CourseMember.gitlab_full_path.is_(None)
+        )
+        if course_member_ids:
+            query = query.filter(CourseMember.id.in_(course_member_ids))
+
+        return [str(member_id) for (member_id,) in query.order_by(CourseMember.id).all()]
+
+
+@activity.defn(name="provision_student_repositories")
+async def provision_student_repositories(course_id: str, course_member_ids: List[str]) -> Dict[str, Any]:
+    """
+    Create the personal repositories of many students of one course.
+
+    Reports progress through activity heartbeats, also while forks are still
+    importing, and returns the number of provisioned repositories, failures,
+    GitLab requests and throughput.
+    """
+    from sqlalchemy.orm import joinedload
+    from sqlalchemy.orm.attributes import flag_modified
+    from ..database import get_db
+    from ..model.course import Course, CourseMember, CourseSubmissionGroup, CourseSubmissionGroupMember
+    from ..model.organization import Organization
+    from ..gitlab_clients import gitlab_client
+    from .temporal_student_repository import (
+        get_gitlab_credentials,
+        get_course_gitlab_config,
+        resolve_student_template_id,
+        student_repository_info,
+        update_submission_groups,
+    )
+
+    started = time.monotonic()
+
+    with next(get_db()) as db:
+        course = db.query(Course).filter(Course.id == course_id).first()
+        if not course:
+            raise ValueError(f"Course {course_id} not found")
+
+        organization = db.query(Organization).filter(Organization.id == course.organization_id).first()
+        if not organization:
+            raise ValueError(f"Organization for course {course_id} not found")
+
+        gitlab_url, gitlab_token = get_gitlab_credentials(organization)
+        gitlab = gitlab_client(gitlab_url, gitlab_token)
+        gitlab_config = get_course_gitlab_config(course, gitlab)
+        namespace_id = gitlab_config['students_group_id']
+        template_id = resolve_student_template_id(gitlab, gitlab_config, course_id)
+
+        scheduler = GitLabScheduler(partial(gitlab_client, gitlab_url, gitlab_token), TokenBucket(GITLAB_REQUESTS_PER_SECOND, GITLAB_BURST))
+        poller = ImportPoller(scheduler)
+
+        try:
+            # One listing of the students group replaces a search per student
+            projects = await scheduler.call(
+                lambda gitlab: gitlab.groups.get(namespace_id, lazy=True).projects.list(all=True, per_page=100)
+            )
+            existing = {project.path: project.attributes for project in projects}
+
+            members = db.query(CourseMember).options(joinedload(CourseMember.user)).filter(
+                CourseMember.course_id == course_id,
+                CourseMember.id.in_(course_member_ids)
+            ).all()
+
+            individual_groups: Dict[str, List[str]] = {}
+            rows = db.query(CourseSubmissionGroupMember.course_member_id, CourseSubmissionGroup.id).join(
+                CourseSubmissionGroup,
+                CourseSubmissionGroup.id == CourseSubmissionGroupMember.course_submission_group_id
+            ).filter(
+                CourseSubmissionGroup.course_id == course_id,
+                CourseSubmissionGroup.max_group_size == 1,
+                CourseSubmissionGroupMember.course_member_id.in_(course_member_ids)
+            ).all()
+            for member_id, group_id in rows:
+                individual_groups.setdefault(str(member_id), []).append(str(group_id))
+
+            provisioned, forked, failed = 0, 0, []
+
+            async def provision(member):
+                try:
+                    return member, await _provision_member(scheduler, poller, member, existing, template_id, namespace_id), None
+                except Exception as e:
+                    return member, None, e
+
+            def progress():
+                return {"done": provisioned + len(failed), "total": len(members), "importing": len(poller.pending)}
+
+            tasks = [asyncio.create_task(provision(member)) for member in members]
+            async for member, result, error in _completed_with_heartbeats(tasks, progress):
+
+                if error is not None:
+                    logger.error(f"Failed to provision repository for course member {member.id}: {error}")
+                    failed.append({"course_member_id": str(member.id), "error": str(error)})
+                else:
+                    repository_info = student_repository_info(result["project"], gitlab_url, namespace_id)
+                    member.properties = member.properties or {}
+                    member.properties['gitlab'] = repository_info
+                    if result["gitlab_user_id"]:
+                        member.properties['gitlab_user_id'] = result["gitlab_user_id"]
+                    flag_modified(member, "properties")
+                    db.add(member)
+                    await update_submission_groups(db, individual_groups.get(str(member.id), []), repository_info)
+                    provisioned += 1
+                    forked += result["forked"]
+
+        finally:
+            # The clients outlive the activity, their sessions must not keep its hooks
+            scheduler.close()
+
+        db.commit()
+
+    elapsed = time.monotonic() - started
+    logger.info(
+        f"Provisioned {provisioned}/{len(members)} repositories for course {course_id} in {elapsed:.1f}s "
+        f"({scheduler.requests} GitLab requests)"
+    )
+
+    return {
+        "provisioned": provisioned,
+        "forked": forked,
+        "failed": failed,
+        "total": len(members),
+        "gitlab_requests": scheduler.requests,
+        "elapsed_seconds": round(elapsed, 1),
+        "repositories_per_minute": round(provisioned / elapsed * 60, 1) if elapsed > 0 else None,
+    }
+
+
+@register_task
+@workflow.defn(name="CourseStudentRepositoriesWorkflow", sandboxed=False)
+class CourseStudentRepositoriesWorkflow(BaseWorkflow):
+    """
+    Provision the repositories of all students of a course that have none.
+    """
+
+    @classmethod
+    def get_name(cls) -> str:
+        """Get the workflow name."""
+        return "CourseStudentRepositoriesWorkflow"
+
+    @classmethod
+    def get_task_queue(cls) -> str:
+        return GITLAB_TASK_QUEUE
+
+    @classmethod
+    def get_execution_timeout(cls) -> timedelta:
+        return timedelta(hours=6)
+
+    @workflow.run
+    async def run(self, params: Dict[str, Any]) -> WorkflowResult:
+        """
+        Expected params:
+        - course_id: ID of the course
+        - course_member_ids: Optional subset of course members
+        """
+        course_id = params.get('course_id')
+        if not course_id:
+            return WorkflowResult(status="failed", result=None, error="course_id is required")
+
+        retry_policy = RetryPolicy(
+            maximum_attempts=3,
+            initial_interval=timedelta(seconds=5),
+            maximum_interval=timedelta(minutes=1),
+            backoff_coefficient=2
+        )
+
+        try:
+            member_ids = await workflow.execute_activity(
+                list_course_members_without_repository,
+                args=[course_id, params.get('course_member_ids')],
+                retry_policy=retry_policy,
+                start_to_close_timeout=timedelta(minutes=1)
+            )
+
+            totals = {"provisioned": 0, "forked": 0, "failed": [], "gitlab_requests": 0, "elapsed_seconds": 0.0}
+            for offset in range(0, len(member_ids), MEMBERS_PER_ACTIVITY):
+                # On retry, repositories forked by a failed attempt are found in the group listing
+                chunk = member_ids[offset:offset + MEMBERS_PER_ACTIVITY]
+                result = await workflow.execute_activity(
+                    provision_student_repositories,
+                    args=[course_id, chunk],
+                    retry_policy=retry_policy,
+                    start_to_close_timeout=timedelta(hours=1),
+                    heartbeat_timeout=timedelta(minutes=5)
+                )
+                for key in ("provisioned", "forked", "gitlab_requests", "elapsed_seconds"):
+                    totals[key] += result[key]
+                totals["failed"].extend(result["failed"])
+
+            elapsed = totals["elapsed_seconds"]
+            totals["total"] = len(member_ids)
+            totals["repositories_per_minute"] = round(totals["provisioned"] / elapsed * 60, 1) if elapsed > 0 else None
+
+            return WorkflowResult(
+                status="completed" if not totals["failed"] else "failed",
+                result=totals,
+                error=f"{len(totals['failed'])} repositories failed" if totals["failed"] else None,
+                metadata={"repository_count": totals["provisioned"]}
+            )
+
+        except Exception as e:
+            logger.error(f"Course student repository provisioning failed: {e}")
+            return WorkflowResult(status="failed", result=None, error=str(e))
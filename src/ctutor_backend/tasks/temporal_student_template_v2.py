@@ -2,20 +2,36 @@
 Temporal workflows for generating student templates from Example Library.
 Version 2: Fixed deployment status handling and sandbox restrictions.
 """
+import os
+import json
+import asyncio
+import hashlib
 import logging
+from collections import OrderedDict
 from datetime import timedelta
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
 
 from temporalio import workflow, activity
 from temporalio.common import RetryPolicy
 
 from .temporal_base import BaseWorkflow, WorkflowResult
+from .temporal_heartbeat import heartbeating
+from ..services.deployment_summary import invalidate_deployment_summary_sync
+from .temporal_client import GENERATION_TASK_QUEUE
 from .registry import register_task
 
 logger = logging.getLogger(__name__)
 
+# Object downloads in flight per materialization
+EXAMPLE_DOWNLOAD_CONCURRENCY = int(os.environ.get("EXAMPLE_DOWNLOAD_CONCURRENCY", "8"))
+# Upper bound of example files kept on the worker between activities
+EXAMPLE_CACHE_MAX_BYTES = int(os.environ.get("EXAMPLE_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
 
-async def process_example_for_student_template_v2(
+# ExampleVersion.id -> (object etags, files), least recently used first
+_example_cache: "OrderedDict[str, Tuple[Dict[str, str], Dict[str, bytes]]]" = OrderedDict()
+
+
+def process_example_for_student_template_v2(
     example_files: Dict[str, bytes],
     target_path: Any,  # Path object
     course_content: Any,
@@ -144,6 +160,36 @@ async def process_example_for_student_template_v2(
         return {"success": False, "error": str(e)}
 
 
+# Bump whenever process_example_for_student_template_v2 produces different output
+STUDENT_TEMPLATE_GENERATOR_VERSION = 1
+
+
+def student_template_manifest(deployment: Any, commit: str, tree: str) -> Dict[str, Any]:
+    """
+    Inputs that fully determine the generated directory of one course content.
+
+    ``tree`` is the git tree SHA of the content directory in the assignments
+    repository. It covers every file including ``meta.yaml``, so a new
+    assignments commit that leaves the directory untouched keeps the hash.
+    """
+    inputs = {
+        "generator": STUDENT_TEMPLATE_GENERATOR_VERSION,
+        "example_version_id": str(deployment.example_version_id) if deployment.example_version_id else None,
+        "deployment_path": str(deployment.deployment_path),
+        "tree": tree,
+    }
+    input_hash = hashlib.sha256(json.dumps(inputs, sort_keys=True).encode()).hexdigest()
+    return {**inputs, "commit": commit, "input_hash": input_hash}
+
+
+def student_template_unchanged(deployment: Any, manifest: Dict[str, Any], template_repo_path: Any) -> bool:
+    """Whether the template already holds the output generated from ``manifest``."""
+    previous = (deployment.deployment_metadata or {}).get("template_manifest") or {}
+    if previous.get("input_hash") != manifest["input_hash"]:
+        return False
+    return (template_repo_path / str(deployment.deployment_path)).is_dir()
+
+
 async def generate_assignments_repository(
     course_id: str,
     assignments_url: str,
@@ -220,6 +266,13 @@ async def generate_assignments_repository(
         processed_count = 0
         errors = []
         
+        # Fetch all example versions up front, concurrently
+        materialized = await materialize_examples([
+            (content.deployment.example_version.example.repository, content.deployment.example_version)
+            for content in course_contents
+            if content.deployment and content.deployment.example_version and content.deployment.example_version.example
+        ])
+        
         # Process each course content with full example data
         for content in course_contents:
             try:
@@ -236,8 +289,9 @@ async def generate_assignments_repository(
                 
                 logger.info(f"Processing assignment content: {content.path}, example: {example.identifier}")
                 
-                # Download example files from MinIO
-                example_files = await download_example_files(example.repository, example_version)
+                example_files = materialized[str(example_version.id)]
+                if isinstance(example_files, BaseException):
+                    raise example_files
                 
                 # For assignments repository, copy ALL files unmodified to preserve full example
                 content_path_str = str(example.identifier)
@@ -346,13 +400,18 @@ This repository contains the complete example content with solutions for course
         }
 
 
-async def download_example_files(repository: Any, version: Any) -> Dict[str, bytes]:
+async def download_example_files(
+    repository: Any,
+    version: Any,
+    semaphore: Optional[asyncio.Semaphore] = None
+) -> Dict[str, bytes]:
     """
     Download example files from repository based on its source type.
     
     Args:
         repository: ExampleRepository with source type information
         version: ExampleVersion with storage path information
+        semaphore: Optional bound of concurrent downloads shared with other versions
         
     Returns:
         Dictionary mapping file paths to their content
@@ -364,11 +423,33 @@ async def download_example_files(repository: Any, version: Any) -> Dict[str, byt
     if repository.source_type == 'git':
         return await download_example_from_git(repository, version)
     elif repository.source_type in ['minio', 's3']:
-        return await download_example_from_object_storage(repository, version)
+        return await download_example_from_object_storage(repository, version, semaphore)
     else:
         raise ValueError(f"Unsupported source type: {repository.source_type}")
 
 
+async def materialize_examples(versions: List[Tuple[Any, Any]]) -> Dict[str, Any]:
+    """
+    Download the files of many example versions concurrently.
+
+    ``versions`` are ``(repository, example_version)`` pairs; versions shared
+    by several contents are downloaded once. All downloads share one bound of
+    ``EXAMPLE_DOWNLOAD_CONCURRENCY``. Returns the files per
+    ``ExampleVersion.id``, or the exception raised while downloading them.
+    """
+    unique: Dict[str, Tuple[Any, Any]] = {}
+    for repository, version in versions:
+        unique.setdefault(str(version.id), (repository, version))
+
+    semaphore = asyncio.Semaphore(EXAMPLE_DOWNLOAD_CONCURRENCY)
+    results = await asyncio.gather(
+        *(download_example_files(repository, version, semaphore) for repository, version in unique.values()),
+        return_exceptions=True
+    )
+
+    return dict(zip(unique.keys(), results))
+
+
 async def download_example_from_git(repository: Any, version: Any) -> Dict[str, bytes]:
     # """Download example files from Git repository."""
     # import os
@@ -401,16 +482,33 @@ async def download_example_from_git(repository: Any, version: Any) -> Dict[str,
     raise NotImplementedError(f"Git source type is not yet implemented for repository '{repository.name}'")
 
 
+def _cache_example(version_id: str, etags: Dict[str, str], files: Dict[str, bytes]):
+    _example_cache[version_id] = (etags, files)
+    _example_cache.move_to_end(version_id)
+
+    size = sum(len(data) for _, cached in _example_cache.values() for data in cached.values())
+    while size > EXAMPLE_CACHE_MAX_BYTES and len(_example_cache) > 1:
+        _, (_, evicted) = _example_cache.popitem(last=False)
+        size -= sum(len(data) for data in evicted.values())
+
+
 async def download_example_from_object_storage(
     repository: Any, 
-    version: Any
+    version: Any,
+    semaphore: Optional[asyncio.Semaphore] = None
 ) -> Dict[str, bytes]:
     """
     Download example files from MinIO/S3 object storage.
+
+    Listing and downloads go through StorageService, bounded by ``semaphore``.
+    Files are cached per ExampleVersion.id, since versions can be re-uploaded
+    in place: a cached file is reused while its listed etag is unchanged,
+    otherwise it is fetched with a conditional get.
     
     Args:
         repository: ExampleRepository with source_type in ['minio', 's3']
         version: ExampleVersion with storage path information
+        semaphore: Optional bound of concurrent downloads
         
     Returns:
         Dictionary mapping file paths to their content
@@ -419,43 +517,86 @@ async def download_example_from_object_storage(
     
     # Initialize storage service
     storage_service = StorageService()
+    semaphore = semaphore or asyncio.Semaphore(EXAMPLE_DOWNLOAD_CONCURRENCY)
     
     storage_path = version.storage_path
     bucket_name = repository.source_url  # Use repository's source_url as bucket name
     prefix = storage_path.strip('/')
+    version_id = str(version.id)
     
+    async with semaphore:
+        objects = await storage_service.list_objects(bucket_name=bucket_name, prefix=prefix)
+
+    cached_etags, cached_files = _example_cache.get(version_id, ({}, {}))
+
     logger.info(f"Downloading from {repository.source_type} bucket: {bucket_name}, path: {storage_path}")
     
+    async def download(obj: Any, relative_path: str) -> Optional[Tuple[str, bytes]]:
+        cached_etag = cached_etags.get(obj.object_name) if relative_path in cached_files else None
+        if cached_etag is not None and cached_etag == obj.etag:
+            return cached_etag, cached_files[relative_path]
+
+        async with semaphore:
+            try:
+                downloaded = await storage_service.download_file_if_changed(obj.object_name, cached_etag, bucket_name)
+            except Exception as e:
+                logger.error(f"Failed to download {obj.object_name}: {e}")
+                return None
+
+        if downloaded is None:
+            return cached_etag, cached_files[relative_path]
+        data, etag = downloaded
+        return etag or obj.etag, data
+
+    # Get relative paths within example
+    relative_paths = [
+        obj.object_name.replace(prefix, '').lstrip('/') if prefix else obj.object_name
+        for obj in objects
+    ]
+    contents = await asyncio.gather(*(download(obj, path) for obj, path in zip(objects, relative_paths)))
+
     # Download all files for this example
+    etags = {}
     example_files = {}
-    objects = await storage_service.list_objects(
-        prefix=prefix,
-        bucket_name=bucket_name
-    )
-    
-    for obj in objects:
-        try:
-            # Download file content
-            file_data = await storage_service.download_file(
-                object_key=obj.object_name,
-                bucket_name=bucket_name
-            )
-            
-            # Get relative path within example
-            relative_path = obj.object_name
-            if prefix:
-                relative_path = obj.object_name.replace(prefix, '').lstrip('/')
-            
-            example_files[relative_path] = file_data
-        except Exception as e:
-            logger.error(f"Failed to download {obj.object_name}: {e}")
+    for obj, relative_path, downloaded in zip(objects, relative_paths, contents):
+        if downloaded is None:
+            continue
+        etags[obj.object_name], example_files[relative_path] = downloaded
+
+    # Only complete downloads are reused
+    if len(example_files) == len(objects):
+        _cache_example(version_id, etags, example_files)
     
     return example_files
 
 
 # Activities
 @activity.defn(name="generate_student_template_activity_v2")
-async def generate_student_template_activity_v2(
+def generate_student_template_activity_v2(
+    course_id: str,
+    student_template_url: str,
+    assignments_url: str = None,
+    workflow_id: str = None,
+    force_redeploy: bool = False,
+    release: Dict[str, Any] | None = None
+) -> Dict[str, Any]:
+    """
+    Generate the student template, see generate_student_template_v2.
+    
+    A sync activity: git, the file processing and the database access block, it
+    runs on the worker's activity executor and heartbeats meanwhile.
+    """
+    try:
+        with heartbeating():
+            return generate_student_template_v2(
+                course_id, student_template_url, assignments_url, workflow_id, force_redeploy, release
+            )
+    finally:
+        # Deployments end up deployed or failed, however the generation ended
+        invalidate_deployment_summary_sync(course_id)
+
+
+def generate_student_template_v2(
     course_id: str,
     student_template_url: str,
     assignments_url: str = None,
@@ -580,6 +721,7 @@ async def generate_student_template_activity_v2(
             db.add(history)
         
         db.commit()
+        invalidate_deployment_summary_sync(course_id)
         
         logger.info(f"Updated {len(deployments_to_process)} deployments to 'deploying' status")
         
@@ -743,8 +885,10 @@ async def generate_student_template_activity_v2(
             
             # Process each CourseContent with an example
             processed_count = 0
+            unchanged_count = 0
             errors = []
             successfully_processed = []  # Track which content was successfully processed
+            manifests = {}  # Generation inputs per deployment, stored once pushed
             
             for content in course_contents:
                 try:
@@ -819,6 +963,24 @@ async def generate_student_template_activity_v2(
                         except Exception:
                             pass
 
+                    # Contents whose inputs did not change since their last release keep their directory
+                    manifest = None
+                    if commit_to_use:
+                        try:
+                            sub_tree = assignments_repo.commit(commit_to_use).tree / content.deployment.deployment_path
+                            manifest = student_template_manifest(content.deployment, commit_to_use, sub_tree.hexsha)
+                        except Exception as e:
+                            logger.warning(f"Failed to resolve assignments tree for {content.path}: {e}")
+
+                    if manifest and not force_redeploy and student_template_unchanged(content.deployment, manifest, Path(template_repo_path)):
+                        logger.info(f"Skipping {content.path}: generation inputs unchanged")
+                        content.deployment.version_identifier = commit_to_use
+                        manifests[content.deployment.id] = manifest
+                        processed_count += 1
+                        unchanged_count += 1
+                        successfully_processed.append(content)
+                        continue
+
                     # Build files map from assignments repo at the selected commit under deployment path
                     files: Dict[str, bytes] = {}
                     if commit_to_use:
@@ -859,7 +1021,7 @@ async def generate_student_template_activity_v2(
                     # Process the example files for student template
                     # This function handles meta.yaml properties like studentSubmissionFiles,
                     # studentTemplates, additionalFiles, and content directory processing
-                    process_result = await process_example_for_student_template_v2(
+                    process_result = process_example_for_student_template_v2(
                         example_files=files,
                         target_path=Path(full_target_path),
                         course_content=content,
@@ -878,6 +1040,8 @@ async def generate_student_template_activity_v2(
                     # Update deployment version to the commit used for this content (only if from assignments)
                     if commit_to_use:
                         content.deployment.version_identifier = commit_to_use
+                    if manifest:
+                        manifests[content.deployment.id] = manifest
                     # Track that we processed it successfully
                     successfully_processed.append(content)
                     
@@ -974,7 +1138,7 @@ async def generate_student_template_activity_v2(
                     # Check if there are changes to commit
                     if template_repo.is_dirty() or template_repo.untracked_files:
                         # Commit changes - selective release
-                        commit_message = f"Release {processed_count} assignments to student template"
+                        commit_message = f"Release {processed_count - unchanged_count} assignments to student template"
                         template_repo.index.commit(commit_message)
                         logger.info(f"Committed changes: {commit_message}")
                         
@@ -1003,6 +1167,14 @@ async def generate_student_template_activity_v2(
             if git_push_successful and processed_count > 0:
                 # Mark successfully processed content as deployed (only if currently deploying)
                 for content in successfully_processed:
+                    manifest = manifests.get(content.deployment.id)
+                    if manifest:
+                        # Reassign so the JSONB column is flagged as modified
+                        content.deployment.deployment_metadata = {
+                            **(content.deployment.deployment_metadata or {}),
+                            "template_manifest": manifest,
+                        }
+
                     if content.deployment and content.deployment.deployment_status == "deploying":
                         content.deployment.deployment_status = "deployed"
                         content.deployment.deployed_at = datetime.now(timezone.utc)
@@ -1043,9 +1215,10 @@ async def generate_student_template_activity_v2(
             result = {
                 "success": success,
                 "processed_count": processed_count,
+                "unchanged_count": unchanged_count,
                 "total_count": len(course_contents),
                 "errors": errors,
-                "message": f"Processed {processed_count}/{len(course_contents)} examples"
+                "message": f"Processed {processed_count}/{len(course_contents)} examples ({unchanged_count} unchanged)"
             }
             
             if errors:
@@ -1114,7 +1287,7 @@ class GenerateStudentTemplateWorkflowV2(BaseWorkflow):
 
     @classmethod
     def get_task_queue(cls) -> str:
-        return "computor-tasks"
+        return GENERATION_TASK_QUEUE
     
     @classmethod
     def get_execution_timeout(cls) -> timedelta:
@@ -1168,6 +1341,7 @@ class GenerateStudentTemplateWorkflowV2(BaseWorkflow):
                 generate_student_template_activity_v2,
                 args=[course_id, student_template_url, assignments_url, workflow_id, force_redeploy, release],
                 start_to_close_timeout=timedelta(minutes=30),
+                heartbeat_timeout=timedelta(minutes=1),
                 retry_policy=retry_policy
             )
             
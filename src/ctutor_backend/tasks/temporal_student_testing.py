@@ -16,6 +16,7 @@ from temporalio.common import RetryPolicy
 from temporalio.exceptions import ApplicationError
 
 from .temporal_base import BaseWorkflow, WorkflowResult
+from .temporal_heartbeat import heartbeating
 from .registry import register_task
 from ctutor_backend.interface.tests import TestJob
 from ctutor_backend.interface.repositories import Repository
@@ -25,9 +26,16 @@ from ctutor_backend.client.crud_client import CrudClient
 from ctutor_backend.utils.docker_utils import transform_localhost_url
 
 
+# Heartbeat timeout of the blocking activities, see temporal_heartbeat
+ACTIVITY_HEARTBEAT_TIMEOUT = timedelta(minutes=1)
+
+
 # Activities
+# clone_repository and execute_tests block on subprocesses. They are sync
+# activities, run on the worker's activity executor, so several tests run at
+# once instead of one after another on the event loop.
 @activity.defn(name="clone_repository")
-async def clone_repository_activity(repo_data: Dict[str, Any], target_path: str) -> bool:
+def clone_repository_activity(repo_data: Dict[str, Any], target_path: str) -> bool:
     """Clone a git repository to target path."""
     import logging
     logger = logging.getLogger(__name__)
@@ -61,25 +69,28 @@ async def clone_repository_activity(repo_data: Dict[str, Any], target_path: str)
     
     clone_cmd.extend([clone_url, target_path])
     
-    # Execute clone
-    result = subprocess.run(clone_cmd, capture_output=True, text=True)
-    
-    if result.returncode != 0:
-        raise Exception(f"Failed to clone repository: {result.stderr}")
-    
-    # Checkout specific commit if provided
-    if repo.commit:
-        checkout_cmd = ["git", "-C", target_path, "checkout", repo.commit]
-        result = subprocess.run(checkout_cmd, capture_output=True, text=True)
+    with heartbeating() as heartbeat:
+        # Execute clone
+        heartbeat.stage("clone")
+        result = subprocess.run(clone_cmd, capture_output=True, text=True)
         
         if result.returncode != 0:
-            raise Exception(f"Failed to checkout commit {repo.commit}: {result.stderr}")
+            raise Exception(f"Failed to clone repository: {result.stderr}")
+        
+        # Checkout specific commit if provided
+        if repo.commit:
+            heartbeat.stage("checkout")
+            checkout_cmd = ["git", "-C", target_path, "checkout", repo.commit]
+            result = subprocess.run(checkout_cmd, capture_output=True, text=True)
+            
+            if result.returncode != 0:
+                raise Exception(f"Failed to checkout commit {repo.commit}: {result.stderr}")
     
     return True
 
 
 @activity.defn(name="execute_tests")
-async def execute_tests_activity(
+def execute_tests_activity(
     student_path: str,
     reference_path: str,
     test_config: Dict[str, Any],
@@ -184,13 +195,17 @@ async def execute_tests_activity(
     
     # Execute tests using the appropriate backend
     try:
-        await execute_tests_with_backend(
-            backend_type=backend_type,
-            test_file_path=test_file_path,
-            spec_file_path=spec_file_path,
-            test_job_config=job_config,
-            backend_properties=backend_properties
-        )
+        # The backends block on the test engine, on this executor thread or
+        # process, with an event loop of their own
+        with heartbeating() as heartbeat:
+            heartbeat.stage("execute_tests")
+            asyncio.run(execute_tests_with_backend(
+                backend_type=backend_type,
+                test_file_path=test_file_path,
+                spec_file_path=spec_file_path,
+                test_job_config=job_config,
+                backend_properties=backend_properties
+            ))
 
         test_results = None
         
@@ -271,7 +286,7 @@ async def commit_test_results_activity(
         )
         
         # Update the result directly using the ID
-        response = client.update(result_id, result_update)
+        response = await client.aupdate(result_id, result_update)
 
         return isinstance(response,ResultGet)
         
@@ -332,6 +347,7 @@ class StudentTestingWorkflow(BaseWorkflow):
                     clone_repository_activity,
                     args=[job_config.module.model_dump(), student_path],
                     start_to_close_timeout=timedelta(minutes=5),
+                    heartbeat_timeout=ACTIVITY_HEARTBEAT_TIMEOUT,
                     retry_policy=RetryPolicy(maximum_attempts=3)
                 )
                 
@@ -341,6 +357,7 @@ class StudentTestingWorkflow(BaseWorkflow):
                     clone_repository_activity,
                     args=[job_config.reference.model_dump(), reference_path],
                     start_to_close_timeout=timedelta(minutes=5),
+                    heartbeat_timeout=ACTIVITY_HEARTBEAT_TIMEOUT,
                     retry_policy=RetryPolicy(maximum_attempts=3)
                 )
                 
@@ -350,6 +367,7 @@ class StudentTestingWorkflow(BaseWorkflow):
                     execute_tests_activity,
                     args=[student_path, reference_path, test_job, execution_backend_properties],
                     start_to_close_timeout=timedelta(minutes=20),
+                    heartbeat_timeout=ACTIVITY_HEARTBEAT_TIMEOUT,
                     retry_policy=RetryPolicy(maximum_attempts=1)
                 )
                 
@@ -14,6 +14,7 @@ from ctutor_backend.interface.system import ReleaseStudentsCreate
 from ctutor_backend.api.utils import collect_sub_path_positions_if_meta_exists
 from ctutor_backend.interface.deployments import ApiConfig, ComputorDeploymentConfig, CodeabilityReleaseBuilder
 from .temporal_base import BaseWorkflow, WorkflowResult
+from .temporal_client import GITLAB_TASK_QUEUE
 from .registry import register_task
 
 
@@ -61,6 +62,10 @@ class ReleaseStudentsWorkflow(BaseWorkflow):
     def get_name(cls) -> str:
         return "release_students"
     
+    @classmethod
+    def get_task_queue(cls) -> str:
+        return GITLAB_TASK_QUEUE
+    
     @classmethod
     def get_execution_timeout(cls) -> timedelta:
         return timedelta(minutes=30)
@@ -117,6 +122,10 @@ class ReleaseCourseWorkflow(BaseWorkflow):
     def get_name(cls) -> str:
         return "release_course"
     
+    @classmethod
+    def get_task_queue(cls) -> str:
+        return GITLAB_TASK_QUEUE
+    
     @classmethod
     def get_execution_timeout(cls) -> timedelta:
         return timedelta(minutes=60)
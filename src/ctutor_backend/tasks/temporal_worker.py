@@ -5,13 +5,20 @@ Temporal worker implementation for running workflows and activities.
 import asyncio
 import os
 import signal
-from typing import List, Optional
-from temporalio.worker import Worker
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+from temporalio.worker import SharedStateManager, Worker
 from temporalio.client import Client
 
+from ..database import dispose_inherited_connections
 from .temporal_client import (
     get_temporal_client,
-    DEFAULT_TASK_QUEUE
+    DEFAULT_TASK_QUEUE,
+    TESTING_TASK_QUEUE,
+    GITLAB_TASK_QUEUE,
+    GENERATION_TASK_QUEUE
 )
 
 # Import all workflows and activities
@@ -57,23 +64,222 @@ from .temporal_student_repository import (
     create_student_repository,
     create_team_repository
 )
+from .temporal_student_repository_batch import (
+    CourseStudentRepositoriesWorkflow,
+    list_course_members_without_repository,
+    provision_student_repositories
+)
+
+
+@dataclass
+class WorkerProfile:
+    """
+    Workflows and activities served together, with their own task queue and limits.
+    
+    Blocking (non-async) activities run on an executor of ``executor_workers``
+    threads or processes, ``max_concurrent_activities`` by default.
+    """
+    name: str
+    task_queue: str
+    workflows: List[type]
+    activities: List[Callable]
+    max_concurrent_activities: int = 100
+    executor: str = "thread"
+    executor_workers: Optional[int] = None
+
+
+EXECUTORS = ("thread", "process")
+
+
+def _profile(name: str, task_queue: str, workflows: List[type], activities: List[Callable],
+             max_concurrent_activities: int, executor: str = "thread") -> WorkerProfile:
+    """Profile with limits overridable by TEMPORAL_<NAME>_MAX_ACTIVITIES, _EXECUTOR and _EXECUTOR_WORKERS."""
+    prefix = f"TEMPORAL_{name.upper()}_"
+    executor = os.environ.get(prefix + "EXECUTOR", executor).lower()
+    if executor not in EXECUTORS:
+        raise ValueError(f"{prefix}EXECUTOR must be one of {', '.join(EXECUTORS)}")
+    executor_workers = os.environ.get(prefix + "EXECUTOR_WORKERS")
+    
+    return WorkerProfile(
+        name=name,
+        task_queue=task_queue,
+        workflows=workflows,
+        activities=activities,
+        max_concurrent_activities=int(os.environ.get(prefix + "MAX_ACTIVITIES", str(max_concurrent_activities))),
+        executor=executor,
+        executor_workers=int(executor_workers) if executor_workers else None,
+    )
+
+
+def worker_profiles() -> Dict[str, WorkerProfile]:
+    """
+    The worker profiles by name.
+    
+    testing runs student tests, gitlab the hierarchy, repository and release
+    workflows, generation the template and assignments generation. examples
+    holds the example workflows, which only the all profile serves.
+    """
+    return {
+        "testing": _profile(
+            "testing",
+            TESTING_TASK_QUEUE,
+            workflows=[StudentTestingWorkflow],
+            activities=[
+                clone_repository_activity,
+                execute_tests_activity,
+                commit_test_results_activity,
+            ],
+            max_concurrent_activities=10,
+        ),
+        "gitlab": _profile(
+            "gitlab",
+            GITLAB_TASK_QUEUE,
+            workflows=[
+                ReleaseStudentsWorkflow,
+                ReleaseCourseWorkflow,
+                CreateOrganizationWorkflow,
+                CreateCourseFamilyWorkflow,
+                CreateCourseWorkflow,
+                DeployComputorHierarchyWorkflow,
+                StudentRepositoryCreationWorkflow,  # Student repository forking
+                CourseStudentRepositoriesWorkflow,  # Batch student repository provisioning
+            ],
+            activities=[
+                release_students_activity,
+                release_course_activity,
+                create_organization_activity,
+                create_course_family_activity,
+                create_course_activity,
+                create_course_content_types_activity,
+                create_student_repository,  # Fork student-template for individual student
+                create_team_repository,  # Fork student-template for team
+                list_course_members_without_repository,  # Batch provisioning selection
+                provision_student_repositories,  # Batch fork of student-template
+            ],
+            max_concurrent_activities=20,
+        ),
+        "generation": _profile(
+            "generation",
+            GENERATION_TASK_QUEUE,
+            workflows=[
+                # DeployExamplesToCourseWorkflow,  # Deprecated - removed
+                GenerateStudentTemplateWorkflowV2,
+                GenerateAssignmentsRepositoryWorkflow,
+            ],
+            activities=[
+                generate_student_template_activity_v2,  # Student template generation
+                generate_assignments_repository_activity,  # Assignments init/populate
+            ],
+            max_concurrent_activities=4,
+        ),
+        "examples": _profile(
+            "examples",
+            DEFAULT_TASK_QUEUE,
+            workflows=[
+                ExampleLongRunningWorkflow,
+                ExampleDataProcessingWorkflow,
+                ExampleErrorHandlingWorkflow,
+            ],
+            activities=[
+                simulate_processing_activity,
+                process_data_chunk_activity,
+            ],
+            max_concurrent_activities=10,
+        ),
+    }
+
+
+PROFILE_NAMES = ["all", "testing", "gitlab", "generation", "examples"]
+
+
+def merge_profiles(profiles: List[WorkerProfile], task_queue: str) -> WorkerProfile:
+    """One profile serving everything of ``profiles`` on ``task_queue``."""
+    executors = {profile.executor for profile in profiles}
+    executor_workers = [profile.executor_workers or profile.max_concurrent_activities for profile in profiles]
+    return WorkerProfile(
+        name="+".join(profile.name for profile in profiles),
+        task_queue=task_queue,
+        workflows=[w for profile in profiles for w in profile.workflows],
+        activities=[a for profile in profiles for a in profile.activities],
+        max_concurrent_activities=sum(profile.max_concurrent_activities for profile in profiles),
+        # Processes only if every merged profile asked for them
+        executor="process" if executors == {"process"} else "thread",
+        executor_workers=sum(executor_workers),
+    )
+
+
+def resolve_worker_profiles(names: List[str], task_queues: Optional[List[str]] = None) -> List[WorkerProfile]:
+    """
+    The profiles to run, one per task queue.
+    
+    "all" selects every profile. Profiles sharing a task queue are served by
+    one worker. With ``task_queues`` the selected profiles are served on those
+    queues instead of their own.
+    """
+    profiles = worker_profiles()
+    
+    selected: List[WorkerProfile] = []
+    for name in names:
+        if name == "all":
+            selected.extend(profile for profile in profiles.values() if profile not in selected)
+        elif name in profiles:
+            if profiles[name] not in selected:
+                selected.append(profiles[name])
+        else:
+            raise ValueError(f"Unknown worker profile '{name}', choose from {', '.join(PROFILE_NAMES)}")
+    
+    if task_queues:
+        return [merge_profiles(selected, task_queue) for task_queue in task_queues]
+    
+    by_queue: Dict[str, List[WorkerProfile]] = {}
+    for profile in selected:
+        by_queue.setdefault(profile.task_queue, []).append(profile)
+    
+    return [
+        queue_profiles[0] if len(queue_profiles) == 1 else merge_profiles(queue_profiles, task_queue)
+        for task_queue, queue_profiles in by_queue.items()
+    ]
 
 
 class TemporalWorker:
     """Temporal worker for executing workflows and activities."""
     
-    def __init__(self, task_queues: Optional[List[str]] = None):
+    def __init__(self, task_queues: Optional[List[str]] = None, profiles: Optional[List[str]] = None):
         """
         Initialize the worker.
         
         Args:
-            task_queues: List of task queues to listen on. If None, listens on default queue.
+            task_queues: List of task queues to listen on. If None, the queues of the profiles.
+            profiles: Worker profiles to run, see worker_profiles(). Defaults to all.
         """
-        self.task_queues = task_queues or [DEFAULT_TASK_QUEUE]
+        self.profiles = resolve_worker_profiles(profiles or ["all"], task_queues)
+        self.task_queues = [profile.task_queue for profile in self.profiles]
         self.workers: List[Worker] = []
+        self.executors: List[Executor] = []
         self.client: Optional[Client] = None
         self._shutdown = False
     
+    def _create_worker(self, profile: WorkerProfile) -> Worker:
+        executor_workers = profile.executor_workers or profile.max_concurrent_activities
+        shared_state_manager = None
+        if profile.executor == "process":
+            executor = ProcessPoolExecutor(max_workers=executor_workers, initializer=dispose_inherited_connections)
+            # Heartbeats and cancellation of activities in other processes
+            shared_state_manager = SharedStateManager.create_from_multiprocessing(multiprocessing.Manager())
+        else:
+            executor = ThreadPoolExecutor(max_workers=executor_workers, thread_name_prefix=f"activity-{profile.name}")
+        self.executors.append(executor)
+        
+        return Worker(
+            self.client,
+            task_queue=profile.task_queue,
+            workflows=profile.workflows,
+            activities=profile.activities,
+            activity_executor=executor,
+            shared_state_manager=shared_state_manager,
+            max_concurrent_activities=profile.max_concurrent_activities,
+        )
+    
     async def start(self):
         """Start the worker and begin processing workflows."""
         print(f"Starting Temporal worker for queues: {', '.join(self.task_queues)}")
@@ -81,52 +287,14 @@ class TemporalWorker:
         # Get client
         self.client = await get_temporal_client()
         
-        # Define workflows and activities
-        workflows = [
-            ExampleLongRunningWorkflow,
-            ExampleDataProcessingWorkflow,
-            ExampleErrorHandlingWorkflow,
-            StudentTestingWorkflow,
-            ReleaseStudentsWorkflow,
-            ReleaseCourseWorkflow,
-            CreateOrganizationWorkflow,
-            CreateCourseFamilyWorkflow,
-            CreateCourseWorkflow,
-            DeployComputorHierarchyWorkflow,
-            # DeployExamplesToCourseWorkflow,  # Deprecated - removed
-            GenerateStudentTemplateWorkflowV2,
-            GenerateAssignmentsRepositoryWorkflow,
-            StudentRepositoryCreationWorkflow,  # Student repository forking
-        ]
-        
-        activities = [
-            simulate_processing_activity,
-            process_data_chunk_activity,
-            clone_repository_activity,
-            execute_tests_activity,
-            commit_test_results_activity,
-            release_students_activity,
-            release_course_activity,
-            create_organization_activity,
-            create_course_family_activity,
-            create_course_activity,
-            create_course_content_types_activity,
-            generate_student_template_activity_v2,  # Student template generation
-            generate_assignments_repository_activity,  # Assignments init/populate
-            create_student_repository,  # Fork student-template for individual student
-            create_team_repository,  # Fork student-template for team
-        ]
-        
         # Create a worker for each task queue
-        for task_queue in self.task_queues:
-            worker = Worker(
-                self.client,
-                task_queue=task_queue,
-                workflows=workflows,
-                activities=activities,
-            )
+        for profile in self.profiles:
+            worker = self._create_worker(profile)
             self.workers.append(worker)
-            print(f"Created worker for queue: {task_queue}")
+            print(
+                f"Created worker for queue: {profile.task_queue} (profile {profile.name}, "
+                f"{profile.max_concurrent_activities} concurrent activities, {profile.executor} executor)"
+            )
         
         # Setup signal handlers
         signal.signal(signal.SIGINT, self._signal_handler)
@@ -156,6 +324,9 @@ class TemporalWorker:
         # Just wait a bit for graceful shutdown
         await asyncio.sleep(1)
         
+        for executor in self.executors:
+            executor.shutdown(wait=False, cancel_futures=True)
+        
         # Close client connection
         if self.client:
             await self.client.close()
@@ -163,14 +334,15 @@ class TemporalWorker:
         print("Workers shut down successfully")
 
 
-async def run_worker(queues: Optional[List[str]] = None):
+async def run_worker(queues: Optional[List[str]] = None, profiles: Optional[List[str]] = None):
     """
     Run a Temporal worker.
     
     Args:
         queues: Optional list of queue names to process
+        profiles: Optional list of worker profiles to run
     """
-    worker = TemporalWorker(task_queues=queues)
+    worker = TemporalWorker(task_queues=queues, profiles=profiles)
     await worker.start()
 
 
@@ -182,17 +354,21 @@ def main():
     parser.add_argument(
         "--queues",
         nargs="+",
-        help="Task queues to process (default: computor-tasks)",
+        help="Task queues to process (default: the queues of the profiles)",
+        default=None
+    )
+    parser.add_argument(
+        "--profiles",
+        nargs="+",
+        choices=PROFILE_NAMES,
+        help="Worker profiles to run (default: all)",
         default=None
     )
     
     args = parser.parse_args()
     
-    # Use specified queues or default
-    queues = args.queues
-    
     # Run worker
-    asyncio.run(run_worker(queues))
+    asyncio.run(run_worker(args.queues, args.profiles))
 
 
 if __name__ == "__main__":
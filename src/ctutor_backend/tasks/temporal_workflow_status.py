@@ -0,0 +1,173 @@
+"""
+Batched workflow status lookups for the API.
+
+Dashboards poll the status of many deployment workflows at once. Statuses are
+fetched through the shared Temporal client, several at a time with one
+visibility query, and kept for ``TEMPORAL_STATUS_CACHE_TTL`` seconds. Closed
+workflows do not change anymore and are kept for
+``TEMPORAL_CLOSED_STATUS_CACHE_TTL`` seconds.
+"""
+
+import os
+import time
+import asyncio
+import logging
+from typing import Any, Dict, Iterable, Optional
+from temporalio.client import Client, WorkflowExecution, WorkflowExecutionStatus
+from temporalio.service import RPCError, RPCStatusCode
+
+from .temporal_client import get_temporal_client
+
+logger = logging.getLogger(__name__)
+
+TEMPORAL_STATUS_CACHE_TTL = float(os.environ.get("TEMPORAL_STATUS_CACHE_TTL", "5"))
+TEMPORAL_CLOSED_STATUS_CACHE_TTL = float(os.environ.get("TEMPORAL_CLOSED_STATUS_CACHE_TTL", "300"))
+TEMPORAL_DESCRIBE_CONCURRENCY = int(os.environ.get("TEMPORAL_DESCRIBE_CONCURRENCY", "10"))
+
+# Workflow ids per visibility query
+VISIBILITY_BATCH_SIZE = 100
+
+_STATUS_CACHE_SIZE = 10000
+
+CLOSED_STATUSES = {
+    status.name for status in WorkflowExecutionStatus if status != WorkflowExecutionStatus.RUNNING
+}
+
+_status_cache: Dict[str, tuple[float, Dict[str, Any]]] = {}
+
+
+def workflow_status_info(workflow_id: str, execution: WorkflowExecution) -> Dict[str, Any]:
+    """Status of a listed or described workflow execution, as returned by the API."""
+    return {
+        "workflow_id": workflow_id,
+        "status": execution.status.name if execution.status else "UNKNOWN",
+        "start_time": execution.start_time.isoformat() if execution.start_time else None,
+        "close_time": execution.close_time.isoformat() if execution.close_time else None,
+        "execution_time": execution.execution_time.isoformat() if execution.execution_time else None,
+        "task_queue": execution.task_queue,
+        "workflow_type": execution.workflow_type,
+        "is_running": execution.status.name in ["RUNNING", "PENDING"] if execution.status else False
+    }
+
+
+def workflow_not_found(workflow_id: str, error: Exception) -> Dict[str, Any]:
+    return {
+        "workflow_id": workflow_id,
+        "status": "NOT_FOUND",
+        "error": str(error),
+        "is_running": False
+    }
+
+
+def _cached(workflow_id: str) -> Optional[Dict[str, Any]]:
+    entry = _status_cache.get(workflow_id)
+    if entry is None:
+        return None
+    expires, info = entry
+    if expires <= time.monotonic():
+        del _status_cache[workflow_id]
+        return None
+    return info
+
+
+def _cache(workflow_id: str, info: Dict[str, Any]):
+    closed = info["status"] in CLOSED_STATUSES
+    ttl = TEMPORAL_CLOSED_STATUS_CACHE_TTL if closed else TEMPORAL_STATUS_CACHE_TTL
+
+    if len(_status_cache) >= _STATUS_CACHE_SIZE:
+        now = time.monotonic()
+        for key in [key for key, (expires, _) in _status_cache.items() if expires <= now]:
+            del _status_cache[key]
+        if len(_status_cache) >= _STATUS_CACHE_SIZE:
+            _status_cache.clear()
+
+    _status_cache[workflow_id] = (time.monotonic() + ttl, info)
+
+
+def invalidate_workflow_status(workflow_id: str):
+    """Forget the cached status, e.g. after the workflow was cancelled."""
+    _status_cache.pop(workflow_id, None)
+
+
+def _visibility_query(workflow_ids: list[str]) -> str:
+    return "WorkflowId IN (" + ", ".join(f"'{workflow_id}'" for workflow_id in workflow_ids) + ")"
+
+
+async def _list_executions(client: Client, workflow_ids: list[str]) -> Dict[str, WorkflowExecution]:
+    """Latest run of each workflow with a single visibility query per batch."""
+    executions: Dict[str, WorkflowExecution] = {}
+    for start in range(0, len(workflow_ids), VISIBILITY_BATCH_SIZE):
+        batch = workflow_ids[start:start + VISIBILITY_BATCH_SIZE]
+        async for execution in client.list_workflows(_visibility_query(batch), page_size=len(batch) * 2):
+            latest = executions.get(execution.id)
+            if latest is None or (execution.start_time and latest.start_time and execution.start_time > latest.start_time):
+                executions[execution.id] = execution
+    return executions
+
+
+async def _describe(client: Client, workflow_id: str, semaphore: asyncio.Semaphore) -> Dict[str, Any]:
+    async with semaphore:
+        try:
+            description = await client.get_workflow_handle(workflow_id).describe()
+        except RPCError as e:
+            info = workflow_not_found(workflow_id, e)
+            if e.status == RPCStatusCode.NOT_FOUND:
+                _cache(workflow_id, info)
+            return info
+        except Exception as e:
+            return workflow_not_found(workflow_id, e)
+
+    info = workflow_status_info(workflow_id, description)
+    _cache(workflow_id, info)
+    return info
+
+
+async def describe_workflows(workflow_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Status of each workflow in ``workflow_ids``, keyed by workflow id.
+
+    Cached statuses are returned without a request. Several missing ones are
+    listed with one visibility query; workflows the visibility store does not
+    know yet, or all of them when it does not support the query, are described
+    concurrently. Raises if Temporal cannot be reached.
+    """
+    statuses: Dict[str, Dict[str, Any]] = {}
+    missing = []
+    for workflow_id in dict.fromkeys(workflow_ids):
+        if not workflow_id:
+            continue
+        info = _cached(workflow_id)
+        if info is not None:
+            statuses[workflow_id] = info
+        else:
+            missing.append(workflow_id)
+
+    if not missing:
+        return statuses
+
+    client = await get_temporal_client()
+
+    # Quotes cannot be escaped in visibility queries, describe such ids instead
+    listable = [workflow_id for workflow_id in missing if "'" not in workflow_id and '"' not in workflow_id]
+    if len(listable) > 1:
+        try:
+            requested = set(listable)
+            for workflow_id, execution in (await _list_executions(client, listable)).items():
+                if workflow_id in requested:
+                    info = workflow_status_info(workflow_id, execution)
+                    _cache(workflow_id, info)
+                    statuses[workflow_id] = info
+        except RPCError as e:
+            logger.debug(f"Visibility query for workflow statuses failed, describing them one by one: {e}")
+
+    semaphore = asyncio.Semaphore(TEMPORAL_DESCRIBE_CONCURRENCY)
+    remaining = [workflow_id for workflow_id in missing if workflow_id not in statuses]
+    for info in await asyncio.gather(*(_describe(client, workflow_id, semaphore) for workflow_id in remaining)):
+        statuses[info["workflow_id"]] = info
+
+    return statuses
+
+
+async def describe_workflow(workflow_id: str) -> Dict[str, Any]:
+    """Status of a single workflow, see ``describe_workflows``."""
+    return (await describe_workflows([workflow_id]))[workflow_id]
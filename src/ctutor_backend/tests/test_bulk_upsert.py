@@ -0,0 +1,121 @@
+"""
+Tests for the bulk upsert CRUD helper behind the /{entity}/bulk routes.
+"""
+
+import pytest
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+from sqlalchemy.dialects import postgresql
+
+from ctutor_backend.api.crud import bulk_upsert_db
+from ctutor_backend.interface.base import BulkUpsertStatus
+from ctutor_backend.interface.users import UserInterface
+from ctutor_backend.model.auth import User
+from ctutor_backend.permissions.principal import Principal
+
+
+def _returned_row(id: str, inserted: bool, email: str):
+    return SimpleNamespace(id=id, inserted=inserted, _mapping={"email": email})
+
+
+def _mock_db(returned_rows):
+    db = MagicMock()
+    executed = []
+
+    def execute(statement):
+        executed.append(statement)
+        return SimpleNamespace(all=lambda: returned_rows(statement))
+
+    db.execute.side_effect = execute
+    db.executed = executed
+    return db
+
+
+class TestBulkUpsert:
+    """Test cases for bulk_upsert_db."""
+
+    @pytest.mark.asyncio
+    async def test_upsert_reports_created_and_updated(self):
+        def returned_rows(statement):
+            params = statement.compile(dialect=postgresql.dialect()).params
+            rows = []
+            for key, value in params.items():
+                if key.startswith("email"):
+                    if value == "existing@example.com":
+                        rows.append(_returned_row("existing-id", False, value))
+                    else:
+                        suffix = key[len("email"):]
+                        rows.append(_returned_row(params[f"id{suffix}"], True, value))
+            return rows
+
+        db = _mock_db(returned_rows)
+        principal = Principal(user_id="admin", is_admin=True)
+
+        report = await bulk_upsert_db(principal, db, [
+            {"given_name": "New", "email": "new@example.com"},
+            {"given_name": "Old", "email": "existing@example.com"},
+        ], UserInterface)
+
+        assert report.created == 1
+        assert report.updated == 1
+        assert report.failed == 0
+        assert [result.status for result in report.results] == [BulkUpsertStatus.created, BulkUpsertStatus.updated]
+        assert report.results[1].id == "existing-id"
+        # Both rows share a column set and go out as a single statement
+        assert len(db.executed) == 1
+        sql = str(db.executed[0].compile(dialect=postgresql.dialect()))
+        assert "ON CONFLICT (email) DO UPDATE" in sql
+        db.commit.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_invalid_and_duplicate_rows_are_reported(self):
+        db = _mock_db(lambda statement: [_returned_row("a-id", True, "a@example.com")])
+        principal = Principal(user_id="admin", is_admin=True)
+
+        with patch("ctutor_backend.api.crud.pg_insert") as mock_insert:
+            report = await bulk_upsert_db(principal, db, [
+                {"email": "not-an-email"},
+                {"email": "a@example.com"},
+                {"email": "a@example.com"},
+            ], UserInterface)
+
+        statuses = [result.status for result in report.results]
+        assert statuses[0] == BulkUpsertStatus.invalid
+        assert statuses[1] == BulkUpsertStatus.created
+        assert statuses[2] == BulkUpsertStatus.duplicate
+        values = mock_insert.return_value.values.call_args.args[0]
+        assert [row["email"] for row in values] == ["a@example.com"]
+
+    @pytest.mark.asyncio
+    async def test_rows_without_permission_are_forbidden(self):
+        db = _mock_db(lambda statement: [])
+        principal = Principal(user_id="student", is_admin=False)
+        handler = MagicMock()
+        handler.can_perform_action.return_value = False
+
+        with patch("ctutor_backend.api.crud.permission_registry.get_handler", return_value=handler):
+            report = await bulk_upsert_db(principal, db, [{"email": "a@example.com"}], UserInterface)
+
+        assert report.results[0].status == BulkUpsertStatus.forbidden
+        assert report.failed == 1
+        db.execute.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_post_update_runs_for_updated_rows(self):
+        db = _mock_db(lambda statement: [_returned_row("existing-id", False, "existing@example.com")])
+        old_user = User(id="existing-id", email="existing@example.com", given_name="Old")
+        updated_user = User(id="existing-id", email="existing@example.com", given_name="New")
+        db.query.return_value.filter.return_value.all.side_effect = [[old_user], [updated_user]]
+        post_update = MagicMock()
+        principal = Principal(user_id="admin", is_admin=True)
+
+        with patch.object(UserInterface, "post_update", post_update):
+            report = await bulk_upsert_db(principal, db, [
+                {"given_name": "New", "email": "existing@example.com"},
+            ], UserInterface)
+
+        assert report.updated == 1
+        post_update.assert_called_once()
+        updated_item, old_item, _ = post_update.call_args.args
+        assert updated_item is updated_user
+        assert old_item.given_name == "Old"
@@ -0,0 +1,40 @@
+"""
+Tests for the eager loading strategy of the course-content queries.
+"""
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+
+from ctutor_backend.api.queries import course_member_course_content_list_query, user_course_content_list_query
+
+# Aliases SQLAlchemy generates for joined eager loads
+EAGER_JOIN_ALIASES = (
+    "course_submission_group_1",
+    "course_submission_group_grading_1",
+    "course_submission_group_member_1",
+    "course_member_1",
+    "course_role_1",
+    "user_1",
+)
+
+
+def _compile(query) -> str:
+    return str(query.statement.compile(dialect=postgresql.dialect())).lower()
+
+
+class TestCourseContentListEagerLoading:
+    """The list queries must not multiply rows through eager joins."""
+
+    @pytest.mark.parametrize("query", [
+        lambda: user_course_content_list_query("user-1", Session()),
+        lambda: course_member_course_content_list_query("member-1", Session()),
+    ])
+    def test_main_statement_has_no_eager_joins(self, query):
+        sql = _compile(query())
+
+        for alias in EAGER_JOIN_ALIASES:
+            assert alias not in sql
+        # User columns like password hashes are never selected in the main statement
+        assert "password" not in sql
+
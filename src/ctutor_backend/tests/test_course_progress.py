@@ -0,0 +1,168 @@
+"""
+Tests for the course_member_content_progress read model queries.
+"""
+
+import pytest
+from types import SimpleNamespace
+from uuid import uuid4
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from ctutor_backend.api.mappers import course_member_course_content_result_mapper
+from ctutor_backend.api.queries import user_course_content_progress_list_query
+from ctutor_backend.interface.student_course_contents import CourseContentStudentInterface, CourseContentStudentQuery
+from ctutor_backend.model.auth import User
+from ctutor_backend.model.course import (
+    Course, CourseContent, CourseContentType, CourseFamily, CourseMember, CourseMemberContentProgress,
+    CourseSubmissionGroup, CourseSubmissionGroupGrading, CourseSubmissionGroupMember,
+)
+from ctutor_backend.model.execution import ExecutionBackend
+from ctutor_backend.model.organization import Organization
+from ctutor_backend.model.result import Result
+
+
+def _compile(query) -> str:
+    return str(query.statement.compile(dialect=postgresql.dialect())).lower()
+
+
+class TestUserCourseContentProgressListQuery:
+    """Test cases for the student course-content list read from progress rows."""
+
+    def test_reads_progress_without_aggregation(self):
+        sql = _compile(user_course_content_progress_list_query("user-1", Session()))
+
+        assert "left outer join course_member_content_progress on" in sql
+        assert "result.id = course_member_content_progress.latest_result_id" in sql
+        for aggregate in ("max(", "count(", "row_number()", "group by"):
+            assert aggregate not in sql
+
+    def test_student_search_filters_apply(self):
+        query = user_course_content_progress_list_query("user-1", Session())
+        query = CourseContentStudentInterface.search(Session(), query, CourseContentStudentQuery(course_id="course-1"))
+
+        assert "course_content.course_id = %(course_id" in _compile(query)
+
+    def test_progress_row_maps_to_student_list(self):
+        content_type = SimpleNamespace(
+            id="type-1", slug="assignment", title="Assignment", color="green",
+            course_content_kind_id="assignment", course_id="course-1", properties=None, description=None,
+        )
+        course_content = SimpleNamespace(
+            id="content-1", title="Week 1", path="week1", course_id="course-1",
+            course_content_type_id="type-1", course_content_kind_id="assignment", position=1.0,
+            max_group_size=1, max_test_runs=None, course_content_type=content_type, deployment=None,
+        )
+        group = SimpleNamespace(
+            id="group-1", properties=None, max_group_size=1, max_submissions=None, members=[], gradings=[],
+        )
+
+        row = (course_content, 4, None, group, 2, 1, 0.8, 1, 2)
+        result = course_member_course_content_result_mapper(row)
+
+        assert result.result_count == 4
+        assert result.submitted is True
+        assert result.unread_message_count == 3
+        assert result.submission_group.status == "corrected"
+        assert result.submission_group.grading == 0.8
+        assert result.submission_group.count == 2
+
+
+@pytest.fixture
+def progress_db(session):
+    """Migrated test database, every change is rolled back after the test."""
+    try:
+        session.execute(text("SELECT 1 FROM course_member_content_progress LIMIT 0"))
+    except SQLAlchemyError as e:
+        pytest.skip(f"Migrated test database not available: {e}")
+    yield session
+    session.rollback()
+
+
+def _add(db, obj):
+    db.add(obj)
+    db.flush()
+    return obj
+
+
+@pytest.fixture
+def submission_group(progress_db):
+    db = progress_db
+    suffix = uuid4().hex[:8]
+    organization = _add(db, Organization(organization_type="organization", title="Progress", path=f"progress_{suffix}"))
+    family = _add(db, CourseFamily(title="Progress", path=f"progress_{suffix}", organization_id=organization.id))
+    course = _add(db, Course(title="Progress", path=f"progress_{suffix}", course_family_id=family.id, organization_id=organization.id))
+    content_type = _add(db, CourseContentType(slug="assignment", course_content_kind_id="assignment", course_id=course.id))
+    content = _add(db, CourseContent(
+        title="Week 1", path="week1", course_id=course.id, course_content_type_id=content_type.id,
+        position=1, max_group_size=2,
+    ))
+    members = [
+        _add(db, CourseMember(user_id=_add(db, User(given_name=name)).id, course_id=course.id, course_role_id="_tutor"))
+        for name in ("Ada", "Grace")
+    ]
+    group = _add(db, CourseSubmissionGroup(max_group_size=2, course_id=course.id, course_content_id=content.id))
+    for member in members:
+        _add(db, CourseSubmissionGroupMember(course_id=course.id, course_submission_group_id=group.id, course_member_id=member.id))
+    backend = _add(db, ExecutionBackend(type="temporal", slug=f"progress-{suffix}"))
+
+    return SimpleNamespace(db=db, content=content, members=members, group=group, backend=backend)
+
+
+def _progress(db, member, content):
+    db.expire_all()
+    return db.query(CourseMemberContentProgress).filter(
+        CourseMemberContentProgress.course_member_id == member.id,
+        CourseMemberContentProgress.course_content_id == content.id,
+    ).one()
+
+
+def _result(setup, result, submit, version):
+    return _add(setup.db, Result(
+        submit=submit, result=result, status=0, version_identifier=version, test_system_id=f"test-{version}",
+        course_member_id=setup.members[0].id, course_submission_group_id=setup.group.id,
+        course_content_id=setup.content.id, course_content_type_id=setup.content.course_content_type_id,
+        execution_backend_id=setup.backend.id,
+    ))
+
+
+@pytest.mark.integration
+class TestProgressTriggers:
+    """The triggers keep the progress rows of every group member up to date."""
+
+    def test_results_update_every_group_member(self, submission_group):
+        setup = submission_group
+        _result(setup, 0.5, True, "v1")
+        latest = _result(setup, 0.25, False, "v2")
+
+        for member in setup.members:
+            progress = _progress(setup.db, member, setup.content)
+            assert str(progress.course_submission_group_id) == str(setup.group.id)
+            assert progress.result_count == 2
+            assert progress.submitted_count == 1
+            assert progress.best_result == 0.5
+            assert str(progress.latest_result_id) == str(latest.id)
+
+    def test_deleted_result_is_removed_from_progress(self, submission_group):
+        setup = submission_group
+        result = _result(setup, 1.0, True, "v1")
+
+        # A bulk delete, Result cascades deletes to its course content in the ORM
+        setup.db.query(Result).filter(Result.id == result.id).delete(synchronize_session=False)
+
+        progress = _progress(setup.db, setup.members[1], setup.content)
+        assert progress.result_count == 0
+        assert progress.latest_result_id is None
+
+    def test_grading_updates_progress(self, submission_group):
+        setup = submission_group
+        grading = _add(setup.db, CourseSubmissionGroupGrading(
+            course_submission_group_id=setup.group.id, graded_by_course_member_id=setup.members[0].id,
+            grading=0.75, status=1,
+        ))
+
+        progress = _progress(setup.db, setup.members[1], setup.content)
+        assert str(progress.latest_grading_id) == str(grading.id)
+        assert progress.grading == 0.75
+        assert progress.grading_status == 1
@@ -0,0 +1,173 @@
+"""
+Tests for the pooled CrudClient/CustomClient transports and pagination.
+"""
+
+import json
+import httpx
+import pytest
+from unittest.mock import patch
+
+from ctutor_backend.client import transport
+from ctutor_backend.client.crud_client import CrudClient, CustomClient
+from ctutor_backend.interface.base import BulkUpsertStatus
+from ctutor_backend.interface.users import UserCreate, UserInterface, UserQuery
+
+
+def _users_handler(total: int, max_limit: int = None, with_total: bool = True, requests: list = None):
+    def handler(request: httpx.Request) -> httpx.Response:
+        if requests is not None:
+            requests.append(request)
+        skip = int(request.url.params.get("skip", 0))
+        limit = int(request.url.params.get("limit", 100))
+        if max_limit is not None:
+            limit = min(limit, max_limit)
+        users = [
+            {"id": f"00000000-0000-0000-0000-{index:012d}", "email": f"user{index}@example.com"}
+            for index in range(skip, min(skip + limit, total))
+        ]
+        headers = {"X-Total-Count": str(total)} if with_total else {}
+        return httpx.Response(200, json=users, headers=headers)
+    return handler
+
+
+def _cursor_handler(total: int, requests: list):
+    """Keyset paginated users with estimated totals, cursors are the next offset."""
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        start = int(request.url.params.get("cursor", 0))
+        end = min(start + int(request.url.params["limit"]), total)
+        users = [
+            {"id": f"00000000-0000-0000-0000-{index:012d}", "email": f"user{index}@example.com"}
+            for index in range(start, end)
+        ]
+        headers = {"X-Total-Count": str(total + 100), "X-Total-Count-Estimated": "true"}
+        if end < total:
+            headers["X-Next-Cursor"] = str(end)
+        return httpx.Response(200, json=users, headers=headers)
+    return handler
+
+
+@pytest.fixture
+def mock_transport():
+    """Route the shared pools through an in-memory transport."""
+    state = {}
+
+    def sync_client(url_base):
+        return httpx.Client(base_url=url_base, transport=httpx.MockTransport(state["handler"]))
+
+    def async_client(url_base):
+        return httpx.AsyncClient(base_url=url_base, transport=httpx.MockTransport(state["handler"]))
+
+    with patch("ctutor_backend.client.crud_client.get_sync_client", side_effect=sync_client), \
+         patch("ctutor_backend.client.crud_client.get_async_client", side_effect=async_client):
+        yield state
+
+
+class TestSharedTransport:
+    """Test cases for the pooled clients."""
+
+    def test_sync_client_is_shared_per_base_url(self):
+        try:
+            first = transport.get_sync_client("http://api.test")
+            assert transport.get_sync_client("http://api.test") is first
+            assert transport.get_sync_client("http://other.test") is not first
+        finally:
+            transport.close_sync_clients()
+
+    @pytest.mark.asyncio
+    async def test_async_client_is_shared_per_loop(self):
+        try:
+            first = transport.get_async_client("http://api.test")
+            assert transport.get_async_client("http://api.test") is first
+        finally:
+            await transport.aclose_async_clients()
+        assert first.is_closed
+
+    def test_clients_share_pool_but_not_credentials(self, mock_transport):
+        requests = []
+        mock_transport["handler"] = _users_handler(1, requests=requests)
+
+        CrudClient("http://api.test", UserInterface, auth=("admin", "secret")).list()
+        CrudClient("http://api.test", UserInterface, glp_auth_header={"token": "x"}).list()
+
+        assert requests[0].headers["Authorization"].startswith("Basic ")
+        assert "GLP-CREDS" not in requests[0].headers
+        assert "Authorization" not in requests[1].headers
+        assert "GLP-CREDS" in requests[1].headers
+
+
+class TestPagination:
+    """Test cases for X-Total-Count driven pagination."""
+
+    def test_list_all_follows_total_count(self, mock_transport):
+        requests = []
+        mock_transport["handler"] = _users_handler(25, requests=requests)
+
+        users = CrudClient("http://api.test", UserInterface).list_all(UserQuery(limit=3), page_size=10)
+
+        assert len(users) == 25
+        assert [int(request.url.params["skip"]) for request in requests] == [0, 10, 20]
+
+    def test_list_all_without_total_stops_on_short_page(self, mock_transport):
+        mock_transport["handler"] = _users_handler(12, with_total=False)
+
+        users = CustomClient("http://api.test").list_all("/users", page_size=5)
+
+        assert len(users) == 12
+
+    @pytest.mark.asyncio
+    async def test_alist_all_fetches_remaining_pages(self, mock_transport):
+        requests = []
+        mock_transport["handler"] = _users_handler(25, max_limit=4, requests=requests)
+
+        users = await CrudClient("http://api.test", UserInterface).alist_all(page_size=10)
+
+        # The server capped the page size, so the client stepped by what it got
+        assert [str(user.id)[-2:] for user in users] == [f"{index:02d}" for index in range(25)]
+        assert len(requests) == 7
+
+    def test_list_all_follows_cursors(self, mock_transport):
+        requests = []
+        mock_transport["handler"] = _cursor_handler(12, requests)
+
+        users = CrudClient("http://api.test", UserInterface).list_all(page_size=5)
+
+        assert len(users) == 12
+        assert [request.url.params.get("cursor") for request in requests] == [None, "5", "10"]
+
+    @pytest.mark.asyncio
+    async def test_alist_all_follows_cursors_when_total_is_estimated(self, mock_transport):
+        requests = []
+        mock_transport["handler"] = _cursor_handler(12, requests)
+
+        users = await CrudClient("http://api.test", UserInterface).alist_all(page_size=5)
+
+        assert [str(user.id)[-2:] for user in users] == [f"{index:02d}" for index in range(12)]
+        assert len(requests) == 3
+
+    @pytest.mark.asyncio
+    async def test_async_crud_methods(self, mock_transport):
+        def handler(request: httpx.Request) -> httpx.Response:
+            if request.method == "DELETE":
+                return httpx.Response(204)
+            return httpx.Response(200, json={"id": "00000000-0000-0000-0000-000000000001", "email": "a@example.com"})
+        mock_transport["handler"] = handler
+
+        client = CrudClient("http://api.test", UserInterface)
+        user = await client.aget("00000000-0000-0000-0000-000000000001")
+        assert user.email == "a@example.com"
+        assert (await client.adelete(user.id)).status_code == 204
+
+    def test_bulk_upsert_sends_only_set_fields(self, mock_transport):
+        requests = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            requests.append(request)
+            return httpx.Response(200, json={"created": 1, "results": [{"index": 0, "status": "created", "id": "user-1"}]})
+        mock_transport["handler"] = handler
+
+        report = CrudClient("http://api.test", UserInterface).bulk_upsert([UserCreate(email="a@example.com", given_name="Ada")])
+
+        assert requests[0].url.path == "/users/bulk"
+        assert json.loads(requests[0].content) == [{"email": "a@example.com", "given_name": "Ada"}]
+        assert report.results[0].status == BulkUpsertStatus.created
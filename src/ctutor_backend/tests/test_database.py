@@ -0,0 +1,98 @@
+"""
+Tests for the session factories in ctutor_backend.database.
+"""
+
+import pytest
+from unittest.mock import MagicMock, patch
+from sqlalchemy.exc import OperationalError
+
+from ctutor_backend import database
+
+
+@pytest.fixture(autouse=True)
+def replicas_up():
+    database._replica_down_until.clear()
+    yield
+    database._replica_down_until.clear()
+
+
+class TestDatabaseSessions:
+
+    def test_replica_addresses(self):
+        assert database._replica_addresses("replica-1:5433, replica-2,") == [
+            ("replica-1", "5433"),
+            ("replica-2", database.POSTGRES_PORT),
+        ]
+
+    def test_read_sessions_use_replicas_round_robin(self):
+        replicas = [MagicMock(name="replica-1"), MagicMock(name="replica-2")]
+
+        with patch.object(database, "_replica_engines", replicas), \
+             patch.object(database, "_replica_cycle", iter(replicas * 2)):
+            binds = []
+            for _ in range(3):
+                session = database.db_session(read_only=True)()
+                binds.append(next(session).bind)
+                session.close()
+
+        assert binds == [replica.connect.return_value for replica in [replicas[0], replicas[1], replicas[0]]]
+
+    def test_read_sessions_use_primary_without_replicas(self):
+        primary = MagicMock(name="primary")
+
+        with patch.object(database, "_engine", primary), \
+             patch.object(database, "_replica_engines", []):
+            session = database.get_read_db()
+            assert next(session).bind is primary.connect.return_value
+            session.close()
+
+        primary.connect.return_value.close.assert_called_once()
+
+    def test_unavailable_replica_is_skipped(self):
+        replicas = [MagicMock(name="replica-1"), MagicMock(name="replica-2")]
+        replicas[0].connect.side_effect = OperationalError("connect", {}, Exception("connection refused"))
+
+        with patch.object(database, "_replica_engines", replicas), \
+             patch.object(database, "_replica_cycle", iter(replicas * 2)):
+            binds = []
+            for _ in range(2):
+                session = database.db_session(read_only=True)()
+                binds.append(next(session).bind)
+                session.close()
+
+        assert binds == [replicas[1].connect.return_value] * 2
+        # Not tried again until DB_REPLICA_RETRY_SECONDS have passed
+        replicas[0].connect.assert_called_once()
+
+    def test_reads_fall_back_to_primary_when_all_replicas_are_down(self):
+        primary = MagicMock(name="primary")
+        replica = MagicMock(name="replica")
+        replica.connect.side_effect = OperationalError("connect", {}, Exception("timeout expired"))
+
+        with patch.object(database, "_engine", primary), \
+             patch.object(database, "_replica_engines", [replica]), \
+             patch.object(database, "_replica_cycle", iter([replica])):
+            session = database.get_read_db()
+            assert next(session).bind is primary.connect.return_value
+            session.close()
+
+    def test_route_statement_timeout_is_set_per_transaction(self):
+        session = database.db_session(statement_timeout=1500)()
+        db = next(session)
+        connection = MagicMock()
+
+        database._apply_transaction_settings(db, None, connection)
+
+        connection.exec_driver_sql.assert_called_once_with("SET LOCAL statement_timeout = 1500")
+        session.close()
+
+    def test_default_timeout_without_pgbouncer_is_a_startup_option(self):
+        with patch.object(database, "DB_PGBOUNCER", False):
+            assert database._statement_timeout(False, None) is None
+
+        with patch.object(database, "DB_PGBOUNCER", True), \
+             patch.object(database, "DB_STATEMENT_TIMEOUT_MS", 30000), \
+             patch.object(database, "DB_READ_STATEMENT_TIMEOUT_MS", 10000):
+            assert database._statement_timeout(False, None) == 30000
+            assert database._statement_timeout(True, None) == 10000
+            assert database._statement_timeout(True, 500) == 500
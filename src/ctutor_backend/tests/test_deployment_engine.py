@@ -0,0 +1,220 @@
+"""
+Tests for the concurrent bulk deployment engine used by `ctutor deployment apply`.
+"""
+
+import json
+import pytest
+from contextlib import contextmanager
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+
+from ctutor_backend.cli.deployment_engine import BULK_CHUNK_SIZE, PREFETCH_CHUNK_SIZE, DeploymentEngine
+from ctutor_backend.interface.deployments_refactored import (
+    ComputorDeploymentConfig,
+    UserAccountDeployment,
+    UserDeployment,
+    AccountDeployment,
+    CourseMemberDeployment,
+)
+from ctutor_backend.interface.base import BulkUpsertResponse, BulkUpsertRowResult, BulkUpsertStatus
+
+
+def _entity(**kwargs):
+    return SimpleNamespace(**kwargs)
+
+
+def _bulk_created(prefix: str):
+    """bulk_upsert side effect creating every row, with ids derived from ``prefix`` and the row."""
+    def bulk_upsert(entities):
+        return BulkUpsertResponse(created=len(entities), results=[
+            BulkUpsertRowResult(index=index, status=BulkUpsertStatus.created, id=f"{prefix}-{getattr(entity, 'username', None) or index}")
+            for index, entity in enumerate(entities)
+        ])
+    return bulk_upsert
+
+
+def _bulk_rows(client) -> list:
+    return [entity for call in client.bulk_upsert.call_args_list for entity in call.args[0]]
+
+
+def _user_deployment(index: int, group: str = "g1"):
+    return UserAccountDeployment(
+        user=UserDeployment(
+            given_name=f"Student{index}",
+            family_name="Test",
+            email=f"student{index}@example.com",
+            username=f"student{index}",
+        ),
+        accounts=[AccountDeployment(provider="gitlab", type="gitlab", provider_account_id=f"student{index}")],
+        course_members=[CourseMemberDeployment(
+            organization="org", course_family="family", course="course", role="_student", group=group
+        )],
+    )
+
+
+@pytest.fixture
+def deployment_engine():
+    with patch("ctutor_backend.cli.deployment_engine.get_crud_client", side_effect=lambda auth, interface: Mock()), \
+         patch("ctutor_backend.cli.deployment_engine.get_custom_client", return_value=Mock()):
+        engine = DeploymentEngine(auth=Mock(), max_workers=4)
+
+    engine.org_client.list.return_value = [_entity(id="org-1")]
+    engine.family_client.list.return_value = [_entity(id="family-1")]
+    engine.course_client.list.return_value = [_entity(id="course-1", path="course")]
+    engine.course_member_client.list_all.return_value = []
+    engine.course_group_client.list_all.return_value = []
+    engine.course_group_client.create.side_effect = lambda group: _entity(id=f"group-{group.title}")
+    engine.user_client.list_all.return_value = []
+    engine.account_client.list_all.return_value = []
+    engine.user_role_client.list_all.return_value = []
+    engine.user_client.bulk_upsert.side_effect = _bulk_created("user")
+    engine.account_client.bulk_upsert.side_effect = _bulk_created("account")
+    engine.course_member_client.bulk_upsert.side_effect = _bulk_created("member")
+    return engine
+
+
+class TestDeploymentEngine:
+    """Test cases for DeploymentEngine."""
+
+    def test_hierarchy_is_resolved_once(self, deployment_engine):
+        config = ComputorDeploymentConfig(organizations=[], users=[_user_deployment(i) for i in range(20)])
+
+        results = deployment_engine.deploy_users(config)
+
+        assert len(results) == 20
+        assert all(result.error is None for result in results)
+        assert deployment_engine.org_client.list.call_count == 1
+        assert deployment_engine.family_client.list.call_count == 1
+        assert deployment_engine.course_client.list.call_count == 1
+        # One course group shared by every student is created exactly once
+        assert deployment_engine.course_group_client.create.call_count == 1
+        # Existing users and accounts of the config are listed once, not looked up per user
+        deployment_engine.user_client.list_all.assert_called_once()
+        deployment_engine.account_client.list_all.assert_called_once()
+        user_filter = json.loads(deployment_engine.user_client.list_all.call_args.args[0].filter)
+        assert user_filter["or"][0]["email"]["in"][0] == "student0@example.com"
+        assert len(user_filter["or"][1]["username"]["in"]) == 20
+        deployment_engine.user_client.list.assert_not_called()
+        deployment_engine.account_client.list.assert_not_called()
+        # Users, accounts and memberships go out as one bulk request each
+        for client in (deployment_engine.user_client, deployment_engine.account_client, deployment_engine.course_member_client):
+            client.bulk_upsert.assert_called_once()
+            client.create.assert_not_called()
+            assert len(_bulk_rows(client)) == 20
+        members = _bulk_rows(deployment_engine.course_member_client)
+        assert members[3].user_id == "user-student3"
+        assert members[3].course_group_id == "group-g1"
+        assert any("Created user: Student3 Test" in message for message in results[3].messages)
+
+    def test_bulk_requests_are_chunked(self, deployment_engine):
+        config = ComputorDeploymentConfig(organizations=[], users=[_user_deployment(i) for i in range(BULK_CHUNK_SIZE + 1)])
+
+        results = deployment_engine.deploy_users(config)
+
+        assert all(result.error is None for result in results)
+        assert [len(call.args[0]) for call in deployment_engine.user_client.bulk_upsert.call_args_list] == [BULK_CHUNK_SIZE, 1]
+
+    def test_existing_state_is_diffed(self, deployment_engine):
+        deployment_engine.user_client.list_all.return_value = [_entity(id="user-1", email="student1@example.com", username="student1")]
+        deployment_engine.account_client.list_all.return_value = [_entity(
+            provider="gitlab", type="gitlab", provider_account_id="student1", user_id="user-1"
+        )]
+        deployment_engine.course_group_client.list_all.return_value = [_entity(id="group-g1", title="g1")]
+        deployment_engine.course_member_client.list_all.return_value = [_entity(
+            id="member-1", user_id="user-1", course_role_id="_student", course_group_id="group-g1"
+        )]
+
+        config = ComputorDeploymentConfig(organizations=[], users=[_user_deployment(1)])
+        results = deployment_engine.deploy_users(config)
+
+        assert results[0].error is None
+        assert results[0].user_id == "user-1"
+        deployment_engine.user_client.bulk_upsert.assert_not_called()
+        deployment_engine.account_client.bulk_upsert.assert_not_called()
+        deployment_engine.course_group_client.create.assert_not_called()
+        deployment_engine.course_member_client.bulk_upsert.assert_not_called()
+
+    def test_role_change_updates_membership(self, deployment_engine):
+        deployment_engine.user_client.list_all.return_value = [_entity(id="user-1", email="student1@example.com", username="student1")]
+        deployment_engine.course_member_client.list_all.return_value = [_entity(
+            id="member-1", user_id="user-1", course_role_id="_tutor", course_group_id=None
+        )]
+        deployment_engine.course_member_client.bulk_upsert.side_effect = lambda entities: BulkUpsertResponse(
+            updated=1, results=[BulkUpsertRowResult(index=0, status=BulkUpsertStatus.updated, id="member-1")]
+        )
+
+        config = ComputorDeploymentConfig(organizations=[], users=[_user_deployment(1)])
+        results = deployment_engine.deploy_users(config)
+
+        [member] = _bulk_rows(deployment_engine.course_member_client)
+        assert member.user_id == "user-1"
+        assert member.course_role_id == "_student"
+        assert "✅ Updated course membership: course as _student" in results[0].messages
+
+    def test_failed_user_rows_are_reported(self, deployment_engine):
+        deployment_engine.user_client.bulk_upsert.side_effect = lambda entities: BulkUpsertResponse(
+            failed=1, results=[BulkUpsertRowResult(index=0, status=BulkUpsertStatus.invalid, detail="Invalid email")]
+        )
+
+        config = ComputorDeploymentConfig(organizations=[], users=[_user_deployment(1)])
+        results = deployment_engine.deploy_users(config)
+
+        assert "Invalid email" in results[0].error
+        deployment_engine.account_client.bulk_upsert.assert_not_called()
+        deployment_engine.course_member_client.bulk_upsert.assert_not_called()
+
+    def test_missing_roles_are_assigned(self, deployment_engine):
+        deployment_engine.role_client.list_all.return_value = [_entity(id="_user_manager"), _entity(id="_admin")]
+        deployment_engine.user_client.list_all.return_value = [_entity(id="user-1", email="student1@example.com", username="student1")]
+        deployment_engine.user_role_client.list_all.return_value = [_entity(user_id="user-1", role_id="_admin")]
+        user_deployment = _user_deployment(1)
+        user_deployment.user.roles = ["_admin", "_user_manager", "_unknown"]
+
+        results = deployment_engine.deploy_users(ComputorDeploymentConfig(organizations=[], users=[user_deployment]))
+
+        deployment_engine.user_role_client.create.assert_called_once()
+        assert deployment_engine.user_role_client.create.call_args.args[0].role_id == "_user_manager"
+        assert "⚠️  Role not found: _unknown" in results[0].messages
+
+    def test_missing_course_is_reported(self, deployment_engine):
+        deployment_engine.course_client.list.return_value = []
+
+        config = ComputorDeploymentConfig(organizations=[], users=[_user_deployment(1)])
+        results = deployment_engine.deploy_users(config)
+
+        assert results[0].error is None
+        assert any("Course not found" in message for message in results[0].messages)
+        deployment_engine.course_member_client.bulk_upsert.assert_not_called()
+
+    def test_prefetch_is_scoped_to_config(self, deployment_engine):
+        deployment_engine.role_client.list_all.return_value = [_entity(id="_admin")]
+        deployment_engine.user_client.list_all.return_value = [_entity(id="user-1", email="student1@example.com", username="student1")]
+        user_deployments = [_user_deployment(i) for i in range(PREFETCH_CHUNK_SIZE + 1)]
+        user_deployments[1].user.roles = ["_admin"]
+
+        deployment_engine.deploy_users(ComputorDeploymentConfig(organizations=[], users=user_deployments))
+
+        assert deployment_engine.user_client.list_all.call_count == 2
+        account_filters = [json.loads(call.args[0].filter) for call in deployment_engine.account_client.list_all.call_args_list]
+        assert sum(len(filter["provider_account_id"]["in"]) for filter in account_filters) == PREFETCH_CHUNK_SIZE + 1
+        # Role assignments are listed for the users found only
+        role_filter = json.loads(deployment_engine.user_role_client.list_all.call_args.args[0].filter)
+        assert role_filter == {"user_id": {"in": ["user-1"]}}
+
+    def test_progress_covers_every_step(self, deployment_engine):
+        bar = Mock()
+
+        @contextmanager
+        def alive_bar(total, **kwargs):
+            bar.total = total
+            yield bar
+
+        deployment_engine.user_client.list_all.return_value = [_entity(id="user-1", email="student1@example.com", username="student1")]
+        user_deployments = [_user_deployment(i) for i in range(3)]
+        user_deployments[2].user.password = "secret"
+
+        with patch("ctutor_backend.cli.deployment_engine.alive_bar", alive_bar):
+            deployment_engine.deploy_users(ComputorDeploymentConfig(organizations=[], users=user_deployments))
+
+        assert bar.total == 10
+        assert sum(call.args[0] for call in bar.call_args_list) == bar.total
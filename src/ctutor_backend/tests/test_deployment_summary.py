@@ -0,0 +1,128 @@
+"""
+Tests for the cached deployment summary of a course.
+"""
+
+import pytest
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import uuid4
+
+from ctutor_backend.interface.deployment import DeploymentSummary
+from ctutor_backend.services.deployment_summary import (
+    DEPLOYMENT_SUMMARY_CACHE_TTL,
+    compute_deployment_summary,
+    deployment_summary_cache_key,
+    get_deployment_summary,
+    invalidate_deployment_summary,
+    invalidate_deployment_summary_sync,
+)
+
+
+def summary_db(content_counts, status_rows):
+    content_query = MagicMock()
+    content_query.outerjoin.return_value.outerjoin.return_value.filter.return_value.one.return_value = content_counts
+    deployment_query = MagicMock()
+    deployment_query.join.return_value.filter.return_value.group_by.return_value.all.return_value = status_rows
+
+    db = MagicMock()
+    db.query.side_effect = [content_query, deployment_query]
+    return db
+
+
+class TestComputeDeploymentSummary:
+
+    def test_counts_by_status(self):
+        course_id = uuid4()
+        earlier = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        later = datetime(2024, 2, 1, tzinfo=timezone.utc)
+        db = summary_db((12, 7), [
+            ("pending", 2, None),
+            ("deployed", 3, later),
+            ("failed", 1, earlier),
+            ("deploying", 1, None),
+        ])
+
+        summary = compute_deployment_summary(db, course_id)
+
+        assert summary.total_content == 12
+        assert summary.submittable_content == 7
+        assert summary.deployments_total == 7
+        assert summary.deployments_pending == 2
+        assert summary.deployments_deployed == 3
+        assert summary.deployments_failed == 1
+        assert summary.last_deployment_at == later
+        assert db.query.call_count == 2
+
+    def test_course_without_deployments(self):
+        summary = compute_deployment_summary(summary_db((0, 0), []), uuid4())
+
+        assert summary.deployments_total == 0
+        assert summary.last_deployment_at is None
+
+
+class TestCachedDeploymentSummary:
+
+    @pytest.mark.asyncio
+    async def test_cached_summary_is_served(self):
+        course_id = uuid4()
+        cached = DeploymentSummary(
+            course_id=course_id, total_content=1, submittable_content=1, deployments_total=1,
+            deployments_pending=0, deployments_deployed=1, deployments_failed=0
+        ).model_dump(mode="json")
+        cache = AsyncMock()
+        cache.get.return_value = cached
+
+        with patch("ctutor_backend.services.deployment_summary.compute_deployment_summary") as compute:
+            summary = await get_deployment_summary(MagicMock(), course_id, cache)
+
+        compute.assert_not_called()
+        assert summary.deployments_deployed == 1
+        cache.get.assert_awaited_once_with(f"course:{course_id}:deployment-summary")
+
+    @pytest.mark.asyncio
+    async def test_computed_summary_is_cached(self):
+        course_id = uuid4()
+        cache = AsyncMock()
+        cache.get.return_value = None
+
+        summary = await get_deployment_summary(summary_db((3, 2), [("pending", 2, None)]), course_id, cache)
+
+        assert summary.deployments_pending == 2
+        key, value = cache.set.call_args[0]
+        assert key == deployment_summary_cache_key(course_id)
+        assert value["course_id"] == str(course_id)
+        assert cache.set.call_args[1]["ttl"] == DEPLOYMENT_SUMMARY_CACHE_TTL
+
+    @pytest.mark.asyncio
+    async def test_unreachable_cache_still_returns_summary(self):
+        cache = AsyncMock()
+        cache.get.side_effect = ConnectionError("redis down")
+        cache.set.side_effect = ConnectionError("redis down")
+
+        summary = await get_deployment_summary(summary_db((1, 1), []), uuid4(), cache)
+
+        assert summary.total_content == 1
+
+
+class TestInvalidation:
+
+    @pytest.mark.asyncio
+    async def test_invalidate(self):
+        course_id = uuid4()
+        cache = AsyncMock()
+
+        await invalidate_deployment_summary(course_id, cache)
+
+        cache.delete.assert_awaited_once_with(f"course:{course_id}:deployment-summary")
+
+    @patch("ctutor_backend.services.deployment_summary.get_sync_redis_client")
+    def test_invalidate_from_sync_code(self, mock_client):
+        invalidate_deployment_summary_sync("course-1")
+
+        mock_client.return_value.delete.assert_called_once_with("course:course-1:deployment-summary")
+
+    @patch("ctutor_backend.services.deployment_summary.get_sync_redis_client")
+    def test_failed_invalidation_is_logged(self, mock_client):
+        mock_client.return_value.delete.side_effect = ConnectionError("redis down")
+
+        invalidate_deployment_summary_sync("course-1")
@@ -0,0 +1,224 @@
+"""
+Tests for the generation-versioned response cache of CrudRouter.
+"""
+
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from sqlalchemy import Column, ForeignKey, Integer, String, create_engine, delete, update
+from sqlalchemy.orm import declarative_base, sessionmaker
+
+from ctutor_backend.api.api_builder import CrudRouter
+from ctutor_backend.api.cache import (
+    cache_dependencies,
+    dependent_tables,
+    get_cache_generation,
+    invalidate_cache_namespace,
+    invalidate_written_tables,
+    versioned_key,
+)
+from ctutor_backend.interface.course_contents import CourseContentInterface
+from ctutor_backend.interface.users import UserInterface
+from ctutor_backend.permissions.principal import Principal
+
+
+class InMemoryCache:
+    """Minimal stand-in for the aiocache Redis backend without KEYS support."""
+
+    def __init__(self):
+        self.values = {}
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def set(self, key, value, ttl=None):
+        self.values[key] = value
+
+    async def multi_get(self, keys):
+        return [self.values.get(key) for key in keys]
+
+    async def increment(self, key, delta=1):
+        self.values[key] = self.values.get(key, 0) + delta
+        return self.values[key]
+
+
+def _user(email: str):
+    return UserInterface.get(id="00000000-0000-0000-0000-000000000001", email=email)
+
+
+class TestCacheGenerations:
+    """Test cases for namespace generations."""
+
+    @pytest.mark.asyncio
+    async def test_invalidate_bumps_generation(self):
+        cache = InMemoryCache()
+
+        assert await get_cache_generation(cache, "user") == 0
+        await invalidate_cache_namespace(cache, "user")
+        assert await get_cache_generation(cache, "user") == 1
+        assert await get_cache_generation(cache, "account") == 0
+
+    def test_versioned_key(self):
+        assert versioned_key("user", 3, "get", "abc") == "user:v3:get:abc"
+
+
+class TestCacheDependencies:
+    """Test cases for the tables embedded in cached responses."""
+
+    def test_embedded_relationships_and_column_properties(self):
+        dependencies = cache_dependencies(CourseContentInterface)
+
+        assert "course_content_deployment" in dependencies
+        assert "course_content_type" in dependencies
+        assert "course_content_kind" in dependencies
+        assert "course_content" not in dependencies
+
+    @pytest.mark.asyncio
+    async def test_write_to_embedded_table_invalidates_response(self):
+        router = CrudRouter(CourseContentInterface)
+        cache = InMemoryCache()
+        principal = Principal(user_id="admin", is_admin=True)
+
+        first = await router._cache_key(cache, principal, "get", "1")
+        await invalidate_cache_namespace(cache, "course_content_deployment")
+
+        assert await router._cache_key(cache, principal, "get", "1") != first
+
+
+NoteBase = declarative_base()
+
+
+class Note(NoteBase):
+    __tablename__ = "note"
+    id = Column(Integer, primary_key=True)
+    text = Column(String)
+
+
+class Comment(NoteBase):
+    __tablename__ = "comment"
+    id = Column(Integer, primary_key=True)
+    note_id = Column(ForeignKey("note.id", ondelete="CASCADE"))
+
+
+class CommentCount(NoteBase):
+    __tablename__ = "comment_count"
+    __table_args__ = ({"info": {"maintained_by_triggers_on": ("comment",)}},)
+    note_id = Column(Integer, primary_key=True)
+
+
+@pytest.fixture
+def note_sessions():
+    engine = create_engine("sqlite:///:memory:")
+    NoteBase.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+    invalidate_written_tables(factory)
+    with patch("ctutor_backend.api.cache.bump_cache_generations") as bump:
+        yield factory, bump
+
+
+class TestDependentTables:
+    """Test cases for the tables written by cascades and triggers."""
+
+    def test_deletes_follow_cascades_and_triggers(self):
+        assert dependent_tables(Note.__table__, True) == {"comment", "comment_count"}
+        assert dependent_tables(Note.__table__) == set()
+        assert dependent_tables(Comment.__table__) == {"comment_count"}
+
+
+class TestWrittenTables:
+    """Test cases for the commit listener bumping generations of every writer."""
+
+    def test_commit_bumps_written_tables(self, note_sessions):
+        factory, bump = note_sessions
+        db = factory()
+        db.add(Note(id=1, text="a"))
+        db.commit()
+
+        bump.assert_called_once_with({"note"})
+
+    def test_statements_are_tracked(self, note_sessions):
+        factory, bump = note_sessions
+        db = factory()
+        db.execute(update(Note).values(text="b"))
+        db.commit()
+
+        bump.assert_called_once_with({"note"})
+
+    def test_deletes_bump_cascaded_tables(self, note_sessions):
+        factory, bump = note_sessions
+        db = factory()
+        db.execute(delete(Note))
+        db.commit()
+
+        bump.assert_called_once_with({"note", "comment", "comment_count"})
+
+    @pytest.mark.asyncio
+    async def test_commit_on_event_loop_does_not_block(self, note_sessions):
+        factory, bump = note_sessions
+        cache = InMemoryCache()
+        db = factory()
+        db.add(Note(id=3, text="a"))
+        with patch("ctutor_backend.api.cache.get_redis_client", AsyncMock(return_value=cache)):
+            db.commit()
+            await asyncio.gather(*(asyncio.all_tasks() - {asyncio.current_task()}))
+
+        bump.assert_not_called()
+        assert await get_cache_generation(cache, "note") == 1
+
+    def test_rollback_and_reads_do_not_bump(self, note_sessions):
+        factory, bump = note_sessions
+        db = factory()
+        db.add(Note(id=2, text="a"))
+        db.flush()
+        db.rollback()
+        db.query(Note).all()
+        db.commit()
+
+        bump.assert_not_called()
+
+
+class TestCrudRouterCache:
+    """Test cases for get caching and invalidation in CrudRouter."""
+
+    @pytest.mark.asyncio
+    async def test_get_is_served_from_cache_until_invalidated(self):
+        router = CrudRouter(UserInterface)
+        route = router.get()
+        cache = InMemoryCache()
+        principal = Principal(user_id="admin", is_admin=True)
+
+        with patch("ctutor_backend.api.api_builder.get_id_db", new=AsyncMock(return_value=_user("a@example.com"))) as mock_get:
+            first = await route(permissions=principal, id="1", cache=cache, db=MagicMock())
+            second = await route(permissions=principal, id="1", cache=cache, db=MagicMock())
+
+            assert first.email == second.email == "a@example.com"
+            assert mock_get.await_count == 1
+
+            await invalidate_cache_namespace(cache, "user")
+            mock_get.return_value = _user("b@example.com")
+            third = await route(permissions=principal, id="1", cache=cache, db=MagicMock())
+
+        assert third.email == "b@example.com"
+        assert mock_get.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_cache_is_scoped_to_principal(self):
+        route = CrudRouter(UserInterface).get()
+        cache = InMemoryCache()
+
+        with patch("ctutor_backend.api.api_builder.get_id_db", new=AsyncMock(return_value=_user("a@example.com"))) as mock_get:
+            await route(permissions=Principal(user_id="u1", is_admin=True), id="1", cache=cache, db=MagicMock())
+            await route(permissions=Principal(user_id="u1", roles=["_lecturer"]), id="1", cache=cache, db=MagicMock())
+
+        assert mock_get.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_unavailable_cache_does_not_fail_request(self):
+        route = CrudRouter(UserInterface).get()
+        cache = MagicMock()
+        cache.get = AsyncMock(side_effect=ConnectionError("redis down"))
+
+        with patch("ctutor_backend.api.api_builder.get_id_db", new=AsyncMock(return_value=_user("a@example.com"))):
+            result = await route(permissions=Principal(user_id="u1", is_admin=True), id="1", cache=cache, db=MagicMock())
+
+        assert result.email == "a@example.com"
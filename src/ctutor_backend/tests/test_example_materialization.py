@@ -0,0 +1,139 @@
+"""
+Tests for concurrent example materialization in template generation.
+"""
+
+import hashlib
+import pytest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from minio.error import S3Error, ServerError
+
+from ctutor_backend.api.exceptions import NotFoundException
+from ctutor_backend.services.storage_service import StorageService
+from ctutor_backend.tasks import temporal_student_template_v2 as templates
+
+
+class FakeMinio:
+    """Blocking client recording every object read."""
+
+    def __init__(self, objects: dict):
+        self.objects = objects
+        self.reads = []
+
+    def etag(self, object_name):
+        return hashlib.md5(self.objects[object_name]).hexdigest()
+
+    def list_objects(self, bucket_name, prefix=None, recursive=False, include_user_meta=False):
+        return [
+            SimpleNamespace(object_name=name, etag=self.etag(name))
+            for name in self.objects if name.startswith(prefix)
+        ]
+
+    def get_object(self, bucket_name, object_name, request_headers=None):
+        if object_name not in self.objects:
+            raise S3Error("NoSuchKey", "Object does not exist", object_name, "request", "host", None)
+        etag = self.etag(object_name)
+        if request_headers and request_headers.get("If-None-Match") == f'"{etag}"':
+            raise ServerError("server failed with HTTP status code 304", 304)
+        self.reads.append(object_name)
+        data = self.objects[object_name]
+
+        class Response:
+            headers = {"ETag": f'"{etag}"'}
+
+            def read(self):
+                return data
+
+            def close(self):
+                pass
+
+            def release_conn(self):
+                pass
+
+        return Response()
+
+
+@pytest.fixture
+def minio():
+    client = FakeMinio({
+        "examples/a/v1/main.py": b"print('a')",
+        "examples/a/v1/meta.yaml": b"title: a",
+        "examples/b/v1/main.py": b"print('b')",
+    })
+    templates._example_cache.clear()
+    with patch("ctutor_backend.services.storage_service.get_minio_client", return_value=client):
+        yield client
+    templates._example_cache.clear()
+
+
+def _version(version_id: str, path: str):
+    return SimpleNamespace(id=version_id, storage_path=path)
+
+
+REPOSITORY = SimpleNamespace(source_type="minio", source_url="examples-bucket", name="library")
+
+
+class TestMaterializeExamples:
+
+    @pytest.mark.asyncio
+    async def test_shared_versions_are_downloaded_once(self, minio):
+        version_a = _version("version-a", "examples/a/v1")
+        version_b = _version("version-b", "examples/b/v1")
+
+        materialized = await templates.materialize_examples([
+            (REPOSITORY, version_a), (REPOSITORY, version_b), (REPOSITORY, version_a)
+        ])
+
+        assert materialized["version-a"] == {"main.py": b"print('a')", "meta.yaml": b"title: a"}
+        assert materialized["version-b"] == {"main.py": b"print('b')"}
+        assert sorted(minio.reads) == sorted(minio.objects)
+
+    @pytest.mark.asyncio
+    async def test_versions_are_cached_while_etags_match(self, minio):
+        version_a = _version("version-a", "examples/a/v1")
+
+        await templates.materialize_examples([(REPOSITORY, version_a)])
+        await templates.materialize_examples([(REPOSITORY, version_a)])
+        assert len(minio.reads) == 2
+
+        # Re-uploaded in place
+        minio.objects["examples/a/v1/main.py"] = b"print('a2')"
+        materialized = await templates.materialize_examples([(REPOSITORY, version_a)])
+
+        assert materialized["version-a"]["main.py"] == b"print('a2')"
+        assert materialized["version-a"]["meta.yaml"] == b"title: a"
+        # Only the changed file is downloaded again
+        assert len(minio.reads) == 3
+
+    @pytest.mark.asyncio
+    async def test_failures_are_returned_per_version(self, minio):
+        broken = SimpleNamespace(source_type="svn", source_url=None, name="broken")
+
+        materialized = await templates.materialize_examples([
+            (broken, _version("version-x", "examples/x")),
+            (REPOSITORY, _version("version-b", "examples/b/v1")),
+        ])
+
+        assert isinstance(materialized["version-x"], ValueError)
+        assert materialized["version-b"] == {"main.py": b"print('b')"}
+
+    @pytest.mark.asyncio
+    async def test_conditional_get_skips_unchanged_files(self, minio):
+        storage = StorageService()
+        etag = minio.etag("examples/b/v1/main.py")
+
+        assert await storage.download_file_if_changed("examples/b/v1/main.py", etag, "examples-bucket") is None
+        assert await storage.download_file_if_changed("examples/b/v1/main.py", "stale", "examples-bucket") == (b"print('b')", etag)
+
+        with pytest.raises(NotFoundException):
+            await storage.download_file_if_changed("examples/missing.py", None, "examples-bucket")
+
+    def test_cache_is_bounded(self):
+        templates._example_cache.clear()
+        with patch.object(templates, "EXAMPLE_CACHE_MAX_BYTES", 10):
+            templates._cache_example("first", {}, {"a": b"123456"})
+            templates._cache_example("second", {}, {"a": b"123456"})
+
+        assert list(templates._example_cache) == ["second"]
+        templates._example_cache.clear()
@@ -0,0 +1,102 @@
+"""
+Tests for the parsed course content file cache.
+"""
+
+import os
+import pytest
+from unittest.mock import patch
+
+from ctutor_backend.api.file_cache import ParsedFileCache, etag_matches
+from ctutor_backend.api.exceptions import BadRequestException, NotFoundException
+
+
+def _write(path, content):
+    with open(path, "w") as file:
+        file.write(content)
+
+
+class TestParsedFileCache:
+    """Test cases for ParsedFileCache."""
+
+    @pytest.mark.asyncio
+    async def test_parses_yaml_json_and_text(self, tmp_path):
+        _write(tmp_path / "meta.yaml", "title: Hello\n")
+        _write(tmp_path / "test.json", '{"a": 1}')
+        _write(tmp_path / "README.md", "# Readme")
+
+        cache = ParsedFileCache()
+        assert (await cache.get(str(tmp_path / "meta.yaml"))).data == {"title": "Hello"}
+        assert (await cache.get(str(tmp_path / "test.json"))).data == {"a": 1}
+        assert (await cache.get(str(tmp_path / "README.md"))).data == {"content": "# Readme"}
+
+    @pytest.mark.asyncio
+    async def test_repeat_read_hits_cache(self, tmp_path):
+        path = str(tmp_path / "meta.yaml")
+        _write(path, "title: Hello\n")
+
+        cache = ParsedFileCache()
+        first = await cache.get(path)
+        with patch("ctutor_backend.api.file_cache._parse_file") as mock_parse:
+            second = await cache.get(path)
+            mock_parse.assert_not_called()
+        assert first is second
+
+    @pytest.mark.asyncio
+    async def test_changed_file_is_reparsed(self, tmp_path):
+        path = str(tmp_path / "meta.yaml")
+        _write(path, "title: Hello\n")
+
+        cache = ParsedFileCache()
+        first = await cache.get(path)
+
+        _write(path, "title: Changed title\n")
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+        second = await cache.get(path)
+        assert second.data == {"title": "Changed title"}
+        assert second.etag != first.etag
+        assert len(cache) == 1
+
+    @pytest.mark.asyncio
+    async def test_memory_budget_evicts_oldest(self, tmp_path):
+        for name in ("a.yaml", "b.yaml", "c.yaml"):
+            _write(tmp_path / name, "key: " + "x" * 40 + "\n")
+
+        cache = ParsedFileCache(max_bytes=100)
+        for name in ("a.yaml", "b.yaml", "c.yaml"):
+            await cache.get(str(tmp_path / name))
+
+        assert len(cache) == 2
+        assert cache.current_bytes <= 100
+        assert str(tmp_path / "a.yaml") not in cache._entries
+
+    @pytest.mark.asyncio
+    async def test_missing_file_raises_not_found(self, tmp_path):
+        cache = ParsedFileCache()
+        with pytest.raises(NotFoundException):
+            await cache.get(str(tmp_path / "missing.yaml"))
+
+    @pytest.mark.asyncio
+    async def test_invalid_yaml_raises_bad_request(self, tmp_path):
+        path = str(tmp_path / "broken.yaml")
+        _write(path, "key: [unclosed\n")
+
+        cache = ParsedFileCache()
+        with pytest.raises(BadRequestException):
+            await cache.get(path)
+        assert len(cache) == 0
+
+
+class TestEtagMatches:
+    """Test cases for If-None-Match handling."""
+
+    def test_matches(self):
+        assert etag_matches('"abc"', '"abc"')
+        assert etag_matches('"x", "abc"', '"abc"')
+        assert etag_matches('W/"abc"', '"abc"')
+        assert etag_matches("*", '"abc"')
+
+    def test_no_match(self):
+        assert not etag_matches(None, '"abc"')
+        assert not etag_matches('"other"', '"abc"')
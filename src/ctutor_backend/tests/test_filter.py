@@ -0,0 +1,106 @@
+"""
+Tests for the compiled filter expressions of apply_filters.
+"""
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+
+from ctutor_backend.api.crud import _apply_list_filter
+from ctutor_backend.api.exceptions import BadRequestException
+from ctutor_backend.interface.course_members import CourseMemberInterface
+from ctutor_backend.interface.filter import FilterError, allowed_field, apply_filters, compile_filters, normalize_filters
+from ctutor_backend.interface.messages import MessageInterface
+from ctutor_backend.model.course import CourseMember
+from ctutor_backend.model.message import Message
+
+
+def _compile(query):
+    return query.statement.compile(dialect=postgresql.dialect(), compile_kwargs={"render_postcompile": True})
+
+
+class TestNormalizeFilters:
+    """Test cases for the canonical filter shape."""
+
+    def test_shape_does_not_depend_on_values_or_key_order(self):
+        first, first_values = normalize_filters(Message, {"course_id": "c1", "level": {"gt": 1}})
+        second, second_values = normalize_filters(Message, {"level": {"gt": 7}, "course_id": {"eq": "c2"}})
+
+        assert first == second
+        assert first_values == ["c1", 1] and second_values == ["c2", 7]
+
+    def test_same_shape_reuses_compiled_expression(self):
+        shape, _ = normalize_filters(Message, {"course_id": {"in": ["a"]}})
+        other_shape, _ = normalize_filters(Message, {"course_id": {"in": ["b", "c", "d"]}})
+
+        assert compile_filters(Message, shape) is compile_filters(Message, other_shape)
+
+    @pytest.mark.parametrize("filters", [
+        {"unknown": 1},
+        {"level": {"approximately": 1}},
+        {"level": {"between": [1]}},
+    ])
+    def test_invalid_filters_raise(self, filters):
+        with pytest.raises(FilterError):
+            normalize_filters(Message, filters)
+
+    def test_allow_list(self):
+        allowed = ("course_id", "user.email", "properties.gitlab.url")
+
+        normalize_filters(CourseMember, {"course_id": "c1", "user": {"email": "a@b.c"}, "properties.gitlab.url": "u"}, allowed)
+        for filters in ({"course_role_id": "r"}, {"user": {"password": "x"}}, {"properties.gitlab.token": "t"}):
+            with pytest.raises(FilterError):
+                normalize_filters(CourseMember, filters, allowed)
+
+    def test_allow_list_wildcard(self):
+        assert allowed_field("properties.gitlab.url", ("properties.gitlab.*",))
+        assert not allowed_field("properties.gitlab", ("properties.gitlab.*",))
+        assert not allowed_field("properties_backup.x", ("properties*",))
+
+
+class TestApplyFilters:
+    """Test cases for the SQL produced by apply_filters."""
+
+    def test_values_are_bound(self):
+        query = apply_filters(Session().query(Message), Message, {
+            "or": [{"course_id": "c1"}, {"level": {"between": [1, 5]}}],
+        })
+        statement = _compile(query)
+
+        assert "message.course_id = %(filter_0)s or message.level between %(filter_1)s and %(filter_2)s" in str(statement).lower()
+        assert statement.params == {"filter_0": "c1", "filter_1": 1, "filter_2": 5}
+
+    def test_json_path_matches_expression_indexes(self):
+        query = apply_filters(Session().query(Message), Message, {"properties.gitlab.url": "https://example.com"})
+
+        assert "(message.properties -> %(properties_1)s)) ->> %(param_1)s" in str(_compile(query))
+
+    def test_relationship_filter_is_correlated(self):
+        query = apply_filters(Session().query(CourseMember), CourseMember, {"user": {"username": "alice"}})
+
+        assert "where exists (select 1" in str(_compile(query)).lower()
+
+    def test_empty_filter_keeps_query(self):
+        query = Session().query(Message)
+
+        assert apply_filters(query, Message, {}) is query
+
+
+class TestListFilter:
+    """Test cases for the filter parameter of list_db."""
+
+    def test_filter_uses_interface_allow_list(self):
+        query = _apply_list_filter(Session().query(CourseMember), CourseMemberInterface, '{"user": {"email": "a@b.c"}}')
+
+        assert "where exists (select 1" in str(_compile(query)).lower()
+        with pytest.raises(BadRequestException):
+            _apply_list_filter(Session().query(CourseMember), CourseMemberInterface, '{"user": {"password": "x"}}')
+
+    @pytest.mark.parametrize("filter", ["{not json", "[1]"])
+    def test_invalid_filter_is_rejected(self, filter):
+        with pytest.raises(BadRequestException):
+            _apply_list_filter(Session().query(CourseMember), CourseMemberInterface, filter)
+
+    def test_interfaces_without_filter_fields_reject_filters(self):
+        with pytest.raises(BadRequestException):
+            _apply_list_filter(Session().query(Message), MessageInterface, '{"course_id": "c1"}')
@@ -0,0 +1,160 @@
+"""
+Tests for the shared GitLab clients and the path lookup cache.
+"""
+
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+from gitlab.exceptions import GitlabGetError
+
+from ctutor_backend import gitlab_clients
+from ctutor_backend.gitlab_clients import (
+    PathLookupCache,
+    find_project,
+    gitlab_client,
+    group_full_path,
+    remember_project,
+    resolve_group_id,
+    resolve_project_id,
+)
+
+
+@pytest.fixture(autouse=True)
+def empty_caches():
+    gitlab_clients._clients.clear()
+    gitlab_clients.lookup_cache.clear()
+    yield
+    gitlab_clients._clients.clear()
+    gitlab_clients.lookup_cache.clear()
+
+
+@pytest.fixture
+def gitlab():
+    client = Mock()
+    client.url = "http://gitlab.example.com"
+    return client
+
+
+def gitlab_object(id, **attributes):
+    obj = Mock()
+    obj.id = id
+    for name, value in attributes.items():
+        setattr(obj, name, value)
+    return obj
+
+
+class TestGitlabClient:
+
+    @patch("ctutor_backend.gitlab_clients.Gitlab")
+    def test_client_is_shared_per_url_and_token(self, mock_gitlab_class):
+        mock_gitlab_class.side_effect = lambda **kwargs: Mock()
+
+        first = gitlab_client("http://gitlab.example.com", "token-a")
+        second = gitlab_client("http://gitlab.example.com", "token-a")
+        other = gitlab_client("http://gitlab.example.com", "token-b")
+
+        assert first is second
+        assert other is not first
+        assert mock_gitlab_class.call_count == 2
+        first.version.assert_called_once()
+
+    @patch("ctutor_backend.gitlab_clients.Gitlab")
+    def test_rejected_token_is_not_cached(self, mock_gitlab_class):
+        mock_gitlab_class.return_value.version.side_effect = Exception("401 Unauthorized")
+
+        with pytest.raises(Exception):
+            gitlab_client("http://gitlab.example.com", "revoked")
+
+        assert gitlab_clients._clients == {}
+
+    @patch("ctutor_backend.gitlab_clients.Gitlab")
+    def test_threads_get_their_own_client(self, mock_gitlab_class):
+        mock_gitlab_class.side_effect = lambda **kwargs: Mock()
+        first = gitlab_client("http://gitlab.example.com", "token-a")
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            other_thread = executor.submit(gitlab_client, "http://gitlab.example.com", "token-a").result()
+
+        assert other_thread is not first
+        assert gitlab_client("http://gitlab.example.com", "token-a") is first
+
+    @patch("ctutor_backend.gitlab_clients.Gitlab")
+    def test_rejected_token_discards_clients(self, mock_gitlab_class):
+        session = SimpleNamespace(hooks={"response": []})
+        mock_gitlab_class.return_value = Mock(session=session)
+        gitlab_client("http://gitlab.example.com", "token-a")
+
+        for hook in session.hooks["response"]:
+            hook(SimpleNamespace(status_code=401))
+
+        assert gitlab_clients._clients == {}
+
+    def test_token_is_not_part_of_the_key(self):
+        assert "secret" not in gitlab_clients.token_fingerprint("secret")
+
+
+class TestPathLookups:
+
+    def test_project_id_is_cached(self, gitlab):
+        gitlab.projects.get.return_value = gitlab_object(7, path_with_namespace="org/course/student-template")
+
+        assert resolve_project_id(gitlab, "org/course/student-template") == 7
+        assert resolve_project_id(gitlab, "org/course/student-template") == 7
+
+        gitlab.projects.get.assert_called_once_with("org/course/student-template")
+
+    def test_missing_project_is_not_cached(self, gitlab):
+        gitlab.projects.get.side_effect = GitlabGetError("404 Project Not Found", 404)
+
+        assert resolve_project_id(gitlab, "org/course/missing") is None
+        assert resolve_project_id(gitlab, "org/course/missing") is None
+
+        assert gitlab.projects.get.call_count == 2
+
+    def test_redirected_path_is_not_found(self, gitlab):
+        # GitLab follows the redirect of a renamed group
+        gitlab.groups.get.return_value = gitlab_object(3, full_path="org/renamed")
+
+        assert resolve_group_id(gitlab, "org/old-name") is None
+
+    def test_deleted_project_is_looked_up_again(self, gitlab):
+        remember_project(gitlab, "org/course/team-a", 5)
+        recreated = gitlab_object(9, path_with_namespace="org/course/team-a")
+        gitlab.projects.get.side_effect = [GitlabGetError("404 Project Not Found", 404), recreated]
+
+        assert find_project(gitlab, "org/course/team-a") is recreated
+        assert resolve_project_id(gitlab, "org/course/team-a") == 9
+
+    def test_group_full_path_is_cached(self, gitlab):
+        gitlab.groups.get.return_value = gitlab_object(4, full_path="org/course/students")
+
+        assert group_full_path(gitlab, 4) == "org/course/students"
+        assert group_full_path(gitlab, 4) == "org/course/students"
+
+        gitlab.groups.get.assert_called_once_with(4)
+
+
+class TestPathLookupCache:
+
+    def test_entries_expire(self):
+        now = [0.0]
+        cache = PathLookupCache(ttl=10, clock=lambda: now[0])
+        cache.set(("url", "project", "a"), 1)
+
+        now[0] = 9.9
+        assert cache.get(("url", "project", "a")) == 1
+
+        now[0] = 10.0
+        assert cache.get(("url", "project", "a")) is None
+
+    def test_least_recently_used_entries_are_evicted(self):
+        cache = PathLookupCache(ttl=60, max_size=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.get("c") == 3
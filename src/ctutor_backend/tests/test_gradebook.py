@@ -0,0 +1,97 @@
+"""
+Tests for the course gradebook endpoint.
+"""
+
+import pytest
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from ctutor_backend.api.courses import _decode_gradebook_cursor, _encode_gradebook_cursor, get_course_gradebook
+from ctutor_backend.api.exceptions import BadRequestException, NotFoundException
+from ctutor_backend.interface.gradebook import GradebookQuery
+from ctutor_backend.permissions.principal import Principal
+
+MEMBER_IDS = [f"00000000-0000-0000-0000-00000000000{index}" for index in range(1, 4)]
+
+
+def _member(index: int):
+    return SimpleNamespace(
+        id=MEMBER_IDS[index], user_id=f"user-{index}", course_group_id=None,
+        given_name=f"Given{index}", family_name=f"Family{index}", username=f"student{index}",
+        sort_family_name=f"Family{index}", sort_given_name=f"Given{index}",
+    )
+
+
+def _content(index: int):
+    return SimpleNamespace(id=f"content-{index}", path=f"week{index}", title=f"Week {index}")
+
+
+def _query(rows):
+    query = MagicMock()
+    query.all.return_value = rows
+    query.limit.return_value = query
+    query.__iter__.side_effect = lambda: iter(rows)
+    return query
+
+
+@pytest.fixture
+def gradebook_queries():
+    permission_query = MagicMock()
+    permission_query.filter.return_value.first.return_value = SimpleNamespace(id="course-1")
+
+    cells = [
+        SimpleNamespace(course_member_id=MEMBER_IDS[0], course_content_id="content-1", latest_result=0.5,
+                        best_result=0.9, submitted_count=2, grading_status=1, grading=0.8),
+        SimpleNamespace(course_member_id=MEMBER_IDS[1], course_content_id="content-2", latest_result=1.0,
+                        best_result=1.0, submitted_count=1, grading_status=None, grading=None),
+    ]
+
+    with patch("ctutor_backend.api.courses.check_course_permissions", return_value=permission_query) as check, \
+         patch("ctutor_backend.api.courses.course_gradebook_contents_query", return_value=_query([_content(1), _content(2)])), \
+         patch("ctutor_backend.api.courses.course_gradebook_members_query", return_value=_query([_member(0), _member(1), _member(2)])) as members, \
+         patch("ctutor_backend.api.courses.course_gradebook_cells_query", return_value=_query(cells)) as cells_query:
+        yield SimpleNamespace(check=check, members=members, cells=cells_query, permission_query=permission_query)
+
+
+class TestCourseGradebook:
+    """Test cases for GET /courses/{id}/gradebook."""
+
+    def test_matrix_is_columnar(self, gradebook_queries):
+        principal = Principal(user_id="tutor", is_admin=False)
+
+        gradebook = get_course_gradebook(principal, "course-1", GradebookQuery(limit=2), MagicMock())
+
+        assert [member.id for member in gradebook.members] == MEMBER_IDS[:2]
+        assert [content.path for content in gradebook.contents] == ["week1", "week2"]
+        assert gradebook.latest_result == [[0.5, None], [None, 1.0]]
+        assert gradebook.best_result == [[0.9, None], [None, 1.0]]
+        assert gradebook.submission_count == [[2, 0], [0, 1]]
+        assert gradebook.grading_status == [[1, None], [None, None]]
+        # One extra member was fetched, so there is a next page
+        assert _decode_gradebook_cursor(gradebook.next_cursor) == ("Family1", "Given1", MEMBER_IDS[1])
+        gradebook_queries.cells.assert_called_once()
+        assert gradebook_queries.cells.call_args.args[1] == MEMBER_IDS[:2]
+
+    def test_last_page_has_no_cursor(self, gradebook_queries):
+        gradebook = get_course_gradebook(Principal(user_id="tutor"), "course-1", GradebookQuery(limit=10), MagicMock())
+
+        assert len(gradebook.members) == 3
+        assert gradebook.next_cursor is None
+
+    def test_cursor_is_passed_as_keyset(self, gradebook_queries):
+        cursor = _encode_gradebook_cursor(_member(0))
+
+        get_course_gradebook(Principal(user_id="tutor"), "course-1", GradebookQuery(cursor=cursor), MagicMock())
+
+        assert gradebook_queries.members.call_args.args[3] == ("Family0", "Given0", MEMBER_IDS[0])
+
+    def test_invalid_cursor_is_rejected(self, gradebook_queries):
+        with pytest.raises(BadRequestException):
+            get_course_gradebook(Principal(user_id="tutor"), "course-1", GradebookQuery(cursor="not-a-cursor"), MagicMock())
+
+    def test_requires_tutor_role(self, gradebook_queries):
+        gradebook_queries.permission_query.filter.return_value.first.return_value = None
+
+        with pytest.raises(NotFoundException):
+            get_course_gradebook(Principal(user_id="student"), "course-1", GradebookQuery(), MagicMock())
+        assert gradebook_queries.check.call_args.args[2] == "_tutor"
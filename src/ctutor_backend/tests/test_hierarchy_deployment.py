@@ -0,0 +1,209 @@
+"""
+Tests for the concurrent deployment of course hierarchies.
+"""
+
+import asyncio
+import threading
+import pytest
+from unittest.mock import Mock, patch
+
+from ctutor_backend.generator.gitlab_builder import GITLAB_BUILDER_CONCURRENCY, GitLabBuilder
+from ctutor_backend.model.course import Course
+from ctutor_backend.tasks.temporal_hierarchy_management import (
+    DeployComputorHierarchyWorkflow,
+    hierarchy_nodes,
+)
+
+
+def deployment_config(courses_per_family=2, families=("prog", "math")):
+    return {
+        "organizations": [
+            {
+                "name": "Uni",
+                "path": "uni",
+                "gitlab": {"url": "http://gitlab.example.com", "token": "token"},
+                "course_families": [
+                    {
+                        "name": family,
+                        "path": family,
+                        "courses": [
+                            {
+                                "name": f"{family} {index}",
+                                "path": f"{family}-{index}",
+                                "content_types": [{"slug": "assignment"}] if index == 0 else [],
+                            }
+                            for index in range(courses_per_family)
+                        ],
+                    }
+                    for family in families
+                ],
+            }
+        ]
+    }
+
+
+class TestHierarchyNodes:
+
+    def test_dependencies(self):
+        nodes = {node.key: node for node in hierarchy_nodes(deployment_config())}
+
+        assert nodes["organization:uni"].parent is None
+        assert nodes["course_family:uni/prog"].parent == "organization:uni"
+        assert nodes["course:uni/prog/prog-1"].parent == "course_family:uni/prog"
+        assert nodes["content_types:uni/prog/prog-0"].parent == "course:uni/prog/prog-0"
+        assert "content_types:uni/prog/prog-1" not in nodes
+
+    def test_parents_come_first(self):
+        seen = set()
+        for node in hierarchy_nodes(deployment_config()):
+            assert node.parent is None or node.parent in seen
+            seen.add(node.key)
+
+    def test_duplicates_are_deployed_once(self):
+        config = deployment_config()
+        config["organizations"].append(config["organizations"][0])
+
+        keys = [node.key for node in hierarchy_nodes(config)]
+
+        assert len(keys) == len(set(keys))
+
+
+class TestDeployComputorHierarchyWorkflow:
+
+    @pytest.fixture
+    def workflow_info(self):
+        with patch("ctutor_backend.tasks.temporal_hierarchy_management.workflow.info") as info, \
+             patch("ctutor_backend.tasks.temporal_hierarchy_management.workflow.logger"):
+            info.return_value.workflow_id = "deploy-1"
+            yield info
+
+    @pytest.mark.asyncio
+    async def test_independent_nodes_run_concurrently(self, workflow_info):
+        running = []
+        max_running = []
+
+        async def deploy_node(node, parent_result, user_id):
+            if parent_result is not None:
+                assert parent_result["key"] == node.parent
+            running.append(node.key)
+            max_running.append(len(running))
+            await asyncio.sleep(0.01)
+            running.remove(node.key)
+            return {"key": node.key, "course_id": "c", "status": "success"}
+
+        with patch.object(DeployComputorHierarchyWorkflow, "_deploy_node", side_effect=deploy_node):
+            result = await DeployComputorHierarchyWorkflow().run({
+                "deployment_config": deployment_config(courses_per_family=3),
+                "user_id": "user",
+                "max_parallel": 3,
+            })
+
+        assert result.status == "completed"
+        assert max(max_running) == 3
+        assert len(result.result["created_entities"]["courses"]) == 6
+        assert result.result["counts"]["courses"] == 6
+
+    @pytest.mark.asyncio
+    async def test_failed_branch_does_not_stop_siblings(self, workflow_info):
+        async def deploy_node(node, parent_result, user_id):
+            if node.key == "course_family:uni/prog":
+                raise Exception("GitLab error")
+            return {"key": node.key, "course_id": "c", "status": "success"}
+
+        with patch.object(DeployComputorHierarchyWorkflow, "_deploy_node", side_effect=deploy_node):
+            result = await DeployComputorHierarchyWorkflow().run({
+                "deployment_config": deployment_config(),
+                "user_id": "user",
+            })
+
+        assert result.status == "failed"
+        assert "course_family:uni/prog: GitLab error" in result.error
+        assert "course:uni/math/math-1" in result.result["nodes"]
+        assert "course:uni/prog/prog-1" not in result.result["nodes"]
+
+    @pytest.mark.asyncio
+    async def test_completed_nodes_are_skipped(self, workflow_info):
+        deployed = []
+
+        async def deploy_node(node, parent_result, user_id):
+            deployed.append(node.key)
+            return {"key": node.key, "course_id": "c", "status": "success"}
+
+        with patch.object(DeployComputorHierarchyWorkflow, "_deploy_node", side_effect=deploy_node):
+            first = await DeployComputorHierarchyWorkflow().run({
+                "deployment_config": deployment_config(families=("prog",)),
+                "user_id": "user",
+            })
+            deployed.clear()
+            second = await DeployComputorHierarchyWorkflow().run({
+                "deployment_config": deployment_config(families=("prog", "math")),
+                "user_id": "user",
+                "completed_nodes": first.result["nodes"],
+            })
+
+        assert second.status == "completed"
+        assert deployed and all("math" in key for key in deployed)
+
+
+class TestCourseGroupsAndProjects:
+
+    def test_groups_and_projects_are_recorded(self):
+        gitlab = Mock()
+        gitlab.url = "http://gitlab.example.com"
+        gitlab.projects.get.side_effect = Exception("404 Project Not Found")
+        gitlab.groups.create.side_effect = lambda data: Mock(id=len(data["path"]), full_path=f"uni/prog/{data['path']}")
+        gitlab.groups.get.return_value.subgroups.list.return_value = []
+        builder = GitLabBuilder(Mock(), "http://gitlab.example.com", "token", gitlab=Mock())
+
+        parent_group = Mock(id=1, full_path="uni/prog")
+        course = Course(title="Programming", properties={})
+
+        with patch("ctutor_backend.generator.gitlab_builder.resolve_project_id", return_value=None), \
+             patch("ctutor_backend.generator.gitlab_builder.gitlab_client", return_value=gitlab) as thread_client:
+            results = builder._create_course_groups_and_projects(course, parent_group)
+
+        assert results["projects"]["created_projects"] == ["student-template", "assignments"]
+        assert gitlab.projects.create.call_count == 2
+        assert course.properties["gitlab"]["students_group"]["full_path"] == "uni/prog/students"
+        assert course.properties["gitlab"]["tutors_group"]["full_path"] == "uni/prog/tutors"
+        assert course.properties["gitlab"]["student_template_url"] == "http://gitlab.example.com/uni/prog/student-template"
+        # The pool threads use their own clients, not the builder's
+        thread_client.assert_called_with("http://gitlab.example.com", "token")
+        builder.gitlab.groups.create.assert_not_called()
+
+    def test_failed_project_keeps_other_results(self):
+        gitlab = Mock()
+        gitlab.projects.create.side_effect = Exception("500 Internal Server Error")
+        existing = Mock(path="students")
+        gitlab.groups.get.return_value.subgroups.list.return_value = [existing]
+        builder = GitLabBuilder(Mock(), "http://gitlab.example.com", "token", gitlab=gitlab)
+
+        parent_group = Mock(id=1, full_path="uni/prog")
+        course = Course(title="Programming", properties={})
+
+        with patch("ctutor_backend.generator.gitlab_builder.resolve_project_id", return_value=None), \
+             patch("ctutor_backend.generator.gitlab_builder.gitlab_client", return_value=gitlab):
+            results = builder._create_course_groups_and_projects(course, parent_group)
+
+        assert results["students_group"]["success"] is True
+        assert results["projects"]["success"] is False
+        assert "projects" not in course.properties.get("gitlab", {})
+
+    def test_courses_share_the_builder_threads(self):
+        gitlab = Mock()
+        gitlab.groups.get.return_value.subgroups.list.return_value = [Mock(path="students"), Mock(path="tutors")]
+        builder = GitLabBuilder(Mock(), "http://gitlab.example.com", "token", gitlab=gitlab)
+        threads = set()
+
+        def thread_client(url, token):
+            threads.add(threading.current_thread())
+            return gitlab
+
+        with patch("ctutor_backend.generator.gitlab_builder.resolve_project_id", return_value=1), \
+             patch("ctutor_backend.generator.gitlab_builder.gitlab_client", side_effect=thread_client):
+            for title in ("Programming", "Mathematics", "Physics"):
+                builder._create_course_groups_and_projects(Course(title=title, properties={}), Mock(id=1, full_path="uni/prog"))
+
+        # Three courses, four requests each, on no more threads than the shared pool has
+        assert len(threads) <= GITLAB_BUILDER_CONCURRENCY
+        assert all(thread.name.startswith("gitlab-builder") for thread in threads)
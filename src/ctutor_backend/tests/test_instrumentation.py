@@ -0,0 +1,113 @@
+"""
+Tests for the statement-level SQL instrumentation.
+"""
+
+import pytest
+from unittest.mock import patch
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, text
+
+from ctutor_backend.instrumentation import (
+    RequestStatements,
+    SQLInstrumentationMiddleware,
+    current_statements,
+    instrument_engine,
+    set_request_principal,
+)
+from ctutor_backend.permissions.principal import Principal
+
+
+@pytest.fixture
+def sqlite_engine():
+    sqlite = create_engine("sqlite://")
+    instrument_engine(sqlite)
+    return sqlite
+
+
+@pytest.fixture
+def executed(sqlite_engine):
+    statements = []
+
+    @event.listens_for(sqlite_engine, "after_cursor_execute")
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    return statements
+
+
+@pytest.fixture
+def client(sqlite_engine):
+    app = FastAPI()
+    app.add_middleware(SQLInstrumentationMiddleware)
+
+    @app.get("/items/{item_id}")
+    def get_item(item_id: str):
+        set_request_principal(Principal(user_id="user-1"))
+        with sqlite_engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+            connection.execute(text("SELECT 2"))
+        return {"statements": current_statements().count}
+
+    return TestClient(app)
+
+
+class TestSQLInstrumentation:
+
+    def test_statements_are_tagged(self, client, executed):
+        client.get("/items/1", headers={"X-Request-ID": "abc-123"})
+
+        assert executed[-1] == (
+            "SELECT 2 /* route='/items/{item_id}',principal='user',request_id='abc-123' */"
+        )
+
+    def test_response_headers(self, client):
+        response = client.get("/items/1", headers={"X-Request-ID": "abc-123"})
+
+        assert response.json() == {"statements": 2}
+        assert response.headers["X-Request-ID"] == "abc-123"
+        assert response.headers["Server-Timing"].startswith("db;dur=")
+        assert response.headers["Server-Timing"].endswith('desc="2 statements"')
+
+    def test_request_id_cannot_escape_comment(self, client, executed):
+        response = client.get("/items/1", headers={"X-Request-ID": "x*/; DROP TABLE user; --"})
+
+        assert "*/;" not in response.headers["X-Request-ID"]
+        assert executed[-1].count("*/") == 1
+
+    def test_statements_outside_requests_are_untouched(self, sqlite_engine, executed):
+        with sqlite_engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+
+        assert executed == ["SELECT 1"]
+        assert current_statements() is None
+
+
+class TestRequestStatements:
+
+    def test_keeps_slowest_statements(self):
+        statements = RequestStatements(scope={"method": "GET"}, request_id="r")
+
+        with patch("ctutor_backend.instrumentation.settings") as settings:
+            settings.SQL_SLOWEST_STATEMENTS = 2
+            settings.SQL_SLOW_QUERY_MS = 1000
+            for duration, statement in [(0.1, "a"), (0.3, "b"), (0.2, "c"), (0.05, "d")]:
+                statements.record(statement, duration)
+
+        assert statements.count == 4
+        assert statements.duration == pytest.approx(0.65)
+        assert statements.slowest_statements() == [(0.3, "b"), (0.2, "c")]
+        assert statements.route == "unmatched"
+
+    def test_logs_slow_statements(self, caplog):
+        statements = RequestStatements(scope={"method": "GET"}, request_id="r")
+
+        with patch("ctutor_backend.instrumentation.settings") as settings:
+            settings.SQL_SLOWEST_STATEMENTS = 5
+            settings.SQL_SLOW_QUERY_MS = 100
+            statements.record("SELECT fast", 0.01)
+            statements.record("SELECT slow", 0.2)
+
+        assert statements.slow == 1
+        assert "SELECT slow" in caplog.text
+        assert "SELECT fast" not in caplog.text
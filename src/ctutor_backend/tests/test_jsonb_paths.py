@@ -0,0 +1,35 @@
+"""
+Tests for promoted JSONB properties paths and their expression indexes.
+"""
+
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+from sqlalchemy.schema import CreateIndex
+
+from ctutor_backend.model.course import Course, CourseMember
+from ctutor_backend.model.organization import Organization
+
+
+def _index_sql(model, name: str) -> str:
+    index = next(index for index in model.__table__.indexes if index.name == name)
+    return str(CreateIndex(index).compile(dialect=postgresql.dialect()))
+
+
+class TestPromotedJsonbPaths:
+    """Test cases for promoted_jsonb_path accessors."""
+
+    def test_instance_value_is_text_like_the_sql_operator(self):
+        course = Course(properties={"gitlab": {"url": "https://git.example.com", "group_id": 42}})
+
+        assert course.gitlab_url == "https://git.example.com"
+        assert course.gitlab_group_id == "42"
+        assert course.gitlab_full_path is None
+        assert Organization(properties=None).gitlab_url is None
+
+    def test_query_expression_matches_index_expression(self):
+        sql = str(Session().query(CourseMember).filter(CourseMember.gitlab_full_path == "students/alice")
+                  .statement.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+        assert "((course_member.properties -> 'gitlab')) ->> 'full_path'" in sql
+        assert _index_sql(CourseMember, "course_member_gitlab_full_path_idx") == \
+            "CREATE INDEX course_member_gitlab_full_path_idx ON course_member (((properties -> 'gitlab') ->> 'full_path'))"
@@ -0,0 +1,133 @@
+"""
+Tests for keyset pagination and estimated totals of list_db.
+"""
+
+import pytest
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+
+from ctutor_backend.api.crud import list_db
+from ctutor_backend.api.exceptions import BadRequestException
+from ctutor_backend.api.pagination import after_cursor, encode_cursor, keyset_query
+from ctutor_backend.interface.base import ListQuery
+from ctutor_backend.interface.course_groups import CourseGroupInterface
+from ctutor_backend.interface.messages import MessageInterface
+from ctutor_backend.interface.results import ResultInterface
+from ctutor_backend.model.message import Message
+from ctutor_backend.model.result import Result
+from ctutor_backend.permissions.principal import Principal
+
+
+def _compile(query) -> str:
+    return str(query.statement.compile(dialect=postgresql.dialect())).lower()
+
+
+class TestKeyset:
+    """Test cases for the cursor sort key."""
+
+    def test_default_key_is_created_at_and_id(self):
+        sql = _compile(keyset_query(Session().query(Message), MessageInterface))
+
+        assert sql.endswith("order by message.created_at asc, message.id asc")
+
+    def test_search_order_prefix_gets_tie_breaker(self):
+        query = Session().query(Result).order_by(Result.created_at.desc())
+
+        sql = _compile(keyset_query(query, ResultInterface))
+
+        assert sql.endswith("order by result.created_at desc, result.id desc")
+
+    def test_incompatible_search_order_disables_keyset(self):
+        from ctutor_backend.model.course import CourseGroup
+        query = Session().query(CourseGroup).order_by(CourseGroup.title)
+
+        assert keyset_query(query, CourseGroupInterface) is None
+
+    def test_cursor_round_trip(self):
+        created_at = datetime(2026, 1, 2, 3, 4, 5, 123456, tzinfo=timezone.utc)
+        entity = SimpleNamespace(created_at=created_at, id="00000000-0000-0000-0000-000000000001")
+
+        query = after_cursor(Session().query(Result), ResultInterface, encode_cursor(entity, ResultInterface))
+        statement = query.statement.compile(dialect=postgresql.dialect())
+
+        assert "(result.created_at, result.id) < (" in str(statement)
+        assert created_at in statement.params.values()
+
+    @pytest.mark.parametrize("cursor", ["not-a-cursor", "WzFd"])
+    def test_invalid_cursor_is_rejected(self, cursor):
+        with pytest.raises(BadRequestException):
+            after_cursor(Session().query(Result), ResultInterface, cursor)
+
+
+@pytest.fixture
+def message_query():
+    query = MagicMock()
+    for method in ("filter", "order_by", "limit", "offset"):
+        getattr(query, method).return_value = query
+    query.count.return_value = 1234
+
+    interface = SimpleNamespace(
+        model=Message, search=lambda db, q, params: q, list=MagicMock(), endpoint="messages",
+        cursor_keys=None, __name__="MessageInterface",
+    )
+    interface.list.model_validate.side_effect = lambda entity, from_attributes: entity
+
+    with patch("ctutor_backend.api.crud.check_permissions", return_value=query):
+        yield query, interface
+
+
+def _messages(count: int):
+    return [SimpleNamespace(id=f"message-{index}", created_at=datetime(2026, 1, 1, tzinfo=timezone.utc)) for index in range(count)]
+
+
+class TestListDbTotals:
+    """Test cases for X-Total-Count and X-Next-Cursor of list_db."""
+
+    @pytest.mark.asyncio
+    async def test_last_page_knows_its_total(self, message_query):
+        query, interface = message_query
+        query.all.return_value = _messages(3)
+
+        page = await list_db(Principal(is_admin=True), MagicMock(), ListQuery(limit=10), interface)
+
+        assert page.total == 3 and not page.total_estimated
+        assert page.next_cursor is None
+        query.count.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_full_page_uses_estimate_and_cursor(self, message_query):
+        query, interface = message_query
+        query.all.return_value = _messages(3)
+
+        with patch("ctutor_backend.api.crud.estimate_count", return_value=5000) as estimate:
+            page = await list_db(Principal(is_admin=True), MagicMock(), ListQuery(limit=2), interface)
+
+        estimate.assert_called_once()
+        assert len(page.items) == 2
+        assert page.total == 5000 and page.total_estimated
+        assert page.next_cursor == encode_cursor(page.items[-1], interface)
+        query.limit.assert_called_with(3)
+
+    @pytest.mark.asyncio
+    async def test_exact_total_is_opt_in(self, message_query):
+        query, interface = message_query
+        query.all.return_value = _messages(3)
+
+        with patch("ctutor_backend.api.crud.estimate_count") as estimate:
+            page = await list_db(Principal(is_admin=True), MagicMock(), ListQuery(limit=2, exact_total=True), interface)
+
+        estimate.assert_not_called()
+        assert page.total == 1234 and not page.total_estimated
+
+    @pytest.mark.asyncio
+    async def test_missing_estimate_falls_back_to_count(self, message_query):
+        query, interface = message_query
+        query.all.return_value = _messages(3)
+
+        with patch("ctutor_backend.api.crud.estimate_count", return_value=None):
+            page = await list_db(Principal(is_admin=True), MagicMock(), ListQuery(limit=2), interface)
+
+        assert page.total == 1234 and not page.total_estimated
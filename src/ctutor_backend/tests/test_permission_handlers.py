@@ -72,7 +72,7 @@ class TestCoursePermissionHandler:
         sentinel = object()
         import ctutor_backend.permissions.query_builders as qb
         monkeypatch.setattr(qb.CoursePermissionQueryBuilder, 'build_course_filtered_query',
-                            lambda entity, user_id, min_role, db_: sentinel)
+                            lambda entity, principal, min_role, db_: sentinel)
 
         principal = Principal(user_id='u2', roles=['user'])
         q = handler.build_query(principal, 'list', db)
@@ -127,7 +127,7 @@ class TestUserPermissionHandler:
         sentinel = object()
         import ctutor_backend.permissions.query_builders as qb
         monkeypatch.setattr(qb.UserPermissionQueryBuilder, 'filter_visible_users',
-                            lambda user_id, db_: sentinel)
+                            lambda principal, db_: sentinel)
         principal = Principal(user_id='u6', roles=['user'])
         q = handler.build_query(principal, 'list', db)
         assert q is sentinel
@@ -141,3 +141,42 @@ class TestCourseMemberPermissionHandler:
         # Should return a query-like object without raising
         q = handler.build_query(principal, 'get', db)
         assert q is not None
+
+
+class TestCoursePermissionQueryBuilder:
+    @staticmethod
+    def _compile(query) -> str:
+        from sqlalchemy.dialects import postgresql
+        return str(query.statement.compile(dialect=postgresql.dialect())).lower()
+
+    def test_claimed_courses_are_bound_as_array(self):
+        from sqlalchemy.orm import Session
+        from ctutor_backend.permissions.query_builders import CoursePermissionQueryBuilder
+
+        claims = build_claims([
+            ('permissions', 'course:_tutor:c1'),
+            ('permissions', 'course:_student:c2'),
+        ])
+        principal = Principal(user_id='u8', claims=claims)
+
+        query = CoursePermissionQueryBuilder.filter_by_course_membership(
+            Session().query(CourseContentType), CourseContentType, principal, '_tutor', None
+        )
+        statement = query.statement.compile()
+        sql = self._compile(query)
+
+        assert 'course_member' not in sql
+        assert 'any (cast(' in sql
+        assert [value for value in statement.params.values() if isinstance(value, list)] == [['c1']]
+
+    def test_principal_without_course_claims_falls_back_to_subquery(self):
+        from sqlalchemy.orm import Session
+        from ctutor_backend.permissions.query_builders import CoursePermissionQueryBuilder
+
+        principal = Principal(user_id='u9')
+
+        query = CoursePermissionQueryBuilder.filter_by_course_membership(
+            Session().query(CourseContentType), CourseContentType, principal, '_tutor', None
+        )
+
+        assert 'from course_member' in self._compile(query)
@@ -0,0 +1,173 @@
+"""
+Tests for batch student repository provisioning.
+"""
+
+import time
+import asyncio
+import pytest
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+from temporalio.testing import ActivityEnvironment
+
+from ctutor_backend.tasks.temporal_student_repository import student_repository_info
+from ctutor_backend.tasks.temporal_student_repository_batch import (
+    GitLabScheduler,
+    ImportPoller,
+    TokenBucket,
+    _completed_with_heartbeats,
+    _provision_member,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def _project(project_id: int, path: str, import_status=None):
+    return {
+        "id": project_id,
+        "path": path,
+        "path_with_namespace": f"course/students/{path}",
+        "web_url": f"https://gitlab.example.com/course/students/{path}",
+        "namespace": {"full_path": "course/students"},
+        "http_url_to_repo": f"https://gitlab.example.com/course/students/{path}.git",
+        "import_status": import_status,
+    }
+
+
+class TestTokenBucket:
+
+    def test_burst_then_rate(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=2.0, capacity=2, clock=clock)
+
+        assert bucket.delay() == 0
+        assert bucket.delay() == 0
+        assert bucket.delay() == pytest.approx(0.5)
+
+        clock.now += 0.5
+        assert bucket.delay() == 0
+
+    def test_pauses_when_window_is_nearly_used(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=10.0, capacity=10, reserve=5, clock=clock)
+
+        bucket.update_from_headers(200, {"RateLimit-Remaining": "100", "RateLimit-Reset": str(time.time() + 30)})
+        assert bucket.delay() == 0
+
+        bucket.update_from_headers(200, {"RateLimit-Remaining": "3", "RateLimit-Reset": str(time.time() + 30)})
+        assert bucket.delay() == pytest.approx(30, abs=1)
+
+    def test_honours_retry_after(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=10.0, capacity=10, clock=clock)
+
+        bucket.update_from_headers(429, {"Retry-After": "12"})
+
+        assert bucket.delay() == pytest.approx(12)
+        clock.now += 12
+        assert bucket.delay() == 0
+
+
+@pytest.fixture
+def gitlab():
+    client = MagicMock()
+    client.session = SimpleNamespace(hooks={"response": []})
+    client.users.list.return_value = [SimpleNamespace(id=77)]
+    return client
+
+
+def _member(email="jane_doe@example.com", properties=None):
+    return SimpleNamespace(id="member-1", properties=properties, user=SimpleNamespace(id="user-1", email=email))
+
+
+class TestProvisionMember:
+
+    @pytest.mark.asyncio
+    async def test_forks_and_waits_for_import(self, gitlab):
+        statuses = iter([{"import_status": "started"}, {"import_status": "finished"}])
+        gitlab.http_post.side_effect = lambda path, post_data: (
+            _project(5, post_data["path"], "scheduled") if path.endswith("/fork") else {}
+        )
+        gitlab.http_get.side_effect = lambda path: next(statuses)
+
+        scheduler = GitLabScheduler(lambda: gitlab, TokenBucket(1000.0, 1000))
+        poller = ImportPoller(scheduler, interval=0)
+
+        with patch("ctutor_backend.gitlab_utils.gitlab_unprotect_branches") as unprotect:
+            result = await _provision_member(scheduler, poller, _member(), {}, 42, 9)
+
+        assert result["forked"] is True
+        assert result["gitlab_user_id"] == 77
+        fork_call = gitlab.http_post.call_args_list[0]
+        assert fork_call.args[0] == "/projects/42/fork"
+        assert fork_call.kwargs["post_data"] == {"path": "jane-doe", "name": "jane_doe", "namespace_id": 9}
+        assert gitlab.http_get.call_count == 2
+        assert unprotect.call_count == 2
+        assert gitlab.http_post.call_args_list[-1].kwargs["post_data"] == {"user_id": 77, "access_level": 40}
+        # The response hook of the session feeds the bucket until the scheduler is closed
+        assert gitlab.session.hooks["response"] == [scheduler._observe]
+        scheduler.close()
+        assert gitlab.session.hooks["response"] == []
+
+    @pytest.mark.asyncio
+    async def test_existing_repository_is_reused(self, gitlab):
+        scheduler = GitLabScheduler(lambda: gitlab, TokenBucket(1000.0, 1000))
+        existing = {"jane-doe": _project(3, "jane-doe")}
+
+        result = await _provision_member(
+            scheduler, ImportPoller(scheduler), _member(properties={"gitlab_user_id": 12}), existing, 42, 9
+        )
+
+        assert result == {"project": existing["jane-doe"], "gitlab_user_id": 12, "forked": False}
+        gitlab.http_post.assert_called_once_with("/projects/3/members", post_data={"user_id": 12, "access_level": 40})
+        gitlab.users.list.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_failed_import_is_raised(self, gitlab):
+        gitlab.http_post.return_value = _project(5, "jane-doe", "scheduled")
+        gitlab.http_get.return_value = {"import_status": "failed", "import_error": "boom"}
+
+        scheduler = GitLabScheduler(lambda: gitlab, TokenBucket(1000.0, 1000))
+
+        with pytest.raises(ValueError, match="boom"):
+            await _provision_member(scheduler, ImportPoller(scheduler, interval=0), _member(), {}, 42, 9)
+
+    def test_repository_info_from_fork_response(self):
+        info = student_repository_info(_project(5, "jane-doe"), "https://gitlab.example.com", 9)
+
+        assert info["full_path"] == "course/students/jane-doe"
+        assert info["namespace_path"] == "course/students"
+        assert info["gitlab_project_id"] == 5
+        assert info["namespace_id"] == 9
+
+
+class TestCompletedWithHeartbeats:
+
+    @pytest.mark.asyncio
+    async def test_heartbeats_while_waiting(self):
+        heartbeats = []
+        env = ActivityEnvironment()
+        env.on_heartbeat = lambda *details: heartbeats.append(details[0])
+
+        async def slow_fork(name, seconds):
+            await asyncio.sleep(seconds)
+            return name
+
+        async def provision():
+            results = []
+            tasks = [asyncio.create_task(slow_fork("fast", 0)), asyncio.create_task(slow_fork("slow", 0.1))]
+            async for name in _completed_with_heartbeats(tasks, lambda: {"done": len(results)}, interval=0.01):
+                results.append(name)
+            return results
+
+        assert await env.run(provision) == ["fast", "slow"]
+
+        # Heartbeats continue while the slow fork is still importing
+        assert len(heartbeats) > 3
+        assert heartbeats[0] == {"done": 1}
+        assert heartbeats[-1] == {"done": 2}
@@ -0,0 +1,54 @@
+"""
+Tests for the per-content manifest of incremental student-template generation.
+"""
+
+from types import SimpleNamespace
+
+from ctutor_backend.tasks.temporal_student_template_v2 import (
+    student_template_manifest,
+    student_template_unchanged,
+)
+
+
+def _deployment(**kwargs):
+    values = dict(example_version_id="version-1", deployment_path="week1.hello", deployment_metadata=None)
+    values.update(kwargs)
+    return SimpleNamespace(**values)
+
+
+class TestStudentTemplateManifest:
+
+    def test_hash_ignores_assignments_commit(self):
+        deployment = _deployment()
+
+        first = student_template_manifest(deployment, "commit-a", "tree-1")
+        second = student_template_manifest(deployment, "commit-b", "tree-1")
+
+        assert first["input_hash"] == second["input_hash"]
+        assert second["commit"] == "commit-b"
+
+    def test_hash_changes_with_inputs(self):
+        manifest = student_template_manifest(_deployment(), "commit-a", "tree-1")
+
+        assert student_template_manifest(_deployment(), "commit-a", "tree-2")["input_hash"] != manifest["input_hash"]
+        assert student_template_manifest(_deployment(example_version_id="version-2"), "commit-a", "tree-1")["input_hash"] != manifest["input_hash"]
+        assert student_template_manifest(_deployment(deployment_path="week1.other"), "commit-a", "tree-1")["input_hash"] != manifest["input_hash"]
+
+    def test_unchanged_requires_matching_hash_and_directory(self, tmp_path):
+        manifest = student_template_manifest(_deployment(), "commit-a", "tree-1")
+        deployment = _deployment(deployment_metadata={"template_manifest": manifest})
+
+        # Directory missing from the cloned template
+        assert not student_template_unchanged(deployment, manifest, tmp_path)
+
+        (tmp_path / "week1.hello").mkdir()
+        assert student_template_unchanged(deployment, manifest, tmp_path)
+
+        changed = student_template_manifest(_deployment(), "commit-b", "tree-2")
+        assert not student_template_unchanged(deployment, changed, tmp_path)
+
+    def test_never_generated_is_changed(self, tmp_path):
+        (tmp_path / "week1.hello").mkdir()
+        manifest = student_template_manifest(_deployment(), "commit-a", "tree-1")
+
+        assert not student_template_unchanged(_deployment(), manifest, tmp_path)
@@ -196,4 +196,33 @@ class TestTemporalClient:
             assert mock_connect.call_count == 1
             
         # Cleanup
-        temporal_client._client = None
\ No newline at end of file
+        temporal_client._client = None
+
+    @pytest.mark.asyncio
+    async def test_unhealthy_client_is_replaced(self):
+        """Test that a client failing its health check is reconnected."""
+        from ctutor_backend.tasks import temporal_client
+        temporal_client._client = None
+        
+        with patch('ctutor_backend.tasks.temporal_client.Client.connect') as mock_connect, \
+                patch.object(temporal_client, 'TEMPORAL_HEALTH_CHECK_INTERVAL', 30), \
+                patch('ctutor_backend.tasks.temporal_client.time.monotonic') as mock_monotonic:
+            stale_client = MagicMock()
+            stale_client.service_client.check_health = AsyncMock(side_effect=Exception("unavailable"))
+            fresh_client = MagicMock()
+            mock_connect.side_effect = [stale_client, fresh_client]
+            
+            mock_monotonic.return_value = 100.0
+            assert await temporal_client.get_temporal_client() == stale_client
+            
+            # Within the interval the client is not checked
+            mock_monotonic.return_value = 110.0
+            assert await temporal_client.get_temporal_client() == stale_client
+            stale_client.service_client.check_health.assert_not_called()
+            
+            mock_monotonic.return_value = 131.0
+            assert await temporal_client.get_temporal_client() == fresh_client
+            assert mock_connect.call_count == 2
+            
+        # Cleanup
+        temporal_client._client = None
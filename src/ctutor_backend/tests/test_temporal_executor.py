@@ -293,11 +293,9 @@ class TestTemporalTaskExecutor:
         mock_execution.execution_time = datetime.utcnow()
         mock_execution.history_length = 10
         
-        # Create async iterator for list_workflows
-        async def mock_list_workflows(**kwargs):
-            yield mock_execution
-        
-        mock_client.list_workflows = mock_list_workflows
+        mock_client.list_workflows = MagicMock(return_value=self._page([mock_execution], b"next"))
+        mock_client.namespace = "default"
+        mock_client.workflow_service.count_workflow_executions.return_value = MagicMock(count=42)
         
         with patch('ctutor_backend.tasks.temporal_executor.get_temporal_client', return_value=mock_client):
             # List tasks
@@ -309,6 +307,91 @@ class TestTemporalTaskExecutor:
             assert tasks[0]["task_id"] == "test-id"
             assert tasks[0]["task_name"] == "test_workflow"
             assert tasks[0]["status"] == "started"
+            assert result["total"] == 42
+            assert result["has_more"] is True
+            
+            # Status is filtered by Temporal
+            mock_client.list_workflows.assert_called_once_with(
+                query="ExecutionStatus IN ('Running')",
+                page_size=10,
+                next_page_token=None
+            )
+            
+            # The next page continues from the returned token
+            mock_client.list_workflows.reset_mock()
+            mock_client.list_workflows.return_value = self._page([], None)
+            result = await executor.list_tasks(limit=10, page_token=result["next_page_token"])
+            
+            assert mock_client.list_workflows.call_args.kwargs["next_page_token"] == b"next"
+            assert result["has_more"] is False
+            assert result["next_page_token"] is None
+            assert result["total"] is None
+    
+    @staticmethod
+    def _page(executions, next_page_token):
+        """Mock of the page iterator returned by list_workflows."""
+        page = MagicMock()
+        page.fetch_next_page = AsyncMock()
+        page.current_page = executions
+        page.next_page_token = next_page_token
+        return page
+    
+    @pytest.mark.asyncio
+    async def test_list_tasks_offset_skips_a_page(self, executor, mock_client):
+        """Test that offsets are skipped with one page request."""
+        mock_client.namespace = "default"
+        skipped = self._page([MagicMock()] * 20, b"after-20")
+        mock_client.list_workflows = MagicMock(side_effect=[skipped, self._page([], None)])
+        
+        with patch('ctutor_backend.tasks.temporal_executor.get_temporal_client', return_value=mock_client):
+            await executor.list_tasks(limit=10, offset=20)
+        
+        assert mock_client.list_workflows.call_args_list[0].kwargs["page_size"] == 20
+        assert mock_client.list_workflows.call_args_list[1].kwargs["next_page_token"] == b"after-20"
+    
+    @pytest.mark.asyncio
+    async def test_list_tasks_large_offset_follows_page_tokens(self, executor, mock_client):
+        """Test that offsets above the server's page size cap are skipped page by page."""
+        mock_client.namespace = "default"
+        mock_client.list_workflows = MagicMock(side_effect=[
+            self._page([MagicMock()] * 1000, b"after-1000"),
+            self._page([MagicMock()] * 800, b"after-1800"),
+            self._page([MagicMock()] * 700, b"after-2500"),
+            self._page([], None),
+        ])
+        
+        with patch('ctutor_backend.tasks.temporal_executor.get_temporal_client', return_value=mock_client):
+            await executor.list_tasks(limit=10, offset=2500)
+        
+        calls = [call.kwargs for call in mock_client.list_workflows.call_args_list]
+        assert [call["page_size"] for call in calls] == [1000, 1000, 700, 10]
+        assert [call["next_page_token"] for call in calls] == [None, b"after-1000", b"after-1800", b"after-2500"]
+    
+    def test_build_list_query(self, executor):
+        """Test visibility query construction from the list filters."""
+        from datetime import timezone
+        
+        assert executor.build_list_query() == ""
+        assert executor.build_list_query(
+            status="failed",
+            task_name="generate_student_template_v2",
+            started_after=datetime(2024, 3, 1, tzinfo=timezone.utc),
+            started_before=datetime(2024, 3, 2, 12, 30)
+        ) == (
+            "ExecutionStatus IN ('Failed', 'TimedOut') "
+            "AND WorkflowType = 'generate_student_template_v2' "
+            "AND StartTime >= '2024-03-01T00:00:00Z' "
+            "AND StartTime < '2024-03-02T12:30:00Z'"
+        )
+    
+    def test_build_list_query_rejects_invalid_filters(self, executor):
+        """Test that unknown statuses and quotes are rejected."""
+        with pytest.raises(ValueError):
+            executor.build_list_query(status="unknown")
+        with pytest.raises(ValueError):
+            executor.build_list_query(task_name="x' OR WorkflowId != '")
+        with pytest.raises(ValueError):
+            executor.decode_page_token("not base64!")
 
     @pytest.mark.asyncio
     async def test_status_mapping(self, executor):
@@ -0,0 +1,47 @@
+"""
+Tests for the heartbeats of blocking activities.
+"""
+
+import time
+from unittest.mock import MagicMock, patch
+from temporalio.testing import ActivityEnvironment
+
+from ctutor_backend.tasks.temporal_heartbeat import heartbeating
+from ctutor_backend.tasks.temporal_student_testing import clone_repository_activity
+
+
+def blocking_work(seconds):
+    with heartbeating(interval=0.01) as heartbeat:
+        heartbeat.stage("working")
+        time.sleep(seconds)
+    return "done"
+
+
+class TestHeartbeating:
+
+    def test_heartbeats_while_blocked(self):
+        heartbeats = []
+        env = ActivityEnvironment()
+        env.on_heartbeat = lambda *details: heartbeats.append(details)
+
+        assert env.run(blocking_work, 0.1) == "done"
+
+        assert len(heartbeats) > 2
+        assert all(details == ("working",) for details in heartbeats)
+
+    def test_no_heartbeats_outside_of_activities(self):
+        assert blocking_work(0) == "done"
+
+    @patch("ctutor_backend.tasks.temporal_student_testing.subprocess.run")
+    def test_clone_is_a_sync_activity(self, mock_run, tmp_path):
+        mock_run.return_value = MagicMock(returncode=0)
+        heartbeats = []
+        env = ActivityEnvironment()
+        env.on_heartbeat = lambda *details: heartbeats.append(details)
+
+        repository = {"url": "http://gitlab.example.com/course/student.git", "commit": "abc123"}
+        assert env.run(clone_repository_activity, repository, str(tmp_path / "student")) is True
+
+        assert mock_run.call_count == 2
+        assert ("clone",) in heartbeats
+        assert ("checkout",) in heartbeats
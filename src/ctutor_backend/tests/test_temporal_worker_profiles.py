@@ -0,0 +1,85 @@
+"""
+Tests for the Temporal worker profiles.
+"""
+
+import pytest
+from unittest.mock import patch
+
+from ctutor_backend.tasks.temporal_worker import (
+    TemporalWorker,
+    resolve_worker_profiles,
+    worker_profiles,
+)
+from ctutor_backend.tasks.temporal_student_testing import StudentTestingWorkflow, execute_tests_activity
+from ctutor_backend.tasks.temporal_student_template_v2 import GenerateStudentTemplateWorkflowV2
+from ctutor_backend.tasks.temporal_hierarchy_management import CreateCourseWorkflow
+
+
+@pytest.fixture
+def split_queues():
+    with patch("ctutor_backend.tasks.temporal_worker.TESTING_TASK_QUEUE", "testing"), \
+         patch("ctutor_backend.tasks.temporal_worker.GITLAB_TASK_QUEUE", "gitlab"), \
+         patch("ctutor_backend.tasks.temporal_worker.GENERATION_TASK_QUEUE", "generation"):
+        yield
+
+
+class TestWorkerProfiles:
+
+    def test_profiles_separate_the_work(self):
+        profiles = worker_profiles()
+
+        assert profiles["testing"].workflows == [StudentTestingWorkflow]
+        assert execute_tests_activity in profiles["testing"].activities
+        assert CreateCourseWorkflow in profiles["gitlab"].workflows
+        assert GenerateStudentTemplateWorkflowV2 in profiles["generation"].workflows
+        assert profiles["generation"].max_concurrent_activities < profiles["gitlab"].max_concurrent_activities
+
+    def test_limits_from_environment(self, monkeypatch):
+        monkeypatch.setenv("TEMPORAL_GENERATION_MAX_ACTIVITIES", "1")
+        monkeypatch.setenv("TEMPORAL_GENERATION_EXECUTOR", "process")
+
+        generation = worker_profiles()["generation"]
+
+        assert generation.max_concurrent_activities == 1
+        assert generation.executor == "process"
+
+    def test_invalid_executor(self, monkeypatch):
+        monkeypatch.setenv("TEMPORAL_TESTING_EXECUTOR", "fiber")
+
+        with pytest.raises(ValueError):
+            worker_profiles()
+
+    def test_all_profiles_share_the_default_queue(self):
+        profiles = resolve_worker_profiles(["all"])
+
+        assert len(profiles) == 1
+        assert profiles[0].task_queue == "computor-tasks"
+        assert StudentTestingWorkflow in profiles[0].workflows
+        assert GenerateStudentTemplateWorkflowV2 in profiles[0].workflows
+
+    def test_split_queues_get_a_worker_each(self, split_queues):
+        profiles = {profile.task_queue: profile for profile in resolve_worker_profiles(["all"])}
+
+        assert set(profiles) == {"testing", "gitlab", "generation", "computor-tasks"}
+        assert profiles["generation"].workflows == worker_profiles()["generation"].workflows
+
+    def test_selected_profiles_only(self, split_queues):
+        profiles = resolve_worker_profiles(["gitlab", "generation"])
+
+        assert [profile.task_queue for profile in profiles] == ["gitlab", "generation"]
+
+    def test_queues_override_the_profile_queue(self):
+        profiles = resolve_worker_profiles(["testing"], ["testing-python"])
+
+        assert len(profiles) == 1
+        assert profiles[0].task_queue == "testing-python"
+        assert profiles[0].workflows == [StudentTestingWorkflow]
+
+    def test_unknown_profile(self):
+        with pytest.raises(ValueError):
+            resolve_worker_profiles(["grading"])
+
+    def test_worker_defaults_to_all_profiles(self, split_queues):
+        worker = TemporalWorker()
+
+        assert sorted(worker.task_queues) == ["computor-tasks", "generation", "gitlab", "testing"]
@@ -0,0 +1,142 @@
+"""
+Tests for the batched workflow status lookups.
+"""
+
+import pytest
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+from temporalio.client import WorkflowExecutionStatus
+from temporalio.service import RPCError, RPCStatusCode
+
+from ctutor_backend.tasks import temporal_workflow_status
+from ctutor_backend.tasks.temporal_workflow_status import (
+    describe_workflow,
+    describe_workflows,
+    invalidate_workflow_status,
+)
+
+
+def execution(workflow_id, status=WorkflowExecutionStatus.RUNNING, started=1):
+    result = MagicMock()
+    result.id = workflow_id
+    result.status = status
+    result.start_time = datetime(2024, 1, 1, 0, 0, started, tzinfo=timezone.utc)
+    result.close_time = None
+    result.execution_time = None
+    result.task_queue = "computor-tasks"
+    result.workflow_type = "generate_student_template_v2"
+    return result
+
+
+def list_workflows(executions):
+    async def iterate(query, page_size):
+        for item in executions:
+            yield item
+    return MagicMock(side_effect=iterate)
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    temporal_workflow_status._status_cache.clear()
+    yield
+    temporal_workflow_status._status_cache.clear()
+
+
+@pytest.fixture
+def client():
+    client = MagicMock()
+    client.list_workflows = list_workflows([])
+    with patch(
+        "ctutor_backend.tasks.temporal_workflow_status.get_temporal_client",
+        AsyncMock(return_value=client)
+    ):
+        yield client
+
+
+class TestDescribeWorkflows:
+
+    @pytest.mark.asyncio
+    async def test_many_workflows_are_listed_with_one_query(self, client):
+        client.list_workflows = list_workflows([
+            execution("wf-1"),
+            execution("wf-2", WorkflowExecutionStatus.COMPLETED),
+        ])
+
+        statuses = await describe_workflows(["wf-1", "wf-2", "wf-1"])
+
+        assert statuses["wf-1"]["status"] == "RUNNING"
+        assert statuses["wf-1"]["is_running"] is True
+        assert statuses["wf-2"]["status"] == "COMPLETED"
+        client.list_workflows.assert_called_once()
+        assert client.list_workflows.call_args[0][0] == "WorkflowId IN ('wf-1', 'wf-2')"
+        client.get_workflow_handle.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_latest_run_wins(self, client):
+        client.list_workflows = list_workflows([
+            execution("wf-1", WorkflowExecutionStatus.RUNNING, started=5),
+            execution("wf-1", WorkflowExecutionStatus.FAILED, started=1),
+            execution("wf-2"),
+        ])
+
+        statuses = await describe_workflows(["wf-1", "wf-2"])
+
+        assert statuses["wf-1"]["status"] == "RUNNING"
+
+    @pytest.mark.asyncio
+    async def test_unlisted_workflows_are_described(self, client):
+        client.list_workflows = list_workflows([execution("wf-1")])
+        client.get_workflow_handle.return_value.describe = AsyncMock(
+            return_value=execution("wf-2", WorkflowExecutionStatus.COMPLETED)
+        )
+
+        statuses = await describe_workflows(["wf-1", "wf-2"])
+
+        assert statuses["wf-2"]["status"] == "COMPLETED"
+        client.get_workflow_handle.assert_called_once_with("wf-2")
+
+    @pytest.mark.asyncio
+    async def test_unsupported_query_falls_back_to_describe(self, client):
+        client.list_workflows = MagicMock(
+            side_effect=RPCError("invalid query", RPCStatusCode.INVALID_ARGUMENT, b"")
+        )
+        client.get_workflow_handle.return_value.describe = AsyncMock(return_value=execution("wf"))
+
+        statuses = await describe_workflows(["wf-1", "wf-2"])
+
+        assert set(statuses) == {"wf-1", "wf-2"}
+        assert client.get_workflow_handle.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_statuses_are_cached(self, client):
+        client.get_workflow_handle.return_value.describe = AsyncMock(return_value=execution("wf-1"))
+
+        await describe_workflow("wf-1")
+        await describe_workflow("wf-1")
+        assert client.get_workflow_handle.call_count == 1
+
+        invalidate_workflow_status("wf-1")
+        await describe_workflow("wf-1")
+        assert client.get_workflow_handle.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_unknown_workflow(self, client):
+        client.get_workflow_handle.return_value.describe = AsyncMock(
+            side_effect=RPCError("workflow not found", RPCStatusCode.NOT_FOUND, b"")
+        )
+
+        info = await describe_workflow("wf-1")
+
+        assert info["status"] == "NOT_FOUND"
+        assert info["is_running"] is False
+
+    @pytest.mark.asyncio
+    async def test_failed_lookup_is_not_cached(self, client):
+        client.get_workflow_handle.return_value.describe = AsyncMock(
+            side_effect=RPCError("unavailable", RPCStatusCode.UNAVAILABLE, b"")
+        )
+
+        await describe_workflow("wf-1")
+        await describe_workflow("wf-1")
+
+        assert client.get_workflow_handle.call_count == 2
@@ -0,0 +1,42 @@
+"""
+Tests for the course-scoped tutor course member query.
+"""
+
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session, aliased
+
+from ctutor_backend.api.queries import course_course_member_list_query
+from ctutor_backend.model.course import CourseMember
+
+
+def _compile(query) -> str:
+    return str(query.statement.compile(dialect=postgresql.dialect())).lower()
+
+
+class TestCourseCourseMemberListQuery:
+    """Test cases for course_course_member_list_query."""
+
+    def test_course_filter_is_pushed_into_aggregation(self):
+        sql = _compile(course_course_member_list_query(Session(), course_id="course-1"))
+
+        aggregation = sql[sql.index("(select"):sql.index("group by")]
+        assert "max(result.created_at)" in aggregation
+        assert "course_submission_group_member.course_id = %(course_id" in aggregation
+        # Only one aggregation level over the results
+        assert sql.count("max(") == 1
+
+    def test_tutor_courses_restrict_members_and_results(self):
+        tutor_member = aliased(CourseMember)
+        course_ids = select(tutor_member.course_id).where(tutor_member.user_id == "tutor-1")
+
+        sql = _compile(course_course_member_list_query(Session(), course_ids=course_ids))
+
+        assert "course_submission_group_member.course_id in (select course_member_1.course_id" in sql
+        assert "course_member.course_id in (select course_member_1.course_id" in sql
+
+    def test_unscoped_query_has_no_course_filter(self):
+        sql = _compile(course_course_member_list_query(Session()))
+
+        assert "course_id in" not in sql
+        assert "course_id =" not in sql